@@ -0,0 +1,70 @@
+"""Add monthly_aggregates and monthly_aggregate_coverage tables
+
+Revision ID: j4d5e6f7g8h9
+Revises: i3c4d5e6f7g8
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'j4d5e6f7g8h9'
+down_revision: str = 'i3c4d5e6f7g8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    existing_tables = inspector.get_table_names()
+
+    if 'monthly_aggregates' not in existing_tables:
+        op.create_table('monthly_aggregates',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('household_id', sa.String(), nullable=False),
+            sa.Column('year', sa.Integer(), nullable=False),
+            sa.Column('month', sa.Integer(), nullable=False),
+            sa.Column('kind', sa.String(), nullable=False),
+            sa.Column('category', sa.String(), nullable=False, server_default=''),
+            sa.Column('total', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('from_bank', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('from_manual', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('bank_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('manual_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('duplicate_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('unreviewed_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['household_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('household_id', 'year', 'month', 'kind', 'category', name='uq_monthly_aggregate_key'),
+        )
+        op.create_index('ix_monthly_aggregates_id', 'monthly_aggregates', ['id'], unique=False)
+        op.create_index('idx_monthly_aggregates_household_period', 'monthly_aggregates', ['household_id', 'year', 'month'], unique=False)
+
+    if 'monthly_aggregate_coverage' not in existing_tables:
+        op.create_table('monthly_aggregate_coverage',
+            sa.Column('household_id', sa.String(), nullable=False),
+            sa.Column('first_year', sa.Integer(), nullable=False),
+            sa.Column('first_month', sa.Integer(), nullable=False),
+            sa.Column('last_year', sa.Integer(), nullable=False),
+            sa.Column('last_month', sa.Integer(), nullable=False),
+            sa.Column('rebuilt_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['household_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('household_id'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('monthly_aggregate_coverage')
+    op.drop_index('idx_monthly_aggregates_household_period', table_name='monthly_aggregates')
+    op.drop_index('ix_monthly_aggregates_id', table_name='monthly_aggregates')
+    op.drop_table('monthly_aggregates')
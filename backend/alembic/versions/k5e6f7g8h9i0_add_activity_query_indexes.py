@@ -0,0 +1,60 @@
+"""Add composite and partial indexes for month-activity queries
+
+Revision ID: k5e6f7g8h9i0
+Revises: j4d5e6f7g8h9
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'k5e6f7g8h9i0'
+down_revision: str = 'j4d5e6f7g8h9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_RECURRING = 'is_recurring AND end_date IS NULL'
+
+# (table, index name, columns, partial WHERE clause or None)
+INDEXES = [
+    ('expenses', 'idx_expenses_user_recurring_date', ['user_id', 'is_recurring', 'date', 'end_date'], None),
+    ('expenses', 'idx_expenses_user_open_recurring', ['user_id', 'date'], OPEN_RECURRING),
+    ('expenses', 'idx_expenses_user_created_at', ['user_id', 'created_at'], None),
+    ('income', 'idx_income_user_recurring_date', ['user_id', 'is_recurring', 'date', 'end_date'], None),
+    ('income', 'idx_income_user_open_recurring', ['user_id', 'date'], OPEN_RECURRING),
+    ('income', 'idx_income_user_created_at', ['user_id', 'created_at'], None),
+    ('savings', 'idx_savings_user_recurring_date', ['user_id', 'is_recurring', 'date', 'end_date'], None),
+    ('savings', 'idx_savings_user_open_recurring', ['user_id', 'date'], OPEN_RECURRING),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = inspect(op.get_bind())
+
+    for table, name, columns, where in INDEXES:
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        if name in existing:
+            continue
+        kwargs = {}
+        if where:
+            kwargs = {
+                'postgresql_where': sa.text(where),
+                'sqlite_where': sa.text(where),
+            }
+        op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = inspect(op.get_bind())
+
+    for table, name, _columns, _where in reversed(INDEXES):
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        if name in existing:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,47 @@
+"""Add tink_sync_state table for incremental transaction sync
+
+Revision ID: l6f7g8h9i0j1
+Revises: k5e6f7g8h9i0
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'l6f7g8h9i0j1'
+down_revision: str = 'k5e6f7g8h9i0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if 'tink_sync_state' not in inspector.get_table_names():
+        op.create_table('tink_sync_state',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('connection_id', sa.Integer(), nullable=False),
+            sa.Column('account_id', sa.String(), nullable=False, server_default=''),
+            sa.Column('last_booked_date', sa.Date(), nullable=True),
+            sa.Column('page_token', sa.String(), nullable=True),
+            sa.Column('cursor_from_date', sa.Date(), nullable=True),
+            sa.Column('last_synced_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['connection_id'], ['tink_connections.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('connection_id', 'account_id', name='uq_tink_sync_state_account'),
+        )
+        op.create_index('ix_tink_sync_state_id', 'tink_sync_state', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tink_sync_state_id', table_name='tink_sync_state')
+    op.drop_table('tink_sync_state')
@@ -0,0 +1,64 @@
+"""Add bank_sync_jobs table for queued user-initiated bank syncs
+
+Revision ID: m7g8h9i0j1k2
+Revises: l6f7g8h9i0j1
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'm7g8h9i0j1k2'
+down_revision: str = 'l6f7g8h9i0j1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if 'bank_sync_jobs' not in inspector.get_table_names():
+        op.create_table('bank_sync_jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('provider', sa.String(), nullable=False),
+            sa.Column('params', sa.JSON(), nullable=True),
+            sa.Column('active_key', sa.String(), nullable=True),
+            sa.Column('idempotency_key', sa.String(), nullable=True),
+            sa.Column('status', sa.String(), nullable=False, server_default='queued'),
+            sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'),
+            sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('locked_by', sa.String(), nullable=True),
+            sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('progress', sa.JSON(), nullable=True),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.Column('error', sa.String(), nullable=True),
+            sa.Column('error_code', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('active_key'),
+            sa.UniqueConstraint('idempotency_key'),
+        )
+        op.create_index('ix_bank_sync_jobs_id', 'bank_sync_jobs', ['id'], unique=False)
+        op.create_index('idx_bank_sync_jobs_status_run_after', 'bank_sync_jobs', ['status', 'run_after'], unique=False)
+        op.create_index('idx_bank_sync_jobs_user_id', 'bank_sync_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_bank_sync_jobs_user_id', table_name='bank_sync_jobs')
+    op.drop_index('idx_bank_sync_jobs_status_run_after', table_name='bank_sync_jobs')
+    op.drop_index('ix_bank_sync_jobs_id', table_name='bank_sync_jobs')
+    op.drop_table('bank_sync_jobs')
@@ -0,0 +1,57 @@
+"""Add reconciliation_candidates table for incrementally maintained duplicate suggestions
+
+Revision ID: n8h9i0j1k2l3
+Revises: m7g8h9i0j1k2
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'n8h9i0j1k2l3'
+down_revision: str = 'm7g8h9i0j1k2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if 'reconciliation_candidates' not in inspector.get_table_names():
+        op.create_table('reconciliation_candidates',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('entry_type', sa.String(), nullable=False),
+            sa.Column('expense_id', sa.Integer(), nullable=True),
+            sa.Column('income_id', sa.Integer(), nullable=True),
+            sa.Column('bank_transaction_id', sa.Integer(), nullable=False),
+            sa.Column('manual_date', sa.Date(), nullable=False),
+            sa.Column('match_score', sa.Float(), nullable=False),
+            sa.Column('match_reasons', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['expense_id'], ['expenses.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['income_id'], ['income.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['bank_transaction_id'], ['bank_transactions.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('expense_id', 'bank_transaction_id', name='uq_reconciliation_candidate_expense'),
+            sa.UniqueConstraint('income_id', 'bank_transaction_id', name='uq_reconciliation_candidate_income'),
+        )
+        op.create_index('ix_reconciliation_candidates_id', 'reconciliation_candidates', ['id'], unique=False)
+        op.create_index('idx_reconciliation_candidates_user_score', 'reconciliation_candidates', ['user_id', 'match_score'], unique=False)
+        op.create_index('idx_reconciliation_candidates_bank_tx', 'reconciliation_candidates', ['bank_transaction_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_reconciliation_candidates_bank_tx', table_name='reconciliation_candidates')
+    op.drop_index('idx_reconciliation_candidates_user_score', table_name='reconciliation_candidates')
+    op.drop_index('ix_reconciliation_candidates_id', table_name='reconciliation_candidates')
+    op.drop_table('reconciliation_candidates')
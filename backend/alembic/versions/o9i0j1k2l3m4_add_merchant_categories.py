@@ -0,0 +1,48 @@
+"""Add merchant_categories table caching AI categories per household merchant
+
+Revision ID: o9i0j1k2l3m4
+Revises: n8h9i0j1k2l3
+Create Date: 2026-10-16 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o9i0j1k2l3m4'
+down_revision: str = 'n8h9i0j1k2l3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if 'merchant_categories' not in inspector.get_table_names():
+        op.create_table('merchant_categories',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('merchant_key', sa.String(), nullable=False),
+            sa.Column('direction', sa.String(), nullable=False),
+            sa.Column('suggested_type', sa.String(), nullable=True),
+            sa.Column('suggested_category', sa.String(), nullable=False),
+            sa.Column('confidence', sa.Float(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id', 'merchant_key', 'direction', name='uq_merchant_category_key'),
+        )
+        op.create_index('ix_merchant_categories_id', 'merchant_categories', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_merchant_categories_id', table_name='merchant_categories')
+    op.drop_table('merchant_categories')
@@ -0,0 +1,64 @@
+"""Add rolling summary to ai_conversations and the ai_usage_records table
+
+Revision ID: p0j1k2l3m4n5
+Revises: o9i0j1k2l3m4
+Create Date: 2026-10-16 23:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'p0j1k2l3m4n5'
+down_revision: str = 'o9i0j1k2l3m4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    conversation_columns = {c['name'] for c in inspector.get_columns('ai_conversations')}
+    if 'summary' not in conversation_columns:
+        op.add_column('ai_conversations', sa.Column('summary', sa.String(), nullable=True))
+    if 'summary_message_id' not in conversation_columns:
+        op.add_column('ai_conversations', sa.Column('summary_message_id', sa.Integer(), nullable=True))
+
+    if 'ai_usage_records' not in inspector.get_table_names():
+        op.create_table('ai_usage_records',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('conversation_id', sa.Integer(), nullable=True),
+            sa.Column('kind', sa.String(), nullable=False),
+            sa.Column('model', sa.String(), nullable=False),
+            sa.Column('requests', sa.Integer(), nullable=False),
+            sa.Column('tool_calls', sa.Integer(), nullable=False),
+            sa.Column('input_tokens', sa.Integer(), nullable=False),
+            sa.Column('output_tokens', sa.Integer(), nullable=False),
+            sa.Column('cache_creation_input_tokens', sa.Integer(), nullable=False),
+            sa.Column('cache_read_input_tokens', sa.Integer(), nullable=False),
+            sa.Column('history_messages', sa.Integer(), nullable=False),
+            sa.Column('first_token_ms', sa.Integer(), nullable=True),
+            sa.Column('latency_ms', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['conversation_id'], ['ai_conversations.id'], ondelete='SET NULL'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('idx_ai_usage_records_created_at', 'ai_usage_records', ['created_at'], unique=False)
+        op.create_index('idx_ai_usage_records_user_created', 'ai_usage_records', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_ai_usage_records_user_created', table_name='ai_usage_records')
+    op.drop_index('idx_ai_usage_records_created_at', table_name='ai_usage_records')
+    op.drop_table('ai_usage_records')
+    op.drop_column('ai_conversations', 'summary_message_id')
+    op.drop_column('ai_conversations', 'summary')
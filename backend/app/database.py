@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine, text, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool, StaticPool
@@ -16,8 +18,10 @@ ENVIRONMENT = os.getenv("ENVIRONMENT", "production")
 IS_TEST_MODE = ENVIRONMENT == "test"
 
 if IS_TEST_MODE:
-    # Test mode: use in-memory SQLite
-    SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+    # Test mode: use in-memory SQLite. The named shared-cache database lets the
+    # aiosqlite engine below see the same tables as the sync engine.
+    SQLALCHEMY_DATABASE_URL = "sqlite:///file:home_budget_test?mode=memory&cache=shared&uri=true"
+    ASYNC_DATABASE_URL = "sqlite+aiosqlite:///file:home_budget_test?mode=memory&cache=shared&uri=true"
     logger.debug("Running in test mode with in-memory SQLite")
 
     engine = create_engine(
@@ -32,6 +36,9 @@ if IS_TEST_MODE:
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
         cursor.close()
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=StaticPool)
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragma)
 else:
     # Production mode: use PostgreSQL
     POSTGRES_USER = os.getenv("POSTGRES_USER", "homebudget")
@@ -43,6 +50,7 @@ else:
     POSTGRES_DB = os.getenv("POSTGRES_DB", "homebudget")
 
     SQLALCHEMY_DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    ASYNC_DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
     logger.debug("Connecting to database at %s:%s/%s", POSTGRES_HOST, POSTGRES_PORT, POSTGRES_DB)
     try:
@@ -62,7 +70,22 @@ else:
         logger.error(f"Failed to connect to database: {str(e)}")
         raise
 
+    # Async engine for endpoints that must not block the event loop (see get_async_db).
+    # It keeps its own pool on top of the sync engine's 20+10 connections.
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=10,
+        max_overflow=10,
+        pool_timeout=30,
+        pool_pre_ping=True
+    )
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: expired attributes would otherwise be lazy-loaded outside
+# the greenlet context after a commit, which the async drivers can't do
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
@@ -72,4 +95,50 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
+        db.close()
+
+
+async def get_async_db():
+    """
+    AsyncSession dependency (asyncpg in production, aiosqlite in test mode).
+
+    Database I/O awaits on the event loop instead of blocking it, so one slow
+    query doesn't stall every other request and WebSocket stream. Services are
+    written against a sync Session; call them through run_sync_db.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_async_session_factory():
+    """
+    Dependency returning the AsyncSession factory.
+
+    For long-lived handlers (WebSockets) that open a short session per unit of
+    work instead of holding one - and its pooled connection - for their lifetime.
+    """
+    return AsyncSessionLocal
+
+
+def dialect_insert(db, table):
+    """
+    INSERT for table in the session's dialect (SQLite in tests, PostgreSQL otherwise).
+
+    Unlike sqlalchemy.insert it offers on_conflict_do_update/do_nothing for upserts.
+    """
+    dialect = sqlite if db.get_bind().dialect.name == "sqlite" else postgresql
+    return dialect.insert(table)
+
+
+async def run_sync_db(db, fn, *args, **kwargs):
+    """
+    Call fn(session, *args, **kwargs) with a sync Session.
+
+    For an AsyncSession the call goes through AsyncSession.run_sync, which runs the
+    sync ORM code in a greenlet whose database I/O is awaited on the event loop. A
+    plain Session (scripts, the MCP server, sync endpoints) is passed straight through.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return fn(db, *args, **kwargs)
+
@@ -255,7 +255,7 @@ async def get_or_create_current_user(
             subscription = ensure_subscription_exists(user.id, db)
             trial_end = subscription.trial_end if subscription else None
 
-            if send_welcome_email(user.email, user.name, trial_end):
+            if await send_welcome_email.offload(user.email, user.name, trial_end):
                 user.welcome_email_sent_at = datetime.now(timezone.utc)
                 db.commit()
                 logger.info(f"Welcome email sent to user {user.id}")
@@ -0,0 +1,178 @@
+"""
+Process-wide pooled HTTP clients for upstream APIs.
+
+Opening a new httpx.AsyncClient per call pays a TCP and TLS handshake on every
+request to Tink, GoCardless, Enable Banking, OpenAI, Anthropic and Google. Instead each
+upstream gets one long-lived client with a keep-alive pool:
+
+    client = get_client("tink")
+    response = await client.get(url, headers=...)
+
+Clients are created in the app lifespan (start()) and closed on shutdown
+(aclose()); get_client() also creates them on first use, so scripts and jobs
+running outside the app work unchanged. A client belongs to the event loop that
+created it, so a call from a different loop gets a fresh client for that loop.
+
+Configuration (per client, falling back to the global value):
+- HTTP_<NAME>_MAX_CONNECTIONS / HTTP_MAX_CONNECTIONS (default 20, or the
+  per-upstream default in HTTP_CLIENT_MAX_CONNECTIONS)
+- HTTP_<NAME>_MAX_KEEPALIVE / HTTP_MAX_KEEPALIVE (default 10)
+- HTTP_<NAME>_TIMEOUT (defaults in HTTP_CLIENT_TIMEOUTS)
+- HTTP_KEEPALIVE_EXPIRY seconds (default 30)
+- HTTP_CLIENT_HTTP2=off disables HTTP/2; it is only used when the optional
+  h2 package is installed (httpx[http2])
+
+stats() reports per-client requests, new connections, the connection reuse ratio
+and pool utilization; it is served at GET /admin/runtime/http.
+"""
+import asyncio
+import logging
+import os
+import ssl
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    _H2_AVAILABLE = True
+except ImportError:
+    _H2_AVAILABLE = False
+
+HTTP_CLIENT_HTTP2 = _H2_AVAILABLE and os.getenv("HTTP_CLIENT_HTTP2", "on").lower() not in ("off", "0", "false")
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# Default timeout (seconds) per upstream; calls can still pass timeout= per request
+HTTP_CLIENT_TIMEOUTS = {
+    "tink": 30.0,
+    "gocardless": 5.0,
+    "enable_banking": 30.0,
+    "openai": 60.0,
+    # AI chat streams: the timeout applies between streamed chunks
+    "anthropic": 120.0,
+    "google": 10.0,
+}
+DEFAULT_TIMEOUT = 5.0
+
+# Upstreams that hold one connection per long-lived stream need a bigger pool
+HTTP_CLIENT_MAX_CONNECTIONS = {
+    "anthropic": 100,
+}
+
+
+@lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    """One verified SSL context shared by every client (loading CA certs is slow)."""
+    return httpx.create_ssl_context()
+
+
+class PooledClient:
+    """A shared httpx.AsyncClient plus request and connection counters."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.max_connections = int(os.getenv(
+            f"HTTP_{name.upper()}_MAX_CONNECTIONS", HTTP_CLIENT_MAX_CONNECTIONS.get(name, HTTP_MAX_CONNECTIONS)
+        ))
+        self.max_keepalive = int(os.getenv(f"HTTP_{name.upper()}_MAX_KEEPALIVE", HTTP_MAX_KEEPALIVE))
+        self.timeout = float(os.getenv(
+            f"HTTP_{name.upper()}_TIMEOUT", HTTP_CLIENT_TIMEOUTS.get(name, DEFAULT_TIMEOUT)
+        ))
+        self.requests = 0
+        self.new_connections = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.client = httpx.AsyncClient(
+            http2=HTTP_CLIENT_HTTP2,
+            verify=_ssl_context(),
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            event_hooks={"request": [self._on_request]},
+        )
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        # Only emitted when the pool has to open a new connection
+        if event == "connection.connect_tcp.complete":
+            self.new_connections += 1
+
+    def _pool_connections(self) -> list:
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        return list(getattr(pool, "connections", []))
+
+    def stats(self) -> Dict[str, Any]:
+        connections = self._pool_connections()
+        active = sum(1 for conn in connections if not conn.is_idle())
+        return {
+            "http2": HTTP_CLIENT_HTTP2,
+            "timeout_s": self.timeout,
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reuse_ratio": round(1 - self.new_connections / self.requests, 4) if self.requests else 0.0,
+            "open_connections": len(connections),
+            "active_connections": active,
+            "utilization": round(active / self.max_connections, 4) if self.max_connections else 0.0,
+        }
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+_clients: Dict[str, PooledClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """Return the shared client for an upstream, creating it on first use."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _clients_lock:
+        pooled = _clients.get(name)
+        if pooled is None or (loop is not None and pooled.loop is not None and pooled.loop is not loop):
+            # The old client's connections belong to another (usually finished) loop
+            pooled = _clients[name] = PooledClient(name)
+        if pooled.loop is None:
+            pooled.loop = loop
+        return pooled.client
+
+
+def start() -> None:
+    """Create the configured clients up front (called from the app lifespan)."""
+    for name in HTTP_CLIENT_TIMEOUTS:
+        get_client(name)
+    logger.info(f"[HTTP] shared clients ready: {', '.join(HTTP_CLIENT_TIMEOUTS)} (http2={HTTP_CLIENT_HTTP2})")
+
+
+async def aclose() -> None:
+    """Close every client's pooled connections (called from the app lifespan)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for pooled in clients:
+        try:
+            await pooled.aclose()
+        except Exception as e:
+            logger.warning(f"[HTTP] failed to close {pooled.name} client: {e}")
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """Per-client pool metrics."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {pooled.name: pooled.stats() for pooled in clients}
@@ -0,0 +1,425 @@
+"""
+Durable queue for user-initiated bank syncs.
+
+POST /banking/transactions/sync and POST /banking/enablebanking/sync used to fetch,
+dedup and insert inside the HTTP request. Long histories hit proxy timeouts and
+held a pooled DB connection for the whole sync. The endpoints now only enqueue a
+BankSyncJob row and return its id; worker coroutines claim and run the jobs.
+
+- Idempotency: one queued/running job per user and provider (active_key); a
+  repeated request - a double-click, or a retry with the same Idempotency-Key
+  header - returns the existing job instead of starting a second sync
+- Claiming: SELECT ... FOR UPDATE SKIP LOCKED, so several workers (in this
+  process or in separate `python -m app.jobs.bank_sync_queue` processes) never
+  run the same job. The claiming worker holds a lease (locked_until) that every
+  progress update extends; a job whose worker died is picked up after the lease
+  expires
+- Retries: a failed attempt is re-queued with exponential backoff
+  (BANK_SYNC_RETRY_BASE_SECONDS * 2^(attempt-1)) until BANK_SYNC_MAX_ATTEMPTS;
+  errors raised as SyncJobError(retryable=False) fail the job at once
+- Provider budgets: workers take a token from sync_scheduler's provider bucket
+  before each attempt, so queued and background syncs share one rate budget
+
+Handlers are registered per provider with @sync_job_handler(provider) and
+receive (db, job, progress); progress.update(**fields) publishes progress for
+polling (GET /banking/sync-jobs/{id}) and SSE (GET /banking/sync-jobs/{id}/events).
+The session is a sync Session, so its work - like claiming jobs and recording
+their outcome here - runs on the "bank_sync" offload pool: handlers call
+`await run_job_db(fn, ...)` and `await progress.publish(**fields)` instead of
+blocking the event loop the workers share with the app.
+
+Workers start in the app lifespan when BANK_SYNC_WORKERS > 0 (default 2; 0 in
+test mode).
+"""
+import asyncio
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import IS_TEST_MODE, SessionLocal
+from ..models import BankSyncJob
+from ..offload import run_blocking
+from .sync_scheduler import sync_scheduler
+
+logger = logging.getLogger(__name__)
+
+BANK_SYNC_WORKERS = int(os.getenv("BANK_SYNC_WORKERS", "0" if IS_TEST_MODE else "2"))
+BANK_SYNC_POLL_SECONDS = float(os.getenv("BANK_SYNC_POLL_SECONDS", "1.0"))
+BANK_SYNC_MAX_ATTEMPTS = int(os.getenv("BANK_SYNC_MAX_ATTEMPTS", "3"))
+BANK_SYNC_RETRY_BASE_SECONDS = float(os.getenv("BANK_SYNC_RETRY_BASE_SECONDS", "30"))
+BANK_SYNC_LEASE_SECONDS = int(os.getenv("BANK_SYNC_LEASE_SECONDS", "300"))
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+# Offload pool for the workers' blocking Session work
+BANK_SYNC_POOL = "bank_sync"
+
+
+class SyncJobError(Exception):
+    """Raised by a handler to fail an attempt with an error code for the client."""
+
+    def __init__(self, message: str, error_code: Optional[str] = None, retryable: bool = True):
+        self.error_code = error_code
+        self.retryable = retryable
+        super().__init__(message)
+
+
+Handler = Callable[[Session, BankSyncJob, "JobProgress"], Awaitable[Dict[str, Any]]]
+_HANDLERS: Dict[str, Handler] = {}
+
+
+def sync_job_handler(provider: str) -> Callable[[Handler], Handler]:
+    """Register the coroutine that runs queued syncs for a provider."""
+    def decorator(handler: Handler) -> Handler:
+        _HANDLERS[provider] = handler
+        return handler
+    return decorator
+
+
+async def run_job_db(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run blocking Session work for a sync job on the bank_sync pool."""
+    return await run_blocking(BANK_SYNC_POOL, fn, *args, **kwargs)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def serialize_job(job: BankSyncJob) -> Dict[str, Any]:
+    """Client-facing view of a job."""
+    return {
+        "job_id": job.id,
+        "provider": job.provider,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "progress": job.progress or {},
+        "result": job.result,
+        "error": job.error,
+        "error_code": job.error_code,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "status_url": f"/banking/sync-jobs/{job.id}",
+        "events_url": f"/banking/sync-jobs/{job.id}/events",
+    }
+
+
+def enqueue_sync(
+    db: Session,
+    user_id: str,
+    provider: str,
+    params: Optional[Dict[str, Any]] = None,
+    idempotency_key: Optional[str] = None,
+) -> BankSyncJob:
+    """
+    Queue a sync, or return the job already covering this request.
+
+    Returns the job with the caller's Idempotency-Key if there is one, else the
+    user's queued/running job for the provider, else a new job. Commits.
+    """
+    scoped_key = f"{user_id}:{idempotency_key}" if idempotency_key else None
+    active_key = f"{provider}:{user_id}"
+
+    existing = _find_existing(db, scoped_key, active_key)
+    if existing is not None:
+        return existing
+
+    job = BankSyncJob(
+        user_id=user_id,
+        provider=provider,
+        params=params or {},
+        active_key=active_key,
+        idempotency_key=scoped_key,
+        status="queued",
+        attempts=0,
+        max_attempts=BANK_SYNC_MAX_ATTEMPTS,
+        run_after=_utcnow(),
+        progress={"stage": "queued"},
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request queued the same sync first
+        db.rollback()
+        existing = _find_existing(db, scoped_key, active_key)
+        if existing is None:
+            raise
+        return existing
+
+    db.refresh(job)
+    logger.info(f"[BankSyncQueue] queued {provider} sync job {job.id} for user {user_id}")
+    return job
+
+
+def _find_existing(db: Session, scoped_key: Optional[str], active_key: str) -> Optional[BankSyncJob]:
+    if scoped_key:
+        job = db.query(BankSyncJob).filter(BankSyncJob.idempotency_key == scoped_key).first()
+        if job is not None:
+            return job
+    return db.query(BankSyncJob).filter(BankSyncJob.active_key == active_key).first()
+
+
+class JobProgress:
+    """Publishes a running job's progress and extends the worker's lease."""
+
+    def __init__(self, job_id: int, worker_id: str, session_factory: Callable[[], Session]):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.session_factory = session_factory
+        self.state: Dict[str, Any] = {}
+        # Serializes writes from concurrent publish() calls, so the latest state is stored last
+        self._lock = threading.Lock()
+
+    def update(self, **fields: Any) -> None:
+        with self._lock:
+            self.state.update(fields)
+            self._write()
+
+    async def publish(self, **fields: Any) -> None:
+        """update() from async code, on the bank_sync pool."""
+        await run_job_db(self.update, **fields)
+
+    def _write(self) -> None:
+        # Separate session: the handler's session holds uncommitted sync work
+        db = self.session_factory()
+        try:
+            db.query(BankSyncJob).filter(
+                BankSyncJob.id == self.job_id,
+                BankSyncJob.locked_by == self.worker_id,
+            ).update({
+                BankSyncJob.progress: dict(self.state),
+                BankSyncJob.locked_until: _utcnow() + timedelta(seconds=BANK_SYNC_LEASE_SECONDS),
+            }, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"[BankSyncQueue] progress update for job {self.job_id} failed: {e}")
+        finally:
+            db.close()
+
+
+class BankSyncQueue:
+    """Claims queued BankSyncJob rows and runs them with the registered handlers."""
+
+    def __init__(
+        self,
+        workers: int = BANK_SYNC_WORKERS,
+        session_factory: Callable[[], Session] = SessionLocal,
+        poll_seconds: float = BANK_SYNC_POLL_SECONDS,
+    ):
+        self.workers = workers
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+        self.totals = {"claimed": 0, "succeeded": 0, "failed": 0, "retried": 0}
+
+    def claim_next(self, worker_id: str) -> Optional[BankSyncJob]:
+        """Lease the next due job (or one whose lease expired) to worker_id; returns a detached copy."""
+        db = self.session_factory()
+        try:
+            now = _utcnow()
+            job = db.scalars(
+                select(BankSyncJob).where(or_(
+                    and_(BankSyncJob.status == "queued", BankSyncJob.run_after <= now),
+                    and_(BankSyncJob.status == "running", BankSyncJob.locked_until < now),
+                ))
+                .order_by(BankSyncJob.run_after, BankSyncJob.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).first()
+            if job is None:
+                # Closing the session ends its read transaction
+                return None
+
+            if job.status == "running" and job.attempts >= job.max_attempts:
+                # Its last attempt's worker died without reporting back
+                _finish(job, "failed", error="Sync worker stopped responding", error_code="INTERNAL_ERROR")
+                db.commit()
+                return None
+
+            job.status = "running"
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.locked_until = now + timedelta(seconds=BANK_SYNC_LEASE_SECONDS)
+            job.started_at = job.started_at or now
+            job.progress = {"stage": "starting", "attempt": job.attempts}
+            db.commit()
+            db.refresh(job)
+            db.expunge(job)
+            self.totals["claimed"] += 1
+            return job
+        finally:
+            db.close()
+
+    async def run_job(self, job: BankSyncJob, worker_id: str) -> None:
+        """Run one claimed job's attempt and record its outcome."""
+        handler = _HANDLERS.get(job.provider)
+        progress = JobProgress(job.id, worker_id, self.session_factory)
+        db = self.session_factory()
+        try:
+            if handler is None:
+                raise SyncJobError(f"No sync handler for provider {job.provider}", retryable=False)
+            await sync_scheduler.provider_bucket(job.provider).acquire()
+            result = await handler(db, job, progress)
+        except Exception as e:
+            # Discards the attempt's uncommitted work
+            db.close()
+            logger.error(
+                f"[BankSyncQueue] {job.provider} job {job.id} attempt {job.attempts} failed: {e}",
+                exc_info=not isinstance(e, SyncJobError),
+            )
+            await run_job_db(self._record_failure, job, worker_id, e)
+            return
+        finally:
+            db.close()
+
+        await run_job_db(self._record, job.id, worker_id, lambda row: _finish(row, "succeeded", result=result))
+        self.totals["succeeded"] += 1
+
+    def _record_failure(self, job: BankSyncJob, worker_id: str, error: Exception) -> None:
+        retryable = getattr(error, "retryable", True)
+        error_code = getattr(error, "error_code", None) or "INTERNAL_ERROR"
+
+        if retryable and job.attempts < job.max_attempts:
+            delay = BANK_SYNC_RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+
+            def requeue(row: BankSyncJob) -> None:
+                row.status = "queued"
+                row.run_after = _utcnow() + timedelta(seconds=delay)
+                row.locked_by = None
+                row.locked_until = None
+                row.error = str(error)
+                row.error_code = error_code
+                row.progress = {"stage": "retrying", "attempt": row.attempts, "retry_in_s": delay}
+
+            self._record(job.id, worker_id, requeue)
+            self.totals["retried"] += 1
+        else:
+            self._record(job.id, worker_id, lambda row: _finish(
+                row, "failed", error=str(error), error_code=error_code
+            ))
+            self.totals["failed"] += 1
+
+    def _record(self, job_id: int, worker_id: str, apply: Callable[[BankSyncJob], None]) -> None:
+        db = self.session_factory()
+        try:
+            row = db.get(BankSyncJob, job_id)
+            # Skip if the lease expired and another worker took the job over
+            if row is not None and row.locked_by == worker_id:
+                apply(row)
+                db.commit()
+        finally:
+            db.close()
+
+    async def _worker(self, worker_id: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = await run_job_db(self.claim_next, worker_id)
+            except Exception as e:
+                logger.error(f"[BankSyncQueue] {worker_id} failed to claim a job: {e}", exc_info=True)
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self.run_job(job, worker_id)
+            except Exception:
+                # Recording the outcome failed; the lease expiry hands the job to a worker again
+                logger.exception(f"[BankSyncQueue] {worker_id} failed to run job {job.id}")
+
+    def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        self._stopping = asyncio.Event()
+        prefix = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{prefix}:{i}"), name=f"bank-sync-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"[BankSyncQueue] started {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Stop claiming jobs and wait for the running attempts to finish."""
+        if not self._tasks:
+            return
+        self._stopping.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            counts = dict(
+                db.query(BankSyncJob.status, func.count(BankSyncJob.id))
+                .filter(BankSyncJob.status.in_(("queued", "running")))
+                .group_by(BankSyncJob.status)
+                .all()
+            )
+        finally:
+            db.close()
+        return {
+            "workers": len(self._tasks),
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "totals": dict(self.totals),
+        }
+
+
+def _finish(
+    job: BankSyncJob,
+    status: str,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+    error_code: Optional[str] = None,
+) -> None:
+    job.status = status
+    job.result = result
+    job.error = error
+    job.error_code = error_code
+    job.active_key = None  # allows the next sync for this user and provider
+    job.locked_by = None
+    job.locked_until = None
+    job.finished_at = _utcnow()
+    job.progress = {**(job.progress or {}), "stage": "done" if status == "succeeded" else "failed"}
+
+
+bank_sync_queue = BankSyncQueue()
+
+
+async def _run_standalone() -> None:
+    # Registers the provider handlers
+    from ..routers import bank_transactions, enable_banking  # noqa: F401
+    from ..services.snapshot_cache import LocalSnapshotBackend, snapshot_cache
+
+    if isinstance(snapshot_cache.backend, LocalSnapshotBackend):
+        logger.warning(
+            "[BankSyncQueue] snapshot cache backend is local: app processes won't see this "
+            "worker's writes until SNAPSHOT_CACHE_TTL_SECONDS; set SNAPSHOT_CACHE_REDIS_URL"
+        )
+
+    queue = BankSyncQueue(workers=max(1, BANK_SYNC_WORKERS))
+    queue.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await queue.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(_run_standalone())
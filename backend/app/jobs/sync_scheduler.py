@@ -0,0 +1,210 @@
+"""
+Concurrent scheduler for background bank syncs.
+
+A background pass used to sync one connection at a time with a fixed pause
+between them, so its wall time grew linearly with the number of connections.
+SyncScheduler runs a pass's jobs concurrently instead, bounded by:
+
+- a semaphore on in-flight syncs (SYNC_CONCURRENCY, default 8)
+- a token bucket per provider (tink, gocardless, enable_banking) limiting syncs
+  per minute against that provider's API; workers wait for a token.
+  Override with SYNC_RATE_<PROVIDER>_PER_MINUTE, e.g. SYNC_RATE_TINK_PER_MINUTE=60
+- a token bucket per user holding SYNC_USER_DAILY_LIMIT syncs (default 50, Tink's
+  documented per-user limit) that refills over a day. A user with no tokens left
+  is skipped and picked up by a later pass.
+
+Every job runs with its own database session, so one failing sync can't leave
+another's session in a broken transaction.
+
+stats() reports totals, throughput and queue lag (time from a pass starting to a
+job's sync starting) for the last pass and since startup; it is served at
+GET /admin/runtime/sync.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+SYNC_CONCURRENCY = int(os.getenv("SYNC_CONCURRENCY", "8"))
+SYNC_USER_DAILY_LIMIT = int(os.getenv("SYNC_USER_DAILY_LIMIT", "50"))
+
+# Syncs per minute against each provider's API
+PROVIDER_SYNC_RATES = {
+    "tink": 30,
+    "gocardless": 10,
+    "enable_banking": 20,
+}
+DEFAULT_PROVIDER_SYNC_RATE = 10
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class TokenBucket:
+    """Token bucket: holds up to `capacity` tokens, refilled continuously at `rate` per second."""
+
+    def __init__(self, capacity: float, rate: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.rate = rate
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available; never waits."""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` will be available."""
+        self._refill()
+        if self._tokens >= tokens:
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until tokens are available, then take them."""
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.wait_time(tokens))
+
+
+@dataclass
+class SyncJob:
+    """One connection to sync. `run` receives the job's own session and returns a result dict."""
+    provider: str
+    user_id: str
+    connection_id: int
+    run: Callable[[Session], Awaitable[Dict[str, Any]]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+def _provider_bucket(provider: str, burst: int) -> TokenBucket:
+    per_minute = float(os.getenv(
+        f"SYNC_RATE_{provider.upper()}_PER_MINUTE",
+        PROVIDER_SYNC_RATES.get(provider, DEFAULT_PROVIDER_SYNC_RATE),
+    ))
+    return TokenBucket(capacity=max(1, min(burst, per_minute)), rate=per_minute / 60)
+
+
+class SyncScheduler:
+    """Runs sync jobs concurrently under provider and per-user rate budgets."""
+
+    def __init__(
+        self,
+        concurrency: int = SYNC_CONCURRENCY,
+        user_daily_limit: int = SYNC_USER_DAILY_LIMIT,
+        session_factory: Callable[[], Session] = SessionLocal,
+        provider_buckets: Optional[Dict[str, TokenBucket]] = None,
+    ):
+        self.concurrency = concurrency
+        self.user_daily_limit = user_daily_limit
+        self.session_factory = session_factory
+        self._provider_buckets: Dict[str, TokenBucket] = dict(provider_buckets or {})
+        self._user_buckets: Dict[str, TokenBucket] = {}
+        self.totals = {"passes": 0, "succeeded": 0, "failed": 0, "rate_limited": 0}
+        self.max_queue_lag_ms = 0.0
+        self.last_pass: Optional[Dict[str, Any]] = None
+
+    def provider_bucket(self, provider: str) -> TokenBucket:
+        bucket = self._provider_buckets.get(provider)
+        if bucket is None:
+            bucket = self._provider_buckets[provider] = _provider_bucket(provider, self.concurrency)
+        return bucket
+
+    def user_bucket(self, user_id: str) -> TokenBucket:
+        bucket = self._user_buckets.get(user_id)
+        if bucket is None:
+            bucket = self._user_buckets[user_id] = TokenBucket(
+                capacity=self.user_daily_limit, rate=self.user_daily_limit / SECONDS_PER_DAY
+            )
+        return bucket
+
+    async def run(self, jobs: List[SyncJob]) -> Dict[str, Any]:
+        """Run one pass over `jobs` and return its summary."""
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        outcomes: Dict[str, int] = {"succeeded": 0, "failed": 0, "rate_limited": 0}
+        lags: List[float] = []
+
+        async def worker(job: SyncJob) -> None:
+            if not self.user_bucket(job.user_id).try_acquire():
+                outcomes["rate_limited"] += 1
+                logger.info(
+                    f"[SyncScheduler] user {job.user_id} is out of daily syncs; "
+                    f"skipping {job.provider} connection {job.connection_id}"
+                )
+                return
+            async with semaphore:
+                await self.provider_bucket(job.provider).acquire()
+                lags.append((time.monotonic() - job.enqueued_at) * 1000)
+                outcomes["succeeded" if await self._run_job(job) else "failed"] += 1
+
+        await asyncio.gather(*(worker(job) for job in jobs))
+
+        duration = time.monotonic() - started
+        completed = outcomes["succeeded"] + outcomes["failed"]
+        summary = {
+            "jobs": len(jobs),
+            **outcomes,
+            "duration_s": round(duration, 3),
+            "throughput_per_min": round(completed / duration * 60, 2) if duration > 0 else 0.0,
+            "mean_queue_lag_ms": round(sum(lags) / len(lags), 2) if lags else 0.0,
+            "max_queue_lag_ms": round(max(lags), 2) if lags else 0.0,
+        }
+
+        self.totals["passes"] += 1
+        for key, count in outcomes.items():
+            self.totals[key] += count
+        self.max_queue_lag_ms = max(self.max_queue_lag_ms, summary["max_queue_lag_ms"])
+        self.last_pass = summary
+        return summary
+
+    async def _run_job(self, job: SyncJob) -> bool:
+        db = self.session_factory()
+        try:
+            result = await job.run(db)
+            return bool(result.get("success", True))
+        except Exception as e:
+            logger.error(
+                f"[SyncScheduler] {job.provider} connection {job.connection_id} failed: {e}", exc_info=True
+            )
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "user_daily_limit": self.user_daily_limit,
+            "totals": dict(self.totals),
+            "max_queue_lag_ms": round(self.max_queue_lag_ms, 2),
+            "last_pass": self.last_pass,
+            "provider_tokens": {
+                provider: round(bucket.tokens, 2) for provider, bucket in self._provider_buckets.items()
+            },
+            "rate_limited_users": sum(1 for bucket in self._user_buckets.values() if bucket.tokens < 1),
+        }
+
+
+sync_scheduler = SyncScheduler()
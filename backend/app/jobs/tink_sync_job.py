@@ -5,16 +5,24 @@ Automatically syncs transactions from Tink for all active connections.
 """
 
 import asyncio
-from datetime import datetime, timedelta
+import os
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from ..database import SessionLocal
-from ..models import User, TinkConnection
+from ..models import User, TinkConnection, TinkSyncState
+from .sync_scheduler import SyncJob, sync_scheduler
 from ..services.tink_service import tink_service
 from ..services.audit_service import audit_transactions_synced
+from ..services.transaction_ingestion import ingest_records, parse_tink_transaction
 from ..logging_utils import get_secure_logger
 
 logger = get_secure_logger(__name__)
 
+# Days refetched before an account's newest booked date to catch pending -> booked
+TINK_SYNC_OVERLAP_DAYS = int(os.getenv("TINK_SYNC_OVERLAP_DAYS", "7"))
+
 
 def run_sync_job():
     """
@@ -33,235 +41,95 @@ async def sync_all_tink_connections():
     
     This job:
     1. Queries all active TinkConnection records
-    2. For each connection, syncs last 90 days of transactions
-    3. Uses exponential backoff to respect rate limits (50 syncs/day per user)
+    2. Syncs the last 90 days of transactions for each, concurrently through
+       sync_scheduler (bounded concurrency, Tink and per-user rate budgets -
+       50 syncs/day per user)
+    3. Gives each connection its own DB session
     4. Logs results to audit table
     5. Isolates errors (one failure doesn't stop others)
     """
     logger.info("Starting background Tink sync job")
     
     db = SessionLocal()
-    total_connections = 0
-    successful_syncs = 0
-    failed_syncs = 0
-    
     try:
         # Query all active connections
-        connections = db.query(TinkConnection).filter(
+        connections = db.query(TinkConnection.id, TinkConnection.user_id).filter(
             TinkConnection.is_active == True
         ).all()
-        
-        total_connections = len(connections)
-        logger.info(f"Found {total_connections} active Tink connections")
-        
-        for connection in connections:
-            try:
-                # Sync this connection
-                result = await sync_single_connection(connection, db)
-                
-                if result["success"]:
-                    successful_syncs += 1
-                    logger.info(
-                        f"Synced connection {connection.id} for user {connection.user_id}: "
-                        f"{result['synced_count']} new, {result['exact_duplicate_count']} duplicates"
-                    )
-                else:
-                    failed_syncs += 1
-                    logger.error(f"Failed to sync connection {connection.id}: {result.get('error')}")
-                    
-                # Small delay between connections to avoid overwhelming the API
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                failed_syncs += 1
-                logger.error(f"Error syncing connection {connection.id}: {str(e)}", exc_info=True)
-                # Continue with next connection (error isolation)
-                continue
-        
-        logger.info(
-            f"Background sync completed: {successful_syncs}/{total_connections} successful, "
-            f"{failed_syncs} failed"
-        )
-        
     except Exception as e:
         logger.error(f"Error in background sync job: {str(e)}", exc_info=True)
+        return
     finally:
         db.close()
 
+    logger.info(f"Found {len(connections)} active Tink connections")
+
+    jobs = [
+        SyncJob(
+            provider="tink",
+            user_id=user_id,
+            connection_id=connection_id,
+            run=partial(_sync_connection_by_id, connection_id),
+        )
+        for connection_id, user_id in connections
+    ]
+    summary = await sync_scheduler.run(jobs)
+
+    logger.info(
+        f"Background sync completed: {summary['succeeded']}/{summary['jobs']} successful, "
+        f"{summary['failed']} failed, {summary['rate_limited']} over the daily limit "
+        f"({summary['duration_s']}s, max queue lag {summary['max_queue_lag_ms']} ms)"
+    )
+
+
+async def _sync_connection_by_id(connection_id: int, db: Session) -> dict:
+    """Scheduler job: load the connection in the job's own session and sync it."""
+    connection = db.get(TinkConnection, connection_id)
+    if connection is None or not connection.is_active:
+        return {"success": False, "error": "Connection no longer active"}
+
+    result = await sync_single_connection(connection, db)
+    if result["success"]:
+        logger.info(
+            f"Synced connection {connection.id} for user {connection.user_id}: "
+            f"{result['synced_count']} new, {result['exact_duplicate_count']} duplicates"
+        )
+    else:
+        logger.error(f"Failed to sync connection {connection.id}: {result.get('error')}")
+    return result
+
 
 async def sync_single_connection(connection: TinkConnection, db: Session, days: int = 90) -> dict:
     """
     Sync transactions for a single Tink connection.
     
     This is a simplified version of the sync endpoint logic, focused on background execution.
+    Each account is synced incrementally from its TinkSyncState (see _sync_account), and
+    every fetched page is ingested with a constant number of queries through the
+    shared ingestion pipeline (see services/transaction_ingestion.py).
     
     Args:
         connection: TinkConnection to sync
         db: Database session
-        days: Number of days to sync (default: 90)
+        days: Number of days to fetch on an account's first sync (default: 90)
         
     Returns:
         dict with sync results
     """
     try:
-        # Import here to avoid circular imports
-        from ..routers.bank_transactions import (
-            BankTransaction,
-            map_tink_category,
-        )
-        from ..services.duplicate_detection_service import (
-            create_fingerprint,
-            check_pending_to_booked_update,
-            detect_duplicate_for_new_transaction,
-        )
-        
         # Get valid access token
         access_token = await tink_service.get_valid_access_token(connection, db)
         
-        # Fetch transactions from Tink
-        from_date = datetime.now() - timedelta(days=days)
-        transactions_response = await tink_service.fetch_transactions(
-            access_token,
-            from_date=from_date
-        )
-        
-        transactions = transactions_response.get("transactions", [])
-        total_fetched = len(transactions)
+        total_fetched = 0
         synced_count = 0
         exact_duplicate_count = 0
         fuzzy_duplicate_count = 0
-        
-        # Process each transaction (same logic as endpoint)
-        for tx in transactions:
-            tink_tx_id = tx.get("id")
-            
-            # Check for exact duplicate
-            existing = db.query(BankTransaction).filter(
-                BankTransaction.tink_transaction_id == tink_tx_id
-            ).first()
-            
-            if existing:
-                exact_duplicate_count += 1
-                continue
-            
-            # Parse transaction data (simplified - using key fields only)
-            amount_data = tx.get("amount", {})
-            amount_value = amount_data.get("value", {})
-            scale = int(amount_value.get("scale", "2"))
-            unscaled = float(amount_value.get("unscaledValue", "0"))
-            amount = unscaled / (10 ** scale)
-            
-            currency = amount_data.get("currencyCode", "PLN")
-            
-            dates = tx.get("dates", {})
-            booked_date_str = dates.get("booked")
-            if booked_date_str:
-                tx_date = datetime.strptime(booked_date_str, "%Y-%m-%d").date()
-            else:
-                tx_date = datetime.now().date()
-            
-            descriptions = tx.get("descriptions", {})
-            description_display = descriptions.get("display", "Unknown transaction")
-            description_original = descriptions.get("original")
-            
-            merchant_info = tx.get("merchantInformation", {})
-            merchant_name = merchant_info.get("merchantName")
-            merchant_category_code = merchant_info.get("merchantCategoryCode")
-            
-            # Parse Tink categories
-            enriched_categories = tx.get("enrichedData", {}).get("categories", {}) or tx.get("enriched_data", {}).get("categories", {})
-            basic_categories = tx.get("categories", {})
-            pfm_category = enriched_categories.get("pfm", {}) or basic_categories.get("pfm", {})
-            tink_category_id = pfm_category.get("id")
-            tink_category_name = pfm_category.get("name")
-            
-            suggested_type = "income" if amount > 0 else "expense"
-            suggested_category = map_tink_category(tink_category_id, suggested_type)
-            
-            # Duplicate detection
-            tink_account_id = tx.get("accountId", "")
-            fingerprint = create_fingerprint(
-                amount=amount,
-                currency=currency,
-                tx_date=tx_date,
-                description=description_display,
-                merchant_category_code=merchant_category_code,
-                tink_account_id=tink_account_id,
-            )
-            
-            # Check pending → booked update
-            pending_tx_id = check_pending_to_booked_update(
-                db=db,
-                user_id=connection.user_id,
-                fingerprint=fingerprint,
-                raw_data=tx,
-            )
-            
-            if pending_tx_id:
-                pending_tx = db.query(BankTransaction).filter(
-                    BankTransaction.id == pending_tx_id
-                ).first()
-                if pending_tx:
-                    pending_tx.tink_transaction_id = tink_tx_id
-                    pending_tx.raw_data = tx
-                    continue
-            
-            # Check fuzzy duplicates
-            is_fuzzy_duplicate = False
-            duplicate_of_id = None
-            duplicate_confidence = None
-            duplicate_reason = None
-            
-            fuzzy_match = detect_duplicate_for_new_transaction(
-                db=db,
-                user_id=connection.user_id,
-                tink_transaction_id=tink_tx_id,
-                amount=amount,
-                currency=currency,
-                tx_date=tx_date,
-                description=description_display,
-                merchant_category_code=merchant_category_code,
-                tink_account_id=tink_account_id,
-            )
-            
-            if fuzzy_match:
-                if fuzzy_match.confidence >= 1.0:
-                    exact_duplicate_count += 1
-                    continue
-                
-                is_fuzzy_duplicate = True
-                duplicate_of_id = fuzzy_match.original_transaction_id
-                duplicate_confidence = fuzzy_match.confidence
-                duplicate_reason = fuzzy_match.match_reason
-                fuzzy_duplicate_count += 1
-            
-            # Create bank transaction
-            bank_tx = BankTransaction(
-                user_id=connection.user_id,
-                tink_transaction_id=tink_tx_id,
-                tink_account_id=tink_account_id,
-                provider_transaction_id=tx.get("identifiers", {}).get("providerTransactionId"),
-                amount=amount,
-                currency=currency,
-                date=tx_date,
-                description_display=description_display,
-                description_original=description_original,
-                merchant_name=merchant_name,
-                merchant_category_code=merchant_category_code,
-                tink_category_id=tink_category_id,
-                tink_category_name=tink_category_name,
-                suggested_type=suggested_type,
-                suggested_category=suggested_category,
-                status="pending",
-                raw_data=tx,
-                is_duplicate=is_fuzzy_duplicate,
-                duplicate_of=duplicate_of_id,
-                duplicate_confidence=duplicate_confidence,
-                duplicate_reason=duplicate_reason,
-            )
-            
-            db.add(bank_tx)
-            synced_count += 1
+        for account_id in connection.accounts or [""]:
+            fetched, synced, exact, fuzzy = await _sync_account(db, connection, access_token, account_id, days)
+            total_fetched += fetched
+            synced_count += synced
+            exact_duplicate_count += exact
+            fuzzy_duplicate_count += fuzzy
         
         # Update connection sync timestamp
         connection.last_sync_at = datetime.now()
@@ -291,6 +159,7 @@ async def sync_single_connection(connection: TinkConnection, db: Session, days:
         
     except Exception as e:
         logger.error(f"Error in sync_single_connection: {str(e)}", exc_info=True)
+        db.rollback()
         
         # Audit failure
         audit_transactions_synced(
@@ -310,3 +179,101 @@ async def sync_single_connection(connection: TinkConnection, db: Session, days:
             "success": False,
             "error": str(e)
         }
+
+
+async def _sync_account(
+    db: Session,
+    connection: TinkConnection,
+    access_token: str,
+    account_id: str,
+    days: int,
+) -> Tuple[int, int, int, int]:
+    """
+    Incrementally sync one account, streaming pages into the ingestion stage.
+
+    - First sync: fetch the last `days` days
+    - Later syncs: fetch from TINK_SYNC_OVERLAP_DAYS before the newest stored booked
+      date, so pending transactions that have since been booked are seen again
+    - Interrupted sync: resume from the stored page cursor
+
+    Every page is committed together with the cursor to the next one, and the
+    last page together with the account's new booked-date watermark.
+
+    Returns (total_fetched, synced_count, exact_duplicate_count, fuzzy_duplicate_count).
+    """
+    state = db.query(TinkSyncState).filter(
+        TinkSyncState.connection_id == connection.id,
+        TinkSyncState.account_id == account_id,
+    ).first()
+    if state is None:
+        state = TinkSyncState(connection_id=connection.id, account_id=account_id)
+        db.add(state)
+
+    page_token = state.page_token
+    if page_token and state.cursor_from_date:
+        from_date = state.cursor_from_date
+    elif state.last_booked_date:
+        page_token = None
+        from_date = state.last_booked_date - timedelta(days=TINK_SYNC_OVERLAP_DAYS)
+    else:
+        page_token = None
+        from_date = (datetime.now() - timedelta(days=days)).date()
+
+    totals = [0, 0, 0, 0]
+    newest_booked = state.last_booked_date
+    pages = tink_service.iter_transaction_pages(
+        access_token,
+        account_id=account_id or None,
+        from_date=datetime.combine(from_date, datetime.min.time()),
+        page_token=page_token,
+    )
+    try:
+        async for page in pages:
+            transactions = page.get("transactions", [])
+            synced, exact, fuzzy = _ingest_transactions(db, connection.user_id, transactions)
+            for i, count in enumerate((len(transactions), synced, exact, fuzzy)):
+                totals[i] += count
+
+            page_booked = _latest_booked_date(transactions)
+            if page_booked and (newest_booked is None or page_booked > newest_booked):
+                newest_booked = page_booked
+
+            state.page_token = page.get("nextPageToken") or None
+            state.cursor_from_date = from_date if state.page_token else None
+            if state.page_token is None:
+                # Last page: the watermark advances with it, in the same commit
+                state.last_booked_date = newest_booked
+                state.last_synced_at = datetime.now()
+            db.commit()
+    except Exception:
+        db.rollback()
+        if page_token:
+            # The stored cursor may have expired; restart from the watermark next time
+            state.page_token = None
+            state.cursor_from_date = None
+            db.commit()
+        raise
+
+    return tuple(totals)
+
+
+def _latest_booked_date(transactions: List[dict]) -> Optional[date]:
+    """Newest booked date in a page (pending transactions have none)."""
+    booked = [tx.get("dates", {}).get("booked") for tx in transactions]
+    booked = [value for value in booked if value]
+    if not booked:
+        return None
+    return datetime.strptime(max(booked), "%Y-%m-%d").date()
+
+
+def _ingest_transactions(db: Session, user_id: str, transactions: List[dict]) -> Tuple[int, int, int]:
+    """
+    Store a page of fetched Tink transactions through the shared ingestion pipeline.
+
+    Pending->booked updates and fuzzy duplicate flagging are enabled for the
+    background sync (see transaction_ingestion.ingest_records).
+
+    Returns (synced_count, exact_duplicate_count, fuzzy_duplicate_count). The caller commits.
+    """
+    records = [parse_tink_transaction(tx) for tx in transactions]
+    return tuple(ingest_records(db, user_id, records, match_fuzzy=True))
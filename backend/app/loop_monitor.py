@@ -0,0 +1,254 @@
+"""
+Event-loop lag monitoring.
+
+An ``async def`` handler that calls blocking code (sync SQLAlchemy, openpyxl, the
+Resend/Stripe SDKs) holds the event loop until that code returns, delaying every
+other request and WebSocket stream on the worker. LoopLagMonitor measures this:
+
+- A heartbeat task sleeps LOOP_LAG_INTERVAL_MS at a time and records how late it
+  wakes up. Wake-ups later than LOOP_LAG_THRESHOLD_MS count as stalls.
+- In debug mode (LOOP_LAG_DEBUG=1) a watchdog thread notices when the heartbeat
+  is overdue and samples the loop thread's stack while it is still stalled. The
+  stall is attributed to the request being served (tracked by LoopLagMiddleware)
+  and the innermost application function on the stack, and logged.
+
+stats() reports lag figures and the worst offenders by endpoint/function; it is
+served at GET /admin/runtime/loop. LOOP_LAG_MONITOR=off disables the monitor
+(the default in test mode).
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_IS_TEST_MODE = os.getenv("ENVIRONMENT", "production") == "test"
+LOOP_LAG_MONITOR = os.getenv("LOOP_LAG_MONITOR", "off" if _IS_TEST_MODE else "on").lower()
+
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_UNATTRIBUTED = ("unknown", "unknown")
+
+
+def _project_frames(frame) -> list:
+    """Project (non-library) frames on a stack, innermost first; this module excluded."""
+    frames = []
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_DIR) and "site-packages" not in filename and filename != __file__:
+            frames.append(frame)
+        frame = frame.f_back
+    return frames
+
+
+def _describe(frame) -> str:
+    path = os.path.relpath(frame.f_code.co_filename, _PROJECT_DIR)
+    return f"{path}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def _route_label(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    method = scope.get("method", "WS" if scope.get("type") == "websocket" else "")
+    return f"{method} {path}".strip()
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag and, in debug mode, attributes stalls to their cause."""
+
+    def __init__(self, threshold_ms: float = 100.0, interval_ms: float = 50.0, debug: bool = False):
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self.debug = debug
+        self._lock = threading.Lock()
+        self._requests: "weakref.WeakKeyDictionary[asyncio.Task, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._beat = 0.0
+        self._sampled_beat: Optional[float] = None
+        self._pending: Optional[Tuple[float, Tuple[str, str]]] = None
+        self.reset()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples = 0
+            self.total_lag_ms = 0.0
+            self.max_lag_ms = 0.0
+            self.stalls = 0
+            self.offenders: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(
+                lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        if self.debug:
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+            self._watchdog.start()
+        logger.info(
+            f"[LoopLag] monitoring event loop (interval {self.interval_ms} ms, "
+            f"threshold {self.threshold_ms} ms, debug={self.debug})"
+        )
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    # ------------------------------------------------------------------
+    # Request tracking (LoopLagMiddleware)
+    # ------------------------------------------------------------------
+
+    def track_request(self, scope: Dict[str, Any]) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._requests[task] = scope
+
+    def untrack_request(self) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._requests.pop(task, None)
+
+    # ------------------------------------------------------------------
+    # Measurement
+    # ------------------------------------------------------------------
+
+    async def _heartbeat(self) -> None:
+        interval = self.interval_ms / 1000
+        while True:
+            beat = time.monotonic()
+            self._beat = beat
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (time.monotonic() - beat - interval) * 1000)
+            self.record(lag_ms, beat)
+
+    def record(self, lag_ms: float, beat: Optional[float] = None) -> None:
+        """Record one heartbeat's lag; stalls use the culprit sampled during that beat."""
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self.samples += 1
+            self.total_lag_ms += lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag_ms < self.threshold_ms:
+                return
+            self.stalls += 1
+            culprit = pending[1] if pending is not None and pending[0] == beat else _UNATTRIBUTED
+            offender = self.offenders[culprit]
+            offender["count"] += 1
+            offender["total_ms"] += lag_ms
+            offender["max_ms"] = max(offender["max_ms"], lag_ms)
+
+        if self.debug:
+            logger.warning(
+                f"[LoopLag] event loop blocked for {lag_ms:.0f} ms by {culprit[0]} in {culprit[1]}"
+            )
+
+    def _watch(self) -> None:
+        """Watchdog thread: sample the loop thread's stack while a stall is in progress."""
+        poll = self.interval_ms / 2000
+        while not self._stop.wait(poll):
+            beat = self._beat
+            overdue_ms = (time.monotonic() - beat) * 1000 - self.interval_ms
+            if overdue_ms < self.threshold_ms or beat == self._sampled_beat:
+                continue
+            self._sampled_beat = beat
+            culprit = self._culprit(sys._current_frames().get(self._loop_thread_id))
+            with self._lock:
+                self._pending = (beat, culprit)
+
+    def _culprit(self, frame) -> Tuple[str, str]:
+        """(endpoint, function) for the code currently holding the loop."""
+        frames = _project_frames(frame)
+
+        endpoint = None
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        scope = self._requests.get(task) if task is not None else None
+        if scope is not None:
+            endpoint = _route_label(scope)
+        elif frames:
+            # Outermost project frame is the handler when the task isn't tracked
+            endpoint = frames[-1].f_code.co_name
+        function = _describe(frames[0]) if frames else "unknown"
+        return endpoint or "unknown", function
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            offenders = sorted(self.offenders.items(), key=lambda item: -item[1]["total_ms"])[:top]
+            return {
+                "running": self.running,
+                "debug": self.debug,
+                "interval_ms": self.interval_ms,
+                "threshold_ms": self.threshold_ms,
+                "samples": self.samples,
+                "mean_lag_ms": round(self.total_lag_ms / self.samples, 2) if self.samples else 0.0,
+                "max_lag_ms": round(self.max_lag_ms, 2),
+                "stalls": self.stalls,
+                "top_offenders": [
+                    {
+                        "endpoint": endpoint,
+                        "function": function,
+                        "count": int(values["count"]),
+                        "total_ms": round(values["total_ms"], 1),
+                        "max_ms": round(values["max_ms"], 1),
+                    }
+                    for (endpoint, function), values in offenders
+                ],
+            }
+
+
+class LoopLagMiddleware:
+    """ASGI middleware registering each request with the monitor for stall attribution."""
+
+    def __init__(self, app, monitor: "LoopLagMonitor"):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or not self.monitor.running:
+            await self.app(scope, receive, send)
+            return
+
+        self.monitor.track_request(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.untrack_request()
+
+
+loop_monitor = LoopLagMonitor(
+    threshold_ms=float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100")),
+    interval_ms=float(os.getenv("LOOP_LAG_INTERVAL_MS", "50")),
+    debug=os.getenv("LOOP_LAG_DEBUG", "").lower() in ("1", "true", "yes"),
+)
@@ -4,6 +4,7 @@ import traceback
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, Query, Header, Request
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from . import models, database
 from pydantic import BaseModel, Field, model_validator
@@ -16,18 +17,26 @@ import csv
 import io
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill
-from .routers import users, auth, financial_freedom, savings, exchange_rates, banking, tink, stripe_billing, bank_transactions, gamification, admin, budget, reconciliation, partner, ai_chat, enable_banking
+from .routers import users, auth, financial_freedom, savings, exchange_rates, banking, tink, stripe_billing, bank_transactions, gamification, admin, budget, reconciliation, partner, ai_chat, enable_banking, sync_jobs
 from datetime import timezone
 from .routers.stripe_billing import TRIAL_DAYS
 from .database import engine, Base
 from .routers.users import User, UserBase, Settings, SettingsBase  # Import User, UserBase, Settings, and SettingsBase models from users router
 import json
 import re
-import httpx
 from .logging_utils import make_conditional_print
 from .services.subscription_service import SubscriptionService
 from .services.gamification_service import GamificationService
 from .services.monthly_totals_service import MonthlyTotalsService
+from .services.monthly_aggregate_service import MonthlyAggregateService
+from .services.summary_service import SummaryService, SUMMARY_MAX_QUERIES
+from .services.budget_report_service import BudgetReportService
+from .services.snapshot_cache import snapshot_cache
+from .services.ai_chat_service import start_anthropic_client
+from .query_budget import QueryBudget, QueryBudgetExceeded
+from .loop_monitor import LOOP_LAG_MONITOR, LoopLagMiddleware, loop_monitor
+from . import http_clients, offload
+from .jobs.bank_sync_queue import bank_sync_queue
 from .services.scheduler_service import (
     initialize_scheduler,
     start_scheduler,
@@ -162,11 +171,21 @@ async def lifespan(app: FastAPI):
     Handles:
     - Scheduler initialization and startup
     - Background job registration
+    - Event-loop lag monitoring
+    - Shared HTTP client pools for upstream APIs (and the AI chat client)
+    - Bank sync queue workers
     - Graceful shutdown
     """
     # Startup
     logger.info("Starting application...")
 
+    if LOOP_LAG_MONITOR == "on":
+        await loop_monitor.start()
+
+    http_clients.start()
+    start_anthropic_client()
+    bank_sync_queue.start()
+
     # Initialize and start scheduler
     try:
         scheduler = initialize_scheduler()
@@ -210,6 +229,11 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error shutting down scheduler: {str(e)}", exc_info=True)
 
+    await bank_sync_queue.stop()
+    await loop_monitor.stop()
+    await http_clients.aclose()
+    offload.shutdown(wait=False)
+
 
 app = FastAPI(
     title="FiredUp API",
@@ -233,6 +257,8 @@ app.add_middleware(
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization", "X-User-ID", "X-Requested-With"],
 )
+# Attributes event-loop stalls to the request being served (see loop_monitor)
+app.add_middleware(LoopLagMiddleware, monitor=loop_monitor)
 
 # Create the database tables
 Base.metadata.create_all(bind=engine)
@@ -272,6 +298,7 @@ app.include_router(banking.router)
 app.include_router(tink.router)
 app.include_router(bank_transactions.router)
 app.include_router(enable_banking.router)
+app.include_router(sync_jobs.router)
 app.include_router(stripe_billing.router)
 # Mobile billing access (direct backend, bypasses Next.js routing)
 app.include_router(stripe_billing.router, prefix="/internal-api")
@@ -1203,13 +1230,13 @@ def get_monthly_expenses(
             month_num = today.month
             month = today.strftime("%Y-%m")
 
-        # Use MonthlyTotalsService for deduplication logic
-        totals = MonthlyTotalsService.calculate_monthly_expenses(
-            user_id=current_user.household_id,
+        # Materialized totals (same deduplication logic as MonthlyTotalsService)
+        totals = MonthlyAggregateService.get_month(
+            household_id=current_user.household_id,
             year=year,
             month=month_num,
             db=db
-        )
+        )["expenses"]
 
         print(f"[FastAPI] Monthly expenses: total={totals['total']}, from_bank={totals['from_bank']}, from_manual={totals['from_manual']}")
 
@@ -1411,13 +1438,13 @@ def get_monthly_income(
             month_num = today.month
             month = today.strftime("%Y-%m")
 
-        # Use MonthlyTotalsService for deduplication logic
-        totals = MonthlyTotalsService.calculate_monthly_income(
-            user_id=current_user.household_id,
+        # Materialized totals (same deduplication logic as MonthlyTotalsService)
+        totals = MonthlyAggregateService.get_month(
+            household_id=current_user.household_id,
             year=year,
             month=month_num,
             db=db
-        )
+        )["income"]
 
         print(f"[FastAPI] Monthly income: total={totals['total']}, from_bank={totals['from_bank']}, from_manual={totals['from_manual']}")
 
@@ -1602,7 +1629,7 @@ async def tax_calculate(req: TaxCalculationRequest):
 async def get_user_summary(
     user_id: str,
     current_user: models.User = Depends(get_authenticated_user),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     """Get financial summary for the authenticated user."""
     validate_user_access(user_id, current_user)
@@ -1610,379 +1637,19 @@ async def get_user_summary(
 
     try:
         print(f"[FastAPI] Getting summary for user: {hid}")
-        # Get current month's start and end dates
-        today = datetime.now()
-        month_start = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-
-        # Use MonthlyTotalsService for both income and expenses to ensure consistent
-        # deduplication logic (recurring edit-duplicates, bank reconciliation, etc.)
-        # Raw SUM queries here would double-count recurring entries created by edits
-        # (each edit creates a new row with end_date=None, leaving two active rows).
-        income_totals = MonthlyTotalsService.calculate_monthly_income(
-            hid, today.year, today.month, db
-        )
-        monthly_income = income_totals["total"]
-
-        expense_totals = MonthlyTotalsService.calculate_monthly_expenses(
-            hid, today.year, today.month, db
-        )
-        monthly_expenses = expense_totals["total"]
-
-        # Fetch monthly loan payments (exclude archived loans)
-        monthly_loan_payments = db.query(func.sum(models.Loan.monthly_payment)).filter(
-            models.Loan.user_id == hid,
-            models.Loan.start_date <= month_end,
-            (models.Loan.is_archived == False) | (models.Loan.is_archived == None)
-        ).scalar() or 0
-
-        # Fetch total loan balance (exclude archived loans)
-        total_loan_balance = db.query(func.sum(models.Loan.remaining_balance)).filter(
-            models.Loan.user_id == hid,
-            (models.Loan.is_archived == False) | (models.Loan.is_archived == None)
-        ).scalar() or 0
-
-        # Calculate monthly balance
-        monthly_balance = monthly_income - monthly_expenses - monthly_loan_payments
-
-        # Calculate savings rate if income is not zero
-        savings_rate = 0
-        if monthly_income > 0:
-            savings_rate = (monthly_income - monthly_expenses - monthly_loan_payments) / monthly_income
-
-        # Calculate debt-to-income ratio if income is not zero
-        debt_to_income = 0
-        if monthly_income > 0:
-            debt_to_income = monthly_loan_payments / monthly_income
-
-        # Get income distribution by category using deduplicated data from MonthlyTotalsService
-        income_distribution = []
-        income_active = MonthlyTotalsService._query_active_income_for_month(
-            hid, today.year, today.month, db
-        )
-        # Apply same dedup as calculate_monthly_income: filter duplicate_of_bank + recurring dedup
-        income_manual = [i for i in income_active if i.bank_transaction_id is None]
-        income_deduped_manual = [
-            i for i in income_manual if i.reconciliation_status not in ["duplicate_of_bank"]
-        ]
-        _seen_inc = {}
-        _non_rec_inc = []
-        for i in income_deduped_manual:
-            if i.is_recurring and i.end_date is None:
-                key = (i.category, i.description)
-                if key not in _seen_inc or i.id > _seen_inc[key].id:
-                    _seen_inc[key] = i
-            else:
-                _non_rec_inc.append(i)
-        income_deduped = (
-            [i for i in income_active if i.bank_transaction_id is not None]
-            + _non_rec_inc
-            + list(_seen_inc.values())
-        )
-        income_by_category: dict = {}
-        for i in income_deduped:
-            income_by_category[i.category] = income_by_category.get(i.category, 0) + float(i.amount)
-
-        total_income_dist = sum(income_by_category.values())
-        for category, amount in income_by_category.items():
-            percentage = (amount / total_income_dist * 100) if total_income_dist > 0 else 0
-            income_distribution.append({
-                "category": category,
-                "amount": float(amount),
-                "percentage": float(percentage)
-            })
-
-        # Get expense distribution by category using deduplicated data from MonthlyTotalsService
-        expense_distribution = []
-        expense_active = MonthlyTotalsService._query_active_expenses_for_month(
-            hid, today.year, today.month, db
-        )
-        # Apply same dedup as calculate_monthly_expenses: filter duplicate_of_bank + recurring dedup
-        exp_manual = [e for e in expense_active if e.bank_transaction_id is None]
-        exp_deduped_manual = [
-            e for e in exp_manual if e.reconciliation_status not in ["duplicate_of_bank"]
-        ]
-        _seen_exp = {}
-        _non_rec_exp = []
-        for e in exp_deduped_manual:
-            if e.is_recurring and e.end_date is None:
-                key = (e.category, e.description)
-                if key not in _seen_exp or e.id > _seen_exp[key].id:
-                    _seen_exp[key] = e
-            else:
-                _non_rec_exp.append(e)
-        expense_deduped = (
-            [e for e in expense_active if e.bank_transaction_id is not None]
-            + _non_rec_exp
-            + list(_seen_exp.values())
-        )
-        expense_by_category: dict = {}
-        for e in expense_deduped:
-            expense_by_category[e.category] = expense_by_category.get(e.category, 0) + float(e.amount)
-
-        total_expense_dist = sum(expense_by_category.values())
-        for category, amount in expense_by_category.items():
-            percentage = (amount / total_expense_dist * 100) if total_expense_dist > 0 else 0
-            expense_distribution.append({
-                "category": category,
-                "amount": float(amount),
-                "percentage": float(percentage)
-            })
-
-        # Generate cash flow data for the rolling last 13 months (12 past + current).
-        # Using a rolling window instead of "current calendar year" ensures the
-        # BudgetVsActual 3-month average always has real historical data even in
-        # January, and avoids polluting past-month averages with future scheduled items.
-        cash_flow = []
-
-        for offset in range(12, -1, -1):  # 12 months ago → current month (ascending)
-            # Pure stdlib month arithmetic — no dateutil needed
-            total_months = (today.year * 12 + today.month - 1) - offset
-            m_year, m_month = divmod(total_months, 12)
-            m_month += 1  # divmod gives 0-based month
-            month_end_date = datetime(m_year, m_month, 1) + timedelta(days=32)
-            month_end_date = month_end_date.replace(day=1) - timedelta(days=1)
-            month_str = f"{m_year}-{m_month:02d}"
-
-            # Use MonthlyTotalsService for accurate deduplication in all months
-            m_income = MonthlyTotalsService.calculate_monthly_income(hid, m_year, m_month, db)
-            m_expenses = MonthlyTotalsService.calculate_monthly_expenses(hid, m_year, m_month, db)
-
-            month_income = m_income["total"]
-            month_expenses = m_expenses["total"]
-
-            # Loan payments for this month (exclude archived)
-            month_loan_payments = db.query(func.sum(models.Loan.monthly_payment)).filter(
-                models.Loan.user_id == hid,
-                models.Loan.start_date <= month_end_date,
-                (models.Loan.is_archived == False) | (models.Loan.is_archived == None)
-            ).scalar() or 0
-
-            # Calculate net flow
-            net_flow = month_income - month_expenses - month_loan_payments
-
-            cash_flow.append({
-                "month": month_str,
-                "income": float(month_income),
-                "expenses": float(month_expenses),
-                "loanPayments": float(month_loan_payments),
-                "netFlow": float(net_flow),
-                "year": m_year
-            })
-
-        # Fetch active loans for the user (exclude archived)
-        active_loans = db.query(models.Loan).filter(
-            models.Loan.user_id == hid,
-            (models.Loan.is_archived == False) | (models.Loan.is_archived == None)
-        ).all()
-        
-        # Format loans for the frontend
-        loans_data = []
-        for loan in active_loans:
-            # Calculate progress as percentage (0-100)
-            total_amount = loan.principal_amount
-            paid_amount = total_amount - loan.remaining_balance
-            progress = (paid_amount / total_amount * 100) if total_amount > 0 else 0
-
-            loans_data.append({
-                "id": str(loan.id),
-                "description": loan.description,
-                "balance": float(loan.remaining_balance),
-                "monthlyPayment": float(loan.monthly_payment),
-                "interestRate": float(loan.interest_rate),
-                "progress": float(progress),
-                "totalAmount": float(total_amount)
-            })
-
-        # Fetch savings data for the user
-        # Total savings balance (all time deposits - withdrawals)
-        total_deposits = db.query(func.sum(models.Saving.amount)).filter(
-            models.Saving.user_id == hid,
-            models.Saving.saving_type == 'deposit'
-        ).scalar() or 0
-
-        total_withdrawals = db.query(func.sum(models.Saving.amount)).filter(
-            models.Saving.user_id == hid,
-            models.Saving.saving_type == 'withdrawal'
-        ).scalar() or 0
-
-        total_savings_balance = total_deposits - total_withdrawals
-
-        # Monthly savings (current month non-recurring + all recurring deposits/withdrawals)
-        monthly_deposits_non_recurring = db.query(func.sum(models.Saving.amount)).filter(
-            models.Saving.user_id == hid,
-            models.Saving.saving_type == 'deposit',
-            models.Saving.is_recurring == False,
-            models.Saving.date >= month_start,
-            models.Saving.date <= month_end
-        ).scalar() or 0
-
-        monthly_deposits_recurring = db.query(func.sum(models.Saving.amount)).filter(
-            models.Saving.user_id == hid,
-            models.Saving.saving_type == 'deposit',
-            models.Saving.is_recurring == True,
-            models.Saving.date <= month_end,  # Started before or during this month
-            or_(
-                models.Saving.end_date == None,  # No end date (ongoing)
-                models.Saving.end_date >= month_start  # Or end_date is this month or later
-            )
-        ).scalar() or 0
-
-        monthly_withdrawals_non_recurring = db.query(func.sum(models.Saving.amount)).filter(
-            models.Saving.user_id == hid,
-            models.Saving.saving_type == 'withdrawal',
-            models.Saving.is_recurring == False,
-            models.Saving.date >= month_start,
-            models.Saving.date <= month_end
-        ).scalar() or 0
-
-        monthly_withdrawals_recurring = db.query(func.sum(models.Saving.amount)).filter(
-            models.Saving.user_id == hid,
-            models.Saving.saving_type == 'withdrawal',
-            models.Saving.is_recurring == True,
-            models.Saving.date <= month_end,  # Started before or during this month
-            or_(
-                models.Saving.end_date == None,  # No end date (ongoing)
-                models.Saving.end_date >= month_start  # Or end_date is this month or later
+        # Every table is read once regardless of history length; the budget catches
+        # regressions that reintroduce per-month queries.
+        with QueryBudget("user_summary", max_queries=SUMMARY_MAX_QUERIES):
+            summary = await database.run_sync_db(
+                db,
+                lambda session: snapshot_cache.get_or_compute(
+                    "user_summary", hid, lambda: SummaryService.build_summary(hid, session)
+                ),
             )
-        ).scalar() or 0
-
-        monthly_savings = (monthly_deposits_non_recurring + monthly_deposits_recurring) - \
-                          (monthly_withdrawals_non_recurring + monthly_withdrawals_recurring)
-
-        # Savings goals (group by category with targets)
-        savings_goals = []
-        savings_by_category = db.query(
-            models.Saving.category,
-            func.sum(
-                case(
-                    (models.Saving.saving_type == 'deposit', models.Saving.amount),
-                    else_=-models.Saving.amount
-                )
-            ).label('current_amount'),
-            func.max(models.Saving.target_amount).label('target_amount')
-        ).filter(
-            models.Saving.user_id == hid
-        ).group_by(models.Saving.category).all()
-
-        for goal in savings_by_category:
-            target = float(goal.target_amount or 0)
-            current = float(goal.current_amount or 0)
-            # Hardcoded Baby Steps targets: emergency_fund = 1 month, six_month_fund = 6 months
-            if target == 0:
-                if goal.category == 'emergency_fund':
-                    target = float(monthly_expenses) * 1
-                elif goal.category == 'six_month_fund':
-                    target = float(monthly_expenses) * 6
-            # Show actual balance (no capping) — progress bar capped separately below
-            effective_current = current
-            progress = (effective_current / target * 100) if target > 0 else 0
-            savings_goals.append({
-                "category": goal.category,
-                "currentAmount": effective_current,
-                "targetAmount": target,
-                "progress": min(float(progress), 100)
-            })
-
-        recent_activities = db.query(models.Activity).filter(
-            models.Activity.user_id == hid
-        ).order_by(models.Activity.timestamp.desc()).limit(20).all()
-
-        numeric_fields = {
-            'amount',
-            'principal_amount',
-            'remaining_balance',
-            'monthly_payment',
-            'target_amount',
-        }
-
-        def build_changes(activity: models.Activity) -> List[dict]:
-            changes: List[dict] = []
-            previous = activity.previous_values or {}
-            new = activity.new_values or {}
-
-            if activity.operation_type == 'create':
-                for key, value in new.items():
-                    if key in {'created_at', 'updated_at'}:
-                        continue
-                    if key in numeric_fields or isinstance(value, (int, float, str)):
-                        changes.append({
-                            'field': key,
-                            'oldValue': None,
-                            'newValue': value,
-                        })
-            elif activity.operation_type == 'delete':
-                for key, value in previous.items():
-                    if key in {'created_at', 'updated_at'}:
-                        continue
-                    if key in numeric_fields or isinstance(value, (int, float, str)):
-                        changes.append({
-                            'field': key,
-                            'oldValue': value,
-                            'newValue': None,
-                        })
-            else:
-                for key, old_value in previous.items():
-                    if key in {'created_at', 'updated_at'}:
-                        continue
-                    new_value = new.get(key)
-                    if old_value != new_value:
-                        if key in numeric_fields or isinstance(old_value, (int, float, str)) or isinstance(new_value, (int, float, str)):
-                            changes.append({
-                                'field': key,
-                                'oldValue': old_value,
-                                'newValue': new_value,
-                            })
-            return changes
-
-        def activity_amount(activity: models.Activity) -> float:
-            source = activity.new_values or activity.previous_values or {}
-            try:
-                if activity.entity_type == 'Income':
-                    return float(source.get('amount', 0) or 0)
-                if activity.entity_type == 'Expense':
-                    return -float(source.get('amount', 0) or 0)
-                if activity.entity_type == 'Loan':
-                    return -float(source.get('monthly_payment', 0) or 0)
-                if activity.entity_type == 'Saving':
-                    amount = float(source.get('amount', 0) or 0)
-                    return amount if source.get('saving_type') != 'withdrawal' else -amount
-            except (TypeError, ValueError):
-                pass
-            return 0.0
-
-        activities_payload = []
-        for activity in recent_activities:
-            base = activity.new_values or activity.previous_values or {}
-            activities_payload.append({
-                "id": activity.id,
-                "title": base.get('description') or activity.entity_type,
-                "amount": activity_amount(activity),
-                "type": activity.entity_type.lower(),
-                "date": activity.timestamp.isoformat() if activity.timestamp else datetime.utcnow().isoformat(),
-                "operation": activity.operation_type,
-                "changes": build_changes(activity),
-            })
-
-        summary = {
-            "total_monthly_income": float(monthly_income),
-            "total_monthly_expenses": float(monthly_expenses),
-            "total_monthly_loan_payments": float(monthly_loan_payments),
-            "total_loan_balance": float(total_loan_balance),
-            "monthly_balance": float(monthly_balance),
-            "savings_rate": float(savings_rate),
-            "debt_to_income": float(debt_to_income),
-            "income_distribution": income_distribution,
-            "expense_distribution": expense_distribution,
-            "cash_flow": cash_flow,
-            "loans": loans_data,
-            "activities": activities_payload,
-            "total_savings_balance": float(total_savings_balance),
-            "monthly_savings": float(monthly_savings),
-            "savings_goals": savings_goals,
-        }
         print(f"[FastAPI] Summary data: {summary}")
         return summary
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
         print(f"[FastAPI] Error fetching summary: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2073,283 +1740,13 @@ def get_yearly_budget(
             print(f"[FastAPI] Error parsing dates: {str(e)}")
             raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
         
-        # Get all non-recurring incomes for the period
-        try:
-            regular_incomes = db.query(models.Income).filter(
-                models.Income.user_id == current_user.household_id,
-                models.Income.date >= start_datetime,
-                models.Income.date <= end_datetime,
-                models.Income.is_recurring == False
-            ).all()
-            print(f"[FastAPI] Found {len(regular_incomes)} regular incomes")
-        except Exception as e:
-            print(f"[FastAPI] Error fetching regular incomes: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error fetching regular incomes: {str(e)}")
-
-        # Get recurring incomes
-        try:
-            recurring_incomes = db.query(models.Income).filter(
-                models.Income.user_id == current_user.household_id,
-                models.Income.is_recurring == True,
-                models.Income.date <= end_datetime
-            ).all()
-            print(f"[FastAPI] Found {len(recurring_incomes)} recurring incomes")
-        except Exception as e:
-            print(f"[FastAPI] Error fetching recurring incomes: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error fetching recurring incomes: {str(e)}")
-
-        # Get all non-recurring expenses for the period
-        try:
-            regular_expenses = db.query(models.Expense).filter(
-                models.Expense.user_id == current_user.household_id,
-                models.Expense.date >= start_datetime,
-                models.Expense.date <= end_datetime,
-                models.Expense.is_recurring == False
-            ).all()
-            print(f"[FastAPI] Found {len(regular_expenses)} regular expenses")
-        except Exception as e:
-            print(f"[FastAPI] Error fetching regular expenses: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error fetching regular expenses: {str(e)}")
-
-        # Get recurring expenses
-        try:
-            recurring_expenses = db.query(models.Expense).filter(
-                models.Expense.user_id == current_user.household_id,
-                models.Expense.is_recurring == True,
-                models.Expense.date <= end_datetime
-            ).all()
-            print(f"[FastAPI] Found {len(recurring_expenses)} recurring expenses")
-        except Exception as e:
-            print(f"[FastAPI] Error fetching recurring expenses: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error fetching recurring expenses: {str(e)}")
-
-        # Get all loans that could be active during this period
-        try:
-            loans = db.query(models.Loan).filter(
-                models.Loan.user_id == current_user.household_id,
-                models.Loan.start_date <= end_datetime
-            ).all()
-            print(f"[FastAPI] Found {len(loans)} loans")
-            for loan in loans:
-                print(f"[FastAPI] Loan: id={loan.id}, monthly_payment={loan.monthly_payment}, start_date={loan.start_date}, term_months={loan.term_months}")
-        except Exception as e:
-            print(f"[FastAPI] Error fetching loans: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error fetching loans: {str(e)}")
-
-        # Get all non-recurring savings for the period
-        try:
-            regular_savings = db.query(models.Saving).filter(
-                models.Saving.user_id == current_user.household_id,
-                models.Saving.date >= start_datetime,
-                models.Saving.date <= end_datetime,
-                models.Saving.is_recurring == False
-            ).all()
-            print(f"[FastAPI] Found {len(regular_savings)} regular savings")
-        except Exception as e:
-            print(f"[FastAPI] Error fetching regular savings: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error fetching regular savings: {str(e)}")
-
-        # Get recurring savings
-        try:
-            recurring_savings = db.query(models.Saving).filter(
-                models.Saving.user_id == current_user.household_id,
-                models.Saving.is_recurring == True,
-                models.Saving.date <= end_datetime
-            ).all()
-            print(f"[FastAPI] Found {len(recurring_savings)} recurring savings")
-        except Exception as e:
-            print(f"[FastAPI] Error fetching recurring savings: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error fetching recurring savings: {str(e)}")
-
-        # Initialize monthly data
-        monthly_data = {}
-        
-        # Generate a list of all months in the range
-        current_date = start_datetime
-        while current_date <= end_datetime:
-            try:
-                month_name = current_date.strftime("%B")
-                month_idx = current_date.month
-                year = current_date.year
-
-                print(f"[FastAPI] Processing month: {month_name} year: {year}")
-
-                # Convert current_date to date for comparison
-                current_date_only = current_date.date()
-
-                # Regular incomes for this month
-                monthly_regular_incomes = [
-                    {
-                        "id": inc.id,
-                        "title": inc.description,
-                        "amount": float(inc.amount),
-                        "category": inc.category,
-                        "date": inc.date.isoformat()
-                    }
-                    for inc in regular_incomes 
-                    if inc.date.year == year and inc.date.month == month_idx
-                ]
-                
-                # Add recurring incomes if they started before or during this month
-                # and haven't ended yet (end_date is None or >= current month)
-                monthly_recurring_incomes = [
-                    {
-                        "id": inc.id,
-                        "title": inc.description,
-                        "amount": float(inc.amount),
-                        "category": inc.category,
-                        "date": inc.date.isoformat()
-                    }
-                    for inc in recurring_incomes
-                    if inc.date <= current_date.date() and (
-                        inc.end_date is None or inc.end_date >= current_date_only
-                    )
-                ]
-                
-                # Regular expenses for this month
-                monthly_regular_expenses = [
-                    {
-                        "id": exp.id,
-                        "title": exp.description,
-                        "amount": float(exp.amount),
-                        "category": exp.category,
-                        "date": exp.date.isoformat()
-                    }
-                    for exp in regular_expenses 
-                    if exp.date.year == year and exp.date.month == month_idx
-                ]
-                
-                # Add recurring expenses if they started before or during this month
-                # and haven't ended yet (end_date is None or >= current month)
-                monthly_recurring_expenses = [
-                    {
-                        "id": exp.id,
-                        "title": exp.description,
-                        "amount": float(exp.amount),
-                        "category": exp.category,
-                        "date": exp.date.isoformat()
-                    }
-                    for exp in recurring_expenses
-                    if exp.date <= current_date.date() and (
-                        exp.end_date is None or exp.end_date >= current_date_only
-                    )
-                ]
-
-                # Get active loans for this month
-                monthly_loans = []
-                monthly_loan_payments_total = 0.0
-                
-                for loan in loans:
-                    try:
-                        # Convert loan.start_date to datetime for comparison
-                        loan_start = datetime.combine(loan.start_date, datetime.min.time())
-
-                        # Calculate loan end date based on start date and term
-                        loan_end_date = loan_start + timedelta(days=30 * loan.term_months)
-                        
-                        # Check if loan is active in this month
-                        if loan_start.date() <= current_date_only and loan_end_date.date() >= current_date_only:
-                            loan_payment = float(loan.monthly_payment) if loan.monthly_payment is not None else 0.0
-                            monthly_loan_payments_total += loan_payment
-                            
-                            monthly_loans.append({
-                                "id": loan.id,
-                                "loan_type": loan.loan_type,
-                                "description": loan.description,
-                                "principal_amount": float(loan.principal_amount) if loan.principal_amount is not None else 0.0,
-                                "remaining_balance": float(loan.remaining_balance) if loan.remaining_balance is not None else 0.0,
-                                "interest_rate": float(loan.interest_rate) if loan.interest_rate is not None else 0.0,
-                                "monthly_payment": loan_payment,
-                                "start_date": loan.start_date.isoformat(),
-                                "term_months": loan.term_months
-                            })
-                    except (ValueError, TypeError, AttributeError) as e:
-                        print(f"[FastAPI] Error processing loan {loan.id}: {str(e)}")
-                        continue
-
-                # Regular savings for this month
-                monthly_regular_savings = [
-                    {
-                        "id": sav.id,
-                        "title": sav.description,
-                        "amount": float(sav.amount),
-                        "category": sav.category,
-                        "saving_type": sav.saving_type,
-                        "date": sav.date.isoformat()
-                    }
-                    for sav in regular_savings
-                    if sav.date.year == year and sav.date.month == month_idx
-                ]
-
-                # Add recurring savings if they started before or during this month
-                # and haven't ended yet (end_date is None or >= current month)
-                monthly_recurring_savings = [
-                    {
-                        "id": sav.id,
-                        "title": sav.description,
-                        "amount": float(sav.amount),
-                        "category": sav.category,
-                        "saving_type": sav.saving_type,
-                        "date": sav.date.isoformat()
-                    }
-                    for sav in recurring_savings
-                    if sav.date <= current_date.date() and (
-                        sav.end_date is None or sav.end_date >= current_date_only
-                    )
-                ]
-
-                # Combine all savings for this month
-                all_monthly_savings = monthly_regular_savings + monthly_recurring_savings
-
-                # Calculate savings totals (deposits - withdrawals)
-                total_deposits = sum(
-                    sav["amount"] for sav in all_monthly_savings
-                    if sav["saving_type"] == "deposit"
-                )
-                total_withdrawals = sum(
-                    sav["amount"] for sav in all_monthly_savings
-                    if sav["saving_type"] == "withdrawal"
-                )
-                net_savings = float(total_deposits - total_withdrawals)
-
-                # Calculate totals
-                total_regular_income = sum(inc["amount"] for inc in monthly_regular_incomes)
-                total_recurring_income = sum(inc["amount"] for inc in monthly_recurring_incomes)
-                total_regular_expenses = sum(exp["amount"] for exp in monthly_regular_expenses)
-                total_recurring_expenses = sum(exp["amount"] for exp in monthly_recurring_expenses)
-                
-                total_income = float(total_regular_income + total_recurring_income)
-                total_expenses = float(total_regular_expenses + total_recurring_expenses)
-                
-                print(f"[FastAPI] {month_name} {year} - Income: {total_income}, Expenses: {total_expenses}, Loan Payments: {monthly_loan_payments_total}, Savings: {net_savings}")
-
-                monthly_data[f"{month_name} {year}"] = {
-                    "incomes": monthly_regular_incomes + monthly_recurring_incomes,
-                    "expenses": monthly_regular_expenses + monthly_recurring_expenses,
-                    "loanPayments": monthly_loans,
-                    "savings": all_monthly_savings,
-                    "totals": {
-                        "income": total_income,
-                        "expenses": total_expenses,
-                        "loanPayments": monthly_loan_payments_total,
-                        "savings": net_savings,
-                        "deposits": float(total_deposits),
-                        "withdrawals": float(total_withdrawals),
-                        "balance": total_income - total_expenses - monthly_loan_payments_total
-                    }
-                }
-                
-                # Move to next month
-                if month_idx == 12:
-                    current_date = current_date.replace(year=year + 1, month=1)
-                else:
-                    current_date = current_date.replace(month=month_idx + 1)
-                    
-            except Exception as e:
-                print(f"[FastAPI] Error processing month {month_name} {year}: {str(e)}")
-                continue
-        
-        print(f"[FastAPI] Successfully generated budget data for period")
+        monthly_data = BudgetReportService.build_yearly_report(
+            current_user.household_id,
+            (start_datetime.year, start_datetime.month),
+            (end_datetime.year, end_datetime.month),
+            db
+        )
+        print(f"[FastAPI] Successfully generated budget data for {len(monthly_data)} months")
         return monthly_data
         
     except Exception as e:
@@ -2358,6 +1755,115 @@ def get_yearly_budget(
         print(f"[FastAPI] Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@offload.blocking("export")
+def _build_xlsx_export(settings, expenses, incomes, loans, savings) -> bytes:
+    """Build the XLSX data export (CPU-bound, so async callers offload it)."""
+    # Create Excel workbook
+    wb = Workbook()
+
+    # Create styles
+    header_font = Font(bold=True)
+    header_fill = PatternFill(start_color='CCE5FF', end_color='CCE5FF', fill_type='solid')
+
+    def style_header_row(worksheet):
+        for cell in worksheet[1]:
+            cell.font = header_font
+            cell.fill = header_fill
+
+    # Settings sheet
+    settings_sheet = wb.active
+    settings_sheet.title = 'Settings'
+    settings_sheet.append(['Setting', 'Value'])
+    settings_sheet.append(['Language', settings.language if settings else "en"])
+    settings_sheet.append(['Currency', settings.currency if settings else "USD"])
+    settings_sheet.append(['Emergency Fund Target', settings.emergency_fund_target if settings else 1000])
+    settings_sheet.append(['Emergency Fund Months', settings.emergency_fund_months if settings else 3])
+    style_header_row(settings_sheet)
+
+    # Expenses sheet
+    expenses_sheet = wb.create_sheet('Expenses')
+    expenses_sheet.append(['Category', 'Description', 'Amount', 'Date', 'Is Recurring'])
+    for expense in expenses:
+        expenses_sheet.append([
+            expense.category,
+            expense.description,
+            expense.amount,
+            expense.date.isoformat(),
+            expense.is_recurring
+        ])
+    style_header_row(expenses_sheet)
+
+    # Income sheet
+    income_sheet = wb.create_sheet('Income')
+    income_sheet.append(['Category', 'Description', 'Amount', 'Date', 'Is Recurring'])
+    for income in incomes:
+        income_sheet.append([
+            income.category,
+            income.description,
+            income.amount,
+            income.date.isoformat(),
+            income.is_recurring
+        ])
+    style_header_row(income_sheet)
+
+    # Loans sheet
+    loans_sheet = wb.create_sheet('Loans')
+    loans_sheet.append([
+        'Type', 'Description', 'Principal Amount', 'Remaining Balance',
+        'Interest Rate', 'Monthly Payment', 'Term Months', 'Start Date'
+    ])
+    for loan in loans:
+        loans_sheet.append([
+            loan.loan_type,
+            loan.description,
+            loan.principal_amount,
+            loan.remaining_balance,
+            loan.interest_rate,
+            loan.monthly_payment,
+            loan.term_months,
+            loan.start_date.isoformat()
+        ])
+    style_header_row(loans_sheet)
+
+    # Savings sheet
+    savings_sheet = wb.create_sheet('Savings')
+    savings_sheet.append([
+        'Category', 'Description', 'Amount', 'Date', 'Is Recurring',
+        'Target Amount', 'Saving Type'
+    ])
+    for saving in savings:
+        savings_sheet.append([
+            saving.category,
+            saving.description,
+            saving.amount,
+            saving.date.isoformat(),
+            saving.is_recurring,
+            saving.target_amount,
+            saving.saving_type
+        ])
+    style_header_row(savings_sheet)
+
+    # Adjust column widths
+    for sheet in wb.sheetnames:
+        ws = wb[sheet]
+        for column in ws.columns:
+            max_length = 0
+            column = list(column)
+            for cell in column:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            adjusted_width = (max_length + 2)
+            ws.column_dimensions[column[0].column_letter].width = adjusted_width
+
+    # Save to buffer
+    excel_buffer = io.BytesIO()
+    wb.save(excel_buffer)
+    return excel_buffer.getvalue()
+
+
 @app.get("/users/{user_id}/export")
 async def export_user_data(
     user_id: str,
@@ -2584,114 +2090,11 @@ async def export_user_data(
                 }
             )
         elif format.lower() == 'xlsx':
-            # Create Excel workbook
-            wb = Workbook()
-            
-            # Create styles
-            header_font = Font(bold=True)
-            header_fill = PatternFill(start_color='CCE5FF', end_color='CCE5FF', fill_type='solid')
-
-            def style_header_row(worksheet):
-                for cell in worksheet[1]:
-                    cell.font = header_font
-                    cell.fill = header_fill
-
-            # Settings sheet
-            settings_sheet = wb.active
-            settings_sheet.title = 'Settings'
-            settings_sheet.append(['Setting', 'Value'])
-            settings_sheet.append(['Language', settings.language if settings else "en"])
-            settings_sheet.append(['Currency', settings.currency if settings else "USD"])
-            settings_sheet.append(['Emergency Fund Target', settings.emergency_fund_target if settings else 1000])
-            settings_sheet.append(['Emergency Fund Months', settings.emergency_fund_months if settings else 3])
-            style_header_row(settings_sheet)
-            
-            # Expenses sheet
-            expenses_sheet = wb.create_sheet('Expenses')
-            expenses_sheet.append(['Category', 'Description', 'Amount', 'Date', 'Is Recurring'])
-            for expense in expenses:
-                expenses_sheet.append([
-                    expense.category,
-                    expense.description,
-                    expense.amount,
-                    expense.date.isoformat(),
-                    expense.is_recurring
-                ])
-            style_header_row(expenses_sheet)
-
-            # Income sheet
-            income_sheet = wb.create_sheet('Income')
-            income_sheet.append(['Category', 'Description', 'Amount', 'Date', 'Is Recurring'])
-            for income in incomes:
-                income_sheet.append([
-                    income.category,
-                    income.description,
-                    income.amount,
-                    income.date.isoformat(),
-                    income.is_recurring
-                ])
-            style_header_row(income_sheet)
-
-            # Loans sheet
-            loans_sheet = wb.create_sheet('Loans')
-            loans_sheet.append([
-                'Type', 'Description', 'Principal Amount', 'Remaining Balance',
-                'Interest Rate', 'Monthly Payment', 'Term Months', 'Start Date'
-            ])
-            for loan in loans:
-                loans_sheet.append([
-                    loan.loan_type,
-                    loan.description,
-                    loan.principal_amount,
-                    loan.remaining_balance,
-                    loan.interest_rate,
-                    loan.monthly_payment,
-                    loan.term_months,
-                    loan.start_date.isoformat()
-                ])
-            style_header_row(loans_sheet)
-            
-            # Savings sheet
-            savings_sheet = wb.create_sheet('Savings')
-            savings_sheet.append([
-                'Category', 'Description', 'Amount', 'Date', 'Is Recurring',
-                'Target Amount', 'Saving Type'
-            ])
-            for saving in savings:
-                savings_sheet.append([
-                    saving.category,
-                    saving.description,
-                    saving.amount,
-                    saving.date.isoformat(),
-                    saving.is_recurring,
-                    saving.target_amount,
-                    saving.saving_type
-                ])
-            style_header_row(savings_sheet)
-
-            # Adjust column widths
-            for sheet in wb.sheetnames:
-                ws = wb[sheet]
-                for column in ws.columns:
-                    max_length = 0
-                    column = list(column)
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = (max_length + 2)
-                    ws.column_dimensions[column[0].column_letter].width = adjusted_width
-
-            # Save to buffer
-            excel_buffer = io.BytesIO()
-            wb.save(excel_buffer)
-            excel_buffer.seek(0)
+            excel_bytes = await _build_xlsx_export.offload(settings, expenses, incomes, loans, savings)
 
             # Return the Excel file
             return StreamingResponse(
-                iter([excel_buffer.getvalue()]),
+                iter([excel_bytes]),
                 media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 headers={
                     "Content-Disposition": f"attachment; filename=home_budget_export_{user_id}.xlsx"
@@ -3860,23 +3263,24 @@ JSON Response Structure (respond with ONLY valid JSON, no other text):
         max_retries = 2
         response = None
         for attempt in range(max_retries + 1):
-            async with httpx.AsyncClient(timeout=90.0) as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": "gpt-4.1-mini",
-                        "max_tokens": 5000,
-                        "response_format": {"type": "json_object"},
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": prompt}
-                        ],
-                    },
-                )
+            client = http_clients.get_client("openai")
+            response = await client.post(
+                "https://api.openai.com/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": "gpt-4.1-mini",
+                    "max_tokens": 5000,
+                    "response_format": {"type": "json_object"},
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                },
+                timeout=90.0,
+            )
 
             # Retry on 500/502/503 (transient) with backoff
             if response.status_code in (500, 502, 503) and attempt < max_retries:
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime, Boolean, JSON, UniqueConstraint, Table, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from .database import Base, IS_TEST_MODE
 from datetime import datetime
 from typing import TYPE_CHECKING
@@ -184,6 +184,16 @@ class Expense(Base):
     __table_args__ = (
         Index('idx_expenses_reconciliation_status', 'reconciliation_status'),
         Index('idx_expenses_source_status', 'source', 'reconciliation_status'),
+        # Month-activity queries: user_id = ? AND is_recurring = ? AND date <=/>= ? [AND end_date >= ?]
+        Index('idx_expenses_user_recurring_date', 'user_id', 'is_recurring', 'date', 'end_date'),
+        # Open-ended recurring entries (end_date NULL) apply to every month after their start
+        Index(
+            'idx_expenses_user_open_recurring', 'user_id', 'date',
+            postgresql_where=text('is_recurring AND end_date IS NULL'),
+            sqlite_where=text('is_recurring AND end_date IS NULL'),
+        ),
+        # Free-tier monthly limit: user_id = ? AND created_at >= ?
+        Index('idx_expenses_user_created_at', 'user_id', 'created_at'),
     )
 
 class Income(Base):
@@ -232,8 +242,60 @@ class Income(Base):
     __table_args__ = (
         Index('idx_income_reconciliation_status', 'reconciliation_status'),
         Index('idx_income_source_status', 'source', 'reconciliation_status'),
+        # Month-activity queries: user_id = ? AND is_recurring = ? AND date <=/>= ? [AND end_date >= ?]
+        Index('idx_income_user_recurring_date', 'user_id', 'is_recurring', 'date', 'end_date'),
+        # Open-ended recurring entries (end_date NULL) apply to every month after their start
+        Index(
+            'idx_income_user_open_recurring', 'user_id', 'date',
+            postgresql_where=text('is_recurring AND end_date IS NULL'),
+            sqlite_where=text('is_recurring AND end_date IS NULL'),
+        ),
+        # Free-tier monthly limit: user_id = ? AND created_at >= ?
+        Index('idx_income_user_created_at', 'user_id', 'created_at'),
     )
 
+class MonthlyAggregate(Base):
+    """
+    Materialized monthly income/expense totals per household and category.
+
+    Maintained by MonthlyAggregateService from Expense/Income writes; values match
+    MonthlyTotalsService (bank + manual, duplicates excluded) for the same month.
+    """
+    __tablename__ = "monthly_aggregates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    household_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)  # 1-12
+    kind = Column(String, nullable=False)  # "income" | "expense"
+    category = Column(String, nullable=False, default="")  # "" for uncategorized rows
+    total = Column(Float, nullable=False, default=0)
+    from_bank = Column(Float, nullable=False, default=0)
+    from_manual = Column(Float, nullable=False, default=0)
+    bank_count = Column(Integer, nullable=False, default=0)
+    manual_count = Column(Integer, nullable=False, default=0)
+    duplicate_count = Column(Integer, nullable=False, default=0)
+    unreviewed_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('household_id', 'year', 'month', 'kind', 'category', name='uq_monthly_aggregate_key'),
+        Index('idx_monthly_aggregates_household_period', 'household_id', 'year', 'month'),
+    )
+
+
+class MonthlyAggregateCoverage(Base):
+    """Contiguous range of months materialized in monthly_aggregates for a household."""
+    __tablename__ = "monthly_aggregate_coverage"
+
+    household_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    first_year = Column(Integer, nullable=False)
+    first_month = Column(Integer, nullable=False)
+    last_year = Column(Integer, nullable=False)
+    last_month = Column(Integer, nullable=False)
+    rebuilt_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class Settings(Base):
     __tablename__ = "settings"
 
@@ -441,6 +503,13 @@ class Saving(Base):
         Index('idx_savings_account_type', 'account_type'),
         Index('idx_savings_goal_id', 'goal_id'),
         Index('idx_savings_entry_type', 'entry_type'),
+        # Active/monthly savings queries: user_id = ? AND is_recurring = ? AND date ... [AND end_date ...]
+        Index('idx_savings_user_recurring_date', 'user_id', 'is_recurring', 'date', 'end_date'),
+        Index(
+            'idx_savings_user_open_recurring', 'user_id', 'date',
+            postgresql_where=text('is_recurring AND end_date IS NULL'),
+            sqlite_where=text('is_recurring AND end_date IS NULL'),
+        ),
     )
 
 class BankingConnection(Base):
@@ -527,6 +596,77 @@ class TinkConnection(Base):
     )
 
 
+class TinkSyncState(Base):
+    """
+    Incremental sync cursor per Tink connection and account.
+
+    last_booked_date is the newest booked date stored so far; the next sync starts
+    a few days before it (to pick up pending -> booked transitions) instead of
+    refetching the whole window. page_token/cursor_from_date are set while a
+    paginated fetch is in progress, so an interrupted sync resumes from its last
+    stored page.
+    """
+    __tablename__ = "tink_sync_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    connection_id = Column(Integer, ForeignKey("tink_connections.id", ondelete="CASCADE"), nullable=False)
+    account_id = Column(String, nullable=False, default="")  # "" = all accounts of the connection
+    last_booked_date = Column(Date, nullable=True)
+    page_token = Column(String, nullable=True)
+    cursor_from_date = Column(Date, nullable=True)
+    last_synced_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('connection_id', 'account_id', name='uq_tink_sync_state_account'),
+    )
+
+
+class BankSyncJob(Base):
+    """
+    A user-initiated bank sync, queued for the bank sync workers.
+
+    active_key is "<provider>:<user_id>" while the job is queued or running and
+    NULL afterwards, so the unique constraint allows one in-flight sync per user
+    and provider. idempotency_key holds the caller's Idempotency-Key (scoped to
+    the user) and is kept, so a repeated request returns the same job.
+    locked_until is the running worker's lease; a job whose lease expired is
+    picked up again.
+    """
+    __tablename__ = "bank_sync_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    provider = Column(String, nullable=False)  # "tink" or "enable_banking"
+    params = Column(JSON, nullable=True)  # e.g. {"days": 90}
+
+    active_key = Column(String, unique=True, nullable=True)
+    idempotency_key = Column(String, unique=True, nullable=True)
+
+    # "queued", "running", "succeeded" or "failed"
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+    progress = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    error_code = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('idx_bank_sync_jobs_status_run_after', 'status', 'run_after'),
+        Index('idx_bank_sync_jobs_user_id', 'user_id'),
+    )
+
+
 class EnableBankingConnection(Base):
     """Stores Enable Banking PSD2 connections (session-based, JWT auth)."""
     __tablename__ = "enable_banking_connections"
@@ -642,6 +782,64 @@ class BankTransaction(Base):
     )
 
 
+class ReconciliationCandidate(Base):
+    """
+    A scored manual entry / bank transaction pair the user may want to mark as duplicate.
+
+    Maintained by services/reconciliation_candidates.py whenever either side is
+    written; /reconciliation/suggestions reads it ordered by match_score.
+    """
+    __tablename__ = "reconciliation_candidates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)  # household
+    entry_type = Column(String, nullable=False)  # "expense" | "income"
+    expense_id = Column(Integer, ForeignKey("expenses.id", ondelete="CASCADE"), nullable=True)
+    income_id = Column(Integer, ForeignKey("income.id", ondelete="CASCADE"), nullable=True)
+    bank_transaction_id = Column(Integer, ForeignKey("bank_transactions.id", ondelete="CASCADE"), nullable=False)
+    manual_date = Column(Date, nullable=False)  # Copied from the manual entry for month/lookback filters
+    match_score = Column(Float, nullable=False)
+    match_reasons = Column(JSON, nullable=False, default=list)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    expense = relationship("Expense")
+    income = relationship("Income")
+    bank_transaction = relationship("BankTransaction")
+
+    __table_args__ = (
+        UniqueConstraint('expense_id', 'bank_transaction_id', name='uq_reconciliation_candidate_expense'),
+        UniqueConstraint('income_id', 'bank_transaction_id', name='uq_reconciliation_candidate_income'),
+        # Suggestions read: user_id = ? [AND match_score >= ?] ORDER BY match_score DESC
+        Index('idx_reconciliation_candidates_user_score', 'user_id', 'match_score'),
+        Index('idx_reconciliation_candidates_bank_tx', 'bank_transaction_id'),
+    )
+
+
+class MerchantCategory(Base):
+    """
+    A household's remembered AI category for a merchant.
+
+    Written by services/categorization_service.py from confident LLM results;
+    later categorize requests apply it instead of asking the model again.
+    """
+    __tablename__ = "merchant_categories"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)  # household
+    merchant_key = Column(String, nullable=False)  # normalize_description(merchant name or description)
+    direction = Column(String, nullable=False)  # "expense" (negative amount) | "income"
+    suggested_type = Column(String, nullable=True)  # "income" or "expense"
+    suggested_category = Column(String, nullable=False)
+    confidence = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Lookup: user_id = ? AND merchant_key IN (...); also the upsert target
+        UniqueConstraint('user_id', 'merchant_key', 'direction', name='uq_merchant_category_key'),
+    )
+
+
 class Subscription(Base):
     """Tracks user subscription status and Stripe integration."""
     __tablename__ = "subscriptions"
@@ -1066,6 +1264,9 @@ class AIConversation(Base):
     id = Column(Integer, primary_key=True)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), index=True)
     title = Column(String, nullable=True)
+    # Rolling summary of the messages up to summary_message_id; only later ones are resent
+    summary = Column(String, nullable=True)
+    summary_message_id = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -1107,4 +1308,36 @@ class AIUsageQuota(Base):
         UniqueConstraint("user_id", "month", name="uq_ai_quota_user_month"),
         Index('idx_ai_usage_quotas_user_id', 'user_id'),
         Index('idx_ai_usage_quotas_month', 'month'),
+    )
+
+
+class AIUsageRecord(Base):
+    """
+    Token and latency accounting for one AI chat turn (or one history summarization).
+
+    Token counts are summed over every model request of the turn's tool loop.
+    input_tokens excludes the cached prefix, which is billed separately as
+    cache_creation_input_tokens (written) and cache_read_input_tokens (read).
+    """
+    __tablename__ = "ai_usage_records"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    conversation_id = Column(Integer, ForeignKey("ai_conversations.id", ondelete="SET NULL"), nullable=True)
+    kind = Column(String, nullable=False, default="chat")  # "chat" | "summary"
+    model = Column(String, nullable=False)
+    requests = Column(Integer, nullable=False, default=0)  # model calls in the tool loop
+    tool_calls = Column(Integer, nullable=False, default=0)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    cache_creation_input_tokens = Column(Integer, nullable=False, default=0)
+    cache_read_input_tokens = Column(Integer, nullable=False, default=0)
+    history_messages = Column(Integer, nullable=False, default=0)  # stored messages resent with the turn
+    first_token_ms = Column(Integer, nullable=True)
+    latency_ms = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_ai_usage_records_created_at', 'created_at'),
+        Index('idx_ai_usage_records_user_created', 'user_id', 'created_at'),
     )
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Bounded thread pools for blocking calls made from async code.
+
+Some dependencies only have synchronous clients (the Resend and Stripe SDKs) and
+some work is CPU plus buffer I/O (openpyxl exports). Calling them from an
+``async def`` endpoint holds the event loop for every other request until they
+return. Run them on a named pool instead:
+
+    @blocking("email")
+    def send_welcome_email(...): ...
+
+    sent = await send_welcome_email.offload(user.email, ...)  # from async code
+    sent = send_welcome_email(user.email, ...)                # sync callers unchanged
+
+    customer = await run_blocking("stripe", stripe.Customer.create, email=...)
+
+Each pool is bounded, so a slow provider can only tie up its own workers. Sizes
+default to OFFLOAD_POOL_SIZES and can be overridden with OFFLOAD_<NAME>_WORKERS,
+e.g. OFFLOAD_EMAIL_WORKERS=8. Calls run in a copy of the caller's context, so
+context variables (query budgets, logging context) follow them into the worker.
+
+stats() reports per-pool activity. A call counts as saturated when every worker
+was already busy at submission, so it had to queue; a rising saturation rate
+means the pool is too small for its traffic.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+OFFLOAD_POOL_SIZES = {
+    "email": 4,
+    "stripe": 8,
+    "export": 2,
+    "bank_sync": 4,
+}
+DEFAULT_POOL_SIZE = 4
+
+
+class OffloadPool:
+    """A bounded ThreadPoolExecutor with queueing and saturation metrics."""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.saturated = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"offload-{self.name}"
+                )
+            return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on this pool and await its result."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_flight >= self.max_workers:
+                self.saturated += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.submitted += 1
+
+        queued_at = time.monotonic()
+        context = contextvars.copy_context()
+
+        def call():
+            wait_ms = (time.monotonic() - queued_at) * 1000
+            with self._lock:
+                self.total_wait_ms += wait_ms
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            return context.run(fn, *args, **kwargs)
+
+        try:
+            return await loop.run_in_executor(self._get_executor(), call)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "saturated": self.saturated,
+                "saturation_rate": round(self.saturated / self.submitted, 4) if self.submitted else 0.0,
+                "mean_wait_ms": round(self.total_wait_ms / self.completed, 2) if self.completed else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 2),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_pools: Dict[str, OffloadPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str) -> OffloadPool:
+    """Return the named pool, creating it with its configured size on first use."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            size = int(os.getenv(
+                f"OFFLOAD_{name.upper()}_WORKERS", OFFLOAD_POOL_SIZES.get(name, DEFAULT_POOL_SIZE)
+            ))
+            pool = _pools[name] = OffloadPool(name, max_workers=size)
+        return pool
+
+
+async def run_blocking(pool: str, fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking callable on the named pool and await its result."""
+    return await get_pool(pool).run(fn, *args, **kwargs)
+
+
+def blocking(pool: str):
+    """
+    Mark a sync function as blocking and give it an ``offload`` coroutine.
+
+    The function itself is returned unchanged for sync callers; async callers use
+    ``await fn.offload(...)`` to run it on the named pool.
+    """
+    def decorator(fn: Callable) -> Callable:
+        async def offload(*args, **kwargs):
+            return await run_blocking(pool, fn, *args, **kwargs)
+
+        fn.offload = offload
+        fn.offload_pool = pool
+        return fn
+
+    return decorator
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """Per-pool metrics for every pool used so far."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.stats() for pool in pools}
+
+
+def shutdown(wait: bool = True) -> None:
+    """Shut down every pool's workers (called from the app lifespan)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.shutdown(wait=wait)
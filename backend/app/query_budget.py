@@ -0,0 +1,96 @@
+"""
+Per-request database query budgets.
+
+Wrap a unit of work in ``QueryBudget`` to count the SQL statements it issues and
+enforce a maximum:
+
+    with QueryBudget("user_summary", max_queries=12):
+        summary = SummaryService.build_summary(household_id, db)
+
+Statements are counted from an Engine-level ``before_cursor_execute`` hook and
+attributed to the innermost active budget via a context variable, so counts follow
+the request through ``run_in_threadpool`` and don't leak between concurrent requests.
+
+Behavior when a budget is exceeded is controlled by QUERY_BUDGET_MODE:
+- "raise": raise QueryBudgetExceeded (default in test mode, so regressions fail CI)
+- "warn":  log a warning with the count (default elsewhere)
+- "off":   don't count at all
+
+Each budget's maximum can be overridden with QUERY_BUDGET_<NAME>, e.g.
+QUERY_BUDGET_USER_SUMMARY=20.
+"""
+import logging
+import os
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_IS_TEST_MODE = os.getenv("ENVIRONMENT", "production") == "test"
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "raise" if _IS_TEST_MODE else "warn").lower()
+
+_active_budget: ContextVar[Optional["QueryBudget"]] = ContextVar("active_query_budget", default=None)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in "raise" mode when a unit of work issues more queries than its budget."""
+
+    def __init__(self, name: str, count: int, max_queries: int, statements: List[str]):
+        self.name = name
+        self.count = count
+        self.max_queries = max_queries
+        self.statements = statements
+        super().__init__(
+            f"Query budget '{name}' exceeded: {count} queries (max {max_queries})"
+        )
+
+
+class QueryBudget:
+    """Context manager that counts SQL statements and enforces a maximum."""
+
+    def __init__(self, name: str, max_queries: int, mode: Optional[str] = None):
+        self.name = name
+        self.max_queries = int(os.getenv(f"QUERY_BUDGET_{name.upper()}", max_queries))
+        self.mode = (mode or QUERY_BUDGET_MODE).lower()
+        self.count = 0
+        self.statements: List[str] = []
+        self._parent: Optional[QueryBudget] = None
+        self._token = None
+
+    def record(self, statement: str) -> None:
+        self.count += 1
+        self.statements.append(statement)
+        if self._parent is not None:
+            self._parent.record(statement)
+
+    def __enter__(self) -> "QueryBudget":
+        if self.mode != "off":
+            self._parent = _active_budget.get()
+            self._token = _active_budget.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._token is None:
+            return False
+        _active_budget.reset(self._token)
+        self._token = None
+
+        if exc_type is not None or self.count <= self.max_queries:
+            return False
+
+        if self.mode == "raise":
+            raise QueryBudgetExceeded(self.name, self.count, self.max_queries, self.statements)
+        logger.warning(
+            f"[QueryBudget] '{self.name}' issued {self.count} queries (max {self.max_queries})"
+        )
+        return False
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    budget = _active_budget.get()
+    if budget is not None:
+        budget.record(statement)
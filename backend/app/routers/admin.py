@@ -6,6 +6,13 @@ All endpoints require admin authentication.
 
 Rate Limits:
 - /audit/tink: 60/minute - read-only audit queries
+- /cache/snapshots: 60/minute - snapshot cache metrics
+- /cache/categories: 60/minute - merchant category cache metrics
+- /cache/tools: 60/minute - AI tool result cache metrics
+- /ai/usage: 60/minute - AI chat token and latency accounting per day
+- /runtime/loop: 60/minute - event-loop lag and offload pool metrics
+- /runtime/sync: 60/minute - background sync scheduler and sync queue metrics
+- /runtime/http: 60/minute - shared upstream HTTP client pool metrics
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query, Request
@@ -20,6 +27,14 @@ from ..database import get_db
 from ..dependencies import get_current_user
 from ..models import User, TinkAuditLog
 from ..services.tink_metrics_service import tink_analytics_service
+from ..services.snapshot_cache import snapshot_cache
+from ..services.categorization_service import category_cache_metrics
+from ..services.tool_result_cache import tool_result_cache
+from ..services.ai_chat_service import get_usage_report
+from ..loop_monitor import loop_monitor
+from ..jobs.sync_scheduler import sync_scheduler
+from ..jobs.bank_sync_queue import bank_sync_queue
+from .. import http_clients, offload
 from ..logging_utils import get_secure_logger
 
 logger = get_secure_logger(__name__)
@@ -413,3 +428,171 @@ async def get_tink_user_engagement(
     await limiter.check("60/minute", http_request)
 
     return tink_analytics_service.get_user_engagement(db, days=days)
+
+
+# ============================================================================
+# Cache Endpoints
+# ============================================================================
+
+@router.get("/cache/snapshots")
+async def get_snapshot_cache_stats(
+    http_request: Request,
+    current_user: User = Depends(require_admin),
+):
+    """
+    Get hit/miss metrics for the household snapshot cache.
+
+    Requires admin access.
+
+    Rate limit: 60/minute
+    """
+    limiter = get_limiter(http_request)
+    await limiter.check("60/minute", http_request)
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        **snapshot_cache.stats(),
+    }
+
+
+@router.get("/cache/categories")
+async def get_category_cache_stats(
+    http_request: Request,
+    current_user: User = Depends(require_admin),
+):
+    """
+    Get hit/miss metrics for the merchant category cache used by AI categorization.
+
+    Requires admin access.
+
+    Rate limit: 60/minute
+    """
+    limiter = get_limiter(http_request)
+    await limiter.check("60/minute", http_request)
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        **category_cache_metrics.stats(),
+    }
+
+
+@router.get("/cache/tools")
+async def get_tool_cache_stats(
+    http_request: Request,
+    current_user: User = Depends(require_admin),
+):
+    """
+    Get hit/miss metrics and time saved per tool for the AI tool result cache.
+
+    Requires admin access.
+
+    Rate limit: 60/minute
+    """
+    limiter = get_limiter(http_request)
+    await limiter.check("60/minute", http_request)
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        **tool_result_cache.stats(),
+    }
+
+
+# ============================================================================
+# AI Endpoints
+# ============================================================================
+
+@router.get("/ai/usage")
+async def get_ai_usage(
+    http_request: Request,
+    days: int = Query(30, ge=1, le=365, description="Number of days"),
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Get AI chat token usage, prompt cache reads and latency per day.
+
+    Includes billed input tokens per turn (cache writes and reads weighted like
+    the provider bills them) to track input cost per message over time.
+
+    Requires admin access.
+
+    Rate limit: 60/minute
+    """
+    limiter = get_limiter(http_request)
+    await limiter.check("60/minute", http_request)
+
+    return get_usage_report(db, days=days)
+
+
+# ============================================================================
+# Runtime Endpoints
+# ============================================================================
+
+@router.get("/runtime/loop")
+async def get_event_loop_stats(
+    http_request: Request,
+    current_user: User = Depends(require_admin),
+):
+    """
+    Get event-loop lag (with stall attribution in LOOP_LAG_DEBUG mode) and
+    per-pool metrics for blocking calls offloaded to thread pools.
+
+    Requires admin access.
+
+    Rate limit: 60/minute
+    """
+    limiter = get_limiter(http_request)
+    await limiter.check("60/minute", http_request)
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "event_loop": loop_monitor.stats(),
+        "offload_pools": offload.stats(),
+    }
+
+
+@router.get("/runtime/sync")
+async def get_sync_scheduler_stats(
+    http_request: Request,
+    current_user: User = Depends(require_admin),
+):
+    """
+    Get background sync scheduler metrics: outcomes, throughput and queue lag
+    for the last pass and since startup, plus remaining provider rate budget.
+    Also reports the user-initiated sync queue: workers, queued/running jobs and
+    outcome totals.
+
+    Requires admin access.
+
+    Rate limit: 60/minute
+    """
+    limiter = get_limiter(http_request)
+    await limiter.check("60/minute", http_request)
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "sync_scheduler": sync_scheduler.stats(),
+        "sync_queue": bank_sync_queue.stats(),
+    }
+
+
+@router.get("/runtime/http")
+async def get_http_client_stats(
+    http_request: Request,
+    current_user: User = Depends(require_admin),
+):
+    """
+    Get per-upstream HTTP client pool metrics: requests, new connections,
+    connection reuse ratio and pool utilization.
+
+    Requires admin access.
+
+    Rate limit: 60/minute
+    """
+    limiter = get_limiter(http_request)
+    await limiter.check("60/minute", http_request)
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "http_clients": http_clients.stats(),
+    }
@@ -3,19 +3,17 @@ AI Chat Router - WebSocket + REST endpoints for AI Financial Advisor.
 """
 import logging
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import jwt
 
-from ..database import get_db
+from ..database import get_db, get_async_session_factory, run_sync_db
 from ..models import User, AIConversation
 from ..dependencies import JWT_SECRET, JWT_ALGORITHM, get_current_user
-from ..services.subscription_service import SubscriptionService
+from ..services.ai_chat_connection import ChatConnection
 from ..services.ai_chat_service import (
-    check_and_increment_quota,
+    TurnUsage,
     get_quota_info,
-    get_or_create_conversation,
-    get_conversation_history,
-    save_messages,
     stream_claude_response,
 )
 
@@ -23,14 +21,14 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-async def authenticate_ws_user(token: str, db: Session):
+async def authenticate_ws_user(token: str, db: AsyncSession):
     """Authenticate WebSocket user via JWT token."""
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         email = payload.get("sub") or payload.get("userId")
         if not email:
             return None
-        user = db.query(User).filter(User.email == email).first()
+        user = await run_sync_db(db, lambda session: session.query(User).filter(User.email == email).first())
         return user
     except Exception as e:
         logger.warning(f"WS auth failed: {e}")
@@ -41,16 +39,27 @@ async def authenticate_ws_user(token: str, db: Session):
 async def chat_websocket(
     websocket: WebSocket,
     token: str = Query(...),
-    db: Session = Depends(get_db),
+    session_factory=Depends(get_async_session_factory),
 ):
-    """WebSocket chat endpoint for AI financial advisor."""
-    user = await authenticate_ws_user(token, db)
+    """
+    WebSocket chat endpoint for AI financial advisor.
+
+    Database work runs in short-lived AsyncSessions, so the socket holds no
+    pooled connection between messages or while waiting on the model.
+    Premium status, quota and conversation history are cached per connection
+    (ChatConnection); quota increments and messages are written behind by its
+    writer task instead of before the done frame.
+    """
+    async with session_factory() as db:
+        user = await authenticate_ws_user(token, db)
     if not user:
         await websocket.close(code=4001)
         return
 
     await websocket.accept()
     logger.info(f"AI WebSocket connected for user {user.id}")
+    connection = ChatConnection(user.id, session_factory)
+    connection.start()
 
     try:
         while True:
@@ -63,10 +72,10 @@ async def chat_websocket(
 
             if not message_content:
                 continue
+            usage = TurnUsage()
 
             # Check premium subscription
-            sub = SubscriptionService.get_subscription(user.id, db)
-            if not SubscriptionService.is_premium(sub):
+            if not await connection.is_premium():
                 await websocket.send_json({
                     "type": "error",
                     "message": "Premium subscription required for AI advisor"
@@ -74,7 +83,7 @@ async def chat_websocket(
                 continue
 
             # Rate limit check + increment
-            allowed, used, limit = check_and_increment_quota(user.id, db)
+            allowed, used, limit = await connection.consume_query()
             if not allowed:
                 await websocket.send_json({
                     "type": "quota_exceeded",
@@ -84,24 +93,27 @@ async def chat_websocket(
                 continue
 
             # Load or create conversation
-            conv = get_or_create_conversation(user.id, conversation_id, db)
-            history = get_conversation_history(conv, db)
+            conversation = await connection.open_conversation(conversation_id)
 
             # Stream response
             full_response = ""
             try:
-                async for frame in stream_claude_response(user, message_content, history, db):
-                    await websocket.send_json(frame)
-                    if frame.get("type") == "token":
-                        full_response += frame.get("content", "")
-
-                # Save messages to DB
-                save_messages(conv, message_content, full_response, db)
+                async with session_factory() as db:
+                    async for frame in stream_claude_response(
+                        user, message_content, conversation.recent(), db,
+                        summary=conversation.summary, usage=usage,
+                    ):
+                        await websocket.send_json(frame)
+                        if frame.get("type") == "token":
+                            full_response += frame.get("content", "")
+
+                # Queue the messages for the writer
+                connection.record_turn(conversation, message_content, full_response, usage)
 
                 # Send done frame
                 await websocket.send_json({
                     "type": "done",
-                    "conversation_id": conv.id,
+                    "conversation_id": conversation.id,
                     "queries_used": used,
                     "queries_limit": limit,
                 })
@@ -117,6 +129,8 @@ async def chat_websocket(
         logger.info(f"AI WebSocket disconnected for user {user.id}")
     except Exception as e:
         logger.error(f"AI WebSocket error: {e}", exc_info=True)
+    finally:
+        await connection.close()
 
 
 @router.get("/ai/conversations")
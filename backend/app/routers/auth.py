@@ -13,6 +13,7 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from ..database import get_db
+from ..http_clients import get_client
 from ..models import User, Account, Session as UserSession, VerificationToken, Subscription
 from ..services.email_service import send_welcome_email
 
@@ -77,25 +78,25 @@ async def get_google_public_keys() -> dict:
             return _google_certs_cache["keys"]
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(GOOGLE_CERTS_URL, timeout=10.0)
-            if response.status_code != 200:
-                logger.error(f"Failed to fetch Google certs: {response.status_code}")
-                # Return cached keys if available, even if expired
-                if _google_certs_cache["keys"]:
-                    return _google_certs_cache["keys"]
-                raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail="Unable to verify token at this time"
-                )
+        client = get_client("google")
+        response = await client.get(GOOGLE_CERTS_URL, timeout=10.0)
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch Google certs: {response.status_code}")
+            # Return cached keys if available, even if expired
+            if _google_certs_cache["keys"]:
+                return _google_certs_cache["keys"]
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Unable to verify token at this time"
+            )
 
-            certs_data = response.json()
+        certs_data = response.json()
 
-            # Cache for 1 hour
-            _google_certs_cache["keys"] = certs_data
-            _google_certs_cache["expires_at"] = now + timedelta(hours=1)
+        # Cache for 1 hour
+        _google_certs_cache["keys"] = certs_data
+        _google_certs_cache["expires_at"] = now + timedelta(hours=1)
 
-            return certs_data
+        return certs_data
 
     except httpx.RequestError as e:
         logger.error(f"Error fetching Google certs: {e}")
@@ -318,7 +319,7 @@ async def mobile_google_auth(
             subscription = ensure_subscription_exists(db_user.id, db)
             trial_end = subscription.trial_end if subscription else None
 
-            if send_welcome_email(db_user.email, db_user.name, trial_end):
+            if await send_welcome_email.offload(db_user.email, db_user.name, trial_end):
                 db_user.welcome_email_sent_at = datetime.now(timezone.utc)
                 db.commit()
                 logger.info(f"Welcome email sent to user {db_user.id}")
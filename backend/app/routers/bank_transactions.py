@@ -4,7 +4,7 @@ Bank Transactions Router
 Handles syncing, viewing, and converting bank transactions from Tink.
 
 Rate Limits (per user):
-- /sync: 50/day - calls Tink API, heavy operation
+- /sync: 50/day - queues a Tink sync job (calls Tink API, heavy operation)
 - /categorize: 100/hour - AI categorization, compute-intensive
 - / (list): 120/minute - standard read
 - /stats: 120/minute - standard read
@@ -18,8 +18,10 @@ Rate Limits (per user):
 - /bulk/convert: 30/hour - bulk operation
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
 from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, date
 from typing import List, Optional
@@ -30,29 +32,39 @@ import os
 # Rate limiting
 from slowapi import Limiter
 
-from ..database import get_db
+from ..database import get_db, get_async_db, run_sync_db
 from ..dependencies import get_current_user
-from ..models import User, TinkConnection, BankTransaction, BankingConnection, Expense, Income, Settings
+from ..models import User, TinkConnection, BankTransaction, BankingConnection, BankSyncJob, Expense, Income, Settings
+from ..jobs.bank_sync_queue import (
+    JobProgress,
+    SyncJobError,
+    enqueue_sync,
+    run_job_db,
+    serialize_job,
+    sync_job_handler,
+)
 from ..services.tink_service import tink_service, TinkAPIError, TinkAPIRetryExhausted
 from ..services.gocardless_service import gocardless_service, GoCardlessAPIError
-from ..services.categorization_service import categorize_in_batches
+from ..services.categorization_service import categorize_with_cache
+from ..services.reconciliation_candidates import queue_bank_transactions
+from ..services.transaction_ingestion import (
+    ingest_records,
+    parse_gocardless_transaction,
+    parse_tink_transaction,
+)
 from ..services.audit_service import (
     audit_transactions_synced,
     audit_transaction_reviewed,
     audit_categorization_requested,
 )
 from ..logging_utils import get_secure_logger
-from ..schemas.errors import (
-    token_expired_error,
-    rate_limited_error,
-    bank_unavailable_error,
-    auth_failed_error,
-    network_error,
-    internal_error,
-)
+from ..schemas.sync_jobs import SyncJobResponse
+from ..schemas.errors import ErrorCode
 
 logger = get_secure_logger(__name__)
 
+# Transactions taken per /categorize request
+CATEGORIZE_MAX_TRANSACTIONS = int(os.getenv("CATEGORIZE_MAX_TRANSACTIONS", "500"))
 
 # Import the limiter from main - we'll use a function to get it from app state
 def get_limiter(request: Request) -> Limiter:
@@ -169,18 +181,20 @@ class CategorizeResponse(BaseModel):
 # Endpoints
 # ============================================================================
 
-@router.post("/sync", response_model=SyncResponse)
+@router.post("/sync", response_model=SyncJobResponse, status_code=202)
 async def sync_transactions(
     http_request: Request,
     days: int = Query(default=90, ge=1, le=365, description="Number of days to sync"),
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Sync transactions from Tink to local database.
+    Queue a sync of transactions from Tink to local database.
 
-    Fetches transactions from the connected bank account and stores them
-    in bank_transactions table. Duplicates are detected by tink_transaction_id.
+    The sync runs on a bank sync worker (see jobs/bank_sync_queue.py). Returns the
+    job; poll GET /banking/sync-jobs/{job_id} or stream its /events. While a Tink
+    sync is queued or running for the household, the same job is returned.
 
     Rate limit: 50/day per user (calls Tink API, heavy operation)
     """
@@ -188,10 +202,10 @@ async def sync_transactions(
     limiter = get_limiter(http_request)
     await limiter.check("50/day", http_request)
     # Get active Tink connection
-    connection = db.query(TinkConnection).filter(
+    connection = await run_sync_db(db, lambda session: session.query(TinkConnection).filter(
         TinkConnection.user_id == current_user.household_id,
         TinkConnection.is_active == True
-    ).first()
+    ).first())
 
     if not connection:
         raise HTTPException(
@@ -199,207 +213,133 @@ async def sync_transactions(
             detail="No active bank connection. Please connect your bank first."
         )
 
-    try:
-        # Get valid access token
-        access_token = await tink_service.get_valid_access_token(connection, db)
+    job = await run_sync_db(
+        db, enqueue_sync, current_user.household_id, "tink", {"days": days}, idempotency_key
+    )
+    return SyncJobResponse(**serialize_job(job))
 
-        # Fetch transactions from Tink
-        from_date = datetime.now() - timedelta(days=days)
-        transactions_response = await tink_service.fetch_transactions(
-            access_token,
-            from_date=from_date
-        )
 
-        transactions = transactions_response.get("transactions", [])
-        total_fetched = len(transactions)
-        synced_count = 0
-        exact_duplicate_count = 0
-        fuzzy_duplicate_count = 0
-
-        for tx in transactions:
-            tink_tx_id = tx.get("id")
-            provider_tx_id = tx.get("identifiers", {}).get("providerTransactionId")
-
-            # Step 1: Check for exact provider_transaction_id match (100% duplicate)
-            # The bank's transaction ID is stable across Tink reconnections,
-            # while Tink's internal ID may change (especially in sandbox)
-            if provider_tx_id:
-                existing = db.query(BankTransaction).filter(
-                    BankTransaction.user_id == current_user.household_id,
-                    BankTransaction.provider_transaction_id == provider_tx_id
-                ).first()
-
-                if existing:
-                    exact_duplicate_count += 1
-                    continue
-
-            # Parse transaction data
-            amount_data = tx.get("amount", {})
-            amount_value = amount_data.get("value", {})
-            # Tink uses unscaledValue and scale (e.g., -15000 with scale 2 = -150.00)
-            scale = int(amount_value.get("scale", "2"))
-            unscaled = float(amount_value.get("unscaledValue", "0"))
-            amount = unscaled / (10 ** scale)
-
-            currency = amount_data.get("currencyCode", "PLN")
-
-            # Parse date
-            dates = tx.get("dates", {})
-            booked_date_str = dates.get("booked")
-            if booked_date_str:
-                tx_date = datetime.strptime(booked_date_str, "%Y-%m-%d").date()
-            else:
-                tx_date = datetime.now().date()
-
-            # Parse descriptions
-            descriptions = tx.get("descriptions", {})
-            description_display = descriptions.get("display", "Unknown transaction")
-            description_original = descriptions.get("original")
-            description_detailed = descriptions.get("detailed")
-
-            # Parse merchant info
-            merchant_info = tx.get("merchantInformation", {})
-            merchant_name = merchant_info.get("merchantName")
-            merchant_category_code = merchant_info.get("merchantCategoryCode")
-
-            # Parse Tink categories - check enriched_data first (enrichment API), fallback to categories (basic API)
-            enriched_categories = tx.get("enrichedData", {}).get("categories", {}) or tx.get("enriched_data", {}).get("categories", {})
-            basic_categories = tx.get("categories", {})
-
-            # Prefer enriched data, fallback to basic
-            pfm_category = enriched_categories.get("pfm", {}) or basic_categories.get("pfm", {})
-            tink_category_id = pfm_category.get("id")
-            tink_category_name = pfm_category.get("name")
-
-            # Determine suggested type based on amount
-            suggested_type = "income" if amount > 0 else "expense"
-
-            # Map Tink category to our category (basic mapping)
-            suggested_category = map_tink_category(tink_category_id, suggested_type)
-
-            tink_account_id = tx.get("accountId", "")
-
-            # Create bank transaction record
-            bank_tx = BankTransaction(
-                user_id=current_user.household_id,
-                tink_transaction_id=tink_tx_id,
-                tink_account_id=tink_account_id,
-                provider_transaction_id=provider_tx_id,
-                amount=amount,
-                currency=currency,
-                date=tx_date,
-                description_display=description_display,
-                description_original=description_original,
-                description_detailed=description_detailed,
-                merchant_name=merchant_name,
-                merchant_category_code=merchant_category_code,
-                tink_category_id=tink_category_id,
-                tink_category_name=tink_category_name,
-                suggested_type=suggested_type,
-                suggested_category=suggested_category,
-                status="pending",
-                raw_data=tx,
-            )
+@sync_job_handler("tink")
+async def run_tink_sync_job(db: Session, job: BankSyncJob, progress: JobProgress) -> dict:
+    """
+    Fetch transactions from Tink and store them in bank_transactions.
 
-            db.add(bank_tx)
-            synced_count += 1
+    Each page is stored and committed as it arrives, so the sync never holds a
+    connection across the whole fetch. Duplicates are detected by
+    tink_transaction_id and provider_transaction_id. Session work runs on the
+    bank_sync pool (run_job_db).
+    """
+    household_id = job.user_id
+    days = (job.params or {}).get("days", 90)
 
-        # Update connection sync timestamp
+    connection = await run_job_db(lambda: db.query(TinkConnection).filter(
+        TinkConnection.user_id == household_id,
+        TinkConnection.is_active == True
+    ).first())
+    if not connection:
+        raise SyncJobError("No active bank connection", error_code=ErrorCode.NOT_FOUND.value, retryable=False)
+    connection_id = connection.id
+
+    def store_page(transactions: list):
+        result = ingest_records(db, household_id, [parse_tink_transaction(tx) for tx in transactions])
+        db.commit()
+        return result
+
+    def mark_synced() -> None:
         connection.last_sync_at = datetime.now()
         db.commit()
 
-        # Audit: Transactions synced (one summary entry, not per-transaction)
-        audit_transactions_synced(
-            db=db,
-            user_id=current_user.household_id,
-            connection_id=connection.id,
-            synced_count=synced_count,
-            exact_duplicate_count=exact_duplicate_count,
-            fuzzy_duplicate_count=fuzzy_duplicate_count,
-            total_fetched=total_fetched,
-            date_range_days=days,
-            result="success",
-            request=http_request,
+    total_fetched = 0
+    synced_count = 0
+    exact_duplicate_count = 0
+    fuzzy_duplicate_count = 0
+    try:
+        # Get valid access token
+        access_token = await tink_service.get_valid_access_token(
+            connection, db, run_db=lambda fn, *args: run_job_db(fn, db, *args)
         )
 
-        # Build message
-        message_parts = [f"Synced {synced_count} new transactions"]
-        if exact_duplicate_count > 0:
-            message_parts.append(f"{exact_duplicate_count} exact duplicates skipped")
-        if fuzzy_duplicate_count > 0:
-            message_parts.append(f"{fuzzy_duplicate_count} potential duplicates flagged for review")
+        from_date = datetime.now() - timedelta(days=days)
+        await progress.publish(stage="fetching", fetched=0, synced=0)
+        async for page in tink_service.iter_transaction_pages(access_token, from_date=from_date):
+            transactions = page.get("transactions", [])
+            total_fetched += len(transactions)
+            result = await run_job_db(store_page, transactions)
+            synced_count += result.synced_count
+            exact_duplicate_count += result.exact_duplicate_count
+            fuzzy_duplicate_count += result.fuzzy_duplicate_count
+            await progress.publish(stage="fetching", fetched=total_fetched, synced=synced_count)
 
-        return SyncResponse(
-            success=True,
-            synced_count=synced_count,
-            exact_duplicate_count=exact_duplicate_count,
-            fuzzy_duplicate_count=fuzzy_duplicate_count,
-            total_fetched=total_fetched,
-            message=", ".join(message_parts)
-        )
+        # Update connection sync timestamp
+        await run_job_db(mark_synced)
 
     except TinkAPIRetryExhausted as e:
         logger.error(f"Tink API retry exhausted during sync: {str(e)}")
-        # Audit sync failure
-        audit_transactions_synced(
-            db=db,
-            user_id=current_user.household_id,
-            connection_id=connection.id if connection else None,
-            synced_count=0,
-            exact_duplicate_count=0,
-            fuzzy_duplicate_count=0,
-            total_fetched=0,
-            date_range_days=days,
-            result="failure",
-            request=http_request,
-        )
-        error = bank_unavailable_error("Tink")
-        return JSONResponse(status_code=503, content=error.model_dump())
+        await run_job_db(_audit_sync_failure, db, household_id, connection_id, days)
+        raise SyncJobError(str(e), error_code=ErrorCode.BANK_UNAVAILABLE.value)
     except TinkAPIError as e:
         logger.error(f"Tink API error during sync: {str(e)}")
-        # Audit sync failure
-        audit_transactions_synced(
-            db=db,
-            user_id=current_user.household_id,
-            connection_id=connection.id if connection else None,
-            synced_count=0,
-            exact_duplicate_count=0,
-            fuzzy_duplicate_count=0,
-            total_fetched=0,
-            date_range_days=days,
-            result="failure",
-            request=http_request,
-        )
+        await run_job_db(_audit_sync_failure, db, household_id, connection_id, days)
         # Check if it's a 401 Unauthorized (token expired)
         if "401" in str(e) or "Unauthorized" in str(e):
-            error = token_expired_error()
-            return JSONResponse(status_code=401, content=error.model_dump())
-        else:
-            error = auth_failed_error()
-            return JSONResponse(status_code=403, content=error.model_dump())
+            raise SyncJobError(str(e), error_code=ErrorCode.TOKEN_EXPIRED.value, retryable=False)
+        raise SyncJobError(str(e), error_code=ErrorCode.AUTH_FAILED.value, retryable=False)
     except Exception as e:
         logger.error(f"Error syncing transactions: {str(e)}")
-        # Audit sync failure
-        audit_transactions_synced(
-            db=db,
-            user_id=current_user.household_id,
-            connection_id=connection.id if connection else None,
-            synced_count=0,
-            exact_duplicate_count=0,
-            fuzzy_duplicate_count=0,
-            total_fetched=0,
-            date_range_days=days,
-            result="failure",
-            request=http_request,
-        )
+        await run_job_db(_audit_sync_failure, db, household_id, connection_id, days)
         # Check if it's a token expiration error
         error_str = str(e).lower()
         if "token expired" in error_str or "refresh token" in error_str:
-            error = token_expired_error()
-            return JSONResponse(status_code=401, content=error.model_dump())
-        else:
-            error = internal_error(str(e))
-            return JSONResponse(status_code=500, content=error.model_dump())
+            raise SyncJobError(str(e), error_code=ErrorCode.TOKEN_EXPIRED.value, retryable=False)
+        raise
+
+    # Audit: Transactions synced (one summary entry, not per-transaction)
+    await run_job_db(
+        audit_transactions_synced,
+        db=db,
+        user_id=household_id,
+        connection_id=connection_id,
+        synced_count=synced_count,
+        exact_duplicate_count=exact_duplicate_count,
+        fuzzy_duplicate_count=fuzzy_duplicate_count,
+        total_fetched=total_fetched,
+        date_range_days=days,
+        result="success",
+        request=None,  # Queued job, no HTTP request
+    )
+
+    # Build message
+    message_parts = [f"Synced {synced_count} new transactions"]
+    if exact_duplicate_count > 0:
+        message_parts.append(f"{exact_duplicate_count} exact duplicates skipped")
+    if fuzzy_duplicate_count > 0:
+        message_parts.append(f"{fuzzy_duplicate_count} potential duplicates flagged for review")
+
+    return SyncResponse(
+        success=True,
+        synced_count=synced_count,
+        exact_duplicate_count=exact_duplicate_count,
+        fuzzy_duplicate_count=fuzzy_duplicate_count,
+        total_fetched=total_fetched,
+        message=", ".join(message_parts)
+    ).model_dump()
+
+
+def _audit_sync_failure(db: Session, household_id: str, connection_id: Optional[int], days: int) -> None:
+    # Pages stored before the failure are already committed
+    db.rollback()
+    audit_transactions_synced(
+        db=db,
+        user_id=household_id,
+        connection_id=connection_id,
+        synced_count=0,
+        exact_duplicate_count=0,
+        fuzzy_duplicate_count=0,
+        total_fetched=0,
+        date_range_days=days,
+        result="failure",
+        request=None,
+    )
 
 
 @router.post("/sync-gocardless", response_model=SyncResponse)
@@ -442,11 +382,7 @@ async def sync_gocardless_transactions(
     try:
         from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
         total_fetched = 0
-        synced_count = 0
-        exact_duplicate_count = 0
-        # Track IDs added in this batch to catch cross-account duplicates
-        # (e.g., ING internal transfers share the same internalTransactionId on both sides)
-        seen_tx_ids = set()
+        records = []
 
         for account_id in connection.accounts:
             try:
@@ -458,113 +394,13 @@ async def sync_gocardless_transactions(
                 continue
 
             total_fetched += len(transactions)
+            records.extend(parse_gocardless_transaction(tx, account_id) for tx in transactions)
 
-            for tx in transactions:
-                # Dedup key: internalTransactionId is stable across reconnections
-                internal_tx_id = tx.get("internalTransactionId")
-                gc_transaction_id = tx.get("transactionId", "")
-
-                # Use internalTransactionId for dedup if available, fall back to transactionId
-                dedup_id = internal_tx_id or gc_transaction_id
-
-                if not dedup_id:
-                    logger.warning(f"Transaction missing both internalTransactionId and transactionId, skipping")
-                    continue
-
-                # Check for exact duplicate by provider_transaction_id
-                if internal_tx_id:
-                    existing = db.query(BankTransaction).filter(
-                        BankTransaction.user_id == current_user.household_id,
-                        BankTransaction.provider_transaction_id == internal_tx_id
-                    ).first()
-
-                    if existing:
-                        exact_duplicate_count += 1
-                        continue
-
-                # Build a globally unique tink_transaction_id for GoCardless:
-                # internalTransactionId is a unique hash, but transactionId is per-account sequential
-                # (e.g., ING uses "D202602190000002" which repeats across accounts)
-                unique_tx_id = internal_tx_id or f"gc:{account_id}:{gc_transaction_id}"
-
-                # In-batch dedup: ING internal transfers share the same internalTransactionId
-                # across both sides of the transfer (debit on account A, credit on account B)
-                if unique_tx_id in seen_tx_ids:
-                    exact_duplicate_count += 1
-                    continue
-                seen_tx_ids.add(unique_tx_id)
-
-                # Check DB for existing record
-                existing_by_tx_id = db.query(BankTransaction).filter(
-                    BankTransaction.tink_transaction_id == unique_tx_id
-                ).first()
-
-                if existing_by_tx_id:
-                    exact_duplicate_count += 1
-                    continue
-
-                # Parse amount: GoCardless sends string like "-95.35"
-                amount_data = tx.get("transactionAmount", {})
-                try:
-                    amount = float(amount_data.get("amount", "0"))
-                except (ValueError, TypeError):
-                    amount = 0.0
-
-                currency = amount_data.get("currency", "PLN")
-
-                # Parse date
-                booking_date_str = tx.get("bookingDate")
-                if booking_date_str:
-                    try:
-                        tx_date = datetime.strptime(booking_date_str, "%Y-%m-%d").date()
-                    except ValueError:
-                        tx_date = datetime.now().date()
-                else:
-                    tx_date = datetime.now().date()
-
-                # Extract merchant/description
-                creditor_name = tx.get("creditorName")
-                debtor_name = tx.get("debtorName")
-                remittance_info = tx.get("remittanceInformationUnstructured", "")
-
-                # For expenses (negative amount), creditor is the merchant
-                # For income (positive amount), debtor is the source
-                if amount < 0:
-                    merchant_name = creditor_name
-                    description_display = creditor_name or remittance_info or "Unknown transaction"
-                else:
-                    merchant_name = debtor_name
-                    description_display = debtor_name or remittance_info or "Unknown transaction"
-
-                suggested_type = "income" if amount > 0 else "expense"
-
-                # proprietaryBankTransactionCode e.g. "PURCHASE", "TRANSFER"
-                bank_tx_code = tx.get("proprietaryBankTransactionCode", "")
-
-                bank_tx = BankTransaction(
-                    user_id=current_user.household_id,
-                    tink_transaction_id=unique_tx_id,
-                    tink_account_id=account_id,
-                    provider_transaction_id=internal_tx_id,
-                    provider="gocardless",
-                    amount=amount,
-                    currency=currency,
-                    date=tx_date,
-                    description_display=description_display,
-                    description_original=remittance_info,
-                    description_detailed=remittance_info,
-                    merchant_name=merchant_name,
-                    merchant_category_code=bank_tx_code,
-                    tink_category_id=None,
-                    tink_category_name=None,
-                    suggested_type=suggested_type,
-                    suggested_category=None,
-                    status="pending",
-                    raw_data=tx,
-                )
-
-                db.add(bank_tx)
-                synced_count += 1
+        # One batch across accounts, so cross-account repeats (ING internal transfers
+        # share one internalTransactionId on both sides) are caught as duplicates
+        synced_count, exact_duplicate_count, _ = ingest_records(
+            db, current_user.household_id, records
+        )
 
         # Update connection sync timestamp
         connection.last_sync_at = datetime.now()
@@ -609,10 +445,12 @@ async def categorize_transactions(
 
     Uses the Anthropic API to intelligently categorize transactions into
     expense/income categories. Results are stored in suggested_type,
-    suggested_category, and confidence_score fields.
+    suggested_category, and confidence_score fields. Merchants the household
+    has seen before are categorized from merchant_categories without an API call.
 
     Args:
-        force: If True, re-categorize all transactions. If False, only uncategorized ones.
+        force: If True, re-categorize all transactions (bypassing and refreshing
+            the merchant cache). If False, only uncategorized ones.
 
     Rate limit: 100/hour per user (AI categorization, compute-intensive)
     """
@@ -660,9 +498,10 @@ async def categorize_transactions(
             (BankTransaction.confidence_score == 0)
         )
 
-    # Limit to 50 transactions per request to avoid gateway timeout (504)
-    # Users can call multiple times if they have more uncategorized transactions
-    transactions = query.order_by(BankTransaction.date.desc()).limit(50).all()
+    # Known merchants come from the cache and the rest go out in concurrent
+    # batches, so a request covers a whole backlog without a gateway timeout (504).
+    # Users can call again if they have more uncategorized transactions
+    transactions = query.order_by(BankTransaction.date.desc()).limit(CATEGORIZE_MAX_TRANSACTIONS).all()
 
     if not transactions:
         return CategorizeResponse(
@@ -688,7 +527,9 @@ async def categorize_transactions(
 
     # Call AI service
     try:
-        results = await categorize_in_batches(tx_data, batch_size=30, api_key=api_key)
+        results = await categorize_with_cache(
+            db, current_user.household_id, tx_data, api_key=api_key, batch_size=30, refresh=force
+        )
     except Exception as e:
         logger.error(f"AI categorization error: {e}")
         raise HTTPException(status_code=500, detail=f"AI categorization failed: {str(e)}")
@@ -806,7 +647,7 @@ async def get_transactions(
     limit: int = Query(default=100, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get bank transactions with optional filtering.
@@ -816,7 +657,7 @@ async def get_transactions(
     # Rate limit: 120 requests per minute per user (standard read)
     limiter = get_limiter(http_request)
     await limiter.check("120/minute", http_request)
-    query = db.query(BankTransaction).filter(
+    query = select(BankTransaction).filter(
         BankTransaction.user_id == current_user.household_id
     )
 
@@ -848,7 +689,9 @@ async def get_transactions(
     query = query.order_by(BankTransaction.date.desc(), BankTransaction.id.desc())
 
     # Apply pagination
-    transactions = query.offset(offset).limit(limit).all()
+    transactions = await run_sync_db(
+        db, lambda session: session.scalars(query.offset(offset).limit(limit)).all()
+    )
 
     return transactions
 
@@ -918,6 +761,181 @@ async def get_pending_transactions(
     return transactions
 
 
+# ============================================================================
+# Bulk Actions
+# ============================================================================
+# Registered before the /{transaction_id}/... routes so /bulk/... isn't matched as a transaction id
+
+@router.post("/bulk/reject", response_model=BulkActionResponse)
+async def bulk_reject_transactions(
+    http_request: Request,
+    request: BulkActionRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Reject multiple transactions at once.
+
+    Rate limit: 30/hour per user (bulk operation)
+    """
+    # Rate limit: 30 bulk rejects per hour per user (bulk operation)
+    limiter = get_limiter(http_request)
+    await limiter.check("30/hour", http_request)
+    updated = db.query(BankTransaction).filter(
+        BankTransaction.id.in_(request.transaction_ids),
+        BankTransaction.user_id == current_user.household_id,
+        BankTransaction.status == "pending"
+    ).update(
+        {"status": "rejected", "reviewed_at": datetime.now()},
+        synchronize_session=False
+    )
+    queue_bank_transactions(db, ids=request.transaction_ids)
+
+    db.commit()
+
+    # Audit: Bulk transaction review (reject)
+    audit_transaction_reviewed(
+        db=db,
+        user_id=current_user.household_id,
+        action="bulk_reject",
+        transaction_count=updated,
+        request=http_request,
+    )
+
+    return BulkActionResponse(
+        success=True,
+        processed_count=updated,
+        message=f"Rejected {updated} transactions"
+    )
+
+
+@router.post("/bulk/accept", response_model=BulkActionResponse)
+async def bulk_accept_transactions(
+    http_request: Request,
+    request: BulkActionRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Accept multiple transactions at once.
+
+    Rate limit: 30/hour per user (bulk operation)
+    """
+    # Rate limit: 30 bulk accepts per hour per user (bulk operation)
+    limiter = get_limiter(http_request)
+    await limiter.check("30/hour", http_request)
+    updated = db.query(BankTransaction).filter(
+        BankTransaction.id.in_(request.transaction_ids),
+        BankTransaction.user_id == current_user.household_id,
+        BankTransaction.status == "pending"
+    ).update(
+        {"status": "accepted", "reviewed_at": datetime.now()},
+        synchronize_session=False
+    )
+    queue_bank_transactions(db, ids=request.transaction_ids)
+
+    db.commit()
+
+    # Audit: Bulk transaction review (accept)
+    audit_transaction_reviewed(
+        db=db,
+        user_id=current_user.household_id,
+        action="bulk_accept",
+        transaction_count=updated,
+        request=http_request,
+    )
+
+    return BulkActionResponse(
+        success=True,
+        processed_count=updated,
+        message=f"Accepted {updated} transactions"
+    )
+
+
+@router.post("/bulk/convert", response_model=BulkActionResponse)
+async def bulk_convert_transactions(
+    http_request: Request,
+    request: BulkConvertRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Convert multiple transactions to expense or income with the same category.
+
+    Rate limit: 30/hour per user (bulk operation)
+    """
+    # Rate limit: 30 bulk converts per hour per user (bulk operation)
+    limiter = get_limiter(http_request)
+    await limiter.check("30/hour", http_request)
+    transactions = db.query(BankTransaction).filter(
+        BankTransaction.id.in_(request.transaction_ids),
+        BankTransaction.user_id == current_user.household_id,
+        BankTransaction.status == "pending"
+    ).all()
+
+    converted_count = 0
+
+    for bank_tx in transactions:
+        # Skip if transaction already has a linked income/expense record
+        # This handles the case where transaction was reset but linked record still exists
+        if bank_tx.linked_expense_id is not None or bank_tx.linked_income_id is not None:
+            logger.warning(f"Skipping transaction {bank_tx.id} - already has linked record")
+            continue
+
+        description = bank_tx.description_display
+        amount = abs(bank_tx.amount)
+
+        if request.type == ConvertType.expense:
+            new_record = Expense(
+                user_id=current_user.household_id,
+                category=request.category,
+                description=description,
+                amount=amount,
+                date=bank_tx.date,
+                is_recurring=False,
+                source="bank_import",
+                bank_transaction_id=bank_tx.id,
+            )
+            db.add(new_record)
+            db.flush()
+            bank_tx.linked_expense_id = new_record.id
+        else:
+            new_record = Income(
+                user_id=current_user.household_id,
+                category=request.category,
+                description=description,
+                amount=amount,
+                date=bank_tx.date,
+                is_recurring=False,
+                source="bank_import",
+                bank_transaction_id=bank_tx.id,
+            )
+            db.add(new_record)
+            db.flush()
+            bank_tx.linked_income_id = new_record.id
+
+        bank_tx.status = "converted"
+        bank_tx.reviewed_at = datetime.now()
+        converted_count += 1
+
+    db.commit()
+
+    # Audit: Bulk transaction review (convert)
+    audit_transaction_reviewed(
+        db=db,
+        user_id=current_user.household_id,
+        action=f"bulk_convert_to_{request.type.value}",
+        transaction_count=converted_count,
+        request=http_request,
+    )
+
+    return BulkActionResponse(
+        success=True,
+        processed_count=converted_count,
+        message=f"Converted {converted_count} transactions to {request.type.value}"
+    )
+
+
 @router.post("/{transaction_id}/convert", response_model=ConvertResponse)
 async def convert_transaction(
     http_request: Request,
@@ -1310,241 +1328,3 @@ async def get_potential_duplicates(
     ).limit(limit).all()
 
     return transactions
-
-
-# ============================================================================
-# Bulk Actions
-# ============================================================================
-
-@router.post("/bulk/reject", response_model=BulkActionResponse)
-async def bulk_reject_transactions(
-    http_request: Request,
-    request: BulkActionRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Reject multiple transactions at once.
-
-    Rate limit: 30/hour per user (bulk operation)
-    """
-    # Rate limit: 30 bulk rejects per hour per user (bulk operation)
-    limiter = get_limiter(http_request)
-    await limiter.check("30/hour", http_request)
-    updated = db.query(BankTransaction).filter(
-        BankTransaction.id.in_(request.transaction_ids),
-        BankTransaction.user_id == current_user.household_id,
-        BankTransaction.status == "pending"
-    ).update(
-        {"status": "rejected", "reviewed_at": datetime.now()},
-        synchronize_session=False
-    )
-
-    db.commit()
-
-    # Audit: Bulk transaction review (reject)
-    audit_transaction_reviewed(
-        db=db,
-        user_id=current_user.household_id,
-        action="bulk_reject",
-        transaction_count=updated,
-        request=http_request,
-    )
-
-    return BulkActionResponse(
-        success=True,
-        processed_count=updated,
-        message=f"Rejected {updated} transactions"
-    )
-
-
-@router.post("/bulk/accept", response_model=BulkActionResponse)
-async def bulk_accept_transactions(
-    http_request: Request,
-    request: BulkActionRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Accept multiple transactions at once.
-
-    Rate limit: 30/hour per user (bulk operation)
-    """
-    # Rate limit: 30 bulk accepts per hour per user (bulk operation)
-    limiter = get_limiter(http_request)
-    await limiter.check("30/hour", http_request)
-    updated = db.query(BankTransaction).filter(
-        BankTransaction.id.in_(request.transaction_ids),
-        BankTransaction.user_id == current_user.household_id,
-        BankTransaction.status == "pending"
-    ).update(
-        {"status": "accepted", "reviewed_at": datetime.now()},
-        synchronize_session=False
-    )
-
-    db.commit()
-
-    # Audit: Bulk transaction review (accept)
-    audit_transaction_reviewed(
-        db=db,
-        user_id=current_user.household_id,
-        action="bulk_accept",
-        transaction_count=updated,
-        request=http_request,
-    )
-
-    return BulkActionResponse(
-        success=True,
-        processed_count=updated,
-        message=f"Accepted {updated} transactions"
-    )
-
-
-@router.post("/bulk/convert", response_model=BulkActionResponse)
-async def bulk_convert_transactions(
-    http_request: Request,
-    request: BulkConvertRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Convert multiple transactions to expense or income with the same category.
-
-    Rate limit: 30/hour per user (bulk operation)
-    """
-    # Rate limit: 30 bulk converts per hour per user (bulk operation)
-    limiter = get_limiter(http_request)
-    await limiter.check("30/hour", http_request)
-    transactions = db.query(BankTransaction).filter(
-        BankTransaction.id.in_(request.transaction_ids),
-        BankTransaction.user_id == current_user.household_id,
-        BankTransaction.status == "pending"
-    ).all()
-
-    converted_count = 0
-
-    for bank_tx in transactions:
-        # Skip if transaction already has a linked income/expense record
-        # This handles the case where transaction was reset but linked record still exists
-        if bank_tx.linked_expense_id is not None or bank_tx.linked_income_id is not None:
-            logger.warning(f"Skipping transaction {bank_tx.id} - already has linked record")
-            continue
-
-        description = bank_tx.description_display
-        amount = abs(bank_tx.amount)
-
-        if request.type == ConvertType.expense:
-            new_record = Expense(
-                user_id=current_user.household_id,
-                category=request.category,
-                description=description,
-                amount=amount,
-                date=bank_tx.date,
-                is_recurring=False,
-                source="bank_import",
-                bank_transaction_id=bank_tx.id,
-            )
-            db.add(new_record)
-            db.flush()
-            bank_tx.linked_expense_id = new_record.id
-        else:
-            new_record = Income(
-                user_id=current_user.household_id,
-                category=request.category,
-                description=description,
-                amount=amount,
-                date=bank_tx.date,
-                is_recurring=False,
-                source="bank_import",
-                bank_transaction_id=bank_tx.id,
-            )
-            db.add(new_record)
-            db.flush()
-            bank_tx.linked_income_id = new_record.id
-
-        bank_tx.status = "converted"
-        bank_tx.reviewed_at = datetime.now()
-        converted_count += 1
-
-    db.commit()
-
-    # Audit: Bulk transaction review (convert)
-    audit_transaction_reviewed(
-        db=db,
-        user_id=current_user.household_id,
-        action=f"bulk_convert_to_{request.type.value}",
-        transaction_count=converted_count,
-        request=http_request,
-    )
-
-    return BulkActionResponse(
-        success=True,
-        processed_count=converted_count,
-        message=f"Converted {converted_count} transactions to {request.type.value}"
-    )
-
-
-# ============================================================================
-# Helper Functions
-# ============================================================================
-
-def map_tink_category(tink_category_id: Optional[str], tx_type: str) -> Optional[str]:
-    """
-    Map Tink category ID to our app category.
-
-    Tink categories look like: "expenses:food.groceries", "income:salary"
-    """
-    if not tink_category_id:
-        return None
-
-    # Basic mapping - can be expanded
-    category_map = {
-        # Expenses
-        "expenses:food.groceries": "Jedzenie",
-        "expenses:food.restaurants": "Restauracje",
-        "expenses:food.coffee": "Restauracje",
-        "expenses:transport.fuel": "Transport",
-        "expenses:transport.public": "Transport",
-        "expenses:transport.taxi": "Transport",
-        "expenses:transport.parking": "Transport",
-        "expenses:housing.rent": "Mieszkanie",
-        "expenses:housing.mortgage": "Mieszkanie",
-        "expenses:housing.utilities": "Rachunki",
-        "expenses:housing.insurance": "Ubezpieczenia",
-        "expenses:shopping.clothes": "Ubrania",
-        "expenses:shopping.electronics": "Elektronika",
-        "expenses:shopping.groceries": "Jedzenie",
-        "expenses:entertainment.movies": "Rozrywka",
-        "expenses:entertainment.games": "Rozrywka",
-        "expenses:entertainment.streaming": "Subskrypcje",
-        "expenses:health.pharmacy": "Zdrowie",
-        "expenses:health.doctor": "Zdrowie",
-        "expenses:health.gym": "Zdrowie",
-        "expenses:education": "Edukacja",
-        "expenses:misc": "Inne",
-
-        # Income
-        "income:salary": "Wynagrodzenie",
-        "income:benefits": "Świadczenia",
-        "income:pension": "Emerytura",
-        "income:refund": "Zwroty",
-        "income:investment": "Inwestycje",
-        "income:gift": "Prezenty",
-        "income:other": "Inne",
-
-        # Transfers (usually ignored)
-        "transfers:internal": None,
-        "transfers:savings": None,
-    }
-
-    # Try exact match first
-    if tink_category_id in category_map:
-        return category_map[tink_category_id]
-
-    # Try prefix match
-    for prefix, category in category_map.items():
-        if tink_category_id.startswith(prefix.split(".")[0]):
-            return category
-
-    # Default based on type
-    return "Inne" if tx_type == "expense" else "Inne"
@@ -1,5 +1,4 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-import httpx
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
@@ -7,6 +6,7 @@ import json
 import logging
 from dotenv import load_dotenv
 from ..database import get_db
+from ..http_clients import get_client
 from sqlalchemy.orm import Session
 from ..dependencies import get_current_user
 from ..models import User
@@ -163,43 +163,43 @@ async def get_access_token():
     try:
         logger.info("Requesting new GoCardless access token")
         logger.info(f"Using URL: {GOCARDLESS_API_URL}/token/new/")
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{GOCARDLESS_API_URL}/token/new/",
-                json={
-                    "secret_id": GOCARDLESS_SECRET_ID,
-                    "secret_key": GOCARDLESS_SECRET_KEY
-                },
-                headers={
-                    "Content-Type": "application/json",
-                    "Accept": "application/json"
-                }
-            )
+        client = get_client("gocardless")
+        response = await client.post(
+            f"{GOCARDLESS_API_URL}/token/new/",
+            json={
+                "secret_id": GOCARDLESS_SECRET_ID,
+                "secret_key": GOCARDLESS_SECRET_KEY
+            },
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            }
+        )
             
-            logger.info(f"Response status: {response.status_code}")
-            if response.status_code != 200:
-                error_text = response.text
-                logger.error(f"Error getting access token: {error_text}")
+        logger.info(f"Response status: {response.status_code}")
+        if response.status_code != 200:
+            error_text = response.text
+            logger.error(f"Error getting access token: {error_text}")
                 
-                # Try to parse the response for better error info
-                try:
-                    error_data = response.json()
-                    logger.error(f"Error details: {json.dumps(error_data)}")
-                except:
-                    pass
+            # Try to parse the response for better error info
+            try:
+                error_data = response.json()
+                logger.error(f"Error details: {json.dumps(error_data)}")
+            except:
+                pass
                 
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Error getting access token: {error_text}"
-                )
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Error getting access token: {error_text}"
+            )
             
-            token_data = response.json()
+        token_data = response.json()
             
-            # Cache the token with expiration time
-            TOKEN_CACHE["access_token"] = token_data["access"]
-            TOKEN_CACHE["expires_at"] = now + timedelta(seconds=token_data["access_expires"] - 300)  # Expire 5 minutes early
+        # Cache the token with expiration time
+        TOKEN_CACHE["access_token"] = token_data["access"]
+        TOKEN_CACHE["expires_at"] = now + timedelta(seconds=token_data["access_expires"] - 300)  # Expire 5 minutes early
             
-            return token_data["access"]
+        return token_data["access"]
             
     except Exception as e:
         logger.error(f"Error getting access token: {str(e)}")
@@ -238,21 +238,21 @@ async def get_institutions(
     try:
         token = await get_access_token()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{GOCARDLESS_API_URL}/institutions/",
-                params={"country": country},
-                headers={"Authorization": f"Bearer {token}"}
-            )
+        client = get_client("gocardless")
+        response = await client.get(
+            f"{GOCARDLESS_API_URL}/institutions/",
+            params={"country": country},
+            headers={"Authorization": f"Bearer {token}"}
+        )
             
-            if response.status_code != 200:
-                logger.error(f"Error getting institutions: {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Error getting institutions: {response.text}"
-                )
+        if response.status_code != 200:
+            logger.error(f"Error getting institutions: {response.text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Error getting institutions: {response.text}"
+            )
             
-            return response.json()
+        return response.json()
             
     except Exception as e:
         logger.error(f"Error getting institutions: {str(e)}")
@@ -272,32 +272,32 @@ async def create_requisition(
         logger.info(f"Creating requisition with data: {requisition_data}")
         token = await get_access_token()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{GOCARDLESS_API_URL}/requisitions/",
-                json=requisition_data.dict(exclude_none=True),
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                    "Accept": "application/json"
-                }
-            )
+        client = get_client("gocardless")
+        response = await client.post(
+            f"{GOCARDLESS_API_URL}/requisitions/",
+            json=requisition_data.dict(exclude_none=True),
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            }
+        )
             
-            logger.info(f"Requisition response status: {response.status_code}")
+        logger.info(f"Requisition response status: {response.status_code}")
             
-            if response.status_code != 200 and response.status_code != 201:
-                logger.error(f"Error creating requisition: {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Error creating requisition: {response.text}"
-                )
+        if response.status_code != 200 and response.status_code != 201:
+            logger.error(f"Error creating requisition: {response.text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Error creating requisition: {response.text}"
+            )
             
-            # Log the response data
-            response_data = response.json()
-            logger.info(f"Requisition created successfully with ID: {response_data.get('id')}")
-            logger.info(f"Link for bank authorization: {response_data.get('link')}")
+        # Log the response data
+        response_data = response.json()
+        logger.info(f"Requisition created successfully with ID: {response_data.get('id')}")
+        logger.info(f"Link for bank authorization: {response_data.get('link')}")
             
-            return response_data
+        return response_data
             
     except Exception as e:
         logger.error(f"Error creating requisition: {str(e)}")
@@ -316,20 +316,20 @@ async def get_requisition(
     try:
         token = await get_access_token()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{GOCARDLESS_API_URL}/requisitions/{requisition_id}/",
-                headers={"Authorization": f"Bearer {token}"}
-            )
+        client = get_client("gocardless")
+        response = await client.get(
+            f"{GOCARDLESS_API_URL}/requisitions/{requisition_id}/",
+            headers={"Authorization": f"Bearer {token}"}
+        )
             
-            if response.status_code != 200:
-                logger.error(f"Error getting requisition: {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Error getting requisition: {response.text}"
-                )
+        if response.status_code != 200:
+            logger.error(f"Error getting requisition: {response.text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Error getting requisition: {response.text}"
+            )
             
-            return response.json()
+        return response.json()
             
     except Exception as e:
         logger.error(f"Error getting requisition: {str(e)}")
@@ -360,20 +360,20 @@ async def get_account_details(
     try:
         token = await get_access_token()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{GOCARDLESS_API_URL}/accounts/{account_id}/details/",
-                headers={"Authorization": f"Bearer {token}"}
-            )
+        client = get_client("gocardless")
+        response = await client.get(
+            f"{GOCARDLESS_API_URL}/accounts/{account_id}/details/",
+            headers={"Authorization": f"Bearer {token}"}
+        )
             
-            if response.status_code != 200:
-                logger.error(f"Error getting account details: {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Error getting account details: {response.text}"
-                )
+        if response.status_code != 200:
+            logger.error(f"Error getting account details: {response.text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Error getting account details: {response.text}"
+            )
             
-            return response.json()
+        return response.json()
             
     except HTTPException:
         raise
@@ -394,20 +394,20 @@ async def get_account_transactions(
     try:
         token = await get_access_token()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{GOCARDLESS_API_URL}/accounts/{account_id}/transactions/",
-                headers={"Authorization": f"Bearer {token}"}
-            )
+        client = get_client("gocardless")
+        response = await client.get(
+            f"{GOCARDLESS_API_URL}/accounts/{account_id}/transactions/",
+            headers={"Authorization": f"Bearer {token}"}
+        )
             
-            if response.status_code != 200:
-                logger.error(f"Error getting transactions: {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Error getting transactions: {response.text}"
-                )
+        if response.status_code != 200:
+            logger.error(f"Error getting transactions: {response.text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Error getting transactions: {response.text}"
+            )
             
-            return response.json()
+        return response.json()
             
     except Exception as e:
         logger.error(f"Error getting transactions: {str(e)}")
@@ -443,18 +443,18 @@ async def create_banking_connection(
             # For each account, fetch details to get the owner name
             for account_id in connection_data.accounts:
                 try:
-                    async with httpx.AsyncClient() as client:
-                        response = await client.get(
-                            f"{GOCARDLESS_API_URL}/accounts/{account_id}/details/",
-                            headers={"Authorization": f"Bearer {token}"}
-                        )
+                    client = get_client("gocardless")
+                    response = await client.get(
+                        f"{GOCARDLESS_API_URL}/accounts/{account_id}/details/",
+                        headers={"Authorization": f"Bearer {token}"}
+                    )
                         
-                        if response.status_code == 200:
-                            details_data = response.json()
-                            owner_name = details_data.get("account", {}).get("ownerName")
-                            if owner_name:
-                                account_names[account_id] = owner_name
-                                logger.info(f"Found owner name for account {account_id}: {owner_name}")
+                    if response.status_code == 200:
+                        details_data = response.json()
+                        owner_name = details_data.get("account", {}).get("ownerName")
+                        if owner_name:
+                            account_names[account_id] = owner_name
+                            logger.info(f"Found owner name for account {account_id}: {owner_name}")
                 except Exception as e:
                     logger.error(f"Error fetching details for account {account_id}: {str(e)}")
             
@@ -12,7 +12,7 @@ from ..schemas.budget import (
     BudgetFromOnboardingRequest,
 )
 from ..dependencies import get_current_user as get_authenticated_user
-from ..services.monthly_totals_service import MonthlyTotalsService
+from ..services.monthly_aggregate_service import MonthlyAggregateService
 
 logger = logging.getLogger(__name__)
 
@@ -119,7 +119,8 @@ def _compute_monthly_summaries(budget_year: models.BudgetYear, entries: list, db
     Compute monthly summaries from budget entries + actual data from Expense/Income tables.
 
     Planned amounts come from BudgetEntry.planned_amount.
-    Actual amounts are calculated using MonthlyTotalsService (combines bank + manual, excludes duplicates).
+    Actual amounts are read from the materialized monthly aggregates
+    (same logic as MonthlyTotalsService: combines bank + manual, excludes duplicates).
     """
     months = {}
 
@@ -138,39 +139,27 @@ def _compute_monthly_summaries(budget_year: models.BudgetYear, entries: list, db
         elif entry.entry_type == "loan_payment":
             summary.planned_loan_payments += entry.planned_amount or 0
 
-    # Step 2: Calculate ACTUAL amounts from Expense/Income tables using MonthlyTotalsService
-    # This replaces the manual entry.actual_amount with real data from bank + manual sources
+    # Step 2: Read ACTUAL amounts from the monthly aggregates of the Expense/Income tables
+    # This replaces the manual entry.actual_amount with real data from bank + manual sources.
+    year_totals = MonthlyAggregateService.get_range(
+        household_id=budget_year.user_id,
+        start_ym=(budget_year.year, 1),
+        end_ym=(budget_year.year, 12),
+        db=db
+    )
+
     for month_num in range(1, 13):
         if month_num not in months:
             months[month_num] = MonthSummary(month=month_num)
 
-        # Get actual expenses for this month (bank + manual, deduplicated)
-        expense_totals = MonthlyTotalsService.calculate_monthly_expenses(
-            user_id=budget_year.user_id,
-            year=budget_year.year,
-            month=month_num,
-            db=db
-        )
-
-        # Get actual income for this month (bank + manual, deduplicated)
-        income_totals = MonthlyTotalsService.calculate_monthly_income(
-            user_id=budget_year.user_id,
-            year=budget_year.year,
-            month=month_num,
-            db=db
-        )
+        totals = year_totals[(budget_year.year, month_num)]
 
         # Split obligations from regular expenses:
         # Expenses with category="obligations" are loan payments (tracked via Wydatki)
-        obligations_total = MonthlyTotalsService.calculate_monthly_obligations(
-            user_id=budget_year.user_id,
-            year=budget_year.year,
-            month=month_num,
-            db=db
-        )
+        obligations_total = totals["obligations"]
 
-        months[month_num].actual_expenses = expense_totals["total"] - obligations_total
-        months[month_num].actual_income = income_totals["total"]
+        months[month_num].actual_expenses = totals["expenses"]["total"] - obligations_total
+        months[month_num].actual_income = totals["income"]["total"]
         months[month_num].actual_loan_payments = obligations_total
 
     return sorted(months.values(), key=lambda s: s.month)
@@ -10,15 +10,18 @@ Rate Limits (per user):
 - /callback: 10/hour - auth callback
 - /connections: 60/minute - list connections
 - /connections/{id}: 30/hour - delete connection
-- /sync: 50/day - transaction sync (heavy)
+- /sync: 50/day - queues a transaction sync job (heavy)
 """
 
+import asyncio
+import os
 import secrets
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -26,54 +29,31 @@ from slowapi import Limiter
 
 from ..database import get_db
 from ..dependencies import get_current_user
-from ..models import User, EnableBankingConnection, BankTransaction
+from ..models import User, EnableBankingConnection, BankSyncJob
+from ..jobs.bank_sync_queue import (
+    JobProgress,
+    SyncJobError,
+    enqueue_sync,
+    run_job_db,
+    serialize_job,
+    sync_job_handler,
+)
+from ..schemas.errors import ErrorCode
+from ..schemas.sync_jobs import SyncJobResponse
 from ..services.enable_banking_service import enable_banking_service, EnableBankingAPIError
+from ..services.transaction_ingestion import ingest_records, parse_enable_banking_transaction
 
 logger = logging.getLogger(__name__)
 
+# Accounts fetched from Enable Banking at the same time during a sync
+EB_SYNC_ACCOUNT_CONCURRENCY = int(os.getenv("EB_SYNC_ACCOUNT_CONCURRENCY", "4"))
+
 
 def get_limiter(request: Request) -> Limiter:
     """Get the limiter instance from app state."""
     return request.app.state.limiter
 
 
-def _detect_internal_transfer(tx: dict) -> bool:
-    """Detect internal transfers from Enable Banking raw transaction data.
-
-    Catches: ING Smart Saver, own-account transfers, savings account transfers,
-    and same-bank same-person transfers.
-    """
-    remittance = tx.get("remittance_information", [])
-    remittance_text = " ".join(remittance) if isinstance(remittance, list) else str(remittance or "")
-    remittance_lower = remittance_text.lower()
-
-    # Pattern 1: ING Smart Saver auto-savings
-    if "smart saver" in remittance_lower:
-        return True
-
-    # Pattern 2: Own-account transfer ("Przelew własny")
-    if "przelew własny" in remittance_lower:
-        return True
-
-    # Pattern 3: Savings account transfer
-    if "konto oszczędnościowe" in remittance_lower:
-        return True
-
-    # Pattern 4: Same bank, same person (debtor_agent BIC == creditor_agent BIC)
-    debtor_agent = tx.get("debtor_agent") or {}
-    creditor_agent = tx.get("creditor_agent") or {}
-    if (debtor_agent.get("bic_fi") and
-            debtor_agent.get("bic_fi") == creditor_agent.get("bic_fi")):
-        debtor_addr = (tx.get("debtor") or {}).get("postal_address") or {}
-        creditor_addr = (tx.get("creditor") or {}).get("postal_address") or {}
-        debtor_lines = debtor_addr.get("address_line") or []
-        creditor_lines = creditor_addr.get("address_line") or []
-        if debtor_lines and creditor_lines and debtor_lines[0] == creditor_lines[0]:
-            return True
-
-    return False
-
-
 router = APIRouter(
     prefix="/banking/enablebanking",
     tags=["enable-banking"],
@@ -121,12 +101,23 @@ class ConnectionResponse(BaseModel):
     created_at: str
 
 
+class AccountSyncReport(BaseModel):
+    account_uid: str
+    pages: int = 0
+    fetched: int = 0
+    synced_count: int = 0
+    exact_duplicate_count: int = 0
+    fetch_ms: float = 0.0
+    error: Optional[str] = None
+
+
 class SyncResponse(BaseModel):
     success: bool
     synced_count: int
     exact_duplicate_count: int
     total_fetched: int
     message: str
+    accounts: List[AccountSyncReport] = []
 
 
 # ============================================================================
@@ -145,6 +136,30 @@ def _cleanup_expired_auth():
         del _PENDING_AUTH[k]
 
 
+async def _fetch_account_transactions(
+    account_uid: str,
+    date_from: str,
+    semaphore: asyncio.Semaphore,
+) -> Tuple[AccountSyncReport, List[dict]]:
+    """Fetch every page of one account's transactions, timing the fetch for the sync report."""
+    report = AccountSyncReport(account_uid=account_uid)
+    transactions: List[dict] = []
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            async for page in enable_banking_service.iter_transaction_pages(account_uid, date_from=date_from):
+                report.pages += 1
+                transactions.extend(page)
+        except EnableBankingAPIError as e:
+            logger.warning(f"Failed to fetch EB transactions for {account_uid}: {e}")
+            report.error = str(e)
+            transactions = []
+        report.fetch_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    report.fetched = len(transactions)
+    return report, transactions
+
+
 # ============================================================================
 # Endpoints
 # ============================================================================
@@ -362,19 +377,21 @@ async def delete_connection(
     return {"success": True, "message": "Connection disconnected."}
 
 
-@router.post("/sync", response_model=SyncResponse)
+@router.post("/sync", response_model=SyncJobResponse, status_code=202)
 async def sync_transactions(
     http_request: Request,
     days: int = Query(default=30, ge=1, le=730, description="Number of days to sync"),
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
-    Sync transactions from Enable Banking to local database.
+    Queue a sync of transactions from Enable Banking to local database.
 
-    Fetches transactions from all accounts in the user's active EB connection
-    and stores them in bank_transactions table with provider="enablebanking".
-    Dedup by entry_reference or generated unique ID.
+    The sync runs on a bank sync worker (see run_enable_banking_sync_job). Returns
+    the job; poll GET /banking/sync-jobs/{job_id} or stream its /events. While an
+    Enable Banking sync is queued or running for the household, the same job is
+    returned.
     """
     limiter = get_limiter(http_request)
     await limiter.check("50/day", http_request)
@@ -396,164 +413,109 @@ async def sync_transactions(
             detail="Connection has no linked accounts."
         )
 
-    try:
-        from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        total_fetched = 0
-        synced_count = 0
-        exact_duplicate_count = 0
-        seen_tx_ids = set()
+    job = enqueue_sync(db, current_user.household_id, "enable_banking", {"days": days}, idempotency_key)
+    return SyncJobResponse(**serialize_job(job))
 
-        for account in connection.accounts:
-            account_uid = account.get("uid")
-            if not account_uid:
-                continue
 
-            try:
-                transactions = await enable_banking_service.get_transactions(
-                    account_uid, date_from=from_date
-                )
-            except EnableBankingAPIError as e:
-                logger.warning(f"Failed to fetch EB transactions for {account_uid}: {e}")
-                continue
-
-            total_fetched += len(transactions)
-
-            for tx in transactions:
-                # Dedup key: entry_reference is the stable bank ID
-                entry_ref = tx.get("entry_reference", "")
-                tx_id = tx.get("transaction_id", "")
-
-                dedup_id = entry_ref or tx_id
-                if not dedup_id:
-                    logger.warning("EB transaction missing entry_reference and transaction_id, skipping")
-                    continue
-
-                # Build unique ID for tink_transaction_id column
-                unique_tx_id = entry_ref or f"eb:{account_uid}:{tx_id}"
-
-                # In-batch dedup
-                if unique_tx_id in seen_tx_ids:
-                    exact_duplicate_count += 1
-                    continue
-                seen_tx_ids.add(unique_tx_id)
-
-                # Check for existing by provider_transaction_id
-                if entry_ref:
-                    existing = db.query(BankTransaction).filter(
-                        BankTransaction.user_id == current_user.household_id,
-                        BankTransaction.provider_transaction_id == entry_ref,
-                    ).first()
-                    if existing:
-                        exact_duplicate_count += 1
-                        continue
-
-                # Check by tink_transaction_id
-                existing_by_id = db.query(BankTransaction).filter(
-                    BankTransaction.tink_transaction_id == unique_tx_id,
-                ).first()
-                if existing_by_id:
-                    exact_duplicate_count += 1
-                    continue
-
-                # Parse amount
-                amount_data = tx.get("transaction_amount", {})
-                try:
-                    amount = float(amount_data.get("amount", "0"))
-                except (ValueError, TypeError):
-                    amount = 0.0
-                currency = amount_data.get("currency", "PLN")
-
-                # Parse date
-                booking_date_str = tx.get("booking_date", "")
-                if booking_date_str:
-                    try:
-                        tx_date = datetime.strptime(booking_date_str, "%Y-%m-%d").date()
-                    except ValueError:
-                        tx_date = datetime.now().date()
-                else:
-                    tx_date = datetime.now().date()
-
-                # Parse booked datetime
-                booked_dt = None
-                if booking_date_str:
-                    try:
-                        booked_dt = datetime.strptime(booking_date_str, "%Y-%m-%d")
-                    except ValueError:
-                        pass
-
-                # Extract merchant/description
-                creditor = tx.get("creditor", {}) or {}
-                debtor = tx.get("debtor", {}) or {}
-                creditor_name = creditor.get("name")
-                debtor_name = debtor.get("name")
-                remittance_info = tx.get("remittance_information", [])
-                remittance_text = " ".join(remittance_info) if isinstance(remittance_info, list) else str(remittance_info or "")
-
-                # credit_debit_indicator: CRDT (income) or DBIT (expense)
-                cdi = tx.get("credit_debit_indicator", "")
-
-                if cdi == "DBIT" or amount < 0:
-                    merchant_name = creditor_name
-                    description_display = creditor_name or remittance_text or "Unknown transaction"
-                    suggested_type = "expense"
-                else:
-                    merchant_name = debtor_name
-                    description_display = debtor_name or remittance_text or "Unknown transaction"
-                    suggested_type = "income"
-
-                mcc = tx.get("merchant_category_code", "")
-
-                bank_tx = BankTransaction(
-                    user_id=current_user.household_id,
-                    tink_transaction_id=unique_tx_id,
-                    tink_account_id=account_uid,
-                    provider_transaction_id=entry_ref or None,
-                    provider="enablebanking",
-                    amount=amount,
-                    currency=currency,
-                    date=tx_date,
-                    booked_datetime=booked_dt,
-                    description_display=description_display,
-                    description_original=remittance_info[0] if isinstance(remittance_info, list) and remittance_info else remittance_text,
-                    description_detailed=remittance_text,
-                    merchant_name=merchant_name,
-                    merchant_category_code=mcc if mcc else None,
-                    tink_category_id=None,
-                    tink_category_name=None,
-                    suggested_type=suggested_type,
-                    suggested_category=None,
-                    status="pending",
-                    is_internal_transfer=_detect_internal_transfer(tx),
-                    raw_data=tx,
-                )
-                db.add(bank_tx)
-                synced_count += 1
-
-        # Update connection sync timestamp
-        connection.last_sync_at = datetime.now()
-        db.commit()
+@sync_job_handler("enable_banking")
+async def run_enable_banking_sync_job(db: Session, job: BankSyncJob, progress: JobProgress) -> dict:
+    """
+    Sync transactions from Enable Banking to local database.
+
+    Fetches transactions from all accounts in the household's active EB connection
+    and stores them in bank_transactions table with provider="enablebanking".
+    Dedup by entry_reference or generated unique ID.
 
-        message_parts = [f"Synced {synced_count} new transactions from Enable Banking"]
-        if exact_duplicate_count > 0:
-            message_parts.append(f"{exact_duplicate_count} duplicates skipped")
+    Accounts are fetched concurrently; the result reports each account's page
+    count, fetch latency and stored/duplicate counts. Session work runs on the
+    bank_sync pool (run_job_db).
+    """
+    household_id = job.user_id
+    days = (job.params or {}).get("days", 30)
 
-        return SyncResponse(
-            success=True,
-            synced_count=synced_count,
-            exact_duplicate_count=exact_duplicate_count,
-            total_fetched=total_fetched,
-            message=", ".join(message_parts),
+    def load_connection() -> Tuple[Optional[EnableBankingConnection], Optional[List[str]]]:
+        connection = db.query(EnableBankingConnection).filter(
+            EnableBankingConnection.user_id == household_id,
+            EnableBankingConnection.is_active == True,
+        ).first()
+        if not connection or not connection.accounts:
+            return connection, None
+        account_uids = [account.get("uid") for account in connection.accounts if account.get("uid")]
+        # Release the connection while the accounts are fetched
+        db.commit()
+        return connection, account_uids
+
+    connection, account_uids = await run_job_db(load_connection)
+    if account_uids is None:
+        raise SyncJobError(
+            "No active Enable Banking connection with linked accounts",
+            error_code=ErrorCode.NOT_FOUND.value,
+            retryable=False,
         )
 
+    from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+    # Fetch all accounts concurrently (at most EB_SYNC_ACCOUNT_CONCURRENCY at a time)
+    semaphore = asyncio.Semaphore(EB_SYNC_ACCOUNT_CONCURRENCY)
+    fetched_accounts = 0
+    await progress.publish(stage="fetching", accounts_total=len(account_uids), accounts_fetched=0)
+
+    async def fetch(account_uid: str) -> Tuple[AccountSyncReport, List[dict]]:
+        nonlocal fetched_accounts
+        fetched = await _fetch_account_transactions(account_uid, from_date, semaphore)
+        fetched_accounts += 1
+        await progress.publish(accounts_fetched=fetched_accounts)
+        return fetched
+
+    try:
+        fetched = await asyncio.gather(*(fetch(account_uid) for account_uid in account_uids))
     except EnableBankingAPIError as e:
         logger.error(f"Enable Banking API error during sync: {str(e)}")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=f"Enable Banking API error: {str(e)}",
+        raise SyncJobError(
+            f"Enable Banking API error: {str(e)}",
+            error_code=ErrorCode.BANK_UNAVAILABLE.value,
+            retryable=e.status_code >= 500 or e.status_code == 429,
         )
-    except Exception as e:
-        logger.error(f"Error syncing Enable Banking transactions: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error syncing transactions: {str(e)}",
+
+    # Store each account with one set-based prefetch; rows inserted for earlier
+    # accounts are visible to later ones, so cross-account repeats are still caught
+    await progress.publish(stage="storing")
+    reports = []
+    for report, transactions in fetched:
+        result = await run_job_db(
+            ingest_records,
+            db,
+            household_id,
+            [parse_enable_banking_transaction(tx, report.account_uid) for tx in transactions],
+        )
+        report.synced_count = result.synced_count
+        report.exact_duplicate_count = result.exact_duplicate_count
+        reports.append(report)
+        logger.info(
+            f"EB account {report.account_uid}: {report.fetched} fetched in {report.pages} pages "
+            f"({report.fetch_ms} ms), {report.synced_count} new"
         )
+
+    total_fetched = sum(report.fetched for report in reports)
+    synced_count = sum(report.synced_count for report in reports)
+    exact_duplicate_count = sum(report.exact_duplicate_count for report in reports)
+
+    def mark_synced() -> None:
+        connection.last_sync_at = datetime.now()
+        db.commit()
+
+    # Update connection sync timestamp
+    await run_job_db(mark_synced)
+
+    message_parts = [f"Synced {synced_count} new transactions from Enable Banking"]
+    if exact_duplicate_count > 0:
+        message_parts.append(f"{exact_duplicate_count} duplicates skipped")
+
+    return SyncResponse(
+        success=True,
+        synced_count=synced_count,
+        exact_duplicate_count=exact_duplicate_count,
+        total_fetched=total_fetched,
+        message=", ".join(message_parts),
+        accounts=reports,
+    ).model_dump()
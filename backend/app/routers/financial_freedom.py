@@ -11,7 +11,8 @@ from ..schemas.savings import SavingCategory
 from ..schemas.financial_freedom import FinancialFreedomCreate, FinancialFreedomResponse, FinancialFreedomUpdate
 from ..dependencies import get_current_user
 from ..services.gamification_service import GamificationService
-from ..services.monthly_totals_service import MonthlyTotalsService
+from ..services.monthly_aggregate_service import MonthlyAggregateService
+from ..services.snapshot_cache import snapshot_cache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -156,6 +157,15 @@ async def get_financial_freedom_calculated(
     Get the financial freedom data with auto-calculated values for steps 1-3 and 6.
     This endpoint calculates progress based on actual financial data (savings, loans, expenses).
     """
+    return snapshot_cache.get_or_compute(
+        "financial_freedom_calculated",
+        current_user.household_id,
+        lambda: _compute_financial_freedom(current_user, db).model_dump(mode="json"),
+    )
+
+
+def _compute_financial_freedom(current_user: User, db: Session) -> FinancialFreedomResponse:
+    """Compute the auto-calculated financial freedom steps (cached by the /calculated endpoint)."""
     try:
         logger.info(f"Getting calculated financial freedom data for user: {current_user.household_id}")
 
@@ -260,10 +270,10 @@ async def get_financial_freedom_calculated(
         mortgage_principal = float(mortgage.principal_amount) if mortgage else 0.0
 
         # ============== Calculate Monthly Expenses (same as summary endpoint) ==============
-        # Use MonthlyTotalsService to match what the savings section shows
-        expense_totals = MonthlyTotalsService.calculate_monthly_expenses(
+        # Use the monthly aggregates to match what the savings section shows
+        expense_totals = MonthlyAggregateService.get_month(
             current_user.household_id, today.year, today.month, db
-        )
+        )["expenses"]
         monthly_expenses = float(expense_totals.get("total", 0) or 0)
         if monthly_expenses == 0:
             monthly_expenses = 8000  # Default fallback
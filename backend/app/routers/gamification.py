@@ -8,6 +8,7 @@ from ..database import get_db
 from ..models import User
 from ..dependencies import get_current_user
 from ..services.gamification_service import GamificationService
+from ..services.snapshot_cache import snapshot_cache
 from ..schemas.gamification import (
     GamificationStats,
     GamificationOverview,
@@ -62,8 +63,11 @@ async def get_gamification_overview(
     This is the main endpoint for the mobile app dashboard.
     """
     try:
-        overview = GamificationService.get_overview(current_user.id, db)
-        return overview
+        return snapshot_cache.get_or_compute(
+            "gamification_overview",
+            current_user.id,
+            lambda: GamificationService.get_overview(current_user.id, db).model_dump(mode="json"),
+        )
     except Exception as e:
         logger.error(f"Error getting gamification overview for user {current_user.id}: {e}")
         raise HTTPException(
@@ -7,6 +7,7 @@ This router provides endpoints for:
 3. Confirming manual entries as separate (not duplicates)
 """
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import datetime
@@ -15,7 +16,7 @@ from pydantic import BaseModel
 from ..database import get_db
 from ..models import Expense, Income, BankTransaction, User
 from ..dependencies import get_current_user as get_authenticated_user
-from ..services.monthly_totals_service import MonthlyTotalsService
+from ..services.reconciliation_candidates import ReconciliationCandidates
 
 
 router = APIRouter(prefix="/users/{email}/reconciliation", tags=["reconciliation"])
@@ -63,7 +64,8 @@ async def get_reconciliation_suggestions(
     """
     Get suggested duplicate matches between manual entries and bank transactions.
 
-    Returns a list of potential duplicates sorted by match confidence (highest first).
+    Returns a list of potential duplicates sorted by match confidence (highest first),
+    streamed as a JSON array one suggestion at a time.
     Uses fuzzy matching: date ±3 days, amount ±2%, description similarity.
 
     Args:
@@ -78,45 +80,41 @@ async def get_reconciliation_suggestions(
     if current_user.email != email:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Get suggestions from service
-    suggestions = MonthlyTotalsService.suggest_duplicates(
-        user_id=current_user.household_id,
+    # Indexed read of the maintained candidates; the month filter applies before the limit
+    suggestions = ReconciliationCandidates.read_suggestions(
+        current_user.household_id,
+        db,
         limit=limit,
-        db=db
+        month=month,
     )
 
-    # Filter by month if specified
-    if month is not None:
-        suggestions = [
-            s for s in suggestions
-            if s["manual_entry"].date.month == month
-        ]
-
-    # Convert to response models
-    response = []
-    for suggestion in suggestions:
-        manual_entry = suggestion["manual_entry"]
-        bank_tx = suggestion["bank_transaction"]
-
-        response.append(ReconciliationSuggestion(
-            manual_entry_id=manual_entry.id,
-            entry_type=suggestion["entry_type"],
-            bank_transaction_id=bank_tx.id,
-            match_score=suggestion["match_score"],
-            match_reasons=suggestion["match_reasons"],
-            # Manual entry details
-            manual_amount=manual_entry.amount,
-            manual_date=manual_entry.date.isoformat(),
-            manual_description=manual_entry.description,
-            manual_category=manual_entry.category,
-            # Bank transaction details
-            bank_amount=bank_tx.amount,
-            bank_date=bank_tx.date.isoformat(),
-            bank_description=bank_tx.description_display,
-            bank_merchant=bank_tx.merchant_name
-        ))
-
-    return response
+    def stream():
+        yield "["
+        for position, suggestion in enumerate(suggestions):
+            manual_entry = suggestion["manual_entry"]
+            bank_tx = suggestion["bank_transaction"]
+
+            item = ReconciliationSuggestion(
+                manual_entry_id=manual_entry.id,
+                entry_type=suggestion["entry_type"],
+                bank_transaction_id=bank_tx.id,
+                match_score=suggestion["match_score"],
+                match_reasons=suggestion["match_reasons"],
+                # Manual entry details
+                manual_amount=manual_entry.amount,
+                manual_date=manual_entry.date.isoformat(),
+                manual_description=manual_entry.description,
+                manual_category=manual_entry.category,
+                # Bank transaction details
+                bank_amount=bank_tx.amount,
+                bank_date=bank_tx.date.isoformat(),
+                bank_description=bank_tx.description_display,
+                bank_merchant=bank_tx.merchant_name
+            )
+            yield ("," if position else "") + item.model_dump_json()
+        yield "]"
+
+    return StreamingResponse(stream(), media_type="application/json")
 
 
 @router.post("/expenses/{expense_id}/mark-duplicate")
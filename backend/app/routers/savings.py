@@ -16,6 +16,7 @@ from ..schemas.savings import (
 )
 from ..dependencies import get_current_user
 from ..services.gamification_service import GamificationService
+from ..services.snapshot_cache import snapshot_cache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -202,6 +203,15 @@ async def get_savings_summary(
     db: Session = Depends(get_db)
 ):
     """Get a summary of user's savings."""
+    return snapshot_cache.get_or_compute(
+        "savings_summary",
+        current_user.household_id,
+        lambda: _compute_savings_summary(current_user, db).model_dump(mode="json"),
+    )
+
+
+def _compute_savings_summary(current_user: User, db: Session) -> SavingsSummary:
+    """Compute the savings summary (cached by get_savings_summary)."""
     try:
         logger.info(f"Getting savings summary for user: {current_user.household_id}")
 
@@ -24,6 +24,7 @@ from ..services.email_service import (
     send_payment_failed_email,
 )
 from ..dependencies import get_current_user
+from ..offload import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -82,7 +83,7 @@ class UsageStatsResponse(BaseModel):
 
 
 # Helper functions
-def get_or_create_stripe_customer(user: models.User, db: Session) -> str:
+async def get_or_create_stripe_customer(user: models.User, db: Session) -> str:
     """Get existing or create new Stripe customer."""
     subscription = db.query(models.Subscription).filter(
         models.Subscription.user_id == user.id
@@ -92,7 +93,9 @@ def get_or_create_stripe_customer(user: models.User, db: Session) -> str:
         return subscription.stripe_customer_id
 
     # Create Stripe customer
-    customer = stripe.Customer.create(
+    customer = await run_blocking(
+        "stripe",
+        stripe.Customer.create,
         email=user.email,
         name=user.name,
         metadata={"user_id": user.id}
@@ -193,7 +196,7 @@ def ensure_subscription_exists(user_id: str, db: Session) -> Optional[models.Sub
     return subscription
 
 
-def check_trial_expiration(subscription: models.Subscription, db: Session) -> models.Subscription:
+async def check_trial_expiration(subscription: models.Subscription, db: Session) -> models.Subscription:
     """Check if trial has expired and update status if needed."""
     if subscription.status == "trialing" and subscription.trial_end:
         trial_end = subscription.trial_end
@@ -210,7 +213,7 @@ def check_trial_expiration(subscription: models.Subscription, db: Session) -> mo
             try:
                 user = db.query(models.User).filter(models.User.id == subscription.user_id).first()
                 if user and user.email and not user.trial_ended_email_sent_at:
-                    if send_trial_ended_email(user.email, user.name):
+                    if await send_trial_ended_email.offload(user.email, user.name):
                         user.trial_ended_email_sent_at = datetime.now(timezone.utc)
                         db.commit()
                         logger.info(f"Trial ended email sent to user {subscription.user_id}")
@@ -240,7 +243,7 @@ async def get_subscription_status(
         )
 
     # Check trial expiration
-    subscription = check_trial_expiration(subscription, db)
+    subscription = await check_trial_expiration(subscription, db)
 
     is_trial = subscription.status == "trialing"
     is_premium = SubscriptionService.is_premium(subscription)
@@ -296,7 +299,7 @@ async def create_checkout_session(
     if not price_id:
         raise HTTPException(status_code=500, detail=f"Price ID for {plan_type} not configured")
 
-    customer_id = get_or_create_stripe_customer(current_user, db)
+    customer_id = await get_or_create_stripe_customer(current_user, db)
 
     # Determine checkout mode
     mode = "payment" if plan_type == "lifetime" else "subscription"
@@ -325,7 +328,7 @@ async def create_checkout_session(
         }
 
     try:
-        session = stripe.checkout.Session.create(**session_params)
+        session = await run_blocking("stripe", stripe.checkout.Session.create, **session_params)
         logger.info(f"Created checkout session {session.id} for user {current_user.id}, plan {plan_type}")
         return CheckoutResponse(
             checkout_url=session.url,
@@ -353,7 +356,9 @@ async def create_portal_session(
         raise HTTPException(status_code=400, detail="No billing account found. Please subscribe first.")
 
     try:
-        session = stripe.billing_portal.Session.create(
+        session = await run_blocking(
+            "stripe",
+            stripe.billing_portal.Session.create,
             customer=subscription.stripe_customer_id,
             return_url=f"{FRONTEND_URL}/settings?tab=billing"
         )
@@ -505,12 +510,12 @@ async def handle_checkout_completed(session_data: dict, db: Session):
         receipt_url = None
         if session_data.get("invoice"):
             try:
-                invoice = stripe.Invoice.retrieve(session_data.get("invoice"))
+                invoice = await run_blocking("stripe", stripe.Invoice.retrieve, session_data.get("invoice"))
                 receipt_url = invoice.get("hosted_invoice_url")
             except Exception as e:
                 logger.warning(f"Could not retrieve invoice for receipt URL: {e}")
 
-        send_payment_confirmation_email(
+        await send_payment_confirmation_email.offload(
             to_email=user.email,
             user_name=user.name,
             plan_type=plan_type,
@@ -579,7 +584,7 @@ async def handle_payment_failed(invoice_data: dict, db: Session):
         try:
             user = db.query(models.User).filter(models.User.id == subscription.user_id).first()
             if user and user.email:
-                send_payment_failed_email(
+                await send_payment_failed_email.offload(
                     to_email=user.email,
                     user_name=user.name,
                     failure_reason=failure_reason,
@@ -647,7 +652,7 @@ async def handle_subscription_deleted(subscription_data: dict, db: Session):
         try:
             user = db.query(models.User).filter(models.User.id == subscription.user_id).first()
             if user and user.email:
-                send_subscription_canceled_email(
+                await send_subscription_canceled_email.offload(
                     to_email=user.email,
                     user_name=user.name,
                     cancel_date=canceled_at,
@@ -681,7 +686,7 @@ async def handle_trial_will_end(subscription_data: dict, db: Session):
                     delta = trial_end_date - datetime.now(timezone.utc)
                     trial_days_left = max(0, delta.days)
 
-                if send_trial_ending_email(
+                if await send_trial_ending_email.offload(
                     to_email=user.email,
                     user_name=user.name,
                     trial_days_left=trial_days_left,
@@ -0,0 +1,125 @@
+"""
+Bank Sync Jobs Router
+
+Status of queued bank syncs (see jobs/bank_sync_queue.py), by polling or as a
+Server-Sent Events stream.
+
+Rate Limits (per user):
+- /{job_id}: 120/minute - job status poll
+- /{job_id}/events: 30/minute - progress stream
+"""
+
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from slowapi import Limiter
+
+from ..database import get_async_session_factory, get_db, run_sync_db
+from ..dependencies import get_current_user
+from ..jobs.bank_sync_queue import TERMINAL_STATUSES, serialize_job
+from ..models import BankSyncJob, User
+from ..schemas.sync_jobs import SyncJobResponse
+
+# Seconds between job reads while streaming, and between keep-alive comments
+SYNC_EVENTS_POLL_SECONDS = 1.0
+SYNC_EVENTS_KEEPALIVE_SECONDS = 15.0
+
+
+def get_limiter(request: Request) -> Limiter:
+    """Get the limiter instance from app state."""
+    return request.app.state.limiter
+
+
+router = APIRouter(
+    prefix="/banking/sync-jobs",
+    tags=["bank-sync-jobs"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+def _load_job(db: Session, job_id: int, household_id: str) -> Optional[BankSyncJob]:
+    return db.query(BankSyncJob).filter(
+        BankSyncJob.id == job_id,
+        BankSyncJob.user_id == household_id,
+    ).first()
+
+
+@router.get("/{job_id}", response_model=SyncJobResponse)
+async def get_sync_job(
+    http_request: Request,
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Current status, progress and (once finished) result of a queued sync."""
+    limiter = get_limiter(http_request)
+    await limiter.check("120/minute", http_request)
+
+    job = _load_job(db, job_id, current_user.household_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sync job not found.")
+    return SyncJobResponse(**serialize_job(job))
+
+
+@router.get("/{job_id}/events")
+async def stream_sync_job(
+    http_request: Request,
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    session_factory=Depends(get_async_session_factory),
+):
+    """
+    Stream a sync's progress as Server-Sent Events.
+
+    Sends an event whenever the job changes and ends after the event with a
+    final status ("succeeded" or "failed"). The stream doesn't hold a database
+    connection; each read uses a short-lived AsyncSession.
+    """
+    limiter = get_limiter(http_request)
+    await limiter.check("30/minute", http_request)
+
+    household_id = current_user.household_id
+
+    def load(session: Session) -> Optional[dict]:
+        job = _load_job(session, job_id, household_id)
+        return serialize_job(job) if job is not None else None
+
+    async def read_job() -> Optional[dict]:
+        async with session_factory() as session:
+            return await run_sync_db(session, load)
+
+    if await read_job() is None:
+        raise HTTPException(status_code=404, detail="Sync job not found.")
+
+    async def events():
+        last_payload = None
+        idle = 0.0
+        while True:
+            job = await read_job()
+            if job is None:
+                return
+            payload = json.dumps(job)
+            if payload != last_payload:
+                last_payload = payload
+                idle = 0.0
+                yield f"event: {job['status']}\ndata: {payload}\n\n"
+                if job["status"] in TERMINAL_STATUSES:
+                    return
+            elif idle >= SYNC_EVENTS_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+
+            if await http_request.is_disconnected():
+                return
+            await asyncio.sleep(SYNC_EVENTS_POLL_SECONDS)
+            idle += SYNC_EVENTS_POLL_SECONDS
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -10,6 +10,7 @@ from .. import models, database
 from ..dependencies import get_or_create_current_user, get_current_user, INTERNAL_SERVICE_SECRET
 from pydantic import BaseModel
 from ..logging_utils import make_conditional_print
+from ..offload import run_blocking
 
 import stripe
 
@@ -264,7 +265,7 @@ async def delete_user_account(
                 subscription.status in ["active", "trialing", "past_due"] and
                 not subscription.is_lifetime):
                 try:
-                    stripe.Subscription.cancel(subscription.stripe_subscription_id)
+                    await run_blocking("stripe", stripe.Subscription.cancel, subscription.stripe_subscription_id)
                     logger.info(f"Cancelled Stripe subscription {subscription.stripe_subscription_id} for user {user_id}")
                 except stripe.error.StripeError as e:
                     # Log error but continue with account deletion
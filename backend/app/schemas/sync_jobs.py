@@ -0,0 +1,21 @@
+"""Pydantic schemas for queued bank sync jobs."""
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+
+
+class SyncJobResponse(BaseModel):
+    """A queued bank sync; `result` holds the provider's sync summary once it succeeds."""
+    job_id: int
+    provider: str
+    status: str  # "queued", "running", "succeeded" or "failed"
+    attempts: int
+    max_attempts: int
+    progress: Dict[str, Any] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    error_code: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    status_url: Optional[str] = None
+    events_url: Optional[str] = None
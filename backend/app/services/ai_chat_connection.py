@@ -0,0 +1,259 @@
+"""
+ChatConnection - Per-WebSocket state for the AI advisor chat.
+
+For every message, chat_websocket used to re-read the subscription, lock and
+increment the quota row, load the conversation and its history and commit the
+messages before sending the done frame - all on one AsyncSession (and pooled
+connection) held for the socket's lifetime. A ChatConnection instead keeps:
+1. Premium status, re-read at most every AI_WS_PREMIUM_TTL_SECONDS.
+2. Quota state: the month's count as last read plus the increments not yet
+   written. Increments are written behind with add_quota_usage(), which adds
+   to the stored count, and every write re-reads the total so other
+   connections' use is seen. Until then a user with several connections can
+   exceed the limit by the unwritten increments.
+3. Conversation state: id, rolling summary and history, loaded once per
+   conversation. Answered turns are appended locally, so the next message
+   doesn't wait for them to be stored.
+4. A writer task that persists queued turns (messages + usage records) and the
+   quota increments in one transaction per batch - after each turn and at least
+   every AI_WS_FLUSH_INTERVAL_SECONDS - then compacts the conversations it
+   wrote to (compact_conversation) and refreshes their cached history.
+
+Every database access opens a short-lived session from the session factory, so
+an idle socket holds no pooled connection.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database import AsyncSessionLocal, run_sync_db
+from ..models import AIConversation
+from .ai_chat_service import (
+    ChatTurn,
+    TurnUsage,
+    add_quota_usage,
+    compact_conversation,
+    current_quota_month,
+    get_conversation_history,
+    get_or_create_conversation,
+    get_quota_info,
+    save_turns,
+)
+from .subscription_service import SubscriptionService
+
+logger = logging.getLogger(__name__)
+
+AI_WS_PREMIUM_TTL_SECONDS = float(os.getenv("AI_WS_PREMIUM_TTL_SECONDS", "60"))
+AI_WS_FLUSH_INTERVAL_SECONDS = float(os.getenv("AI_WS_FLUSH_INTERVAL_SECONDS", "2.0"))
+# History messages sent with each turn (as get_conversation_history's default)
+AI_WS_HISTORY_MESSAGES = 20
+
+
+@dataclass
+class ConversationState:
+    """A conversation's summary and the history after it, including turns not yet stored."""
+    id: int
+    summary: Optional[str]
+    history: List[dict]
+    unsaved: int = 0  # trailing history messages not yet written
+
+    def recent(self, max_messages: int = AI_WS_HISTORY_MESSAGES) -> List[dict]:
+        return self.history[-max_messages:]
+
+
+class ChatConnection:
+    """Cached gate checks, conversation history and write-behind persistence for one socket."""
+
+    def __init__(
+        self,
+        user_id: str,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        flush_interval: float = AI_WS_FLUSH_INTERVAL_SECONDS,
+        premium_ttl: float = AI_WS_PREMIUM_TTL_SECONDS,
+    ):
+        self.user_id = user_id
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.premium_ttl = premium_ttl
+
+        self._premium: Optional[bool] = None
+        self._premium_checked_at = 0.0
+        self._quota_month: Optional[str] = None
+        self._quota_used = 0
+        self._quota_limit = 0
+        self._quota_pending = 0
+        self._conversations: Dict[int, ConversationState] = {}
+        self._queue: List[ChatTurn] = []
+
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def close(self) -> None:
+        """Stop the writer after a final flush of pending turns and quota increments."""
+        self._closed = True
+        self._wakeup.set()
+        if self._writer is not None:
+            await self._writer
+            self._writer = None
+        else:
+            await self._flush_logged()
+
+    # ------------------------------------------------------------------
+    # Gate checks
+    # ------------------------------------------------------------------
+
+    async def is_premium(self) -> bool:
+        """Premium status, re-read from the subscription once it is older than premium_ttl."""
+        now = time.monotonic()
+        if self._premium is None or now - self._premium_checked_at >= self.premium_ttl:
+            async with self.session_factory() as db:
+                sub = await run_sync_db(db, lambda session: SubscriptionService.get_subscription(self.user_id, session))
+                self._premium = SubscriptionService.is_premium(sub)
+            self._premium_checked_at = now
+        return self._premium
+
+    async def consume_query(self) -> Tuple[bool, int, int]:
+        """
+        Count one query against the monthly quota. Returns (allowed, used, limit).
+
+        The increment is only recorded locally; the writer adds it to the stored count.
+        """
+        month = current_quota_month()
+        if self._quota_month != month:
+            # New connection or a new month: write the old month's increments, then read
+            await self._flush_logged()
+            async with self.session_factory() as db:
+                used, limit = await run_sync_db(db, lambda session: get_quota_info(self.user_id, session, month))
+            self._quota_month, self._quota_used, self._quota_limit = month, used, limit
+
+        used = self._quota_used + self._quota_pending
+        if used >= self._quota_limit:
+            return False, used, self._quota_limit
+        self._quota_pending += 1
+        return True, used + 1, self._quota_limit
+
+    # ------------------------------------------------------------------
+    # Conversations
+    # ------------------------------------------------------------------
+
+    async def open_conversation(self, conversation_id: Optional[int]) -> ConversationState:
+        """Cached conversation state; loads (or creates) the conversation on first use."""
+        if conversation_id in self._conversations:
+            return self._conversations[conversation_id]
+
+        def load(session: Session) -> ConversationState:
+            conv = get_or_create_conversation(self.user_id, conversation_id, session)
+            return ConversationState(conv.id, conv.summary, get_conversation_history(conv, session))
+
+        async with self.session_factory() as db:
+            state = await run_sync_db(db, load)
+        self._conversations[state.id] = state
+        return state
+
+    def record_turn(
+        self,
+        conversation: ConversationState,
+        user_content: str,
+        assistant_content: str,
+        usage: Optional[TurnUsage] = None,
+    ) -> None:
+        """Append an answered turn to the cached history and queue it for the writer."""
+        conversation.history.extend([
+            {"role": "user", "content": user_content},
+            {"role": "assistant", "content": assistant_content},
+        ])
+        conversation.unsaved += 2
+        self._queue.append(ChatTurn(conversation.id, user_content, assistant_content, usage))
+        self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Write-behind
+    # ------------------------------------------------------------------
+
+    async def flush(self) -> None:
+        """Persist queued turns and quota increments in one transaction, then compact."""
+        async with self._flush_lock:
+            turns, self._queue = self._queue, []
+            month, pending = self._quota_month, self._quota_pending
+            if not turns and not pending:
+                return
+
+            def write(session: Session) -> Optional[int]:
+                if turns:
+                    save_turns(turns, session)
+                stored = add_quota_usage(self.user_id, month, pending, session) if pending else None
+                session.commit()
+                return stored
+
+            try:
+                async with self.session_factory() as db:
+                    stored = await run_sync_db(db, write)
+            except Exception:
+                # Keep everything for the next attempt
+                self._queue = turns + self._queue
+                raise
+
+            self._quota_pending -= pending
+            if stored is not None and month == self._quota_month:
+                self._quota_used = stored
+            written: Dict[int, int] = {}
+            for turn in turns:
+                written[turn.conversation_id] = written.get(turn.conversation_id, 0) + 2
+            for conv_id, count in written.items():
+                if conv_id in self._conversations:
+                    self._conversations[conv_id].unsaved -= count
+
+            for conv_id in written:
+                await self._compact(conv_id)
+
+    async def _compact(self, conv_id: int) -> None:
+        try:
+            async with self.session_factory() as db:
+                if not await compact_conversation(conv_id, db):
+                    return
+
+                def reload(session: Session) -> Tuple[Optional[str], List[dict]]:
+                    conv = session.get(AIConversation, conv_id)
+                    return conv.summary, get_conversation_history(conv, session)
+
+                summary, persisted = await run_sync_db(db, reload)
+        except Exception as e:
+            logger.warning(f"[AI] Conversation compaction failed for {conv_id}: {e}")
+            return
+
+        state = self._conversations.get(conv_id)
+        if state is not None:
+            # Turns recorded while compacting aren't stored yet; keep them after the reloaded history
+            tail = state.history[len(state.history) - state.unsaved:] if state.unsaved else []
+            state.summary = summary
+            state.history = persisted + tail
+
+    async def _write_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush_logged()
+            if self._closed:
+                return
+
+    async def _flush_logged(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"[AI] Failed to persist chat for user {self.user_id}: {e}", exc_info=True)
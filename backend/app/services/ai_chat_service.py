@@ -2,8 +2,11 @@
 AI Chat Service - Single Source of Truth for AI financial advisor logic.
 Used by both the FastAPI WebSocket endpoint and the MCP server.
 """
+import asyncio
+import json
 import os
 import logging
+import time
 
 # Load .env file (needed when running in Docker where .env is mounted but not auto-loaded)
 try:
@@ -11,17 +14,24 @@ try:
     load_dotenv("/app/.env", override=False)  # override=False: docker-compose env takes precedence
 except ImportError:
     pass
-from datetime import datetime, timezone
-from typing import AsyncGenerator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import AsyncGenerator, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import anthropic
 
+from ..database import dialect_insert, run_sync_db
+from ..query_budget import QueryBudget
+from ..http_clients import get_client
 from ..models import (
-    User, AIConversation, AIMessage, AIUsageQuota,
+    User, AIConversation, AIMessage, AIUsageQuota, AIUsageRecord,
     Expense, Income, Loan, LoanPayment, Saving, SavingsGoal,
-    Settings, FinancialFreedom, Subscription
+    FinancialFreedom
 )
-from ..services.subscription_service import SubscriptionService
+from ..services.ai_context_service import AIContextService, AI_CONTEXT_MAX_QUERIES
+from ..services.snapshot_cache import snapshot_cache
+from ..services.tool_result_cache import PURE_TOOLS, tool_result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +39,20 @@ AI_CHAT_MODEL = os.getenv("AI_CHAT_MODEL", "claude-haiku-4-5-20251001")
 AI_MAX_TOKENS = int(os.getenv("AI_MAX_TOKENS", "4096"))
 AI_QUERIES_PER_MONTH = int(os.getenv("AI_QUERIES_PER_MONTH", "100"))
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+# Mark the system prompt and the transcript for provider-side prompt caching
+AI_PROMPT_CACHING = os.getenv("AI_PROMPT_CACHING", "true").lower() == "true"
+# Estimated tokens of summary + unsummarized history above which older turns are summarized
+AI_HISTORY_TOKEN_BUDGET = int(os.getenv("AI_HISTORY_TOKEN_BUDGET", "4000"))
+# Most recent messages always resent verbatim
+AI_HISTORY_KEEP_MESSAGES = int(os.getenv("AI_HISTORY_KEEP_MESSAGES", "6"))
+AI_SUMMARY_MODEL = os.getenv("AI_SUMMARY_MODEL", AI_CHAT_MODEL)
+AI_SUMMARY_MAX_TOKENS = int(os.getenv("AI_SUMMARY_MAX_TOKENS", "1024"))
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Shared async client (see get_anthropic_client) and the pooled httpx client it wraps
+_anthropic_client: Optional[anthropic.AsyncAnthropic] = None
+_anthropic_http_client = None
 
 
 def _rec_no_end_deduped(db: Session, user_id: str, date_end):
@@ -136,25 +160,14 @@ def _income_rec_no_end_deduped_by_category(db: Session, user_id: str, date_end)
     )
 
 
-def _build_savings_contrib_2026(db: Session, user_id: str, year: int) -> dict:
-    """
-    Returns actual contributions per account_type in the given year,
-    excluding opening_balance entries (those are historical carryovers, not new contributions).
-    Used to correctly calculate remaining annual limits for IKE/IKZE/OIPE.
-    """
-    from sqlalchemy import func as _func, extract as _extract
-    rows = db.query(Saving.account_type, _func.sum(Saving.amount)).filter(
-        Saving.user_id == user_id,
-        _extract('year', Saving.date) == year,
-        Saving.entry_type != 'opening_balance',
-        Saving.saving_type == 'deposit',
-    ).group_by(Saving.account_type).all()
-    return {at: float(amt or 0) for at, amt in rows}
+def current_quota_month() -> str:
+    """Quota period key ("2026-02")."""
+    return datetime.now().strftime("%Y-%m")
 
 
 def check_and_increment_quota(user_id: str, db: Session) -> tuple[bool, int, int]:
     """Returns (allowed, used, limit). Increments counter atomically."""
-    month = datetime.now().strftime("%Y-%m")
+    month = current_quota_month()
     quota = db.query(AIUsageQuota).filter(
         AIUsageQuota.user_id == user_id,
         AIUsageQuota.month == month
@@ -170,9 +183,9 @@ def check_and_increment_quota(user_id: str, db: Session) -> tuple[bool, int, int
     return True, quota.queries_used, AI_QUERIES_PER_MONTH
 
 
-def get_quota_info(user_id: str, db: Session) -> tuple[int, int]:
-    """Returns (used, limit) for current month without incrementing."""
-    month = datetime.now().strftime("%Y-%m")
+def get_quota_info(user_id: str, db: Session, month: Optional[str] = None) -> tuple[int, int]:
+    """Returns (used, limit) for current month (or the given one) without incrementing."""
+    month = month or current_quota_month()
     quota = db.query(AIUsageQuota).filter(
         AIUsageQuota.user_id == user_id,
         AIUsageQuota.month == month
@@ -181,238 +194,146 @@ def get_quota_info(user_id: str, db: Session) -> tuple[int, int]:
     return used, AI_QUERIES_PER_MONTH
 
 
-async def build_user_context(user_id: str, db: Session) -> dict:
-    """Builds financial snapshot for system prompt context."""
-    from sqlalchemy import func, extract
-    from datetime import date, timedelta
+def add_quota_usage(user_id: str, month: str, count: int, db: Session) -> int:
+    """
+    Add count queries to a month's quota and return the stored total (not committed).
 
-    now = date.today()
-    current_month = now.month
-    current_year = now.year
-
-    # Settings
-    settings = db.query(Settings).filter(Settings.user_id == user_id).first()
-
-    # Income: current month (deduplicated) + rolling average of last 3 non-zero months
-    # Non-recurring income for current month
-    current_income_non_rec = db.query(func.sum(Income.amount)).filter(
-        Income.user_id == user_id,
-        Income.is_recurring == False,
-        extract('month', Income.date) == current_month,
-        extract('year', Income.date) == current_year,
-    ).scalar() or 0
-    # Recurring income (no end_date): deduplicated — newest per category+description
-    current_income_rec = _income_rec_no_end_deduped_total(db, user_id, current_month, current_year)
-    # Recurring income with explicit end_date still active this month
-    import calendar as _cal_inc
-    _, _inc_days = _cal_inc.monthrange(current_year, current_month)
-    m_end_inc = date(current_year, current_month, _inc_days)
-    current_income_rec_we = db.query(func.sum(Income.amount)).filter(
-        Income.user_id == user_id,
-        Income.is_recurring == True,
-        Income.end_date.is_not(None),
-        Income.date <= m_end_inc,
-        Income.end_date >= date(current_year, current_month, 1),
-    ).scalar() or 0
-    current_income = float(current_income_non_rec) + current_income_rec + float(current_income_rec_we)
-
-    # Rolling 3-month average (same dedup logic, excluding current month)
-    monthly_incomes = []
-    for offset in range(1, 7):  # Look back up to 6 months
-        m = current_month - offset
-        y = current_year
-        while m <= 0:
-            m += 12
-            y -= 1
-        month_non_rec = db.query(func.sum(Income.amount)).filter(
-            Income.user_id == user_id,
-            Income.is_recurring == False,
-            extract('month', Income.date) == m,
-            extract('year', Income.date) == y,
-        ).scalar() or 0
-        month_rec = _income_rec_no_end_deduped_total(db, user_id, m, y)
-        month_total = float(month_non_rec) + month_rec
-        if month_total > 0:
-            monthly_incomes.append(month_total)
-        if len(monthly_incomes) >= 3:
-            break
-    avg_income = sum(monthly_incomes) / len(monthly_incomes) if monthly_incomes else current_income
+    One upsert that adds to the stored value, so increments written behind by
+    several connections of the same user never overwrite each other.
+    """
+    table = AIUsageQuota.__table__
+    stmt = dialect_insert(db, table).values(user_id=user_id, month=month, queries_used=count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "month"],
+        set_={"queries_used": table.c.queries_used + stmt.excluded.queries_used},
+    )
+    db.execute(stmt)
+    return db.query(AIUsageQuota.queries_used).filter(
+        AIUsageQuota.user_id == user_id,
+        AIUsageQuota.month == month
+    ).scalar()
 
-    # Current month expenses by category (same logic as backend dashboard)
-    import calendar as cal_mod
-    from sqlalchemy import or_
-    _, month_days = cal_mod.monthrange(current_year, current_month)
-    month_start = date(current_year, current_month, 1)
-    month_end = date(current_year, current_month, month_days)
-
-    # Non-recurring: exact date in current month
-    exp_non_rec = db.query(Expense.category, func.sum(Expense.amount)).filter(
-        Expense.user_id == user_id,
-        Expense.is_recurring == False,
-        Expense.date >= month_start,
-        Expense.date <= month_end,
-    ).group_by(Expense.category).all()
-
-    # Recurring with explicit end_date: active if started before month end and ended after month start
-    exp_rec_with_end = db.query(Expense.category, func.sum(Expense.amount)).filter(
-        Expense.user_id == user_id,
-        Expense.is_recurring == True,
-        Expense.end_date.is_not(None),
-        Expense.date <= month_end,
-        Expense.end_date >= month_start,
-    ).group_by(Expense.category).all()
-
-    # Recurring without end_date: deduplicated (newest per category+description)
-    exp_rec_no_end = _rec_no_end_deduped(db, user_id, month_end)
-
-    from collections import defaultdict
-    cat_totals: dict[str, float] = defaultdict(float)
-    for cat, amt in exp_non_rec:
-        cat_totals[cat] += float(amt or 0)
-    for cat, amt in exp_rec_with_end:
-        cat_totals[cat] += float(amt or 0)
-    for cat, amt in exp_rec_no_end:
-        cat_totals[cat] += float(amt or 0)
-    expenses_raw = list(cat_totals.items())
-    total_expenses = sum(v for v in cat_totals.values())
-    top_categories = sorted(expenses_raw, key=lambda x: x[1], reverse=True)[:5]
-
-    # Active loans (not archived)
-    loans = db.query(Loan).filter(
-        Loan.user_id == user_id,
-        Loan.is_archived == False
-    ).all()
-    loans_summary = []
-    for loan in loans:
-        loans_summary.append({
-            "name": loan.description or "Kredyt",
-            "balance": float(loan.remaining_balance or loan.principal_amount or 0),
-            "rate": float(loan.interest_rate or 0),
-            "monthly_payment": float(loan.monthly_payment or 0),
-        })
 
-    # Savings goals
-    goals = db.query(SavingsGoal).filter(SavingsGoal.user_id == user_id).all()
-    goals_summary = []
-    for g in goals:
-        goals_summary.append({
-            "name": g.name,
-            "current": float(g.current_amount or 0),
-            "target": float(g.target_amount),
-            "deadline": g.deadline.isoformat() if g.deadline else None,
-        })
+async def build_user_context(user_id: str, db: Session) -> dict:
+    """
+    Builds financial snapshot for system prompt context (db: Session or AsyncSession).
 
-    # Baby steps - FinancialFreedom uses JSONB `steps` field
-    ff = db.query(FinancialFreedom).filter(FinancialFreedom.userId == user_id).first()
-    baby_step = 1
-    if ff and ff.steps:
-        steps = ff.steps if isinstance(ff.steps, list) else []
-        for step in steps:
-            if isinstance(step, dict) and step.get("status") == "completed":
-                baby_step = max(baby_step, step.get("step", 1))
-        # Current step is the first non-completed one
-        for step in steps:
-            if isinstance(step, dict) and step.get("status") != "completed":
-                baby_step = step.get("step", baby_step)
-                break
+    Cached per household and data version (snapshot_cache), so the messages of
+    a conversation reuse one snapshot until the household's data changes.
+    """
+    def build(session: Session) -> dict:
+        with QueryBudget("ai_context", max_queries=AI_CONTEXT_MAX_QUERIES):
+            return AIContextService.build_context(user_id, session)
 
-    # Subscription
-    sub = db.query(Subscription).filter(Subscription.user_id == user_id).first()
-    is_premium = SubscriptionService.is_premium(sub)
-
-    # Savings breakdown by account type (IKE/IKZE/OIPE/PPK/standard)
-    # Use deposits - withdrawals (both stored as positive amounts, saving_type distinguishes direction)
-    from sqlalchemy import case as sa_case
-    acct_totals = db.query(
-        Saving.account_type,
-        (func.sum(sa_case((Saving.saving_type == 'deposit', Saving.amount), else_=0)) -
-         func.sum(sa_case((Saving.saving_type == 'withdrawal', Saving.amount), else_=0)))
-    ).filter(
-        Saving.user_id == user_id
-    ).group_by(Saving.account_type).all()
-    savings_by_type = {at: float(net or 0) for at, net in acct_totals}
-    total_savings = sum(savings_by_type.values())
-    total_loan_balance = sum(l["balance"] for l in loans_summary)
-    net_worth = float(total_savings) - total_loan_balance
-
-    # Separate liquid savings from illiquid assets (real_estate/investment/college/other).
-    # Real estate is an asset for net worth, but NOT liquid cash for emergency fund / Baby Steps.
-    _ILLIQUID_CATS = ('real_estate', 'investment', 'college', 'other')
-    _net_expr = (
-        func.sum(sa_case((Saving.saving_type == 'deposit', Saving.amount), else_=0)) -
-        func.sum(sa_case((Saving.saving_type == 'withdrawal', Saving.amount), else_=0))
+    return await snapshot_cache.get_or_compute_async(
+        "ai_context", user_id, lambda: run_sync_db(db, build)
     )
-    _illiquid_val = db.query(_net_expr).filter(
-        Saving.user_id == user_id,
-        Saving.category.in_(_ILLIQUID_CATS),
-    ).scalar()
-    illiquid_assets_value = float(_illiquid_val or 0)
-    # Liquid standard savings = standard account minus illiquid categories
-    liquid_standard_savings = max(0.0, savings_by_type.get('standard', 0) - illiquid_assets_value)
-
-    # Savings rate: cashflow / income (current month)
-    cashflow = float(current_income) - float(total_expenses)
-    savings_rate = (cashflow / float(current_income) * 100) if current_income > 0 else 0
-
-    def s(field, default=None):
-        return getattr(settings, field, default) if settings else default
-
-    current_year_for_age = now.year
-    birth_year = s('birth_year')
-    age = (current_year_for_age - birth_year) if birth_year else None
-
-    return {
-        "user_id": user_id,
-        "settings": {
-            "currency": s('currency', 'PLN'),
-            "language": s('language', 'pl'),
-            # Tax & employment profile
-            "employment_status": s('employment_status'),       # employee/b2b/jdg/business/freelancer
-            "employment_type": s('employment_type'),           # uop/b2b/jdg
-            "tax_form": s('tax_form'),                         # scale/linear/lumpsum/card
-            "birth_year": birth_year,
-            "age": age,
-            "use_authors_costs": s('use_authors_costs', False),  # KUP 50%
-            # PPK
-            "ppk_enrolled": s('ppk_enrolled'),
-            "ppk_employee_rate": s('ppk_employee_rate'),
-            "ppk_employer_rate": s('ppk_employer_rate'),
-            # Family
-            "children_count": s('children_count', 0),
-            "marital_status": s('marital_status'),
-            "include_partner_finances": s('include_partner_finances', False),
-            # Partner profile
-            "partner_name": s('partner_name'),
-            "partner_employment_status": s('partner_employment_status'),
-            "partner_tax_form": s('partner_tax_form'),
-            "partner_birth_year": s('partner_birth_year'),
-            # Emergency fund
-            "emergency_fund_target": s('emergency_fund_target', 1000),
-            "emergency_fund_months": s('emergency_fund_months', 3),
-        },
-        "income": {
-            "current_month": float(current_income),
-            "avg_monthly": round(avg_income, 0),
-        },
-        "expenses": {
-            "current_month_total": float(total_expenses),
-            "top_categories": [(cat, float(amt)) for cat, amt in top_categories],
-        },
-        "loans": loans_summary,
-        "savings_by_type": savings_by_type,  # {standard: X, ike: Y, ikze: Z, oipe: W, ppk: V}
-        "liquid_standard_savings": liquid_standard_savings,  # standard minus illiquid assets
-        "illiquid_assets_value": illiquid_assets_value,      # real_estate + investment + college + other
-        "savings_goals": goals_summary,
-        "baby_step": baby_step,
-        "is_premium": is_premium,
-        "net_worth": net_worth,
-        "savings_rate": round(savings_rate, 1),
-        "savings_contrib_2026": _build_savings_contrib_2026(db, user_id, now.year),
-    }
+
+
+# Persona, tax expertise and rules: identical for every user and turn, so it is
+# the cached prefix of every request (see build_system_blocks)
+SYSTEM_PROMPT_STATIC = """Jesteś Mieszko — inteligentny doradca finansowy w aplikacji FiredUp.
+Twoim nadrzędnym celem jest pomóc użytkownikowi zbudować "Skarbiec" — czyli stabilność i niezależność finansową (FIRE).
+
+TWOJA OSOBOWOŚĆ:
+- Imię: Mieszko (od "mieszka" — sakiewki i Mieszka I). Jesteś Osobistym Skarbnikiem i Strażnikiem Majątku.
+- Ton: Rzeczowy, konkretny, lekko szarmancki, ale nowoczesny. Nie jesteś sztywnym urzędnikiem, raczej "bystrym strategiem".
+- Styl wypowiedzi: Używasz sformułowań budujących autorytet i klimat, np. "Przeanalizowałem Twój skarbiec", "Zadbajmy o Twój majątek", "Twoje przepływy wyglądają tak:".
+- Emocje: Cieszysz się z sukcesów (spłacony dług, wysoka stopa oszczędności) i stanowczo ostrzegasz przed zagrożeniami (inflacja stylu życia, zbędne abonamenty).
+- Język: Prosty, bez żargonu bankowego (chyba że użytkownik o niego pyta). Zwięźle i na temat.
+
+WIEDZA EKSPERCKA — PRAWO PODATKOWE I FINANSE (POLSKA 2026):
+
+1. FORMY OPODATKOWANIA JDG (Wady i Zalety):
+   - Skala (Zasady ogólne): 12% do 120k dochodu, 32% powyżej.
+     * Zalety: Kwota wolna 30k, wspólne rozliczenie z małżonkiem, ulga na dziecko.
+     * Wady: Składka zdrowotna 9% (nieodliczalna). Opłaca się przy niższych dochodach lub dużej rodzinie.
+   - Podatek Liniowy (19%): Stała stawka niezależnie od dochodu.
+     * Zalety: Opłacalny powyżej ~170k-200k dochodu rocznie. Składka zdrowotna 4.9% (odliczalna do limitu rocznego).
+     * Wady: Brak kwoty wolnej, brak wspólnego rozliczenia.
+   - Ryczałt (Ewidencjonowany): Płacisz podatek od PRZYCHODU, nie dochodu.
+     * Stawki: 12% (IT/Programiści), 15% (Doradztwo), 8.5% (Usługi), 3% (Handel).
+     * Zalety: Prosta księgowość, niska składka zdrowotna (zryczałtowana w 3 progach: do 60k, do 300k, pow. 300k).
+     * Wady: Nie odliczysz ŻADNYCH kosztów (paliwa, leasingu, sprzętu).
+
+2. ZUS I SKŁADKA ZDROWOTNA:
+   - Ulga na start (6 m-cy): Tylko zdrowotna.
+   - Preferencyjny ZUS (24 m-ce): Podstawa to 30% minimalnej krajowej.
+   - Mały ZUS Plus: Zależy od dochodu (dla przychodów < 120k rocznie).
+   - Pełny ZUS: Stała opłata społeczna + zmienna zdrowotna.
+   - Terminy: ZUS płacimy do 20. dnia miesiąca.
+
+3. KOSZTY I OPTYMALIZACJA:
+   - Samochód w firmie (Osobowy — użytek mieszany): 50% VAT i 75% kosztów eksploatacji.
+     Limit amortyzacji/leasingu (KUP): 150 000 PLN (spalinowy) lub 225 000 PLN (elektryk).
+   - KSeF: Od 2026 obowiązkowy dla czynnych podatników VAT.
+   - IP BOX: 5% podatku dla dochodów z praw IP (IT/twórcy). Wymaga ewidencji i interpretacji.
+
+4. INWESTYCJE I EMERYTURA (Tarcza podatkowa):
+   - IKE: limit ~28 260 PLN/rok. Zyski zwolnione z Belki przy wypłacie po 60. r.ż.
+   - IKZE: limit ~11 304 PLN/rok (JDG: ~16 920 PLN). Wpłaty odliczasz od dochodu, na końcu ryczałt 10%.
+   - Podatek Belki: 19% od zysków kapitałowych.
+   - Nadpłata hipoteki: Opłaca się gdy oprocentowanie > zysk_z_inwestycji × 0.81.
+
+5. VAT:
+   - Zwolnienie podmiotowe: do 200 000 PLN obrotu (chyba że branża wykluczona, np. doradztwo).
+   - Biała Lista: przelewy > 15k PLN tylko na konto z Białej Listy, inaczej brak KUP.
+   - Split Payment: obowiązkowy dla niektórych branż i faktur > 15k PLN brutto.
+
+ZASADY DZIAŁANIA (Protokół):
+1. Język: Odpowiadaj WYŁĄCZNIE PO POLSKU. Nie używaj angielskich słów ani wyrażeń: ZAKAZ "Verdict", "Summary", "Bottom line", "Key takeaway", "Overview", "insight", "Breakdown", "wrap-up", "Bottom", itp. Jeśli myślisz po angielsku, przetłumacz. Zwracaj się per "Ty".
+0. Długość odpowiedzi: Na ogólne pytania odpowiadaj KRÓTKO i KONKRETNIE — maksymalnie 3-5 zdań lub tabela z liczbami + 1-2 zdania komentarza. BEZ wstępów, BEZ podsumowań na końcu, BEZ pytań retorycznych. Szczegółową analizę pisz tylko gdy użytkownik wyraźnie o nią prosi (np. "wyjaśnij", "przeanalizuj dokładnie", "co sądzisz o", "daj mi pełny obraz"). Przykład: na "ile wydałem na jedzenie?" — odpowiedz liczbą i 1 zdaniem, nie esejem.
+2. Dane: Nigdy nie zgaduj liczb. Używaj dostępnych tools, aby pobrać fakty. Jeśli narzędzie zwróci błąd, powiedz o tym wprost.
+3. Konkret: Mów liczbami ("Wydałeś 400 zł na kawę"), a nie ogólnikami ("Dużo wydajesz na przyjemności").
+4. Read-only: Nie możesz sam zmieniać danych w bazie. Sugerujesz akcje do zatwierdzenia przez użytkownika.
+5. Braki danych: Jeśli nie możesz policzyć (np. podatku) bo brakuje formy opodatkowania — poinstruuj gdzie to ustawić w profilu.
+6. Wizualizacja: Przy trendach, porównaniach, składzie portfela — ZAWSZE używaj generate_chart_config. Skomentuj wykres krótko.
+7. Bezpieczeństwo: Przy poradach podatkowych/inwestycyjnych dodaj dyskretne zastrzeżenie, że jesteś AI i warto skonsultować z księgowym.
+8. Fokus odpowiedzi: Odpowiadaj WYŁĄCZNIE na pytanie, które zadano — bez powtarzania informacji z poprzednich wiadomości. Szczególna zasada dla pytań uzupełniających (np. "a IKE?", "a kredyt?", "co z OIPE?"): odpowiedz TYLKO na nowy temat, nie cytuj ani nie streszczaj poprzedniej odpowiedzi. Użytkownik ją już widzi — nie potrzebuje jej ponownie. Zacznij bezpośrednio od nowej informacji.
+9. Spójność danych: NIGDY nie mieszaj wyników z różnych narzędzi dla tego samego okresu. Dla pytań ogólnych ("sytuacja finansowa", "przychody vs wydatki") używaj get_cash_flow_summary(months_back=3) jako JEDYNEGO źródła prawdy dla dochodów i wydatków. get_income_breakdown używaj WYŁĄCZNIE gdy pytanie dotyczy konkretnego miesiąca lub kategorii przychodu. Jeśli wywołasz oba — użyj TYLKO get_cash_flow_summary dla liczb podsumowujących.
+10. Świeże dane: Zawsze wywołuj narzędzia, aby pobrać aktualne dane — nawet jeśli pytanie powtarza się. Nie opieraj się na wynikach poprzednich wywołań narzędzi zapisanych w historii rozmowy.
+11. ZASADA MINIMALNEGO WYWOŁANIA NARZĘDZI: Wywołuj TYLKO narzędzia niezbędne do odpowiedzi na AKTUALNE pytanie. NIE wywołuj get_cash_flow_summary "dla kontekstu" przy pytaniach o konkretny temat:
+    - Pytanie o wydatki → wywołaj TYLKO get_expenses_by_category
+    - Pytanie o kredyty → wywołaj TYLKO get_loans_status
+    - Pytanie o oszczędności → wywołaj TYLKO get_savings_analysis
+    - Pytanie o dochody → wywołaj TYLKO get_income_breakdown
+    - Pytanie o podatki → wywołaj TYLKO calculate_polish_tax
+    - get_cash_flow_summary WYŁĄCZNIE dla: "sytuacja finansowa", "cashflow", "nadwyżka", "stopa oszczędności", "przychody vs wydatki"
+    Jeśli wywołałeś narzędzie i masz dane — pokaż TYLKO te dane. Nie przytaczaj danych z INNYCH narzędzi których nie wywołałeś w tej odpowiedzi."""
 
 
 def build_system_prompt(context: dict) -> str:
     """Builds Mieszko's personalized system prompt with full financial context and tax expertise."""
+    return SYSTEM_PROMPT_STATIC + "\n\n" + build_context_prompt(context)
+
+
+def build_system_blocks(context: dict, summary: Optional[str] = None) -> list:
+    """
+    System prompt as content blocks, most stable first.
+
+    The request prefix is tools -> system -> messages, so a cache breakpoint
+    after SYSTEM_PROMPT_STATIC caches the tool definitions and the static prompt
+    for every user, and one after the context caches the household's snapshot
+    for the rest of the conversation. The rolling summary changes least often
+    of the remaining parts and goes last.
+    """
+    blocks = [
+        {"type": "text", "text": SYSTEM_PROMPT_STATIC},
+        {"type": "text", "text": build_context_prompt(context)},
+    ]
+    if AI_PROMPT_CACHING:
+        for block in blocks:
+            block["cache_control"] = CACHE_CONTROL
+    if summary:
+        blocks.append({
+            "type": "text",
+            "text": f"PODSUMOWANIE WCZEŚNIEJSZEJ CZĘŚCI ROZMOWY:\n{summary}",
+        })
+    return blocks
+
+
+def build_context_prompt(context: dict) -> str:
+    """Builds the user's profile and financial context part of the system prompt."""
     s = context['settings']
     currency = s.get('currency', 'PLN')
     income_current = context['income']['current_month']
@@ -479,17 +400,7 @@ def build_system_prompt(context: dict) -> str:
         partner_text = f"""- Partner ({s.get('partner_name')}):
   Status: {s.get('partner_employment_status') or 'nieznany'}, Forma opodatkowania: {s.get('partner_tax_form') or 'nieznana'}"""
 
-    return f"""Jesteś Mieszko — inteligentny doradca finansowy w aplikacji FiredUp.
-Twoim nadrzędnym celem jest pomóc użytkownikowi zbudować "Skarbiec" — czyli stabilność i niezależność finansową (FIRE).
-
-TWOJA OSOBOWOŚĆ:
-- Imię: Mieszko (od "mieszka" — sakiewki i Mieszka I). Jesteś Osobistym Skarbnikiem i Strażnikiem Majątku.
-- Ton: Rzeczowy, konkretny, lekko szarmancki, ale nowoczesny. Nie jesteś sztywnym urzędnikiem, raczej "bystrym strategiem".
-- Styl wypowiedzi: Używasz sformułowań budujących autorytet i klimat, np. "Przeanalizowałem Twój skarbiec", "Zadbajmy o Twój majątek", "Twoje przepływy wyglądają tak:".
-- Emocje: Cieszysz się z sukcesów (spłacony dług, wysoka stopa oszczędności) i stanowczo ostrzegasz przed zagrożeniami (inflacja stylu życia, zbędne abonamenty).
-- Język: Prosty, bez żargonu bankowego (chyba że użytkownik o niego pyta). Zwięźle i na temat.
-
-PROFIL UŻYTKOWNIKA (Dane z onboardingu — zawsze aktualne):
+    return f"""PROFIL UŻYTKOWNIKA (Dane z onboardingu — zawsze aktualne):
 - Wiek: {age_text}
 - Status zawodowy: {employment}
 - Forma opodatkowania: {tax_form}
@@ -513,66 +424,7 @@ AKTUALNY KONTEKST FINANSOWY (Dane ze Skarbca):
 {loans_text}
 - Cele oszczędnościowe:
 {goals_text}
-- Baby Steps — krok: {baby_step}/7
-
-WIEDZA EKSPERCKA — PRAWO PODATKOWE I FINANSE (POLSKA 2026):
-
-1. FORMY OPODATKOWANIA JDG (Wady i Zalety):
-   - Skala (Zasady ogólne): 12% do 120k dochodu, 32% powyżej.
-     * Zalety: Kwota wolna 30k, wspólne rozliczenie z małżonkiem, ulga na dziecko.
-     * Wady: Składka zdrowotna 9% (nieodliczalna). Opłaca się przy niższych dochodach lub dużej rodzinie.
-   - Podatek Liniowy (19%): Stała stawka niezależnie od dochodu.
-     * Zalety: Opłacalny powyżej ~170k-200k dochodu rocznie. Składka zdrowotna 4.9% (odliczalna do limitu rocznego).
-     * Wady: Brak kwoty wolnej, brak wspólnego rozliczenia.
-   - Ryczałt (Ewidencjonowany): Płacisz podatek od PRZYCHODU, nie dochodu.
-     * Stawki: 12% (IT/Programiści), 15% (Doradztwo), 8.5% (Usługi), 3% (Handel).
-     * Zalety: Prosta księgowość, niska składka zdrowotna (zryczałtowana w 3 progach: do 60k, do 300k, pow. 300k).
-     * Wady: Nie odliczysz ŻADNYCH kosztów (paliwa, leasingu, sprzętu).
-
-2. ZUS I SKŁADKA ZDROWOTNA:
-   - Ulga na start (6 m-cy): Tylko zdrowotna.
-   - Preferencyjny ZUS (24 m-ce): Podstawa to 30% minimalnej krajowej.
-   - Mały ZUS Plus: Zależy od dochodu (dla przychodów < 120k rocznie).
-   - Pełny ZUS: Stała opłata społeczna + zmienna zdrowotna.
-   - Terminy: ZUS płacimy do 20. dnia miesiąca.
-
-3. KOSZTY I OPTYMALIZACJA:
-   - Samochód w firmie (Osobowy — użytek mieszany): 50% VAT i 75% kosztów eksploatacji.
-     Limit amortyzacji/leasingu (KUP): 150 000 PLN (spalinowy) lub 225 000 PLN (elektryk).
-   - KSeF: Od 2026 obowiązkowy dla czynnych podatników VAT.
-   - IP BOX: 5% podatku dla dochodów z praw IP (IT/twórcy). Wymaga ewidencji i interpretacji.
-
-4. INWESTYCJE I EMERYTURA (Tarcza podatkowa):
-   - IKE: limit ~28 260 PLN/rok. Zyski zwolnione z Belki przy wypłacie po 60. r.ż.
-   - IKZE: limit ~11 304 PLN/rok (JDG: ~16 920 PLN). Wpłaty odliczasz od dochodu, na końcu ryczałt 10%.
-   - Podatek Belki: 19% od zysków kapitałowych.
-   - Nadpłata hipoteki: Opłaca się gdy oprocentowanie > zysk_z_inwestycji × 0.81.
-
-5. VAT:
-   - Zwolnienie podmiotowe: do 200 000 PLN obrotu (chyba że branża wykluczona, np. doradztwo).
-   - Biała Lista: przelewy > 15k PLN tylko na konto z Białej Listy, inaczej brak KUP.
-   - Split Payment: obowiązkowy dla niektórych branż i faktur > 15k PLN brutto.
-
-ZASADY DZIAŁANIA (Protokół):
-1. Język: Odpowiadaj WYŁĄCZNIE PO POLSKU. Nie używaj angielskich słów ani wyrażeń: ZAKAZ "Verdict", "Summary", "Bottom line", "Key takeaway", "Overview", "insight", "Breakdown", "wrap-up", "Bottom", itp. Jeśli myślisz po angielsku, przetłumacz. Zwracaj się per "Ty".
-0. Długość odpowiedzi: Na ogólne pytania odpowiadaj KRÓTKO i KONKRETNIE — maksymalnie 3-5 zdań lub tabela z liczbami + 1-2 zdania komentarza. BEZ wstępów, BEZ podsumowań na końcu, BEZ pytań retorycznych. Szczegółową analizę pisz tylko gdy użytkownik wyraźnie o nią prosi (np. "wyjaśnij", "przeanalizuj dokładnie", "co sądzisz o", "daj mi pełny obraz"). Przykład: na "ile wydałem na jedzenie?" — odpowiedz liczbą i 1 zdaniem, nie esejem.
-2. Dane: Nigdy nie zgaduj liczb. Używaj dostępnych tools, aby pobrać fakty. Jeśli narzędzie zwróci błąd, powiedz o tym wprost.
-3. Konkret: Mów liczbami ("Wydałeś 400 zł na kawę"), a nie ogólnikami ("Dużo wydajesz na przyjemności").
-4. Read-only: Nie możesz sam zmieniać danych w bazie. Sugerujesz akcje do zatwierdzenia przez użytkownika.
-5. Braki danych: Jeśli nie możesz policzyć (np. podatku) bo brakuje formy opodatkowania — poinstruuj gdzie to ustawić w profilu.
-6. Wizualizacja: Przy trendach, porównaniach, składzie portfela — ZAWSZE używaj generate_chart_config. Skomentuj wykres krótko.
-7. Bezpieczeństwo: Przy poradach podatkowych/inwestycyjnych dodaj dyskretne zastrzeżenie, że jesteś AI i warto skonsultować z księgowym.
-8. Fokus odpowiedzi: Odpowiadaj WYŁĄCZNIE na pytanie, które zadano — bez powtarzania informacji z poprzednich wiadomości. Szczególna zasada dla pytań uzupełniających (np. "a IKE?", "a kredyt?", "co z OIPE?"): odpowiedz TYLKO na nowy temat, nie cytuj ani nie streszczaj poprzedniej odpowiedzi. Użytkownik ją już widzi — nie potrzebuje jej ponownie. Zacznij bezpośrednio od nowej informacji.
-9. Spójność danych: NIGDY nie mieszaj wyników z różnych narzędzi dla tego samego okresu. Dla pytań ogólnych ("sytuacja finansowa", "przychody vs wydatki") używaj get_cash_flow_summary(months_back=3) jako JEDYNEGO źródła prawdy dla dochodów i wydatków. get_income_breakdown używaj WYŁĄCZNIE gdy pytanie dotyczy konkretnego miesiąca lub kategorii przychodu. Jeśli wywołasz oba — użyj TYLKO get_cash_flow_summary dla liczb podsumowujących.
-10. Świeże dane: Zawsze wywołuj narzędzia, aby pobrać aktualne dane — nawet jeśli pytanie powtarza się. Nie opieraj się na wynikach poprzednich wywołań narzędzi zapisanych w historii rozmowy.
-11. ZASADA MINIMALNEGO WYWOŁANIA NARZĘDZI: Wywołuj TYLKO narzędzia niezbędne do odpowiedzi na AKTUALNE pytanie. NIE wywołuj get_cash_flow_summary "dla kontekstu" przy pytaniach o konkretny temat:
-    - Pytanie o wydatki → wywołaj TYLKO get_expenses_by_category
-    - Pytanie o kredyty → wywołaj TYLKO get_loans_status
-    - Pytanie o oszczędności → wywołaj TYLKO get_savings_analysis
-    - Pytanie o dochody → wywołaj TYLKO get_income_breakdown
-    - Pytanie o podatki → wywołaj TYLKO calculate_polish_tax
-    - get_cash_flow_summary WYŁĄCZNIE dla: "sytuacja finansowa", "cashflow", "nadwyżka", "stopa oszczędności", "przychody vs wydatki"
-    Jeśli wywołałeś narzędzie i masz dane — pokaż TYLKO te dane. Nie przytaczaj danych z INNYCH narzędzi których nie wywołałeś w tej odpowiedzi."""
+- Baby Steps — krok: {baby_step}/7"""
 
 
 # ============================================================
@@ -727,7 +579,21 @@ TOOLS = [
 # ============================================================
 
 async def execute_tool_call(name: str, arguments: dict, user_id: str, db: Session) -> dict:
-    """Execute a tool call and return result dict."""
+    """
+    Execute a tool call and return result dict (db: Session or AsyncSession).
+
+    Results are memoized per household, normalized arguments and data version
+    (tool_result_cache); pure tools run without touching the database.
+    """
+    async def execute() -> dict:
+        if name in PURE_TOOLS:
+            return _execute_tool_call(name, arguments, user_id, None)
+        return await run_sync_db(db, lambda session: _execute_tool_call(name, arguments, user_id, session))
+
+    return await tool_result_cache.get_or_execute(name, arguments, user_id, execute)
+
+
+def _execute_tool_call(name: str, arguments: dict, user_id: str, db: Session) -> dict:
     # Hoist all shared imports to function top — avoids Python's "local variable
     # referenced before assignment" scoping issue (any `from x import y` inside
     # a function makes y a local for the ENTIRE function, not just that block).
@@ -1380,23 +1246,172 @@ async def execute_tool_call(name: str, arguments: dict, user_id: str, db: Sessio
 # STREAMING CLAUDE RESPONSE
 # ============================================================
 
+TOOL_LABELS = {
+    "get_expenses_by_category": "Sprawdzam wydatki...",
+    "get_income_breakdown": "Sprawdzam przychody...",
+    "get_loans_status": "Sprawdzam kredyty...",
+    "calculate_polish_tax": "Obliczam podatek...",
+    "get_savings_analysis": "Sprawdzam oszczednosci...",
+    "get_baby_steps_progress": "Sprawdzam Baby Steps...",
+    "get_spending_trend": "Analizuje trend wydatkow...",
+    "simulate_loan_overpayment": "Symuluje nadplate...",
+    "simulate_savings_goal": "Symuluje cel oszczednosciowy...",
+    "get_cash_flow_summary": "Analizuje cashflow...",
+    "generate_chart_config": "Przygotowuje wykres...",
+    "get_bank_transactions": "Sprawdzam transakcje bankowe...",
+}
+
+
+def get_anthropic_client() -> Optional[anthropic.AsyncAnthropic]:
+    """
+    Return the process-wide AsyncAnthropic client (None without an API key).
+
+    It runs on the shared "anthropic" httpx pool from http_clients, so every
+    chat reuses the same keep-alive connections, and is rebuilt only when that
+    pool is (e.g. a new event loop). SDK 1.x rejects httpx clients here, hence
+    the anthropic<1.0 pin in requirements.txt.
+    """
+    global _anthropic_client, _anthropic_http_client
+    if not ANTHROPIC_API_KEY:
+        return None
+    http_client = get_client("anthropic")
+    if _anthropic_client is None or _anthropic_http_client is not http_client:
+        _anthropic_client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY, http_client=http_client)
+        _anthropic_http_client = http_client
+    return _anthropic_client
+
+
+def start_anthropic_client() -> None:
+    """Create the shared Anthropic client up front (called from the app lifespan)."""
+    if get_anthropic_client() is None:
+        logger.info("[AI] ANTHROPIC_API_KEY not set, AI chat disabled")
+
+
+@dataclass
+class TurnUsage:
+    """Token and latency accounting for one chat turn, filled in by stream_claude_response."""
+    model: str = AI_CHAT_MODEL
+    requests: int = 0
+    tool_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    history_messages: int = 0
+    first_token_ms: Optional[int] = None
+    latency_ms: Optional[int] = None
+    started: float = field(default_factory=time.perf_counter)
+
+    def add_message(self, message) -> None:
+        """Add one model response's usage (missing fields count as 0)."""
+        self.requests += 1
+        usage = getattr(message, "usage", None)
+        for name in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+            setattr(self, name, getattr(self, name) + (getattr(usage, name, None) or 0))
+
+    def mark_first_token(self) -> None:
+        if self.first_token_ms is None:
+            self.first_token_ms = self._elapsed_ms()
+
+    def finish(self) -> None:
+        self.latency_ms = self._elapsed_ms()
+
+    def to_record(self, user_id: str, conversation_id: Optional[int], kind: str = "chat") -> AIUsageRecord:
+        return AIUsageRecord(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            kind=kind,
+            model=self.model,
+            requests=self.requests,
+            tool_calls=self.tool_calls,
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            cache_creation_input_tokens=self.cache_creation_input_tokens,
+            cache_read_input_tokens=self.cache_read_input_tokens,
+            history_messages=self.history_messages,
+            first_token_ms=self.first_token_ms,
+            latency_ms=self.latency_ms,
+        )
+
+    def _elapsed_ms(self) -> int:
+        return int((time.perf_counter() - self.started) * 1000)
+
+
+def _with_cache_breakpoint(messages: list) -> list:
+    """
+    Copy of messages with a cache breakpoint on the last content block.
+
+    Each request of the tool loop (and the next turn) then reads the transcript
+    written by the previous one from the cache. The stored messages are not
+    touched, so exactly one transcript breakpoint is sent per request.
+    """
+    if not AI_PROMPT_CACHING or not messages:
+        return messages
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    content = content[:-1] + [{**content[-1], "cache_control": CACHE_CONTROL}]
+    return messages[:-1] + [{**last, "content": content}]
+
+
+async def _end_read_transaction(db) -> None:
+    """
+    Return an AsyncSession's connection to the pool before waiting on the model.
+
+    The chat only reads, so the transaction has nothing to write; with
+    expire_on_commit=False loaded objects stay usable after the commit.
+    """
+    if isinstance(db, AsyncSession) and db.in_transaction():
+        await db.commit()
+
+
+async def _run_tool_calls(tool_calls: List[dict], user_id: str, db) -> list:
+    """
+    Execute one turn's tool calls and return their results in order.
+
+    With an AsyncSession each call gets its own session on the same engine so
+    the queries run concurrently; a plain Session (MCP server, scripts) can
+    only serve one call at a time.
+    """
+    if len(tool_calls) == 1 or not isinstance(db, AsyncSession):
+        return [await execute_tool_call(tc["name"], tc["input"], user_id, db) for tc in tool_calls]
+
+    async def run(tc: dict) -> dict:
+        async with AsyncSession(db.bind, autoflush=False, expire_on_commit=False) as session:
+            return await execute_tool_call(tc["name"], tc["input"], user_id, session)
+
+    return await asyncio.gather(*(run(tc) for tc in tool_calls))
+
+
 async def stream_claude_response(
     user: User,
     message_content: str,
     conversation_history: list,
     db: Session,
+    summary: Optional[str] = None,
+    usage: Optional[TurnUsage] = None,
 ) -> AsyncGenerator[dict, None]:
     """
     Stream Claude response with tool use support.
-    Yields JSON-serializable frame dicts.
+    Yields JSON-serializable frame dicts. db may be a Session or an AsyncSession.
+
+    Uses the shared AsyncAnthropic client, so waiting for tokens never blocks
+    the event loop for other chats. summary is the conversation's rolling
+    summary of the turns no longer in conversation_history; usage, when given,
+    collects the turn's token counts and latency.
     """
-    if not ANTHROPIC_API_KEY:
+    client = get_anthropic_client()
+    if client is None:
         yield {"type": "error", "message": "ANTHROPIC_API_KEY not configured"}
         return
 
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+    usage = usage if usage is not None else TurnUsage()
+    usage.history_messages = len(conversation_history)
+
     context = await build_user_context(user.id, db)
-    system_prompt = build_system_prompt(context)
+    await _end_read_transaction(db)
+    system = build_system_blocks(context, summary)
 
     messages = conversation_history + [{"role": "user", "content": message_content}]
 
@@ -1405,35 +1420,21 @@ async def stream_claude_response(
         full_text = ""
         tool_calls = []
 
-        with client.messages.stream(
+        async with client.messages.stream(
             model=AI_CHAT_MODEL,
             max_tokens=AI_MAX_TOKENS,
-            system=system_prompt,
+            system=system,
             tools=TOOLS,
-            messages=messages,
+            messages=_with_cache_breakpoint(messages),
         ) as stream:
-            for event in stream:
+            async for event in stream:
                 if hasattr(event, 'type'):
                     if event.type == 'content_block_start':
                         if hasattr(event, 'content_block'):
                             if event.content_block.type == 'tool_use':
                                 tool_name = event.content_block.name
                                 tool_id = event.content_block.id
-                                labels = {
-                                    "get_expenses_by_category": "Sprawdzam wydatki...",
-                                    "get_income_breakdown": "Sprawdzam przychody...",
-                                    "get_loans_status": "Sprawdzam kredyty...",
-                                    "calculate_polish_tax": "Obliczam podatek...",
-                                    "get_savings_analysis": "Sprawdzam oszczednosci...",
-                                    "get_baby_steps_progress": "Sprawdzam Baby Steps...",
-                                    "get_spending_trend": "Analizuje trend wydatkow...",
-                                    "simulate_loan_overpayment": "Symuluje nadplate...",
-                                    "simulate_savings_goal": "Symuluje cel oszczednosciowy...",
-                                    "get_cash_flow_summary": "Analizuje cashflow...",
-                                    "generate_chart_config": "Przygotowuje wykres...",
-                                    "get_bank_transactions": "Sprawdzam transakcje bankowe...",
-                                }
-                                label = labels.get(tool_name, f"Uzywam narzedzia {tool_name}...")
+                                label = TOOL_LABELS.get(tool_name, f"Uzywam narzedzia {tool_name}...")
                                 yield {"type": "tool_start", "tool": tool_name, "label": label}
                                 tool_calls.append({"id": tool_id, "name": tool_name, "input": ""})
 
@@ -1441,27 +1442,33 @@ async def stream_claude_response(
                         if hasattr(event, 'delta'):
                             if event.delta.type == 'text_delta':
                                 full_text += event.delta.text
+                                usage.mark_first_token()
                                 yield {"type": "token", "content": event.delta.text}
                             elif event.delta.type == 'input_json_delta':
                                 if tool_calls:
                                     tool_calls[-1]["input"] += event.delta.partial_json
 
-        final_message = stream.get_final_message()
+            final_message = await stream.get_final_message()
+        usage.add_message(final_message)
         stop_reason = final_message.stop_reason
 
         if stop_reason == "end_turn" or not tool_calls:
             break
 
-        # Execute tool calls
-        tool_results = []
+        usage.tool_calls += len(tool_calls)
+
+        # Execute this turn's tool calls concurrently
         for tc in tool_calls:
-            import json as json_lib
             try:
-                input_data = json_lib.loads(tc["input"]) if tc["input"] else {}
+                tc["input"] = json.loads(tc["input"]) if tc["input"] else {}
             except Exception:
-                input_data = {}
+                tc["input"] = {}
 
-            result = await execute_tool_call(tc["name"], input_data, user.id, db)
+        results = await _run_tool_calls(tool_calls, user.id, db)
+        await _end_read_transaction(db)
+
+        tool_results = []
+        for tc, result in zip(tool_calls, results):
             yield {"type": "tool_result", "tool": tc["name"]}
 
             if tc["name"] == "generate_chart_config":
@@ -1483,6 +1490,8 @@ async def stream_claude_response(
         messages.append({"role": "assistant", "content": assistant_content})
         messages.append({"role": "user", "content": tool_results})
 
+    usage.finish()
+
 
 def get_or_create_conversation(user_id: str, conversation_id: int | None, db: Session) -> AIConversation:
     """Get existing conversation or create a new one."""
@@ -1500,22 +1509,222 @@ def get_or_create_conversation(user_id: str, conversation_id: int | None, db: Se
     return conv
 
 
-def save_messages(conv: AIConversation, user_content: str, assistant_content: str, db: Session):
-    """Save user and assistant messages to conversation."""
+@dataclass
+class ChatTurn:
+    """One answered message waiting to be persisted (see save_turns)."""
+    conversation_id: int
+    user_content: str
+    assistant_content: str
+    usage: Optional[TurnUsage] = None
+
+
+def _add_turn(
+    conv: AIConversation,
+    user_content: str,
+    assistant_content: str,
+    db: Session,
+    usage: Optional[TurnUsage] = None,
+) -> None:
     if not conv.title:
         conv.title = user_content[:60] + ("..." if len(user_content) > 60 else "")
 
-    user_msg = AIMessage(conversation_id=conv.id, role="user", content=user_content)
-    asst_msg = AIMessage(conversation_id=conv.id, role="assistant", content=assistant_content)
-    db.add(user_msg)
-    db.add(asst_msg)
+    db.add(AIMessage(conversation_id=conv.id, role="user", content=user_content))
+    db.add(AIMessage(conversation_id=conv.id, role="assistant", content=assistant_content))
+    if usage is not None:
+        if usage.latency_ms is None:
+            usage.finish()
+        db.add(usage.to_record(conv.user_id, conv.id))
+
+
+def save_messages(
+    conv: AIConversation,
+    user_content: str,
+    assistant_content: str,
+    db: Session,
+    usage: Optional[TurnUsage] = None,
+):
+    """Save user and assistant messages (and the turn's usage record) to conversation."""
+    _add_turn(conv, user_content, assistant_content, db, usage)
     db.commit()
 
 
+def save_turns(turns: List[ChatTurn], db: Session) -> None:
+    """Add several turns' messages and usage records in one flush (not committed)."""
+    ids = {turn.conversation_id for turn in turns}
+    conversations = {
+        conv.id: conv
+        for conv in db.query(AIConversation).filter(AIConversation.id.in_(ids)).all()
+    }
+    for turn in turns:
+        conv = conversations.get(turn.conversation_id)
+        if conv is None:
+            logger.warning(f"[AI] Conversation {turn.conversation_id} no longer exists, dropping turn")
+            continue
+        _add_turn(conv, turn.user_content, turn.assistant_content, db, turn.usage)
+    db.flush()
+
+
 def get_conversation_history(conv: AIConversation, db: Session, max_messages: int = 20) -> list:
-    """Get conversation history formatted for Claude API."""
-    messages = db.query(AIMessage).filter(
-        AIMessage.conversation_id == conv.id
-    ).order_by(AIMessage.created_at.desc()).limit(max_messages).all()
+    """Get conversation history formatted for Claude API (messages after the rolling summary)."""
+    query = db.query(AIMessage).filter(AIMessage.conversation_id == conv.id)
+    if conv.summary_message_id:
+        query = query.filter(AIMessage.id > conv.summary_message_id)
+    messages = query.order_by(AIMessage.created_at.desc(), AIMessage.id.desc()).limit(max_messages).all()
     messages.reverse()
     return [{"role": m.role, "content": m.content} for m in messages]
+
+
+# ============================================================
+# HISTORY COMPACTION
+# ============================================================
+
+SUMMARY_PROMPT = """Streszczasz rozmowę doradcy finansowego Mieszko z użytkownikiem aplikacji FiredUp.
+Napisz zwięzłe podsumowanie po polsku (maksymalnie 15 punktów), które pozwoli kontynuować rozmowę bez pełnej historii:
+- o co użytkownik pytał i jakie ma cele lub plany,
+- kluczowe liczby i wnioski z odpowiedzi,
+- ustalenia, decyzje i otwarte kwestie.
+Jeśli otrzymasz wcześniejsze podsumowanie, połącz je z nowymi wiadomościami w jedno. Pomiń powitania i powtórzenia."""
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count (~4 characters per token) for budgeting history."""
+    return len(text or "") // 4 + 1
+
+
+def _split_for_summary(messages: list, keep: int) -> tuple:
+    """Split into (to summarize, to keep); the kept part starts with a user message."""
+    split = max(0, len(messages) - keep)
+    while split > 0 and messages[split].role != "user":
+        split -= 1
+    return messages[:split], messages[split:]
+
+
+def _format_transcript(summary: Optional[str], messages: list) -> str:
+    parts = [f"WCZEŚNIEJSZE PODSUMOWANIE:\n{summary}"] if summary else []
+    parts.append("NOWE WIADOMOŚCI:")
+    for m in messages:
+        speaker = "Użytkownik" if m.role == "user" else "Mieszko"
+        parts.append(f"{speaker}: {m.content}")
+    return "\n\n".join(parts)
+
+
+def _load_unsummarized(conv_id: int, db: Session) -> tuple:
+    conv = db.get(AIConversation, conv_id)
+    if conv is None:
+        return None, []
+    query = db.query(AIMessage).filter(AIMessage.conversation_id == conv_id)
+    if conv.summary_message_id:
+        query = query.filter(AIMessage.id > conv.summary_message_id)
+    return conv, query.order_by(AIMessage.created_at, AIMessage.id).all()
+
+
+def _store_summary(conv_id: int, summary: str, last_message_id: int, usage: TurnUsage, db: Session) -> None:
+    conv = db.get(AIConversation, conv_id)
+    conv.summary = summary
+    conv.summary_message_id = last_message_id
+    db.add(usage.to_record(conv.user_id, conv.id, kind="summary"))
+    db.commit()
+
+
+async def compact_conversation(conv_id: int, db: Session) -> bool:
+    """
+    Fold older turns into the conversation's rolling summary once the history is over budget.
+
+    When the summary plus the unsummarized messages exceed AI_HISTORY_TOKEN_BUDGET
+    (estimated), everything but the last AI_HISTORY_KEEP_MESSAGES messages is
+    summarized together with the previous summary in one model call. Later turns
+    send the summary in the system prompt instead of those messages. The call's
+    usage is recorded with kind="summary". db may be a Session or an AsyncSession.
+
+    Returns:
+        True if the summary was updated
+    """
+    client = get_anthropic_client()
+    if client is None:
+        return False
+
+    conv, messages = await run_sync_db(db, lambda session: _load_unsummarized(conv_id, session))
+    if conv is None:
+        return False
+    total = estimate_tokens(conv.summary) + sum(estimate_tokens(m.content) for m in messages)
+    if total <= AI_HISTORY_TOKEN_BUDGET:
+        return False
+    older, _ = _split_for_summary(messages, AI_HISTORY_KEEP_MESSAGES)
+    if not older:
+        return False
+
+    usage = TurnUsage(model=AI_SUMMARY_MODEL)
+    usage.history_messages = len(older)
+    response = await client.messages.create(
+        model=AI_SUMMARY_MODEL,
+        max_tokens=AI_SUMMARY_MAX_TOKENS,
+        system=SUMMARY_PROMPT,
+        messages=[{"role": "user", "content": _format_transcript(conv.summary, older)}],
+    )
+    usage.add_message(response)
+    usage.finish()
+    summary = "".join(block.text for block in response.content if block.type == "text").strip()
+    if not summary:
+        return False
+
+    last_id = older[-1].id
+    await run_sync_db(db, lambda session: _store_summary(conv_id, summary, last_id, usage, session))
+    logger.info(f"[AI] Compacted conversation {conv_id}: {len(older)} messages, ~{total} tokens before")
+    return True
+
+
+# ============================================================
+# USAGE ACCOUNTING
+# ============================================================
+
+def get_usage_report(db: Session, days: int = 30) -> dict:
+    """
+    Daily token and latency totals from ai_usage_records.
+
+    billed_input_tokens weights the cached prefix like the provider bills it
+    (cache writes 1.25x, cache reads 0.1x the base input price), so
+    billed_input_per_turn tracks the input cost per chat message over time.
+    """
+    from sqlalchemy import func as _func
+
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = db.query(
+        _func.date(AIUsageRecord.created_at),
+        AIUsageRecord.kind,
+        _func.count(AIUsageRecord.id),
+        _func.sum(AIUsageRecord.requests),
+        _func.sum(AIUsageRecord.input_tokens),
+        _func.sum(AIUsageRecord.output_tokens),
+        _func.sum(AIUsageRecord.cache_creation_input_tokens),
+        _func.sum(AIUsageRecord.cache_read_input_tokens),
+        _func.avg(AIUsageRecord.first_token_ms),
+        _func.avg(AIUsageRecord.latency_ms),
+    ).filter(
+        AIUsageRecord.created_at >= since
+    ).group_by(
+        _func.date(AIUsageRecord.created_at), AIUsageRecord.kind
+    ).order_by(
+        _func.date(AIUsageRecord.created_at)
+    ).all()
+
+    by_day = []
+    for day, kind, turns, requests, input_tokens, output_tokens, cache_write, cache_read, first_token, latency in rows:
+        input_tokens, cache_write, cache_read = int(input_tokens or 0), int(cache_write or 0), int(cache_read or 0)
+        prompt_tokens = input_tokens + cache_write + cache_read
+        billed_input = input_tokens + cache_write * 1.25 + cache_read * 0.1
+        by_day.append({
+            "date": str(day),
+            "kind": kind,
+            "turns": turns,
+            "requests": int(requests or 0),
+            "input_tokens": input_tokens,
+            "output_tokens": int(output_tokens or 0),
+            "cache_creation_input_tokens": cache_write,
+            "cache_read_input_tokens": cache_read,
+            "cache_read_ratio": round(cache_read / prompt_tokens, 3) if prompt_tokens else 0.0,
+            "billed_input_tokens": round(billed_input),
+            "billed_input_per_turn": round(billed_input / turns) if turns else 0,
+            "avg_first_token_ms": round(float(first_token), 1) if first_token is not None else None,
+            "avg_latency_ms": round(float(latency), 1) if latency is not None else None,
+        })
+    return {"days": days, "by_day": by_day}
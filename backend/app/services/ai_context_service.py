@@ -0,0 +1,245 @@
+"""
+AIContextService - Single-pass financial context for the AI advisor's system prompt.
+
+The context is rebuilt whenever a chat message misses the snapshot cache, so
+like SummaryService it reads each source once and derives everything in memory:
+1. Income/expenses: one MonthlyAggregateService.get_range() read covering the
+   current month and the INCOME_LOOKBACK_MONTHS look-back (current totals,
+   category breakdown, rolling income average).
+2. Profile: settings, Baby Steps (FinancialFreedom) and subscription in one
+   outer-joined read from the user row.
+3. Loans and savings goals: one read each.
+4. Savings: one grouped query per (account type, category, direction, entry
+   type) yields the balance by account type, the illiquid assets and this
+   year's contributions. The year is a date-range condition, not
+   extract('year'), so the date index stays usable.
+
+The statement count is independent of history length; build_user_context()
+enforces it with a QueryBudget (AI_CONTEXT_MAX_QUERIES).
+"""
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from ..models import FinancialFreedom, Loan, Saving, SavingsGoal, Settings, Subscription, User
+from .monthly_aggregate_service import MonthlyAggregateService
+from .subscription_service import SubscriptionService
+
+# Months before the current one considered for the income average
+INCOME_LOOKBACK_MONTHS = 6
+# Non-zero months averaged
+INCOME_AVERAGE_MONTHS = 3
+
+# Saving categories that are assets for net worth but not liquid cash
+ILLIQUID_CATEGORIES = ('real_estate', 'investment', 'college', 'other')
+
+# Statement budget for build_context(), including first-read materialization of the
+# monthly aggregates. Override with QUERY_BUDGET_AI_CONTEXT.
+AI_CONTEXT_MAX_QUERIES = 12
+
+
+class AIContextService:
+    """Service building the AI advisor's financial context."""
+
+    @staticmethod
+    def build_context(household_id: str, db: Session, today: Optional[date] = None) -> Dict:
+        """
+        Build the financial snapshot used in the AI advisor's system prompt.
+
+        Args:
+            household_id: Household ID (primary user id)
+            db: Database session
+            today: Reference date (defaults to today)
+
+        Returns:
+            Context dictionary consumed by build_system_prompt()
+        """
+        today = today or date.today()
+
+        # Income and expenses come from the materialized monthly aggregates (bank + manual,
+        # duplicates and recurring edit-duplicates excluded - same as the dashboard)
+        first = today.year * 12 + today.month - 1 - INCOME_LOOKBACK_MONTHS
+        monthly_totals = MonthlyAggregateService.get_range(
+            household_id, (first // 12, first % 12 + 1), (today.year, today.month), db
+        )
+        current_totals = monthly_totals[(today.year, today.month)]
+        current_income = float(current_totals["income"]["total"])
+        avg_income = AIContextService._average_income(monthly_totals, today, current_income)
+
+        # Current month expenses by category (same logic as backend dashboard)
+        cat_totals = current_totals["expenses"]["by_category"]
+        total_expenses = sum(v for v in cat_totals.values())
+        top_categories = sorted(cat_totals.items(), key=lambda x: x[1], reverse=True)[:5]
+
+        settings, ff, sub = db.query(Settings, FinancialFreedom, Subscription).select_from(User).outerjoin(
+            Settings, Settings.user_id == User.id
+        ).outerjoin(
+            FinancialFreedom, FinancialFreedom.userId == User.id
+        ).outerjoin(
+            Subscription, Subscription.user_id == User.id
+        ).filter(User.id == household_id).first() or (None, None, None)
+
+        # Active loans (not archived)
+        loans = db.query(Loan).filter(
+            Loan.user_id == household_id,
+            Loan.is_archived == False
+        ).all()
+        loans_summary = [
+            {
+                "name": loan.description or "Kredyt",
+                "balance": float(loan.remaining_balance or loan.principal_amount or 0),
+                "rate": float(loan.interest_rate or 0),
+                "monthly_payment": float(loan.monthly_payment or 0),
+            }
+            for loan in loans
+        ]
+
+        goals = db.query(SavingsGoal).filter(SavingsGoal.user_id == household_id).all()
+        goals_summary = [
+            {
+                "name": g.name,
+                "current": float(g.current_amount or 0),
+                "target": float(g.target_amount),
+                "deadline": g.deadline.isoformat() if g.deadline else None,
+            }
+            for g in goals
+        ]
+
+        savings = AIContextService._savings_sections(household_id, db, today)
+        savings_by_type = savings["savings_by_type"]
+        total_savings = sum(savings_by_type.values())
+        total_loan_balance = sum(l["balance"] for l in loans_summary)
+        net_worth = float(total_savings) - total_loan_balance
+
+        # Savings rate: cashflow / income (current month)
+        cashflow = float(current_income) - float(total_expenses)
+        savings_rate = (cashflow / float(current_income) * 100) if current_income > 0 else 0
+
+        def s(field, default=None):
+            return getattr(settings, field, default) if settings else default
+
+        birth_year = s('birth_year')
+        age = (today.year - birth_year) if birth_year else None
+
+        return {
+            "user_id": household_id,
+            "settings": {
+                "currency": s('currency', 'PLN'),
+                "language": s('language', 'pl'),
+                # Tax & employment profile
+                "employment_status": s('employment_status'),       # employee/b2b/jdg/business/freelancer
+                "employment_type": s('employment_type'),           # uop/b2b/jdg
+                "tax_form": s('tax_form'),                         # scale/linear/lumpsum/card
+                "birth_year": birth_year,
+                "age": age,
+                "use_authors_costs": s('use_authors_costs', False),  # KUP 50%
+                # PPK
+                "ppk_enrolled": s('ppk_enrolled'),
+                "ppk_employee_rate": s('ppk_employee_rate'),
+                "ppk_employer_rate": s('ppk_employer_rate'),
+                # Family
+                "children_count": s('children_count', 0),
+                "marital_status": s('marital_status'),
+                "include_partner_finances": s('include_partner_finances', False),
+                # Partner profile
+                "partner_name": s('partner_name'),
+                "partner_employment_status": s('partner_employment_status'),
+                "partner_tax_form": s('partner_tax_form'),
+                "partner_birth_year": s('partner_birth_year'),
+                # Emergency fund
+                "emergency_fund_target": s('emergency_fund_target', 1000),
+                "emergency_fund_months": s('emergency_fund_months', 3),
+            },
+            "income": {
+                "current_month": float(current_income),
+                "avg_monthly": round(avg_income, 0),
+            },
+            "expenses": {
+                "current_month_total": float(total_expenses),
+                "top_categories": [(cat, float(amt)) for cat, amt in top_categories],
+            },
+            "loans": loans_summary,
+            "savings_by_type": savings_by_type,  # {standard: X, ike: Y, ikze: Z, oipe: W, ppk: V}
+            "liquid_standard_savings": savings["liquid_standard_savings"],  # standard minus illiquid assets
+            "illiquid_assets_value": savings["illiquid_assets_value"],      # real_estate + investment + college + other
+            "savings_goals": goals_summary,
+            "baby_step": AIContextService._baby_step(ff),
+            "is_premium": SubscriptionService.is_premium(sub),
+            "net_worth": net_worth,
+            "savings_rate": round(savings_rate, 1),
+            "savings_contrib_2026": savings["contributions_this_year"],
+        }
+
+    @staticmethod
+    def _average_income(monthly_totals: Dict, today: date, current_income: float) -> float:
+        """Average of the last INCOME_AVERAGE_MONTHS non-zero months before the current one."""
+        monthly_incomes = []
+        for offset in range(1, INCOME_LOOKBACK_MONTHS + 1):
+            ordinal = today.year * 12 + today.month - 1 - offset
+            month_total = float(monthly_totals[(ordinal // 12, ordinal % 12 + 1)]["income"]["total"])
+            if month_total > 0:
+                monthly_incomes.append(month_total)
+            if len(monthly_incomes) >= INCOME_AVERAGE_MONTHS:
+                break
+        return sum(monthly_incomes) / len(monthly_incomes) if monthly_incomes else current_income
+
+    @staticmethod
+    def _baby_step(ff: Optional[FinancialFreedom]) -> int:
+        """Current Baby Step: the first non-completed step (FinancialFreedom.steps JSON)."""
+        baby_step = 1
+        if ff and ff.steps:
+            steps = ff.steps if isinstance(ff.steps, list) else []
+            for step in steps:
+                if isinstance(step, dict) and step.get("status") == "completed":
+                    baby_step = max(baby_step, step.get("step", 1))
+            for step in steps:
+                if isinstance(step, dict) and step.get("status") != "completed":
+                    baby_step = step.get("step", baby_step)
+                    break
+        return baby_step
+
+    @staticmethod
+    def _savings_sections(household_id: str, db: Session, today: date) -> Dict:
+        """
+        Balances by account type, illiquid assets and this year's contributions from one grouped read.
+
+        Deposits and withdrawals are both stored as positive amounts; saving_type
+        gives the direction. Contributions count this year's deposits except
+        opening balances (historical carryovers), for the IKE/IKZE/OIPE limits.
+        """
+        in_year = and_(Saving.date >= date(today.year, 1, 1), Saving.date < date(today.year + 1, 1, 1))
+        rows = db.query(
+            Saving.account_type,
+            Saving.category,
+            Saving.saving_type,
+            Saving.entry_type,
+            func.sum(Saving.amount),
+            func.sum(case((in_year, Saving.amount), else_=0)),
+            func.sum(case((in_year, 1), else_=0)),
+        ).filter(
+            Saving.user_id == household_id
+        ).group_by(
+            Saving.account_type, Saving.category, Saving.saving_type, Saving.entry_type
+        ).all()
+
+        savings_by_type: Dict = {}
+        contributions: Dict = {}
+        illiquid = 0.0
+        for account_type, category, saving_type, entry_type, total, year_total, year_count in rows:
+            sign = 1 if saving_type == 'deposit' else -1 if saving_type == 'withdrawal' else 0
+            net = sign * float(total or 0)
+            savings_by_type[account_type] = savings_by_type.get(account_type, 0.0) + net
+            if category in ILLIQUID_CATEGORIES:
+                illiquid += net
+            if saving_type == 'deposit' and entry_type != 'opening_balance' and year_count:
+                contributions[account_type] = contributions.get(account_type, 0.0) + float(year_total or 0)
+
+        return {
+            "savings_by_type": savings_by_type,
+            "illiquid_assets_value": illiquid,
+            # Liquid standard savings = standard account minus illiquid categories
+            "liquid_standard_savings": max(0.0, savings_by_type.get('standard', 0) - illiquid),
+            "contributions_this_year": contributions,
+        }
@@ -0,0 +1,233 @@
+"""
+BudgetReportService - Columnar builder for the yearly budget report.
+
+GET /api/reports/yearly-budget lists, for every month of a range, the incomes,
+expenses, loan payments and savings that apply to it plus monthly totals.
+
+Rather than rescanning every row for every month, each table is loaded once into
+NumPy arrays:
+1. One-off rows are bucketed by month ordinal (year * 12 + month - 1) with a stable
+   sort + searchsorted, so each row is visited once.
+2. Recurring rows and loans become a (months x rows) activity matrix computed with
+   broadcasting over day ordinals: a recurring entry applies to a month when it
+   started on or before the 1st and hasn't ended before it; a loan is active from
+   its start date until start + 30 days * term_months.
+3. JSON items are built once per row and reused by every month they appear in.
+
+Totals are summed left to right over the same items as before, so the report is
+identical (to the float) to the previous per-month loop.
+"""
+import calendar
+from datetime import date, datetime
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..models import Expense, Income, Loan, Saving
+from .monthly_totals_service import YearMonth
+
+# End-of-range sentinel for recurring entries without an end_date
+_OPEN_ENDED = date.max.toordinal()
+
+
+class BudgetReportService:
+    """Service building the yearly budget report."""
+
+    @staticmethod
+    def build_yearly_report(
+        household_id: str, start_ym: YearMonth, end_ym: YearMonth, db: Session
+    ) -> Dict[str, Dict]:
+        """
+        Build the month-by-month budget report for [start_ym, end_ym].
+
+        Args:
+            household_id: Household ID (primary user id)
+            start_ym: First month as (year, month)
+            end_ym: Last month as (year, month), inclusive
+            db: Database session
+
+        Returns:
+            Dictionary keyed by "<Month name> <year>" (in month order) with
+            incomes, expenses, loanPayments, savings and totals for each month.
+        """
+        start_ordinal = start_ym[0] * 12 + start_ym[1] - 1
+        end_ordinal = end_ym[0] * 12 + end_ym[1] - 1
+        if end_ordinal < start_ordinal:
+            return {}
+
+        period_start = date(*start_ym, 1)
+        period_end = date(*end_ym, calendar.monthrange(*end_ym)[1])
+
+        month_ordinals = np.arange(start_ordinal, end_ordinal + 1, dtype=np.int64)
+        month_firsts = np.array(
+            [date(o // 12, o % 12 + 1, 1).toordinal() for o in month_ordinals.tolist()],
+            dtype=np.int64,
+        )
+
+        incomes, expenses, savings = (
+            BudgetReportService._entry_columns(
+                model, household_id, period_start, period_end, month_ordinals, month_firsts, db
+            )
+            for model in (Income, Expense, Saving)
+        )
+
+        loans = db.query(Loan).filter(
+            Loan.user_id == household_id,
+            Loan.start_date <= period_end
+        ).all()
+        # Loans without a start date or term can't be placed on the calendar
+        loans = [loan for loan in loans if loan.start_date is not None and loan.term_months is not None]
+        loan_items = [BudgetReportService._loan_item(loan) for loan in loans]
+        loan_payments = [item["monthly_payment"] for item in loan_items]
+        loan_starts = np.array([loan.start_date.toordinal() for loan in loans], dtype=np.int64)
+        loan_ends = loan_starts + 30 * np.array([loan.term_months for loan in loans], dtype=np.int64)
+        loans_active = BudgetReportService._active_matrix(month_firsts, loan_starts, loan_ends)
+
+        monthly_data = {}
+        for m, month_ordinal in enumerate(month_ordinals.tolist()):
+            year, month = month_ordinal // 12, month_ordinal % 12 + 1
+
+            month_regular_incomes, month_recurring_incomes = incomes.items_for(m)
+            month_regular_expenses, month_recurring_expenses = expenses.items_for(m)
+            month_regular_savings, month_recurring_savings = savings.items_for(m)
+            all_month_savings = month_regular_savings + month_recurring_savings
+
+            active_loans = np.flatnonzero(loans_active[m]).tolist()
+            month_loans = [loan_items[i] for i in active_loans]
+            loan_payments_total = 0.0
+            for i in active_loans:
+                loan_payments_total += loan_payments[i]
+
+            total_deposits = sum(s["amount"] for s in all_month_savings if s["saving_type"] == "deposit")
+            total_withdrawals = sum(s["amount"] for s in all_month_savings if s["saving_type"] == "withdrawal")
+
+            total_income = float(
+                sum(i["amount"] for i in month_regular_incomes)
+                + sum(i["amount"] for i in month_recurring_incomes)
+            )
+            total_expenses = float(
+                sum(e["amount"] for e in month_regular_expenses)
+                + sum(e["amount"] for e in month_recurring_expenses)
+            )
+
+            month_name = datetime(year, month, 1).strftime("%B")
+            monthly_data[f"{month_name} {year}"] = {
+                "incomes": month_regular_incomes + month_recurring_incomes,
+                "expenses": month_regular_expenses + month_recurring_expenses,
+                "loanPayments": month_loans,
+                "savings": all_month_savings,
+                "totals": {
+                    "income": total_income,
+                    "expenses": total_expenses,
+                    "loanPayments": loan_payments_total,
+                    "savings": float(total_deposits - total_withdrawals),
+                    "deposits": float(total_deposits),
+                    "withdrawals": float(total_withdrawals),
+                    "balance": total_income - total_expenses - loan_payments_total
+                }
+            }
+
+        return monthly_data
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _entry_columns(
+        model,
+        household_id: str,
+        period_start: date,
+        period_end: date,
+        month_ordinals: np.ndarray,
+        month_firsts: np.ndarray,
+        db: Session,
+    ) -> "_EntryColumns":
+        """Load one-off rows in the period and recurring rows started by its end."""
+        # Plain column tuples - the report never needs ORM entities for these rows
+        columns = [model.id, model.description, model.amount, model.category, model.date, model.end_date]
+        if model is Saving:
+            columns.append(model.saving_type)
+
+        regular = db.query(*columns).filter(
+            model.user_id == household_id,
+            model.date >= period_start,
+            model.date <= period_end,
+            model.is_recurring == False
+        ).all()
+        recurring = db.query(*columns).filter(
+            model.user_id == household_id,
+            model.is_recurring == True,
+            model.date <= period_end
+        ).all()
+        return _EntryColumns(regular, recurring, month_ordinals, month_firsts)
+
+    @staticmethod
+    def _active_matrix(month_firsts: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """(months x rows) mask: row started on/before the 1st and not ended before it."""
+        firsts = month_firsts[:, None]
+        return (starts[None, :] <= firsts) & (ends[None, :] >= firsts)
+
+    @staticmethod
+    def _entry_item(row) -> Dict:
+        if "saving_type" in row._fields:
+            return {
+                "id": row.id,
+                "title": row.description,
+                "amount": float(row.amount),
+                "category": row.category,
+                "saving_type": row.saving_type,
+                "date": row.date.isoformat()
+            }
+        return {
+            "id": row.id,
+            "title": row.description,
+            "amount": float(row.amount),
+            "category": row.category,
+            "date": row.date.isoformat()
+        }
+
+    @staticmethod
+    def _loan_item(loan: Loan) -> Dict:
+        return {
+            "id": loan.id,
+            "loan_type": loan.loan_type,
+            "description": loan.description,
+            "principal_amount": float(loan.principal_amount) if loan.principal_amount is not None else 0.0,
+            "remaining_balance": float(loan.remaining_balance) if loan.remaining_balance is not None else 0.0,
+            "interest_rate": float(loan.interest_rate) if loan.interest_rate is not None else 0.0,
+            "monthly_payment": float(loan.monthly_payment) if loan.monthly_payment is not None else 0.0,
+            "start_date": loan.start_date.isoformat(),
+            "term_months": loan.term_months
+        }
+
+
+class _EntryColumns:
+    """One table's rows for the report as month buckets plus a recurring activity matrix."""
+
+    def __init__(
+        self, regular: Sequence, recurring: Sequence, month_ordinals: np.ndarray, month_firsts: np.ndarray
+    ):
+        # One-off rows: stable sort by month keeps query order within each month
+        self.regular_items = [BudgetReportService._entry_item(row) for row in regular]
+        row_months = np.array([row.date.year * 12 + row.date.month - 1 for row in regular], dtype=np.int64)
+        self._regular_order = np.argsort(row_months, kind="stable")
+        sorted_months = row_months[self._regular_order]
+        self._bucket_starts = np.searchsorted(sorted_months, month_ordinals, side="left")
+        self._bucket_ends = np.searchsorted(sorted_months, month_ordinals, side="right")
+
+        self.recurring_items = [BudgetReportService._entry_item(row) for row in recurring]
+        starts = np.array([row.date.toordinal() for row in recurring], dtype=np.int64)
+        ends = np.array(
+            [row.end_date.toordinal() if row.end_date is not None else _OPEN_ENDED for row in recurring],
+            dtype=np.int64,
+        )
+        self._recurring_active = BudgetReportService._active_matrix(month_firsts, starts, ends)
+
+    def items_for(self, month_index: int) -> Tuple[List[Dict], List[Dict]]:
+        """Return (one-off items, active recurring items) for a month of the range."""
+        bucket = self._regular_order[self._bucket_starts[month_index]:self._bucket_ends[month_index]]
+        regular = [self.regular_items[i] for i in bucket.tolist()]
+        recurring = [self.recurring_items[i] for i in np.flatnonzero(self._recurring_active[month_index]).tolist()]
+        return regular, recurring
@@ -1,15 +1,49 @@
 """
 AI-powered transaction categorization service using OpenAI.
+
+A categorize request is cheap when it repeats merchants the household has
+seen before, and bounded by the slowest batch rather than the sum of all
+batches otherwise:
+1. categorize_with_cache() looks every transaction up in merchant_categories,
+   keyed by the household, the normalized merchant (normalize_description)
+   and the amount's direction. Hits never reach the LLM.
+2. Misses are de-duplicated by that key, so one representative per merchant
+   is sent; its result is applied to every transaction sharing the key and
+   stored when the model is confident enough.
+3. categorize_in_batches() packs the representatives into batches by an
+   estimated token budget and sends them concurrently, at most
+   CATEGORIZATION_CONCURRENCY at a time.
 """
 
+import asyncio
 import os
 import json
 import logging
+import threading
 from typing import List, Dict, Optional, Tuple
 import httpx
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..database import dialect_insert
+from ..http_clients import get_client
+from ..models import MerchantCategory
+from .text_similarity import normalize_description
 
 logger = logging.getLogger(__name__)
 
+# Batches in flight at once per categorize call
+CATEGORIZATION_CONCURRENCY = int(os.getenv("CATEGORIZATION_CONCURRENCY", "4"))
+
+# Estimated prompt tokens of transaction data per batch, and the output budget
+# (max_tokens) each batch's results must fit in
+CATEGORIZATION_BATCH_TOKENS = int(os.getenv("CATEGORIZATION_BATCH_TOKENS", "2500"))
+CATEGORIZATION_MAX_TOKENS = 4096
+TOKENS_PER_RESULT = 40
+
+# Results below this confidence are applied but not remembered
+MERCHANT_CACHE_MIN_CONFIDENCE = 0.7
+
 # Our expense and income categories
 EXPENSE_CATEGORIES = [
     "housing",        # rent, mortgage, property taxes
@@ -84,16 +118,7 @@ async def categorize_transactions(
         return []
 
     # Build prompt with transaction data
-    tx_list = []
-    for tx in transactions:
-        tx_entry = {
-            "id": tx["id"],
-            "description": tx.get("description", ""),
-            "merchant": tx.get("merchant_name", ""),
-            "amount": tx.get("amount", 0),
-            "tink_category": tx.get("tink_category", "")
-        }
-        tx_list.append(tx_entry)
+    tx_list = [_prompt_entry(tx) for tx in transactions]
 
     prompt = f"""You are a financial transaction categorizer for a Polish household budget app.
 
@@ -139,22 +164,22 @@ Rules:
 5. Consider tink_category as a hint but make your own judgment"""
 
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "gpt-4.1-mini",
-                    "max_tokens": 4096,
-                    "messages": [
-                        {"role": "system", "content": "You are a transaction categorization engine. Respond with valid JSON only."},
-                        {"role": "user", "content": prompt}
-                    ]
-                }
-            )
+        client = get_client("openai")
+        response = await client.post(
+            "https://api.openai.com/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": "gpt-4.1-mini",
+                "max_tokens": CATEGORIZATION_MAX_TOKENS,
+                "messages": [
+                    {"role": "system", "content": "You are a transaction categorization engine. Respond with valid JSON only."},
+                    {"role": "user", "content": prompt}
+                ]
+            }
+        )
 
         if response.status_code != 200:
             logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
@@ -194,29 +219,231 @@ Rules:
         return []
 
 
+def _prompt_entry(tx: Dict) -> Dict:
+    """The fields of a transaction sent to the model."""
+    return {
+        "id": tx["id"],
+        "description": tx.get("description", ""),
+        "merchant": tx.get("merchant_name", ""),
+        "amount": tx.get("amount", 0),
+        "tink_category": tx.get("tink_category", "")
+    }
+
+
+def estimate_tokens(tx: Dict) -> int:
+    """Rough prompt token count of one transaction (~4 characters per token)."""
+    return len(json.dumps(_prompt_entry(tx), ensure_ascii=False, indent=2)) // 4 + 1
+
+
+def plan_batches(
+    transactions: List[Dict],
+    max_batch_size: int = 30,
+    token_budget: int = CATEGORIZATION_BATCH_TOKENS,
+) -> List[List[Dict]]:
+    """
+    Split transactions into batches that fit the prompt and output budgets.
+
+    A batch is closed when the next transaction would push its estimated
+    prompt tokens over token_budget, or when it holds max_batch_size
+    transactions (further capped so the results fit in max_tokens). Long
+    descriptions therefore get smaller batches, short ones larger.
+    """
+    max_batch_size = max(1, min(max_batch_size, CATEGORIZATION_MAX_TOKENS // TOKENS_PER_RESULT))
+    batches: List[List[Dict]] = []
+    batch: List[Dict] = []
+    batch_tokens = 0
+    for tx in transactions:
+        tokens = estimate_tokens(tx)
+        if batch and (len(batch) >= max_batch_size or batch_tokens + tokens > token_budget):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(tx)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
 async def categorize_in_batches(
     transactions: List[Dict],
     batch_size: int = 30,
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    max_concurrency: int = CATEGORIZATION_CONCURRENCY,
 ) -> List[Dict]:
     """
-    Categorize transactions in batches for efficiency.
+    Categorize transactions in concurrently dispatched batches.
 
     Args:
         transactions: List of all transactions to categorize
-        batch_size: Number of transactions per API call
+        batch_size: Maximum number of transactions per API call
         api_key: OpenAI API key
+        max_concurrency: Maximum number of API calls in flight
 
     Returns:
-        Combined list of all categorization results
+        Combined list of all categorization results, in batch order
     """
-    all_results = []
+    batches = plan_batches(transactions, max_batch_size=batch_size)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(number: int, batch: List[Dict]) -> List[Dict]:
+        async with semaphore:
+            logger.info(f"Categorizing batch {number}/{len(batches)} ({len(batch)} transactions)")
+            return await categorize_transactions(batch, api_key)
+
+    batch_results = await asyncio.gather(
+        *(run(number, batch) for number, batch in enumerate(batches, start=1))
+    )
+    return [result for results in batch_results for result in results]
+
 
-    for i in range(0, len(transactions), batch_size):
-        batch = transactions[i:i + batch_size]
-        logger.info(f"Categorizing batch {i // batch_size + 1} ({len(batch)} transactions)")
+class CategoryCacheMetrics:
+    """Process-wide hit/miss counters of the merchant category cache."""
 
-        results = await categorize_transactions(batch, api_key)
-        all_results.extend(results)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
 
-    return all_results
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.llm_transactions = 0
+        self.stored = 0
+
+    def record(self, hits: int = 0, misses: int = 0, llm_transactions: int = 0, stored: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.llm_transactions += llm_transactions
+            self.stored += stored
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "llm_transactions": self.llm_transactions,
+                "stored": self.stored,
+            }
+
+
+category_cache_metrics = CategoryCacheMetrics()
+
+
+def merchant_key(tx: Dict) -> Tuple[str, str]:
+    """
+    Cache key of a transaction: (normalized merchant, direction).
+
+    The merchant name is preferred over the description; direction is
+    "expense" for negative amounts and "income" otherwise, so refunds from a
+    shop don't inherit its expense category. An empty merchant is not cacheable.
+    """
+    merchant = normalize_description(tx.get("merchant_name") or tx.get("description"))
+    direction = "expense" if (tx.get("amount") or 0) < 0 else "income"
+    return merchant, direction
+
+
+def _store_categories(db: Session, household_id: str, rows: List[Dict]) -> None:
+    """Upsert remembered categories (a later result for a key replaces the old one)."""
+    if not rows:
+        return
+    stmt = dialect_insert(db, MerchantCategory.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "merchant_key", "direction"],
+        set_={
+            "suggested_type": stmt.excluded.suggested_type,
+            "suggested_category": stmt.excluded.suggested_category,
+            "confidence": stmt.excluded.confidence,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt, [{"user_id": household_id, **row} for row in rows])
+
+
+async def categorize_with_cache(
+    db: Session,
+    household_id: str,
+    transactions: List[Dict],
+    api_key: Optional[str] = None,
+    batch_size: int = 30,
+    refresh: bool = False,
+) -> List[Dict]:
+    """
+    Categorize transactions, asking the LLM only about merchants not seen before.
+
+    Args:
+        db: Database session (new cache rows are added, not committed)
+        household_id: Household the transactions and cache rows belong to
+        transactions: Transactions as for categorize_transactions()
+        api_key: OpenAI API key
+        batch_size: Maximum number of transactions per API call
+        refresh: Skip cache reads (every merchant goes to the LLM) and
+            overwrite the stored categories with the new results
+
+    Returns:
+        Categorization results as for categorize_transactions(); results
+        served from the cache carry "cached": True
+    """
+    keys = {tx["id"]: merchant_key(tx) for tx in transactions}
+
+    cached: Dict[Tuple[str, str], MerchantCategory] = {}
+    merchants = {merchant for merchant, _ in keys.values() if merchant}
+    if merchants and not refresh:
+        rows = db.query(MerchantCategory).filter(
+            MerchantCategory.user_id == household_id,
+            MerchantCategory.merchant_key.in_(merchants),
+        ).all()
+        cached = {(row.merchant_key, row.direction): row for row in rows}
+
+    results: List[Dict] = []
+    # One representative per uncached key; uncacheable transactions go alone
+    representatives: Dict[Tuple[str, str], Dict] = {}
+    sharing: Dict[Tuple[str, str], List[Dict]] = {}
+    uncacheable: List[Dict] = []
+    for tx in transactions:
+        key = keys[tx["id"]]
+        row = cached.get(key)
+        if row is not None:
+            results.append({
+                "id": tx["id"],
+                "type": row.suggested_type,
+                "category": row.suggested_category,
+                "confidence": row.confidence,
+                "cached": True,
+            })
+        elif not key[0]:
+            uncacheable.append(tx)
+        else:
+            representatives.setdefault(key, tx)
+            sharing.setdefault(key, []).append(tx)
+
+    to_send = list(representatives.values()) + uncacheable
+    hits = len(results)
+    category_cache_metrics.record(hits=hits, misses=len(transactions) - hits, llm_transactions=len(to_send))
+    if not to_send:
+        return results
+
+    llm_results = await categorize_in_batches(to_send, batch_size=batch_size, api_key=api_key)
+    by_id = {result.get("id"): result for result in llm_results}
+
+    new_rows = []
+    for key, tx in representatives.items():
+        result = by_id.pop(tx["id"], None)
+        if result is None:
+            continue
+        for member in sharing[key]:
+            results.append({**result, "id": member["id"]})
+        if (result.get("confidence") or 0) >= MERCHANT_CACHE_MIN_CONFIDENCE and result.get("category"):
+            new_rows.append({
+                "merchant_key": key[0],
+                "direction": key[1],
+                "suggested_type": result.get("type"),
+                "suggested_category": result["category"],
+                "confidence": result["confidence"],
+            })
+    results.extend(by_id.values())
+
+    _store_categories(db, household_id, new_rows)
+    category_cache_metrics.record(stored=len(new_rows))
+    return results
@@ -13,15 +13,22 @@ Fingerprint algorithm considers:
 - Merchant category code (MCC)
 """
 
-import re
+from collections import defaultdict
 from datetime import date, timedelta
-from typing import Optional, List, Tuple, Dict, Any
+from typing import Optional, List, Tuple, Dict, Any, Iterable, Set
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select
 
 from ..models import BankTransaction
 from ..logging_utils import get_secure_logger
+from .text_similarity import (
+    PreparedDescription,
+    bounded_similarity,
+    levenshtein_distance,
+    normalize_description,
+    prepare_description,
+)
 
 logger = get_secure_logger(__name__)
 
@@ -45,6 +52,13 @@ DESCRIPTION_SIMILARITY_THRESHOLD = 0.80
 # Minimum amount for duplicate detection (skip zero/tiny transactions)
 MIN_AMOUNT_FOR_DUPLICATE_CHECK = 0.01
 
+# Looser amount tolerance used to pick fuzzy-match candidates
+FUZZY_AMOUNT_TOLERANCE = 0.50
+
+# DuplicateCandidateIndex bucket sizes: amount band (cents) and date bucket (days)
+INDEX_AMOUNT_BAND_CENTS = 100
+INDEX_DATE_BUCKET_DAYS = 3
+
 
 # =============================================================================
 # Data Classes
@@ -73,84 +87,21 @@ class DuplicateMatch:
 # Helper Functions
 # =============================================================================
 
-def normalize_description(desc: str) -> str:
-    """
-    Normalize a transaction description for comparison.
-
-    Rules:
-    - Convert to lowercase
-    - Remove all non-alphanumeric characters
-    - Collapse multiple spaces
-    - Trim whitespace
-
-    Examples:
-    - "TESCO" -> "tesco"
-    - "Tesco Stores" -> "tescostores"
-    - "TESCO STORES 3297" -> "tescostores3297"
-    """
-    if not desc:
-        return ""
-
-    # Lowercase
-    normalized = desc.lower()
-
-    # Remove non-alphanumeric (keep spaces for now)
-    normalized = re.sub(r'[^a-z0-9\s]', '', normalized)
-
-    # Remove all spaces
-    normalized = re.sub(r'\s+', '', normalized)
-
-    return normalized.strip()
-
-
-def levenshtein_distance(s1: str, s2: str) -> int:
-    """
-    Calculate the Levenshtein distance between two strings.
-    """
-    if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
-
-    if len(s2) == 0:
-        return len(s1)
-
-    previous_row = range(len(s2) + 1)
-    for i, c1 in enumerate(s1):
-        current_row = [i + 1]
-        for j, c2 in enumerate(s2):
-            insertions = previous_row[j + 1] + 1
-            deletions = current_row[j] + 1
-            substitutions = previous_row[j] + (c1 != c2)
-            current_row.append(min(insertions, deletions, substitutions))
-        previous_row = current_row
-
-    return previous_row[-1]
-
-
-def description_similarity(desc1: str, desc2: str) -> float:
+def description_similarity(desc1: str, desc2: str, min_similarity: float = 0.0) -> float:
     """
     Calculate similarity between two descriptions (0-1).
 
-    Uses Levenshtein distance normalized by max string length.
+    Uses Levenshtein distance normalized by max string length. Scores below
+    min_similarity may be returned as 0.0 without computing the distance.
     """
     if not desc1 or not desc2:
         return 0.0
 
-    # Normalize both descriptions
-    norm1 = normalize_description(desc1)
-    norm2 = normalize_description(desc2)
-
-    if not norm1 or not norm2:
-        return 0.0
-
-    # Exact match after normalization
-    if norm1 == norm2:
-        return 1.0
-
-    # Calculate Levenshtein similarity
-    max_len = max(len(norm1), len(norm2))
-    distance = levenshtein_distance(norm1, norm2)
-
-    return 1.0 - (distance / max_len)
+    return bounded_similarity(
+        prepare_description(desc1),
+        prepare_description(desc2),
+        min_similarity,
+    )
 
 
 def amounts_match(amount1: float, amount2: float, tolerance: float = AMOUNT_TOLERANCE) -> bool:
@@ -239,6 +190,21 @@ def calculate_duplicate_confidence(
         existing_fingerprint.description_normalized
     )
 
+    return _score_match(fingerprint, existing_fingerprint, existing_tx.amount, desc_similarity)
+
+
+def _score_match(
+    fingerprint: TransactionFingerprint,
+    existing_fingerprint: TransactionFingerprint,
+    existing_amount: float,
+    desc_similarity: float,
+) -> Tuple[float, str]:
+    """
+    Apply the confidence scenarios to a pair whose currency and amount already match.
+
+    Shared by calculate_duplicate_confidence() and DuplicateCandidateIndex, which
+    supplies a precomputed (or bounded) description similarity.
+    """
     # Same account scenarios
     same_account = fingerprint.tink_account_id == existing_fingerprint.tink_account_id
 
@@ -260,8 +226,8 @@ def calculate_duplicate_confidence(
     # One transaction positive, one negative = inter-account transfer
     if not same_account and same_date:
         # Check if amounts are inverse (one positive, one negative)
-        if (fingerprint.amount_abs > 0 and existing_tx.amount < 0) or \
-           (fingerprint.amount_abs > 0 and existing_tx.amount > 0):
+        if (fingerprint.amount_abs > 0 and existing_amount < 0) or \
+           (fingerprint.amount_abs > 0 and existing_amount > 0):
             # This is for detecting the same transaction showing up in both accounts
             # of an internal transfer
             return 0.75, "inter_account_transfer"
@@ -293,17 +259,17 @@ def find_potential_duplicates(
     Find potential duplicate transactions in the database.
 
     Strategy:
-    1. Query transactions within date window (±7 days for wider net)
-    2. Filter by approximate amount (in Python, for floating point safety)
-    3. Calculate confidence for each candidate
-    4. Return matches above minimum threshold
+    1. Query transactions within the date window and the loose amount band
+       (±FUZZY_AMOUNT_TOLERANCE) - every row that can score, with no truncation
+    2. Score them through a DuplicateCandidateIndex
+    3. Return matches above minimum threshold
 
     Args:
         db: Database session
         user_id: User ID to search within
         fingerprint: Fingerprint of the new transaction
         exclude_transaction_ids: IDs to exclude from search (e.g., the transaction itself)
-        limit: Maximum candidates to fetch from DB
+        limit: Maximum matches to return
 
     Returns:
         List of DuplicateMatch objects, sorted by confidence (highest first)
@@ -312,45 +278,28 @@ def find_potential_duplicates(
     if fingerprint.amount_abs < MIN_AMOUNT_FOR_DUPLICATE_CHECK:
         return []
 
-    # Calculate date range (wider than actual window for performance)
-    date_min = fingerprint.date - timedelta(days=7)
-    date_max = fingerprint.date + timedelta(days=7)
+    date_min = fingerprint.date - timedelta(days=DATE_WINDOW_DAYS)
+    date_max = fingerprint.date + timedelta(days=DATE_WINDOW_DAYS)
+    # A cent of slack either side; the index re-checks amounts exactly
+    amount_slack = FUZZY_AMOUNT_TOLERANCE + AMOUNT_TOLERANCE
 
-    # Base query
-    query = db.query(BankTransaction).filter(
+    query = select(BankTransaction).where(
         BankTransaction.user_id == user_id,
         BankTransaction.currency == fingerprint.currency,
         BankTransaction.date >= date_min,
         BankTransaction.date <= date_max,
+        func.abs(BankTransaction.amount).between(
+            fingerprint.amount_abs - amount_slack,
+            fingerprint.amount_abs + amount_slack,
+        ),
     )
 
     # Exclude specific transactions
     if exclude_transaction_ids:
-        query = query.filter(BankTransaction.id.notin_(exclude_transaction_ids))
-
-    # Fetch candidates
-    candidates = query.limit(limit * 3).all()  # Fetch more than needed for filtering
-
-    # Calculate confidence for each candidate
-    matches = []
-    for candidate in candidates:
-        # Skip if amount doesn't match (approximate)
-        if not amounts_match(fingerprint.amount_abs, abs(candidate.amount), tolerance=0.50):
-            continue
+        query = query.where(BankTransaction.id.notin_(exclude_transaction_ids))
 
-        confidence, reason = calculate_duplicate_confidence(fingerprint, candidate)
-
-        if confidence >= MIN_CONFIDENCE_THRESHOLD:
-            matches.append(DuplicateMatch(
-                original_transaction_id=candidate.id,
-                confidence=confidence,
-                match_reason=reason,
-            ))
-
-    # Sort by confidence (highest first)
-    matches.sort(key=lambda m: m.confidence, reverse=True)
-
-    return matches[:limit]
+    index = DuplicateCandidateIndex(db.scalars(query))
+    return index.find_matches(fingerprint)[:limit]
 
 
 # =============================================================================
@@ -465,3 +414,251 @@ def check_pending_to_booked_update(
             return candidate.id
 
     return None
+
+
+# =============================================================================
+# Batch Detection
+# =============================================================================
+#
+# check_pending_to_booked_update() and detect_duplicate_for_new_transaction()
+# issue queries per incoming transaction. A sync batch instead prefetches
+# everything it needs once - the provider ids already stored and every row
+# inside the batch's date window - and matches in memory with the same
+# confidence rules.
+
+def fetch_existing_transaction_ids(
+    db: Session,
+    user_id: str,
+    tink_transaction_ids: Iterable[Optional[str]],
+    provider_transaction_ids: Iterable[Optional[str]] = (),
+) -> Tuple[Set[str], Set[str]]:
+    """
+    Return the already-stored subsets of a batch's ids (one query).
+
+    tink_transaction_ids are matched globally (the column is unique), provider
+    transaction ids within the household only.
+
+    Returns (stored_tink_transaction_ids, stored_provider_transaction_ids).
+    """
+    tink_ids = {tx_id for tx_id in tink_transaction_ids if tx_id}
+    provider_ids = {tx_id for tx_id in provider_transaction_ids if tx_id}
+    if not tink_ids and not provider_ids:
+        return set(), set()
+
+    conditions = []
+    if tink_ids:
+        conditions.append(BankTransaction.tink_transaction_id.in_(tink_ids))
+    if provider_ids:
+        conditions.append(and_(
+            BankTransaction.user_id == user_id,
+            BankTransaction.provider_transaction_id.in_(provider_ids),
+        ))
+
+    stored_tink_ids: Set[str] = set()
+    stored_provider_ids: Set[str] = set()
+    rows = db.execute(
+        select(
+            BankTransaction.tink_transaction_id,
+            BankTransaction.provider_transaction_id,
+            BankTransaction.user_id,
+        ).where(or_(*conditions))
+    )
+    for tink_id, provider_id, owner_id in rows:
+        if tink_id in tink_ids:
+            stored_tink_ids.add(tink_id)
+        if owner_id == user_id and provider_id in provider_ids:
+            stored_provider_ids.add(provider_id)
+    return stored_tink_ids, stored_provider_ids
+
+
+def fetch_candidate_window(
+    db: Session,
+    user_id: str,
+    fingerprints: List[TransactionFingerprint],
+) -> List[BankTransaction]:
+    """
+    Load every stored transaction that could match any fingerprint in a batch (one query).
+
+    The window spans the batch's currencies and its date range widened by
+    DATE_WINDOW_DAYS on both sides, which covers every confidence scenario.
+    """
+    if not fingerprints:
+        return []
+
+    date_min = min(fp.date for fp in fingerprints) - timedelta(days=DATE_WINDOW_DAYS)
+    date_max = max(fp.date for fp in fingerprints) + timedelta(days=DATE_WINDOW_DAYS)
+
+    return list(db.scalars(
+        select(BankTransaction).where(
+            BankTransaction.user_id == user_id,
+            BankTransaction.currency.in_({fp.currency for fp in fingerprints}),
+            BankTransaction.date >= date_min,
+            BankTransaction.date <= date_max,
+        ).order_by(BankTransaction.id)
+    ))
+
+
+class _IndexedTransaction:
+    """A candidate row with everything a lookup needs precomputed."""
+
+    __slots__ = ("tx", "fingerprint", "description", "is_pending")
+
+    def __init__(self, tx: BankTransaction):
+        self.tx = tx
+        self.fingerprint = create_fingerprint_from_transaction(tx)
+        self.description = prepare_description(self.fingerprint.description_normalized)
+        self.is_pending = (tx.raw_data or {}).get("status") == "PENDING"
+
+
+class DuplicateCandidateIndex:
+    """
+    In-memory index over one user's stored transactions.
+
+    Candidates are blocked by (currency, amount band, date bucket), so a lookup
+    only visits the few buckets within FUZZY_AMOUNT_TOLERANCE and
+    DATE_WINDOW_DAYS of the incoming transaction. Descriptions are prepared
+    once per candidate, and each pair is only scored up to the description
+    similarity its confidence tiers can use (see _score), so most distances end
+    in a prefilter or early exit. Scores are the same as
+    calculate_duplicate_confidence().
+    """
+
+    def __init__(self, candidates: Iterable[BankTransaction] = ()):
+        self._buckets: Dict[Tuple[str, int, int], List[_IndexedTransaction]] = defaultdict(list)
+        self._claimed_pending: Set[int] = set()
+        for candidate in candidates:
+            self.add(candidate)
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def add(self, tx: BankTransaction) -> None:
+        """Index a stored transaction."""
+        entry = _IndexedTransaction(tx)
+        cents = round(entry.fingerprint.amount_abs * 100)
+        key = (
+            entry.fingerprint.currency,
+            cents // INDEX_AMOUNT_BAND_CENTS,
+            tx.date.toordinal() // INDEX_DATE_BUCKET_DAYS,
+        )
+        self._buckets[key].append(entry)
+
+    def _nearby(
+        self,
+        fingerprint: TransactionFingerprint,
+        amount_tolerance: float,
+    ) -> List[_IndexedTransaction]:
+        """Candidates within amount_tolerance and DATE_WINDOW_DAYS, in id order."""
+        # One cent of slack so float rounding never drops a bucket edge
+        cents_min = int((fingerprint.amount_abs - amount_tolerance) * 100) - 1
+        cents_max = int((fingerprint.amount_abs + amount_tolerance) * 100) + 1
+        day = fingerprint.date.toordinal()
+
+        nearby = []
+        for band in range(cents_min // INDEX_AMOUNT_BAND_CENTS, cents_max // INDEX_AMOUNT_BAND_CENTS + 1):
+            for bucket in range(
+                (day - DATE_WINDOW_DAYS) // INDEX_DATE_BUCKET_DAYS,
+                (day + DATE_WINDOW_DAYS) // INDEX_DATE_BUCKET_DAYS + 1,
+            ):
+                for entry in self._buckets.get((fingerprint.currency, band, bucket), ()):
+                    if abs(entry.tx.date.toordinal() - day) > DATE_WINDOW_DAYS:
+                        continue
+                    if not amounts_match(fingerprint.amount_abs, entry.fingerprint.amount_abs, amount_tolerance):
+                        continue
+                    nearby.append(entry)
+        nearby.sort(key=lambda entry: entry.tx.id)
+        return nearby
+
+    def _score(
+        self,
+        fingerprint: TransactionFingerprint,
+        description: PreparedDescription,
+        entry: _IndexedTransaction,
+        min_similarity: Optional[float] = None,
+    ) -> Tuple[float, str]:
+        if not amounts_match(fingerprint.amount_abs, entry.fingerprint.amount_abs):
+            return 0.0, "amount_mismatch"
+        if min_similarity is None:
+            # Same account: the weak match tier accepts 0.5. Across accounts
+            # only the 0.8 tier uses the description (transfers ignore it).
+            if fingerprint.tink_account_id == entry.fingerprint.tink_account_id:
+                min_similarity = 0.5
+            else:
+                min_similarity = DESCRIPTION_SIMILARITY_THRESHOLD
+        desc_similarity = bounded_similarity(description, entry.description, min_similarity)
+        return _score_match(fingerprint, entry.fingerprint, entry.tx.amount, desc_similarity)
+
+    def find_pending_to_booked(
+        self,
+        fingerprint: TransactionFingerprint,
+        raw_data: Dict[str, Any],
+    ) -> Optional[BankTransaction]:
+        """
+        Return the stored pending transaction this booked one replaces, if any.
+
+        Mirrors check_pending_to_booked_update(). A pending row is claimed by the
+        first booked transaction that matches it, so two booked transactions in
+        one batch can't overwrite the same row.
+        """
+        if raw_data.get("status") != "BOOKED":
+            return None
+
+        description = prepare_description(fingerprint.description_normalized)
+        for entry in self._nearby(fingerprint, AMOUNT_TOLERANCE):
+            if entry.tx.id in self._claimed_pending or not entry.is_pending:
+                continue
+            if entry.fingerprint.tink_account_id != fingerprint.tink_account_id:
+                continue
+
+            # 0.85+ needs a description similarity of at least 0.8
+            confidence, _ = self._score(fingerprint, description, entry, DESCRIPTION_SIMILARITY_THRESHOLD)
+            if confidence >= 0.85:
+                self._claimed_pending.add(entry.tx.id)
+                return entry.tx
+
+        return None
+
+    def find_matches(self, fingerprint: TransactionFingerprint) -> List[DuplicateMatch]:
+        """Every match above MIN_CONFIDENCE_THRESHOLD, highest confidence first."""
+        if fingerprint.amount_abs < MIN_AMOUNT_FOR_DUPLICATE_CHECK:
+            return []
+
+        description = prepare_description(fingerprint.description_normalized)
+        matches = []
+        for entry in self._nearby(fingerprint, FUZZY_AMOUNT_TOLERANCE):
+            confidence, reason = self._score(fingerprint, description, entry)
+            if confidence >= MIN_CONFIDENCE_THRESHOLD:
+                matches.append(DuplicateMatch(
+                    original_transaction_id=entry.tx.id,
+                    confidence=confidence,
+                    match_reason=reason,
+                ))
+
+        matches.sort(key=lambda m: m.confidence, reverse=True)
+        return matches
+
+    def find_duplicate(self, fingerprint: TransactionFingerprint) -> Optional[DuplicateMatch]:
+        """Return the best fuzzy match for a fingerprint, or None."""
+        matches = self.find_matches(fingerprint)
+        return matches[0] if matches else None
+
+    def find_duplicates(
+        self,
+        fingerprints: Iterable[TransactionFingerprint],
+    ) -> List[Optional[DuplicateMatch]]:
+        """Best fuzzy match (or None) for each fingerprint of an incoming batch."""
+        return [self.find_duplicate(fingerprint) for fingerprint in fingerprints]
+
+
+def find_duplicates_batch(
+    db: Session,
+    user_id: str,
+    fingerprints: List[TransactionFingerprint],
+) -> List[Optional[DuplicateMatch]]:
+    """
+    Deduplicate a whole incoming batch against stored transactions (one query).
+
+    Returns the best match (or None) for each fingerprint, in order.
+    """
+    index = DuplicateCandidateIndex(fetch_candidate_window(db, user_id, fingerprints))
+    return index.find_duplicates(fingerprints)
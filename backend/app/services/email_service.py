@@ -14,6 +14,8 @@ from enum import Enum
 
 import sentry_sdk
 
+from ..offload import blocking
+
 logger = logging.getLogger(__name__)
 
 # Resend configuration
@@ -170,6 +172,7 @@ def _send_email(
     return False
 
 
+@blocking("email")
 def send_welcome_email(
     to_email: str,
     user_name: Optional[str] = None,
@@ -262,6 +265,7 @@ def send_welcome_email(
     )
 
 
+@blocking("email")
 def send_payment_confirmation_email(
     to_email: str,
     user_name: Optional[str] = None,
@@ -368,6 +372,7 @@ def send_payment_confirmation_email(
     )
 
 
+@blocking("email")
 def send_trial_ending_email(
     to_email: str,
     user_name: Optional[str] = None,
@@ -474,6 +479,7 @@ def send_trial_ending_email(
     )
 
 
+@blocking("email")
 def send_trial_ended_email(
     to_email: str,
     user_name: Optional[str] = None,
@@ -559,6 +565,7 @@ def send_trial_ended_email(
     )
 
 
+@blocking("email")
 def send_subscription_canceled_email(
     to_email: str,
     user_name: Optional[str] = None,
@@ -636,6 +643,7 @@ def send_subscription_canceled_email(
     )
 
 
+@blocking("email")
 def send_payment_failed_email(
     to_email: str,
     user_name: Optional[str] = None,
@@ -726,6 +734,7 @@ def _load_template(filename: str) -> str:
         return f.read()
 
 
+@blocking("email")
 def send_partner_invitation_email(
     to_email: str,
     inviter_name: Optional[str] = None,
@@ -9,14 +9,15 @@ API docs: https://enablebanking.com/docs/api/reference/
 
 import os
 import time
-import httpx
 import jwt
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, List, Any
+from typing import Optional, List, Any, AsyncIterator
 
 from dotenv import load_dotenv
 
+from ..http_clients import get_client
+
 logger = logging.getLogger(__name__)
 
 load_dotenv()
@@ -94,21 +95,21 @@ class EnableBankingService:
 
         GET /aspsps?country={country}
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/aspsps",
-                params={"country": country.upper()},
-                headers=self._auth_headers(),
-                timeout=30.0,
+        client = get_client("enable_banking")
+        response = await client.get(
+            f"{self.api_url}/aspsps",
+            params={"country": country.upper()},
+            headers=self._auth_headers(),
+            timeout=30.0,
+        )
+
+        if response.status_code != 200:
+            raise EnableBankingAPIError(
+                f"Failed to list ASPSPs for {country}: {response.text}",
+                status_code=response.status_code,
             )
 
-            if response.status_code != 200:
-                raise EnableBankingAPIError(
-                    f"Failed to list ASPSPs for {country}: {response.text}",
-                    status_code=response.status_code,
-                )
-
-            return response.json().get("aspsps", [])
+        return response.json().get("aspsps", [])
 
     async def start_auth(
         self,
@@ -141,21 +142,21 @@ class EnableBankingService:
             "psu_type": psu_type,
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}/auth",
-                json=body,
-                headers=self._auth_headers(),
-                timeout=30.0,
-            )
+        client = get_client("enable_banking")
+        response = await client.post(
+            f"{self.api_url}/auth",
+            json=body,
+            headers=self._auth_headers(),
+            timeout=30.0,
+        )
 
-            if response.status_code not in (200, 201):
-                raise EnableBankingAPIError(
-                    f"Failed to start auth for {aspsp_name}: {response.text}",
-                    status_code=response.status_code,
-                )
+        if response.status_code not in (200, 201):
+            raise EnableBankingAPIError(
+                f"Failed to start auth for {aspsp_name}: {response.text}",
+                status_code=response.status_code,
+            )
 
-            return response.json()
+        return response.json()
 
     async def create_session(self, code: str) -> dict:
         """
@@ -165,21 +166,21 @@ class EnableBankingService:
 
         The session_id is the long-lived credential (valid until consent expiry).
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}/sessions",
-                json={"code": code},
-                headers=self._auth_headers(),
-                timeout=30.0,
+        client = get_client("enable_banking")
+        response = await client.post(
+            f"{self.api_url}/sessions",
+            json={"code": code},
+            headers=self._auth_headers(),
+            timeout=30.0,
+        )
+
+        if response.status_code not in (200, 201):
+            raise EnableBankingAPIError(
+                f"Failed to create session: {response.text}",
+                status_code=response.status_code,
             )
 
-            if response.status_code not in (200, 201):
-                raise EnableBankingAPIError(
-                    f"Failed to create session: {response.text}",
-                    status_code=response.status_code,
-                )
-
-            return response.json()
+        return response.json()
 
     async def get_session(self, session_id: str) -> dict:
         """
@@ -187,20 +188,20 @@ class EnableBankingService:
 
         GET /sessions/{session_id}
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/sessions/{session_id}",
-                headers=self._auth_headers(),
-                timeout=30.0,
+        client = get_client("enable_banking")
+        response = await client.get(
+            f"{self.api_url}/sessions/{session_id}",
+            headers=self._auth_headers(),
+            timeout=30.0,
+        )
+
+        if response.status_code != 200:
+            raise EnableBankingAPIError(
+                f"Failed to get session {session_id}: {response.text}",
+                status_code=response.status_code,
             )
 
-            if response.status_code != 200:
-                raise EnableBankingAPIError(
-                    f"Failed to get session {session_id}: {response.text}",
-                    status_code=response.status_code,
-                )
-
-            return response.json()
+        return response.json()
 
     async def get_balances(self, account_uid: str) -> list:
         """
@@ -208,20 +209,20 @@ class EnableBankingService:
 
         GET /accounts/{account_uid}/balances
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/accounts/{account_uid}/balances",
-                headers=self._auth_headers(),
-                timeout=30.0,
+        client = get_client("enable_banking")
+        response = await client.get(
+            f"{self.api_url}/accounts/{account_uid}/balances",
+            headers=self._auth_headers(),
+            timeout=30.0,
+        )
+
+        if response.status_code != 200:
+            raise EnableBankingAPIError(
+                f"Failed to fetch balances for {account_uid}: {response.text}",
+                status_code=response.status_code,
             )
 
-            if response.status_code != 200:
-                raise EnableBankingAPIError(
-                    f"Failed to fetch balances for {account_uid}: {response.text}",
-                    status_code=response.status_code,
-                )
-
-            return response.json().get("balances", [])
+        return response.json().get("balances", [])
 
     async def get_transactions(
         self,
@@ -237,40 +238,52 @@ class EnableBankingService:
         Returns all booked transactions (follows continuation_key until exhausted).
         """
         all_transactions = []
+        async for page in self.iter_transaction_pages(account_uid, date_from, date_to):
+            all_transactions.extend(page)
+        return all_transactions
+
+    async def iter_transaction_pages(
+        self,
+        account_uid: str,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Yield an account's transactions one page at a time, following continuation_key.
+
+        GET /accounts/{account_uid}/transactions
+        """
         continuation_key = None
 
-        async with httpx.AsyncClient() as client:
-            while True:
-                params = {}
-                if date_from:
-                    params["date_from"] = date_from
-                if date_to:
-                    params["date_to"] = date_to
-                if continuation_key:
-                    params["continuation_key"] = continuation_key
-
-                response = await client.get(
-                    f"{self.api_url}/accounts/{account_uid}/transactions",
-                    params=params,
-                    headers=self._auth_headers(),
-                    timeout=60.0,
-                )
+        client = get_client("enable_banking")
+        while True:
+            params = {}
+            if date_from:
+                params["date_from"] = date_from
+            if date_to:
+                params["date_to"] = date_to
+            if continuation_key:
+                params["continuation_key"] = continuation_key
 
-                if response.status_code != 200:
-                    raise EnableBankingAPIError(
-                        f"Failed to fetch transactions for {account_uid}: {response.text}",
-                        status_code=response.status_code,
-                    )
+            response = await client.get(
+                f"{self.api_url}/accounts/{account_uid}/transactions",
+                params=params,
+                headers=self._auth_headers(),
+                timeout=60.0,
+            )
 
-                data = response.json()
-                transactions = data.get("transactions", [])
-                all_transactions.extend(transactions)
+            if response.status_code != 200:
+                raise EnableBankingAPIError(
+                    f"Failed to fetch transactions for {account_uid}: {response.text}",
+                    status_code=response.status_code,
+                )
 
-                continuation_key = data.get("continuation_key")
-                if not continuation_key:
-                    break
+            data = response.json()
+            yield data.get("transactions", [])
 
-        return all_transactions
+            continuation_key = data.get("continuation_key")
+            if not continuation_key:
+                break
 
     async def delete_session(self, session_id: str) -> None:
         """
@@ -278,19 +291,19 @@ class EnableBankingService:
 
         DELETE /sessions/{session_id}
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self.api_url}/sessions/{session_id}",
-                headers=self._auth_headers(),
-                timeout=30.0,
+        client = get_client("enable_banking")
+        response = await client.delete(
+            f"{self.api_url}/sessions/{session_id}",
+            headers=self._auth_headers(),
+            timeout=30.0,
+        )
+
+        if response.status_code not in (200, 204):
+            raise EnableBankingAPIError(
+                f"Failed to delete session {session_id}: {response.text}",
+                status_code=response.status_code,
             )
 
-            if response.status_code not in (200, 204):
-                raise EnableBankingAPIError(
-                    f"Failed to delete session {session_id}: {response.text}",
-                    status_code=response.status_code,
-                )
-
 
 # Singleton instance
 enable_banking_service = EnableBankingService()
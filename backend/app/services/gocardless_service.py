@@ -8,13 +8,14 @@ API docs: https://bankaccountdata.gocardless.com/api/v2/
 """
 
 import os
-import httpx
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
 
 from dotenv import load_dotenv
 
+from ..http_clients import get_client
+
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -61,69 +62,69 @@ class GoCardlessService:
             return _TOKEN_CACHE["access_token"]
 
         logger.info("Requesting new GoCardless access token")
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}/token/new/",
-                json={
-                    "secret_id": GOCARDLESS_SECRET_ID,
-                    "secret_key": GOCARDLESS_SECRET_KEY,
-                },
-                headers={
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                },
+        client = get_client("gocardless")
+        response = await client.post(
+            f"{self.api_url}/token/new/",
+            json={
+                "secret_id": GOCARDLESS_SECRET_ID,
+                "secret_key": GOCARDLESS_SECRET_KEY,
+            },
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            },
+        )
+
+        if response.status_code != 200:
+            raise GoCardlessAPIError(
+                f"Failed to get access token: {response.text}",
+                status_code=response.status_code,
             )
 
-            if response.status_code != 200:
-                raise GoCardlessAPIError(
-                    f"Failed to get access token: {response.text}",
-                    status_code=response.status_code,
-                )
-
-            token_data = response.json()
-            # Cache with 5-minute safety margin
-            _TOKEN_CACHE["access_token"] = token_data["access"]
-            _TOKEN_CACHE["expires_at"] = now + timedelta(
-                seconds=token_data["access_expires"] - 300
-            )
+        token_data = response.json()
+        # Cache with 5-minute safety margin
+        _TOKEN_CACHE["access_token"] = token_data["access"]
+        _TOKEN_CACHE["expires_at"] = now + timedelta(
+            seconds=token_data["access_expires"] - 300
+        )
 
-            return token_data["access"]
+        return token_data["access"]
 
     async def fetch_requisition(self, requisition_id: str) -> dict:
         """Fetch requisition details including linked account IDs."""
         token = await self.get_access_token()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/requisitions/{requisition_id}/",
-                headers={"Authorization": f"Bearer {token}"},
-            )
+        client = get_client("gocardless")
+        response = await client.get(
+            f"{self.api_url}/requisitions/{requisition_id}/",
+            headers={"Authorization": f"Bearer {token}"},
+        )
 
-            if response.status_code != 200:
-                raise GoCardlessAPIError(
-                    f"Failed to fetch requisition {requisition_id}: {response.text}",
-                    status_code=response.status_code,
-                )
+        if response.status_code != 200:
+            raise GoCardlessAPIError(
+                f"Failed to fetch requisition {requisition_id}: {response.text}",
+                status_code=response.status_code,
+            )
 
-            return response.json()
+        return response.json()
 
     async def fetch_account_details(self, account_id: str) -> dict:
         """Fetch account details (IBAN, owner name, currency, product)."""
         token = await self.get_access_token()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/accounts/{account_id}/details/",
-                headers={"Authorization": f"Bearer {token}"},
-            )
+        client = get_client("gocardless")
+        response = await client.get(
+            f"{self.api_url}/accounts/{account_id}/details/",
+            headers={"Authorization": f"Bearer {token}"},
+        )
 
-            if response.status_code != 200:
-                raise GoCardlessAPIError(
-                    f"Failed to fetch account details for {account_id}: {response.text}",
-                    status_code=response.status_code,
-                )
+        if response.status_code != 200:
+            raise GoCardlessAPIError(
+                f"Failed to fetch account details for {account_id}: {response.text}",
+                status_code=response.status_code,
+            )
 
-            return response.json().get("account", {})
+        return response.json().get("account", {})
 
     async def fetch_accounts(self, requisition_id: str) -> List[dict]:
         """Fetch all accounts for a requisition with their details."""
@@ -168,42 +169,42 @@ class GoCardlessService:
         if from_date:
             params["date_from"] = from_date
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/accounts/{account_id}/transactions/",
-                params=params,
-                headers={"Authorization": f"Bearer {token}"},
-                timeout=60.0,
-            )
+        client = get_client("gocardless")
+        response = await client.get(
+            f"{self.api_url}/accounts/{account_id}/transactions/",
+            params=params,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=60.0,
+        )
 
-            if response.status_code != 200:
-                raise GoCardlessAPIError(
-                    f"Failed to fetch transactions for {account_id}: {response.text}",
-                    status_code=response.status_code,
-                )
+        if response.status_code != 200:
+            raise GoCardlessAPIError(
+                f"Failed to fetch transactions for {account_id}: {response.text}",
+                status_code=response.status_code,
+            )
 
-            data = response.json()
-            transactions = data.get("transactions", {})
-            return transactions.get("booked", [])
+        data = response.json()
+        transactions = data.get("transactions", {})
+        return transactions.get("booked", [])
 
     async def fetch_balances(self, account_id: str) -> List[dict]:
         """Fetch balances for an account."""
         token = await self.get_access_token()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/accounts/{account_id}/balances/",
-                headers={"Authorization": f"Bearer {token}"},
-            )
+        client = get_client("gocardless")
+        response = await client.get(
+            f"{self.api_url}/accounts/{account_id}/balances/",
+            headers={"Authorization": f"Bearer {token}"},
+        )
 
-            if response.status_code != 200:
-                raise GoCardlessAPIError(
-                    f"Failed to fetch balances for {account_id}: {response.text}",
-                    status_code=response.status_code,
-                )
+        if response.status_code != 200:
+            raise GoCardlessAPIError(
+                f"Failed to fetch balances for {account_id}: {response.text}",
+                status_code=response.status_code,
+            )
 
-            data = response.json()
-            return data.get("balances", [])
+        data = response.json()
+        return data.get("balances", [])
 
 
 # Singleton instance
@@ -0,0 +1,499 @@
+"""
+MonthlyAggregateService - Materialized per-household monthly income/expense totals.
+
+Dashboard, budget and AI-context reads use the monthly_aggregates table instead of
+recomputing totals from raw Expense/Income rows on every request.
+
+How it stays correct:
+1. MonthlyTotalsService remains the reference implementation. Every bucket is built
+   from its dedup rules (bank-backed + manual, duplicate_of_bank excluded, newest
+   recurring row per (category, description)), grouped by category.
+2. Each household has a contiguous range of materialized months
+   (monthly_aggregate_coverage). Reads outside that range are computed once and
+   folded into it.
+3. Session hooks watch Expense/Income inserts, updates and deletes (manual CRUD,
+   bank transaction conversion, reconciliation status changes, imports) and refresh
+   only the covered months the changed rows are active in, in the same transaction.
+4. check_consistency() diffs the stored buckets against the live computation;
+   scripts/rebuild_monthly_aggregates.py rebuilds and verifies from the CLI.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, event, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from ..database import dialect_insert
+from ..models import Expense, Income, MonthlyAggregate, MonthlyAggregateCoverage
+from .monthly_totals_service import MonthlyTotalsService, YearMonth
+
+logger = logging.getLogger(__name__)
+
+# kind column value -> source model
+KINDS = {"income": Income, "expense": Expense}
+
+# Result key used by MonthlyTotalsService.calculate_range() for each kind
+RESULT_KEYS = {"income": "income", "expense": "expenses"}
+
+SUM_FIELDS = ("total", "from_bank", "from_manual")
+COUNT_FIELDS = ("bank_count", "manual_count", "duplicate_count", "unreviewed_count")
+
+# Stored values are sums of floats; compare with a sub-cent tolerance
+CONSISTENCY_TOLERANCE = 0.005
+
+_PENDING_KEY = "monthly_aggregate_pending"
+_APPLYING_KEY = "monthly_aggregate_applying"
+
+
+def _ordinal(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+
+def _from_ordinal(ordinal: int) -> YearMonth:
+    return ordinal // 12, ordinal % 12 + 1
+
+
+def _empty_totals() -> Dict:
+    totals = {field: 0 for field in SUM_FIELDS + COUNT_FIELDS}
+    totals["by_category"] = {}
+    return totals
+
+
+class MonthlyAggregateService:
+    """Read, maintain and verify the monthly_aggregates table."""
+
+    @staticmethod
+    def get_range(
+        household_id: str, start_ym: YearMonth, end_ym: YearMonth, db: Session
+    ) -> Dict[YearMonth, Dict]:
+        """
+        Read monthly totals for a range of months from the materialized table.
+
+        Months not yet materialized for the household are computed with
+        MonthlyTotalsService and stored in a separate session before reading
+        (see _materialize); the caller's transaction is left alone.
+
+        Returns:
+            Same structure as MonthlyTotalsService.calculate_range(), with an extra
+            "by_category" mapping ({category: total}) in the income and expenses dicts.
+        """
+        months = MonthlyTotalsService._month_range(start_ym, end_ym)
+        MonthlyAggregateService._materialize(household_id, start_ym, end_ym, db)
+
+        results = {
+            ym: {"income": _empty_totals(), "expenses": _empty_totals(), "obligations": 0}
+            for ym in months
+        }
+
+        rows = MonthlyAggregateService._rows_in_range(household_id, start_ym, end_ym, db)
+        for row in sorted(rows, key=lambda r: (r.year, r.month, r.kind, r.category)):
+            ym = (row.year, row.month)
+            if ym not in results:
+                continue
+            totals = results[ym][RESULT_KEYS[row.kind]]
+            for field in SUM_FIELDS + COUNT_FIELDS:
+                totals[field] += getattr(row, field)
+            category = row.category or None
+            totals["by_category"][category] = totals["by_category"].get(category, 0) + row.total
+            if row.kind == "expense" and row.category == "obligations":
+                results[ym]["obligations"] += row.total
+
+        return results
+
+    @staticmethod
+    def get_month(household_id: str, year: int, month: int, db: Session) -> Dict:
+        """Read totals for a single month. Same structure as one get_range() value."""
+        return MonthlyAggregateService.get_range(
+            household_id, (year, month), (year, month), db
+        )[(year, month)]
+
+    @staticmethod
+    def rebuild(
+        household_id: str,
+        db: Session,
+        start_ym: Optional[YearMonth] = None,
+        end_ym: Optional[YearMonth] = None,
+    ) -> Tuple[YearMonth, YearMonth]:
+        """
+        Drop and recompute all materialized months for a household.
+
+        Defaults to the month of the household's earliest Expense/Income row through
+        the current month (or the existing coverage, whichever is wider).
+
+        Returns:
+            The (start_ym, end_ym) range now covered.
+        """
+        coverage = db.query(MonthlyAggregateCoverage).filter(
+            MonthlyAggregateCoverage.household_id == household_id
+        ).first()
+
+        today = date.today()
+        first_ordinal = _ordinal(today.year, today.month)
+        last_ordinal = first_ordinal
+
+        for model in KINDS.values():
+            earliest = db.query(func.min(model.date)).filter(model.user_id == household_id).scalar()
+            if earliest:
+                first_ordinal = min(first_ordinal, _ordinal(earliest.year, earliest.month))
+
+        if coverage:
+            first_ordinal = min(first_ordinal, _ordinal(coverage.first_year, coverage.first_month))
+            last_ordinal = max(last_ordinal, _ordinal(coverage.last_year, coverage.last_month))
+
+        start_ym = start_ym or _from_ordinal(first_ordinal)
+        end_ym = end_ym or _from_ordinal(last_ordinal)
+
+        db.query(MonthlyAggregate).filter(
+            MonthlyAggregate.household_id == household_id
+        ).delete(synchronize_session=False)
+        MonthlyAggregateService._refresh_months(household_id, start_ym, end_ym, db)
+
+        if coverage is None:
+            coverage = MonthlyAggregateCoverage(household_id=household_id)
+            db.add(coverage)
+        coverage.first_year, coverage.first_month = start_ym
+        coverage.last_year, coverage.last_month = end_ym
+        coverage.rebuilt_at = datetime.now(timezone.utc)
+        db.commit()
+
+        logger.info(f"[MonthlyAggregates] Rebuilt {household_id} for {start_ym} - {end_ym}")
+        return start_ym, end_ym
+
+    @staticmethod
+    def check_consistency(household_id: str, db: Session) -> List[Dict]:
+        """
+        Diff the materialized buckets against the live MonthlyTotalsService computation.
+
+        Returns:
+            List of mismatches, each containing year, month, kind, category, field,
+            stored and live values. Empty when the table is consistent (or the
+            household has nothing materialized).
+        """
+        coverage = db.query(MonthlyAggregateCoverage).filter(
+            MonthlyAggregateCoverage.household_id == household_id
+        ).first()
+        if coverage is None:
+            return []
+
+        start_ym = (coverage.first_year, coverage.first_month)
+        end_ym = (coverage.last_year, coverage.last_month)
+        live = MonthlyAggregateService._compute_buckets(household_id, start_ym, end_ym, db)
+
+        stored = {
+            (row.year, row.month, row.kind, row.category): row
+            for row in MonthlyAggregateService._rows_in_range(household_id, start_ym, end_ym, db)
+        }
+
+        mismatches = []
+        for key in sorted(set(live) | set(stored)):
+            live_values = live.get(key, {})
+            row = stored.get(key)
+            for field in SUM_FIELDS + COUNT_FIELDS:
+                live_value = live_values.get(field, 0)
+                stored_value = getattr(row, field) if row is not None else 0
+                if abs(stored_value - live_value) > CONSISTENCY_TOLERANCE:
+                    year, month, kind, category = key
+                    mismatches.append({
+                        "year": year,
+                        "month": month,
+                        "kind": kind,
+                        "category": category or None,
+                        "field": field,
+                        "stored": stored_value,
+                        "live": live_value,
+                    })
+        return mismatches
+
+    @staticmethod
+    def _materialize(
+        household_id: str, start_ym: YearMonth, end_ym: YearMonth, db: Session
+    ) -> None:
+        """
+        Store the requested months the household's coverage lacks, committed on their own.
+
+        Runs in a separate session on db's bind, so the caller's pending work is
+        neither committed nor rolled back. When a concurrent request materialized
+        the same months first (unique conflict), the coverage check runs again
+        against what that request stored.
+        """
+        for attempt in range(2):
+            session = Session(bind=db.get_bind())
+            try:
+                if MonthlyAggregateService._ensure_coverage(household_id, start_ym, end_ym, session):
+                    session.commit()
+                return
+            except IntegrityError:
+                if attempt:
+                    raise
+                logger.info(f"[MonthlyAggregates] Concurrent materialization for {household_id}, retrying")
+            finally:
+                session.close()
+
+    @staticmethod
+    def _ensure_coverage(
+        household_id: str, start_ym: YearMonth, end_ym: YearMonth, db: Session
+    ) -> bool:
+        """
+        Materialize any requested months that fall outside the household's coverage.
+
+        Returns True when rows were written (flushed, not committed). Extending an
+        existing range locks its coverage row, so concurrent readers of the same
+        household extend it one at a time.
+        """
+        start_ordinal = _ordinal(*start_ym)
+        end_ordinal = _ordinal(*end_ym)
+
+        def covers(coverage: MonthlyAggregateCoverage) -> bool:
+            return (
+                _ordinal(coverage.first_year, coverage.first_month) <= start_ordinal
+                and end_ordinal <= _ordinal(coverage.last_year, coverage.last_month)
+            )
+
+        coverage_query = db.query(MonthlyAggregateCoverage).filter(
+            MonthlyAggregateCoverage.household_id == household_id
+        )
+        coverage = coverage_query.first()
+        if coverage is not None and covers(coverage):
+            return False
+
+        if coverage is None:
+            MonthlyAggregateService._refresh_months(household_id, start_ym, end_ym, db)
+            db.add(MonthlyAggregateCoverage(
+                household_id=household_id,
+                first_year=start_ym[0], first_month=start_ym[1],
+                last_year=end_ym[0], last_month=end_ym[1],
+            ))
+            db.flush()
+            return True
+
+        # Re-read under the lock: another request may have extended it meanwhile
+        coverage = coverage_query.populate_existing().with_for_update().one()
+        if covers(coverage):
+            return False
+        covered_first = _ordinal(coverage.first_year, coverage.first_month)
+        covered_last = _ordinal(coverage.last_year, coverage.last_month)
+
+        # Keep coverage contiguous: fill everything between the request and the
+        # existing range, not just the requested months.
+        if start_ordinal < covered_first:
+            MonthlyAggregateService._refresh_months(
+                household_id, start_ym, _from_ordinal(covered_first - 1), db
+            )
+            coverage.first_year, coverage.first_month = start_ym
+        if end_ordinal > covered_last:
+            MonthlyAggregateService._refresh_months(
+                household_id, _from_ordinal(covered_last + 1), end_ym, db
+            )
+            coverage.last_year, coverage.last_month = end_ym
+        db.flush()
+        return True
+
+    @staticmethod
+    def _refresh_months(
+        household_id: str, start_ym: YearMonth, end_ym: YearMonth, db: Session
+    ) -> None:
+        """
+        Replace the stored buckets for [start_ym, end_ym] with freshly computed ones.
+
+        Buckets are upserted on uq_monthly_aggregate_key and only buckets that no
+        longer exist are deleted, so two transactions refreshing the same months
+        don't collide on the key; the last one to commit wins.
+        """
+        buckets = MonthlyAggregateService._compute_buckets(household_id, start_ym, end_ym, db)
+
+        stale = [
+            row_id for row_id, *key in db.query(
+                MonthlyAggregate.id, MonthlyAggregate.year, MonthlyAggregate.month,
+                MonthlyAggregate.kind, MonthlyAggregate.category,
+            ).filter(
+                MonthlyAggregate.household_id == household_id,
+                MonthlyAggregateService._period_filter(start_ym, end_ym),
+            )
+            if tuple(key) not in buckets
+        ]
+        if stale:
+            db.query(MonthlyAggregate).filter(
+                MonthlyAggregate.id.in_(stale)
+            ).delete(synchronize_session=False)
+
+        # One executemany instead of an ORM INSERT per bucket, so materializing a
+        # range costs a fixed number of statements however many categories it has.
+        if buckets:
+            stmt = dialect_insert(db, MonthlyAggregate)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["household_id", "year", "month", "kind", "category"],
+                set_={
+                    **{field: stmt.excluded[field] for field in SUM_FIELDS + COUNT_FIELDS},
+                    "updated_at": func.now(),
+                },
+            )
+            db.execute(stmt, [
+                {
+                    "household_id": household_id,
+                    "year": year,
+                    "month": month,
+                    "kind": kind,
+                    "category": category,
+                    **values,
+                }
+                for (year, month, kind, category), values in buckets.items()
+            ])
+        db.flush()
+
+    @staticmethod
+    def _compute_buckets(
+        household_id: str, start_ym: YearMonth, end_ym: YearMonth, db: Session
+    ) -> Dict[Tuple[int, int, str, str], Dict]:
+        """
+        Compute per-(month, kind, category) totals from raw rows.
+
+        Recurring dedup keys on (category, description), so summarizing each
+        category separately yields buckets that add up to the monthly totals.
+        """
+        months = MonthlyTotalsService._month_range(start_ym, end_ym)
+        window_start = date(start_ym[0], start_ym[1], 1)
+        window_end = MonthlyTotalsService._month_bounds(*end_ym)[1]
+
+        buckets = {}
+        for kind, model in KINDS.items():
+            entries = MonthlyTotalsService._query_overlapping(
+                model, household_id, window_start, window_end, db
+            )
+            by_month = MonthlyTotalsService._bucket_by_month(entries, months)
+            for (year, month), month_entries in by_month.items():
+                by_category = defaultdict(list)
+                for entry in month_entries:
+                    by_category[entry.category or ""].append(entry)
+                for category, category_entries in by_category.items():
+                    totals = MonthlyTotalsService._summarize_entries(category_entries)
+                    buckets[(year, month, kind, category)] = {
+                        field: totals[field] for field in SUM_FIELDS + COUNT_FIELDS
+                    }
+        return buckets
+
+    @staticmethod
+    def _rows_in_range(
+        household_id: str, start_ym: YearMonth, end_ym: YearMonth, db: Session
+    ) -> List[MonthlyAggregate]:
+        # Upserts keep row identities, so refresh rows already in the session
+        return db.query(MonthlyAggregate).populate_existing().filter(
+            MonthlyAggregate.household_id == household_id,
+            MonthlyAggregateService._period_filter(start_ym, end_ym),
+        ).all()
+
+    @staticmethod
+    def _period_filter(start_ym: YearMonth, end_ym: YearMonth):
+        """SQL filter for rows whose (year, month) falls within [start_ym, end_ym]."""
+        period = MonthlyAggregate.year * 12 + MonthlyAggregate.month - 1
+        return and_(
+            MonthlyAggregate.year.between(start_ym[0], end_ym[0]),
+            period >= _ordinal(*start_ym),
+            period <= _ordinal(*end_ym),
+        )
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _active_span(user_id, entry_date, end_date, is_recurring) -> Optional[Tuple[str, int, Optional[int]]]:
+        """
+        Months an Expense/Income row contributes to, as (household_id, first, last).
+
+        last is None for open-ended recurring rows. Rows MonthlyTotalsService never
+        counts (no date, is_recurring NULL) have no span.
+        """
+        if user_id is None or entry_date is None or is_recurring is None:
+            return None
+        first = _ordinal(entry_date.year, entry_date.month)
+        if not is_recurring:
+            return user_id, first, first
+        if end_date is None:
+            return user_id, first, None
+        return user_id, first, _ordinal(end_date.year, end_date.month)
+
+    @staticmethod
+    def _collect_changes(session: Session) -> None:
+        """Record the spans touched by Expense/Income rows in the current flush."""
+        if session.info.get(_APPLYING_KEY):
+            return
+
+        pending = session.info.setdefault(_PENDING_KEY, {})
+
+        def add(span):
+            if span is None:
+                return
+            household_id, first, last = span
+            current = pending.get(household_id)
+            if current is None:
+                pending[household_id] = [first, last]
+                return
+            current[0] = min(current[0], first)
+            current[1] = None if last is None or current[1] is None else max(current[1], last)
+
+        tracked = ("user_id", "date", "end_date", "is_recurring")
+        for obj in list(session.new) + list(session.deleted):
+            if isinstance(obj, (Expense, Income)):
+                add(MonthlyAggregateService._active_span(*(getattr(obj, attr) for attr in tracked)))
+
+        for obj in session.dirty:
+            if not isinstance(obj, (Expense, Income)):
+                continue
+            # An update can move a row between months, so refresh both where it
+            # was and where it is now.
+            add(MonthlyAggregateService._active_span(*(getattr(obj, attr) for attr in tracked)))
+            previous = []
+            for attr in tracked:
+                history = get_history(obj, attr)
+                previous.append(history.deleted[0] if history.deleted else getattr(obj, attr))
+            add(MonthlyAggregateService._active_span(*previous))
+
+    @staticmethod
+    def _apply_pending(session: Session) -> None:
+        """Refresh covered months for households whose rows changed in this transaction."""
+        if session.info.get(_APPLYING_KEY):
+            return
+        if session.new or session.dirty or session.deleted:
+            session.flush()
+
+        pending = session.info.pop(_PENDING_KEY, None)
+        if not pending:
+            return
+
+        session.info[_APPLYING_KEY] = True
+        try:
+            coverages = session.query(MonthlyAggregateCoverage).filter(
+                MonthlyAggregateCoverage.household_id.in_(list(pending))
+            ).all()
+            for coverage in coverages:
+                first, last = pending[coverage.household_id]
+                covered_first = _ordinal(coverage.first_year, coverage.first_month)
+                covered_last = _ordinal(coverage.last_year, coverage.last_month)
+                start = max(first, covered_first)
+                end = covered_last if last is None else min(last, covered_last)
+                if start > end:
+                    continue
+                MonthlyAggregateService._refresh_months(
+                    coverage.household_id, _from_ordinal(start), _from_ordinal(end), session
+                )
+        finally:
+            session.info.pop(_APPLYING_KEY, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _monthly_aggregates_after_flush(session, flush_context):
+    MonthlyAggregateService._collect_changes(session)
+
+
+@event.listens_for(Session, "before_commit")
+def _monthly_aggregates_before_commit(session):
+    MonthlyAggregateService._apply_pending(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _monthly_aggregates_after_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -12,7 +12,11 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func, extract
 from datetime import date, timedelta
 from ..models import Expense, Income, BankTransaction
-import difflib
+from .reconciliation_candidates import ReconciliationCandidates
+from .reconciliation_engine import score_match
+
+
+YearMonth = Tuple[int, int]
 
 
 class MonthlyTotalsService:
@@ -46,46 +50,7 @@ class MonthlyTotalsService:
         expenses = MonthlyTotalsService._query_active_expenses_for_month(
             user_id, year, month, db
         )
-
-        # Separate by source
-        bank_backed = [e for e in expenses if e.bank_transaction_id is not None]
-        manual = [e for e in expenses if e.bank_transaction_id is None]
-
-        # Filter out duplicates from manual entries (bank reconciliation duplicates)
-        deduplicated_manual = [
-            e for e in manual
-            if e.reconciliation_status not in ["duplicate_of_bank"]
-        ]
-
-        # Deduplicate recurring manual entries with no end_date that share (category, description).
-        # When a user edits a recurring expense, a new row is created without closing the old one,
-        # leaving two rows with end_date=None. Keep only the newest (highest id).
-        seen_recurring: dict = {}
-        non_recurring_manual = []
-        for e in deduplicated_manual:
-            if e.is_recurring and e.end_date is None:
-                key = (e.category, e.description)
-                if key not in seen_recurring or e.id > seen_recurring[key].id:
-                    seen_recurring[key] = e
-            else:
-                non_recurring_manual.append(e)
-        deduplicated_manual = non_recurring_manual + list(seen_recurring.values())
-
-        # Count unreviewed entries (manual entries created after bank connection)
-        unreviewed = [
-            e for e in manual
-            if e.reconciliation_status == "unreviewed"
-        ]
-
-        return {
-            "total": sum(e.amount for e in bank_backed) + sum(e.amount for e in deduplicated_manual),
-            "from_bank": sum(e.amount for e in bank_backed),
-            "from_manual": sum(e.amount for e in deduplicated_manual),
-            "bank_count": len(bank_backed),
-            "manual_count": len(deduplicated_manual),
-            "duplicate_count": len(manual) - len(deduplicated_manual),
-            "unreviewed_count": len(unreviewed),
-        }
+        return MonthlyTotalsService._summarize_entries(expenses)
 
     @staticmethod
     def calculate_monthly_income(
@@ -101,41 +66,109 @@ class MonthlyTotalsService:
         income = MonthlyTotalsService._query_active_income_for_month(
             user_id, year, month, db
         )
+        return MonthlyTotalsService._summarize_entries(income)
 
+    @staticmethod
+    def calculate_monthly_obligations(
+        user_id: str, year: int, month: int, db: Session
+    ) -> float:
+        """
+        Calculate total of expenses with category='obligations' for a given month.
+        These represent actual loan/obligation payments and should be counted as
+        actual_loan_payments in the budget, not as regular actual_expenses.
+        """
+        expenses = MonthlyTotalsService._query_active_expenses_for_month(
+            user_id, year, month, db
+        )
+        return MonthlyTotalsService._sum_obligations(expenses)
+
+    @staticmethod
+    def calculate_range(
+        user_id: str, start_ym: YearMonth, end_ym: YearMonth, db: Session
+    ) -> Dict[YearMonth, Dict]:
+        """
+        Calculate income, expenses and obligations for every month in a range.
+
+        Equivalent to calling calculate_monthly_income(), calculate_monthly_expenses()
+        and calculate_monthly_obligations() once per month, but fetches all rows that
+        overlap the window with a single query per table and buckets them in memory.
+
+        Args:
+            user_id: User ID
+            start_ym: First month as (year, month), inclusive
+            end_ym: Last month as (year, month), inclusive
+            db: Database session
+
+        Returns:
+            Dictionary keyed by (year, month) in ascending order, each value containing:
+                - income: Same structure as calculate_monthly_income()
+                - expenses: Same structure as calculate_monthly_expenses()
+                - obligations: Same value as calculate_monthly_obligations()
+        """
+        months = MonthlyTotalsService._month_range(start_ym, end_ym)
+        window_start = date(start_ym[0], start_ym[1], 1)
+        window_end = MonthlyTotalsService._month_bounds(*end_ym)[1]
+
+        expenses = MonthlyTotalsService._query_overlapping(
+            Expense, user_id, window_start, window_end, db
+        )
+        income = MonthlyTotalsService._query_overlapping(
+            Income, user_id, window_start, window_end, db
+        )
+
+        expenses_by_month = MonthlyTotalsService._bucket_by_month(expenses, months)
+        income_by_month = MonthlyTotalsService._bucket_by_month(income, months)
+
+        return {
+            ym: {
+                "income": MonthlyTotalsService._summarize_entries(income_by_month[ym]),
+                "expenses": MonthlyTotalsService._summarize_entries(expenses_by_month[ym]),
+                "obligations": MonthlyTotalsService._sum_obligations(expenses_by_month[ym]),
+            }
+            for ym in months
+        }
+
+    @staticmethod
+    def _summarize_entries(entries: List) -> Dict:
+        """
+        Apply bank/manual deduplication to the Expense or Income rows active in one month.
+
+        Returns the dictionary documented in calculate_monthly_expenses().
+        """
         # Separate by source
-        bank_backed = [i for i in income if i.bank_transaction_id is not None]
-        manual = [i for i in income if i.bank_transaction_id is None]
+        bank_backed = [e for e in entries if e.bank_transaction_id is not None]
+        manual = [e for e in entries if e.bank_transaction_id is None]
 
         # Filter out duplicates from manual entries (bank reconciliation duplicates)
         deduplicated_manual = [
-            i for i in manual
-            if i.reconciliation_status not in ["duplicate_of_bank"]
+            e for e in manual
+            if e.reconciliation_status not in ["duplicate_of_bank"]
         ]
 
         # Deduplicate recurring manual entries with no end_date that share (category, description).
-        # When a user edits a recurring income, a new row is created without closing the old one,
-        # leaving two rows with end_date=None for the same income. Keep only the newest (highest id).
+        # When a user edits a recurring entry, a new row is created without closing the old one,
+        # leaving two rows with end_date=None. Keep only the newest (highest id).
         seen_recurring: dict = {}
         non_recurring_manual = []
-        for i in deduplicated_manual:
-            if i.is_recurring and i.end_date is None:
-                key = (i.category, i.description)
-                if key not in seen_recurring or i.id > seen_recurring[key].id:
-                    seen_recurring[key] = i
+        for e in deduplicated_manual:
+            if e.is_recurring and e.end_date is None:
+                key = (e.category, e.description)
+                if key not in seen_recurring or e.id > seen_recurring[key].id:
+                    seen_recurring[key] = e
             else:
-                non_recurring_manual.append(i)
+                non_recurring_manual.append(e)
         deduplicated_manual = non_recurring_manual + list(seen_recurring.values())
 
-        # Count unreviewed entries
+        # Count unreviewed entries (manual entries created after bank connection)
         unreviewed = [
-            i for i in manual
-            if i.reconciliation_status == "unreviewed"
+            e for e in manual
+            if e.reconciliation_status == "unreviewed"
         ]
 
         return {
-            "total": sum(i.amount for i in bank_backed) + sum(i.amount for i in deduplicated_manual),
-            "from_bank": sum(i.amount for i in bank_backed),
-            "from_manual": sum(i.amount for i in deduplicated_manual),
+            "total": sum(e.amount for e in bank_backed) + sum(e.amount for e in deduplicated_manual),
+            "from_bank": sum(e.amount for e in bank_backed),
+            "from_manual": sum(e.amount for e in deduplicated_manual),
             "bank_count": len(bank_backed),
             "manual_count": len(deduplicated_manual),
             "duplicate_count": len(manual) - len(deduplicated_manual),
@@ -143,17 +176,8 @@ class MonthlyTotalsService:
         }
 
     @staticmethod
-    def calculate_monthly_obligations(
-        user_id: str, year: int, month: int, db: Session
-    ) -> float:
-        """
-        Calculate total of expenses with category='obligations' for a given month.
-        These represent actual loan/obligation payments and should be counted as
-        actual_loan_payments in the budget, not as regular actual_expenses.
-        """
-        expenses = MonthlyTotalsService._query_active_expenses_for_month(
-            user_id, year, month, db
-        )
+    def _sum_obligations(expenses: List[Expense]) -> float:
+        """Sum category='obligations' expenses, excluding manual duplicates of bank entries."""
         obligations = [e for e in expenses if e.category == "obligations"]
         # Apply same dedup as regular expenses
         bank_backed = [e for e in obligations if e.bank_transaction_id is not None]
@@ -174,6 +198,9 @@ class MonthlyTotalsService:
         """
         Find potential duplicate transactions between manual entries and bank transactions.
         Uses fuzzy matching: date ±3 days, amount ±2%, description similarity.
+        Pairs outside the date window or amount band aren't considered
+        (see reconciliation_engine). Reads the maintained reconciliation_candidates
+        table; reconciliation_engine.rank_suggestions() computes the same from scratch.
 
         Args:
             user_id: User ID
@@ -188,129 +215,15 @@ class MonthlyTotalsService:
                 - match_score: Confidence score (0.0-1.0)
                 - match_reasons: List of matching factors
         """
-        suggestions = []
-
-        # Get unreviewed manual expenses from last 6 months
-        six_months_ago = date.today() - timedelta(days=180)
-        manual_expenses = db.query(Expense).filter(
-            and_(
-                Expense.user_id == user_id,
-                Expense.bank_transaction_id.is_(None),
-                Expense.reconciliation_status == "unreviewed",
-                Expense.date >= six_months_ago
-            )
-        ).all()
-
-        # Get unreviewed manual income from last 6 months
-        manual_income = db.query(Income).filter(
-            and_(
-                Income.user_id == user_id,
-                Income.bank_transaction_id.is_(None),
-                Income.reconciliation_status == "unreviewed",
-                Income.date >= six_months_ago
-            )
-        ).all()
-
-        # Get bank transactions from last 6 months that aren't already accepted
-        bank_transactions = db.query(BankTransaction).filter(
-            and_(
-                BankTransaction.user_id == user_id,
-                BankTransaction.date >= six_months_ago,
-                BankTransaction.status == "pending"
-            )
-        ).all()
-
-        # Match expenses with negative bank transactions
-        for expense in manual_expenses:
-            for bank_tx in bank_transactions:
-                if bank_tx.amount < 0:  # Negative = expense
-                    match_score, reasons = MonthlyTotalsService._calculate_match_score(
-                        expense, bank_tx
-                    )
-                    if match_score >= min_score:
-                        suggestions.append({
-                            "manual_entry": expense,
-                            "entry_type": "expense",
-                            "bank_transaction": bank_tx,
-                            "match_score": match_score,
-                            "match_reasons": reasons
-                        })
-
-        # Match income with positive bank transactions
-        for income in manual_income:
-            for bank_tx in bank_transactions:
-                if bank_tx.amount > 0:  # Positive = income
-                    match_score, reasons = MonthlyTotalsService._calculate_match_score(
-                        income, bank_tx
-                    )
-                    if match_score >= min_score:
-                        suggestions.append({
-                            "manual_entry": income,
-                            "entry_type": "income",
-                            "bank_transaction": bank_tx,
-                            "match_score": match_score,
-                            "match_reasons": reasons
-                        })
-
-        # Sort by match score (highest first) and limit
-        suggestions.sort(key=lambda x: x["match_score"], reverse=True)
-        return suggestions[:limit]
+        return ReconciliationCandidates.read_suggestions(user_id, db, limit=limit, min_score=min_score)
 
     @staticmethod
     def _calculate_match_score(
         manual_entry,  # Expense or Income
         bank_transaction: BankTransaction
     ) -> Tuple[float, List[str]]:
-        """
-        Calculate match score between a manual entry and bank transaction.
-
-        Matching criteria:
-        - Date within ±3 days: +0.3
-        - Amount within ±2%: +0.4
-        - Description similarity > 0.6: +0.3
-
-        Returns:
-            Tuple of (score, reasons) where score is 0.0-1.0
-        """
-        score = 0.0
-        reasons = []
-
-        # 1. Date matching (±3 days)
-        date_diff = abs((manual_entry.date - bank_transaction.date).days)
-        if date_diff == 0:
-            score += 0.3
-            reasons.append("Same date")
-        elif date_diff <= 3:
-            score += 0.2
-            reasons.append(f"Date within {date_diff} days")
-
-        # 2. Amount matching (±2%)
-        manual_amount = abs(manual_entry.amount)
-        bank_amount = abs(bank_transaction.amount)
-        amount_diff_pct = abs(manual_amount - bank_amount) / max(manual_amount, bank_amount)
-
-        if amount_diff_pct < 0.001:  # Exact match
-            score += 0.4
-            reasons.append("Exact amount match")
-        elif amount_diff_pct <= 0.02:  # Within 2%
-            score += 0.3
-            reasons.append(f"Amount within {amount_diff_pct*100:.1f}%")
-
-        # 3. Description similarity
-        manual_desc = manual_entry.description.lower()
-        bank_desc = (bank_transaction.description_display or "").lower()
-
-        # Use SequenceMatcher for fuzzy string matching
-        similarity = difflib.SequenceMatcher(None, manual_desc, bank_desc).ratio()
-
-        if similarity > 0.8:
-            score += 0.3
-            reasons.append("Very similar descriptions")
-        elif similarity > 0.6:
-            score += 0.2
-            reasons.append("Similar descriptions")
-
-        return score, reasons
+        """Calculate match score between a manual entry and bank transaction (see score_match)."""
+        return score_match(manual_entry, bank_transaction)
 
     @staticmethod
     def _query_active_expenses_for_month(
@@ -323,14 +236,7 @@ class MonthlyTotalsService:
         - One-off expenses (date in month)
         - Recurring expenses (active during month)
         """
-        # First day of month
-        month_start = date(year, month, 1)
-
-        # Last day of month
-        if month == 12:
-            month_end = date(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            month_end = date(year, month + 1, 1) - timedelta(days=1)
+        month_start, month_end = MonthlyTotalsService._month_bounds(year, month)
 
         expenses = db.query(Expense).filter(
             and_(
@@ -366,14 +272,7 @@ class MonthlyTotalsService:
 
         Same logic as _query_active_expenses_for_month but for Income.
         """
-        # First day of month
-        month_start = date(year, month, 1)
-
-        # Last day of month
-        if month == 12:
-            month_end = date(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            month_end = date(year, month + 1, 1) - timedelta(days=1)
+        month_start, month_end = MonthlyTotalsService._month_bounds(year, month)
 
         income = db.query(Income).filter(
             and_(
@@ -399,3 +298,81 @@ class MonthlyTotalsService:
         ).all()
 
         return income
+
+    @staticmethod
+    def _query_overlapping(
+        model, user_id: str, window_start: date, window_end: date, db: Session
+    ) -> List:
+        """
+        Query all Expense or Income records active at any point in [window_start, window_end].
+
+        Uses the same one-off/recurring predicates as the per-month queries, widened
+        to the whole window, so every row the per-month queries would return for any
+        month in the window is fetched exactly once.
+        """
+        return db.query(model).filter(
+            and_(
+                model.user_id == user_id,
+                or_(
+                    and_(
+                        model.is_recurring == False,
+                        model.date >= window_start,
+                        model.date <= window_end
+                    ),
+                    and_(
+                        model.is_recurring == True,
+                        model.date <= window_end,
+                        or_(
+                            model.end_date.is_(None),
+                            model.end_date >= window_start
+                        )
+                    )
+                )
+            )
+        ).order_by(model.id).all()
+
+    @staticmethod
+    def _bucket_by_month(entries: List, months: List[YearMonth]) -> Dict[YearMonth, List]:
+        """
+        Expand rows into the months they are active in.
+
+        One-off rows land in the month of their date. Recurring rows land in every
+        month from their start date through their end_date (or the end of the range).
+        """
+        buckets: Dict[YearMonth, List] = {ym: [] for ym in months}
+        first_ordinal = months[0][0] * 12 + months[0][1] - 1
+        last_ordinal = months[-1][0] * 12 + months[-1][1] - 1
+
+        for entry in entries:
+            start_ordinal = entry.date.year * 12 + entry.date.month - 1
+            if entry.is_recurring:
+                if entry.end_date is None:
+                    end_ordinal = last_ordinal
+                else:
+                    end_ordinal = entry.end_date.year * 12 + entry.end_date.month - 1
+            else:
+                end_ordinal = start_ordinal
+
+            for ordinal in range(max(start_ordinal, first_ordinal), min(end_ordinal, last_ordinal) + 1):
+                buckets[(ordinal // 12, ordinal % 12 + 1)].append(entry)
+
+        return buckets
+
+    @staticmethod
+    def _month_range(start_ym: YearMonth, end_ym: YearMonth) -> List[YearMonth]:
+        """List (year, month) pairs from start_ym to end_ym inclusive."""
+        first = start_ym[0] * 12 + start_ym[1] - 1
+        last = end_ym[0] * 12 + end_ym[1] - 1
+        if last < first:
+            raise ValueError(f"end_ym {end_ym} is before start_ym {start_ym}")
+        return [(o // 12, o % 12 + 1) for o in range(first, last + 1)]
+
+    @staticmethod
+    def _month_bounds(year: int, month: int) -> Tuple[date, date]:
+        """Return the first and last day of a month."""
+        month_start = date(year, month, 1)
+        if month == 12:
+            month_end = date(year + 1, 1, 1) - timedelta(days=1)
+        else:
+            month_end = date(year, month + 1, 1) - timedelta(days=1)
+        return month_start, month_end
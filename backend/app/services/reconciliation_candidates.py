@@ -0,0 +1,321 @@
+"""
+ReconciliationCandidates - Persisted duplicate suggestions between manual entries and bank transactions.
+
+/reconciliation/suggestions reads the reconciliation_candidates table (one
+indexed query ordered by match_score) instead of re-running the matching
+engine on every request.
+
+How it stays correct:
+1. reconciliation_engine is the reference: rows hold exactly the pairs
+   iter_scored_pairs() yields for unreviewed manual entries (no bank link) and
+   pending bank transactions, scored with score_match().
+2. Session hooks watch Expense/Income/BankTransaction inserts, updates and
+   deletes. When a row is written, its own candidates are dropped and - if it
+   is still eligible - it alone is matched against the other side's rows within
+   its date window, in the same transaction. A status change (reviewed entry,
+   accepted/rejected bank transaction) therefore prunes its candidates.
+3. Writes the hooks can't see (the sync ingestion pipeline's Core inserts,
+   bulk accept/reject updates) register their rows with queue_bank_transactions().
+4. scripts/rebuild_reconciliation_candidates.py rebuilds a household from
+   scratch (e.g. after the migration).
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, extract, func, insert, or_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import get_history
+
+from ..models import BankTransaction, Expense, Income, ReconciliationCandidate
+from .reconciliation_engine import (
+    MIN_SUGGESTION_SCORE,
+    SUGGESTION_LOOKBACK_DAYS,
+    SUGGESTION_WINDOW_DAYS,
+    iter_scored_pairs,
+    matches_sign,
+)
+
+# entry_type -> manual model and the candidate column referencing it
+MANUAL_MODELS = {"expense": Expense, "income": Income}
+CANDIDATE_COLUMNS = {
+    "expense": ReconciliationCandidate.expense_id,
+    "income": ReconciliationCandidate.income_id,
+}
+
+# Attributes whose change can add, rescore or remove a pair
+MANUAL_TRACKED = ("user_id", "date", "amount", "description", "reconciliation_status", "bank_transaction_id")
+BANK_TRACKED = ("user_id", "date", "amount", "description_display", "status")
+
+_PENDING_KEY = "reconciliation_candidates_pending"
+_APPLYING_KEY = "reconciliation_candidates_applying"
+
+
+def _pending(session: Session) -> Dict[str, Set]:
+    return session.info.setdefault(
+        _PENDING_KEY, {"expense": set(), "income": set(), "bank": set(), "bank_tink_ids": set()}
+    )
+
+
+def _eligible_manual(model):
+    return (model.reconciliation_status == "unreviewed", model.bank_transaction_id.is_(None))
+
+
+def queue_bank_transactions(
+    session: Session,
+    tink_transaction_ids: Iterable[str] = (),
+    ids: Iterable[int] = (),
+) -> None:
+    """Rematch bank transactions written without the ORM (Core inserts, bulk updates) on commit."""
+    pending = _pending(session)
+    pending["bank_tink_ids"].update(tink_transaction_ids)
+    pending["bank"].update(ids)
+
+
+class ReconciliationCandidates:
+    """Read and maintain the reconciliation_candidates table."""
+
+    @staticmethod
+    def read_suggestions(
+        household_id: str,
+        db: Session,
+        limit: int = 50,
+        min_score: float = MIN_SUGGESTION_SCORE,
+        month: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Best stored suggestions, highest match score first.
+
+        Same shape as reconciliation_engine.rank_suggestions(); manual entries
+        older than SUGGESTION_LOOKBACK_DAYS are left out. Only pairs scoring at
+        least MIN_SUGGESTION_SCORE are stored, so a lower min_score is rejected.
+        """
+        if min_score < MIN_SUGGESTION_SCORE:
+            raise ValueError(
+                f"min_score {min_score} is below MIN_SUGGESTION_SCORE ({MIN_SUGGESTION_SCORE}); "
+                "lower-scored candidates aren't stored"
+            )
+        if limit <= 0:
+            return []
+
+        since = date.today() - timedelta(days=SUGGESTION_LOOKBACK_DAYS)
+        query = db.query(ReconciliationCandidate).options(
+            selectinload(ReconciliationCandidate.expense),
+            selectinload(ReconciliationCandidate.income),
+            selectinload(ReconciliationCandidate.bank_transaction),
+        ).filter(
+            ReconciliationCandidate.user_id == household_id,
+            ReconciliationCandidate.match_score >= min_score,
+            ReconciliationCandidate.manual_date >= since,
+        )
+        if month is not None:
+            query = query.filter(extract("month", ReconciliationCandidate.manual_date) == month)
+
+        candidates = query.order_by(
+            ReconciliationCandidate.match_score.desc(),
+            ReconciliationCandidate.entry_type,
+            ReconciliationCandidate.manual_date,
+            func.coalesce(ReconciliationCandidate.expense_id, ReconciliationCandidate.income_id),
+            ReconciliationCandidate.bank_transaction_id,
+        ).limit(limit).all()
+
+        return [
+            {
+                "manual_entry": candidate.expense if candidate.entry_type == "expense" else candidate.income,
+                "entry_type": candidate.entry_type,
+                "bank_transaction": candidate.bank_transaction,
+                "match_score": candidate.match_score,
+                "match_reasons": candidate.match_reasons,
+            }
+            for candidate in candidates
+        ]
+
+    @staticmethod
+    def rebuild(household_id: str, db: Session) -> int:
+        """Recompute every candidate of a household (not committed). Returns the row count."""
+        db.query(ReconciliationCandidate).filter(
+            ReconciliationCandidate.user_id == household_id
+        ).delete(synchronize_session=False)
+
+        bank_transactions = db.query(BankTransaction).filter(
+            BankTransaction.user_id == household_id,
+            BankTransaction.status == "pending",
+        ).order_by(BankTransaction.date, BankTransaction.id).all()
+
+        rows = []
+        for entry_type, model in MANUAL_MODELS.items():
+            entries = db.query(model).filter(
+                model.user_id == household_id,
+                model.date.isnot(None),
+                *_eligible_manual(model),
+            ).order_by(model.date, model.id).all()
+            candidates = [tx for tx in bank_transactions if matches_sign(entry_type, tx.amount)]
+            rows.extend(
+                ReconciliationCandidates._row(entry_type, entry, bank_tx, score, reasons)
+                for entry, bank_tx, score, reasons in iter_scored_pairs(entries, candidates)
+            )
+
+        if rows:
+            db.execute(insert(ReconciliationCandidate), rows)
+        return len(rows)
+
+    @staticmethod
+    def _row(entry_type: str, entry, bank_tx: BankTransaction, score: float, reasons: List[str]) -> Dict:
+        return {
+            "user_id": entry.user_id,
+            "entry_type": entry_type,
+            "expense_id": entry.id if entry_type == "expense" else None,
+            "income_id": entry.id if entry_type == "income" else None,
+            "bank_transaction_id": bank_tx.id,
+            "manual_date": entry.date,
+            "match_score": score,
+            "match_reasons": reasons,
+        }
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _collect_changes(session: Session) -> None:
+        """Record the Expense/Income/BankTransaction rows written in the current flush."""
+        if session.info.get(_APPLYING_KEY):
+            return
+
+        pending = None
+
+        def changed(obj, tracked):
+            return any(get_history(obj, attr).has_changes() for attr in tracked)
+
+        for obj in list(session.new) + list(session.deleted) + list(session.dirty):
+            if isinstance(obj, BankTransaction):
+                key, tracked = "bank", BANK_TRACKED
+            elif isinstance(obj, Expense):
+                key, tracked = "expense", MANUAL_TRACKED
+            elif isinstance(obj, Income):
+                key, tracked = "income", MANUAL_TRACKED
+            else:
+                continue
+            if obj in session.dirty and obj not in session.new and not changed(obj, tracked):
+                continue
+            if obj.id is None:
+                continue
+            if pending is None:
+                pending = _pending(session)
+            pending[key].add(obj.id)
+
+    @staticmethod
+    def _apply_pending(session: Session) -> None:
+        """Rematch the rows written in this transaction, each against its own window."""
+        if session.info.get(_APPLYING_KEY):
+            return
+        if session.new or session.dirty or session.deleted:
+            session.flush()
+
+        pending = session.info.pop(_PENDING_KEY, None)
+        if not pending or not any(pending.values()):
+            return
+
+        session.info[_APPLYING_KEY] = True
+        try:
+            ReconciliationCandidates._rematch(session, pending)
+        finally:
+            session.info.pop(_APPLYING_KEY, None)
+
+    @staticmethod
+    def _rematch(session: Session, pending: Dict[str, Set]) -> None:
+        bank_filters = []
+        if pending["bank"]:
+            bank_filters.append(BankTransaction.id.in_(pending["bank"]))
+        if pending["bank_tink_ids"]:
+            bank_filters.append(BankTransaction.tink_transaction_id.in_(pending["bank_tink_ids"]))
+        written_banks = []
+        if bank_filters:
+            # populate_existing: bulk updates leave loaded rows with stale statuses
+            written_banks = session.query(BankTransaction).populate_existing().filter(or_(*bank_filters)).all()
+        bank_ids = pending["bank"] | {tx.id for tx in written_banks}
+
+        # Drop every candidate touching a written row (deleted rows included)
+        stale = [ReconciliationCandidate.bank_transaction_id.in_(bank_ids)] if bank_ids else []
+        for entry_type in MANUAL_MODELS:
+            if pending[entry_type]:
+                stale.append(CANDIDATE_COLUMNS[entry_type].in_(pending[entry_type]))
+        if stale:
+            session.query(ReconciliationCandidate).filter(or_(*stale)).delete(synchronize_session=False)
+
+        pairs: Dict[Tuple[str, int, int], Dict] = {}
+
+        def add(entry_type, matches):
+            for entry, bank_tx, score, reasons in matches:
+                pairs[(entry_type, entry.id, bank_tx.id)] = ReconciliationCandidates._row(
+                    entry_type, entry, bank_tx, score, reasons
+                )
+
+        # Written manual entries against pending bank rows in their window
+        for entry_type, model in MANUAL_MODELS.items():
+            if not pending[entry_type]:
+                continue
+            entries = session.query(model).filter(
+                model.id.in_(pending[entry_type]),
+                model.date.isnot(None),
+                *_eligible_manual(model),
+            ).all()
+            for household_id, household_entries in ReconciliationCandidates._by_household(entries).items():
+                window_start, window_end = ReconciliationCandidates._window(household_entries)
+                bank_transactions = [
+                    tx for tx in session.query(BankTransaction).filter(
+                        BankTransaction.user_id == household_id,
+                        BankTransaction.status == "pending",
+                        BankTransaction.date.between(window_start, window_end),
+                    ).order_by(BankTransaction.date, BankTransaction.id)
+                    if matches_sign(entry_type, tx.amount)
+                ]
+                add(entry_type, iter_scored_pairs(household_entries, bank_transactions))
+
+        # Written pending bank rows against eligible manual entries in their window
+        pending_banks = [tx for tx in written_banks if tx.status == "pending"]
+        for household_id, household_banks in ReconciliationCandidates._by_household(pending_banks).items():
+            window_start, window_end = ReconciliationCandidates._window(household_banks)
+            for entry_type, model in MANUAL_MODELS.items():
+                bank_transactions = [tx for tx in household_banks if matches_sign(entry_type, tx.amount)]
+                if not bank_transactions:
+                    continue
+                entries = session.query(model).filter(
+                    model.user_id == household_id,
+                    model.date.between(window_start, window_end),
+                    *_eligible_manual(model),
+                ).order_by(model.date, model.id).all()
+                add(entry_type, iter_scored_pairs(entries, bank_transactions))
+
+        if pairs:
+            session.execute(insert(ReconciliationCandidate), list(pairs.values()))
+
+    @staticmethod
+    def _by_household(rows) -> Dict[str, List]:
+        """Group rows by household, each group sorted by (date, id) for the window join."""
+        grouped = defaultdict(list)
+        for row in sorted(rows, key=lambda row: (row.date, row.id)):
+            if row.user_id is not None:
+                grouped[row.user_id].append(row)
+        return grouped
+
+    @staticmethod
+    def _window(rows) -> Tuple[date, date]:
+        """Date range the other side must fall in to pair with any of rows (sorted by date)."""
+        window = timedelta(days=SUGGESTION_WINDOW_DAYS)
+        return rows[0].date - window, rows[-1].date + window
+
+
+@event.listens_for(Session, "after_flush")
+def _reconciliation_candidates_after_flush(session, flush_context):
+    ReconciliationCandidates._collect_changes(session)
+
+
+@event.listens_for(Session, "before_commit")
+def _reconciliation_candidates_before_commit(session):
+    ReconciliationCandidates._apply_pending(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _reconciliation_candidates_after_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
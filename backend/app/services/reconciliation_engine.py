@@ -0,0 +1,227 @@
+"""
+Reconciliation suggestion engine.
+
+Suggests which unreviewed manual expenses/income duplicate a pending bank
+transaction. Rather than scoring every manual entry against every bank
+transaction:
+1. Both sides are loaded sorted by date and joined with a sliding window, so
+   each manual entry only meets bank rows within ±SUGGESTION_WINDOW_DAYS.
+2. Pairs outside the ±AMOUNT_TOLERANCE_PCT amount band are dropped before any
+   description is compared.
+3. Surviving pairs are scored (score_match) and only the best `limit` are kept
+   in a bounded min-heap, so memory stays O(limit).
+
+Expenses are matched with negative bank amounts, income with positive ones.
+"""
+import heapq
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import extract
+from sqlalchemy.orm import Session
+
+from ..models import BankTransaction, Expense, Income
+from .text_similarity import sequence_similarity
+
+# How far back unreviewed entries are considered
+SUGGESTION_LOOKBACK_DAYS = 180
+
+# Join window (days) and amount band (fraction of the larger amount)
+SUGGESTION_WINDOW_DAYS = 3
+AMOUNT_TOLERANCE_PCT = 0.02
+
+# Default minimum match score for a suggestion
+MIN_SUGGESTION_SCORE = 0.7
+
+# Manual entry type -> bank amount sign it is matched with
+ENTRY_SIGNS = {"expense": -1, "income": 1}
+
+
+def score_match(manual_entry, bank_transaction: BankTransaction) -> Tuple[float, List[str]]:
+    """
+    Calculate match score between a manual entry and bank transaction.
+
+    Matching criteria:
+    - Date within ±3 days: +0.3
+    - Amount within ±2%: +0.4
+    - Description similarity > 0.6: +0.3
+
+    Returns:
+        Tuple of (score, reasons) where score is 0.0-1.0
+    """
+    score = 0.0
+    reasons = []
+
+    # 1. Date matching (±3 days)
+    date_diff = abs((manual_entry.date - bank_transaction.date).days)
+    if date_diff == 0:
+        score += 0.3
+        reasons.append("Same date")
+    elif date_diff <= 3:
+        score += 0.2
+        reasons.append(f"Date within {date_diff} days")
+
+    # 2. Amount matching (±2%)
+    manual_amount = abs(manual_entry.amount)
+    bank_amount = abs(bank_transaction.amount)
+    amount_diff_pct = abs(manual_amount - bank_amount) / max(manual_amount, bank_amount)
+
+    if amount_diff_pct < 0.001:  # Exact match
+        score += 0.4
+        reasons.append("Exact amount match")
+    elif amount_diff_pct <= 0.02:  # Within 2%
+        score += 0.3
+        reasons.append(f"Amount within {amount_diff_pct*100:.1f}%")
+
+    # 3. Description similarity
+    manual_desc = (manual_entry.description or "").lower()
+    bank_desc = (bank_transaction.description_display or "").lower()
+
+    # SequenceMatcher ratio; below 0.6 it earns nothing, so the quick
+    # upper bounds can skip the full match
+    similarity = sequence_similarity(manual_desc, bank_desc, min_ratio=0.6)
+
+    if similarity > 0.8:
+        score += 0.3
+        reasons.append("Very similar descriptions")
+    elif similarity > 0.6:
+        score += 0.2
+        reasons.append("Similar descriptions")
+
+    return score, reasons
+
+
+def amounts_within_band(manual_amount: float, bank_amount: float) -> bool:
+    """Whether two amounts differ by at most AMOUNT_TOLERANCE_PCT of the larger one."""
+    manual_abs, bank_abs = abs(manual_amount), abs(bank_amount)
+    larger = max(manual_abs, bank_abs)
+    if larger == 0:
+        return False
+    return abs(manual_abs - bank_abs) / larger <= AMOUNT_TOLERANCE_PCT
+
+
+def iter_window_pairs(
+    manual_entries: Sequence,
+    bank_transactions: Sequence[BankTransaction],
+) -> Iterator[Tuple[object, BankTransaction]]:
+    """
+    Yield (manual_entry, bank_transaction) pairs within the date window and amount band.
+
+    Both sequences must be sorted by date. The window's start only moves
+    forward, so the join is linear in the input plus the pairs it visits.
+    """
+    window = timedelta(days=SUGGESTION_WINDOW_DAYS)
+    start = 0
+    for entry in manual_entries:
+        while start < len(bank_transactions) and bank_transactions[start].date < entry.date - window:
+            start += 1
+        latest = entry.date + window
+        position = start
+        while position < len(bank_transactions) and bank_transactions[position].date <= latest:
+            bank_tx = bank_transactions[position]
+            if amounts_within_band(entry.amount, bank_tx.amount):
+                yield entry, bank_tx
+            position += 1
+
+
+def matches_sign(entry_type: str, amount: float) -> bool:
+    """Whether a bank amount has the sign matched with entry_type (expenses are negative)."""
+    return amount * ENTRY_SIGNS[entry_type] > 0
+
+
+def iter_scored_pairs(
+    manual_entries: Sequence,
+    bank_transactions: Sequence[BankTransaction],
+    min_score: float = MIN_SUGGESTION_SCORE,
+) -> Iterator[Tuple[object, BankTransaction, float, List[str]]]:
+    """
+    Yield (manual_entry, bank_transaction, score, reasons) for window pairs scoring at least min_score.
+
+    Both sequences must be sorted by date and bank_transactions already limited
+    to the sign matched with the entries.
+    """
+    for entry, bank_tx in iter_window_pairs(manual_entries, bank_transactions):
+        match_score, reasons = score_match(entry, bank_tx)
+        if match_score >= min_score:
+            yield entry, bank_tx, match_score, reasons
+
+
+def rank_suggestions(
+    user_id: str,
+    db: Session,
+    limit: int = 50,
+    min_score: float = MIN_SUGGESTION_SCORE,
+    month: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Best manual/bank duplicate suggestions, highest match score first, computed from scratch.
+
+    The reference for the persisted reconciliation_candidates table, which
+    /reconciliation/suggestions reads (see reconciliation_candidates.py).
+
+    Args:
+        user_id: User (household) ID
+        db: Database session
+        limit: Maximum number of suggestions to return
+        min_score: Minimum match score (0.0-1.0) to include
+        month: Only suggest manual entries dated in this month (1-12)
+
+    Returns:
+        List of suggestions, each containing:
+            - manual_entry: Expense or Income object
+            - entry_type: "expense" or "income"
+            - bank_transaction: BankTransaction object
+            - match_score: Confidence score (0.0-1.0)
+            - match_reasons: List of matching factors
+    """
+    if limit <= 0:
+        return []
+
+    since = date.today() - timedelta(days=SUGGESTION_LOOKBACK_DAYS)
+
+    def unreviewed(model):
+        query = db.query(model).filter(
+            model.user_id == user_id,
+            model.bank_transaction_id.is_(None),
+            model.reconciliation_status == "unreviewed",
+            model.date >= since,
+        )
+        if month is not None:
+            query = query.filter(extract("month", model.date) == month)
+        return query.order_by(model.date, model.id).all()
+
+    # Bank transactions not accepted yet, widened by the window so entries
+    # at the start of the lookback still see their neighbours
+    bank_transactions = db.query(BankTransaction).filter(
+        BankTransaction.user_id == user_id,
+        BankTransaction.date >= since - timedelta(days=SUGGESTION_WINDOW_DAYS),
+        BankTransaction.status == "pending",
+    ).order_by(BankTransaction.date, BankTransaction.id).all()
+
+    # Min-heap of (score, -sequence, ...): the root is the weakest kept
+    # suggestion; among equal scores the later one is evicted first
+    heap: List[Tuple[float, int, str, object, BankTransaction, List[str]]] = []
+    sequence = 0
+    for entry_type, model in (("expense", Expense), ("income", Income)):
+        candidates = [tx for tx in bank_transactions if matches_sign(entry_type, tx.amount)]
+        for entry, bank_tx, match_score, reasons in iter_scored_pairs(
+            unreviewed(model), candidates, min_score
+        ):
+            sequence += 1
+            item = (match_score, -sequence, entry_type, entry, bank_tx, reasons)
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+
+    ranked = sorted(heap, key=lambda item: item[:2], reverse=True)
+    return [
+        {
+            "manual_entry": entry,
+            "entry_type": entry_type,
+            "bank_transaction": bank_tx,
+            "match_score": match_score,
+            "match_reasons": reasons,
+        }
+        for match_score, _, entry_type, entry, bank_tx, reasons in ranked
+    ]
@@ -0,0 +1,376 @@
+"""
+SnapshotCache - Read-through cache for computed household financial snapshots.
+
+The dashboard summary, calculated financial freedom steps, savings summary,
+gamification overview and AI chat context all recompute overlapping aggregates from
+the same household rows. This cache stores each computed snapshot under
+
+    {name}:{scope}:v{data_version}:{today}[:{extra key parts}]
+
+where scope is the id the data rows are keyed by (household_id for financial data).
+
+How it stays correct:
+1. Every household has a data-version counter in the backend. Session hooks collect
+   the scopes touched by inserts/updates/deletes of the tracked models (Expense,
+   Income, Loan, Saving, BankTransaction and the other tables the snapshots read)
+   and bump their counters after the transaction commits. Old entries are never
+   read again and age out through LRU eviction or the TTL.
+2. Today's date is part of the key, so date-dependent snapshots roll over at midnight.
+3. Core bulk writes register their scope with mark_scope_written(). The TTL
+   bounds staleness for any other writes the hooks can't see (raw SQL, bulk
+   query.update()/delete()).
+
+Backends (SNAPSHOT_CACHE_BACKEND):
+- "local":  in-process LRU + TTL (default without SNAPSHOT_CACHE_REDIS_URL)
+- "shared": redis-compatible store at SNAPSHOT_CACHE_REDIS_URL, shared by all
+            workers; eviction is delegated to the store (maxmemory-policy allkeys-lru).
+            Default when SNAPSHOT_CACHE_REDIS_URL is set
+- "off":    every call computes (default in test mode)
+
+Versions are bumped in the backend of the process that committed. With "local",
+writes from another process - several app workers, or bank sync workers run
+separately (python -m app.jobs.bank_sync_queue) - reach this process's cache
+only through the TTL, so multi-process deployments should use "shared".
+
+FakeSharedClient implements the subset of the redis client API the shared backend
+uses, so the shared code path runs in tests without a server.
+"""
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..models import (
+    Achievement,
+    Activity,
+    BankTransaction,
+    Expense,
+    FinancialFreedom,
+    GamificationEvent,
+    Income,
+    Loan,
+    LoanPayment,
+    Saving,
+    SavingsGoal,
+    Settings,
+    StreakHistory,
+    Subscription,
+    UserGamificationStats,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_IS_TEST_MODE = os.getenv("ENVIRONMENT", "production") == "test"
+SNAPSHOT_CACHE_REDIS_URL = os.getenv("SNAPSHOT_CACHE_REDIS_URL", "")
+SNAPSHOT_CACHE_BACKEND = (
+    os.getenv("SNAPSHOT_CACHE_BACKEND")
+    or ("off" if _IS_TEST_MODE else "shared" if SNAPSHOT_CACHE_REDIS_URL else "local")
+).lower()
+SNAPSHOT_CACHE_TTL_SECONDS = int(os.getenv("SNAPSHOT_CACHE_TTL_SECONDS", "300"))
+SNAPSHOT_CACHE_MAX_ENTRIES = int(os.getenv("SNAPSHOT_CACHE_MAX_ENTRIES", "2048"))
+
+# Models whose writes invalidate snapshots -> attribute holding the owning scope id
+TRACKED_MODELS = {
+    Expense: "user_id",
+    Income: "user_id",
+    Loan: "user_id",
+    LoanPayment: "user_id",
+    Saving: "user_id",
+    SavingsGoal: "user_id",
+    BankTransaction: "user_id",
+    Activity: "user_id",
+    Settings: "user_id",
+    Subscription: "user_id",
+    FinancialFreedom: "userId",
+    UserGamificationStats: "user_id",
+    Achievement: "user_id",
+    StreakHistory: "user_id",
+    GamificationEvent: "user_id",
+}
+
+_PENDING_KEY = "snapshot_cache_pending"
+
+
+class LocalSnapshotBackend:
+    """In-process LRU with per-entry TTL. Values are deep-copied in and out."""
+
+    def __init__(self, max_entries: int = SNAPSHOT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_version(self, scope: str) -> int:
+        with self._lock:
+            return self._versions.get(scope, 0)
+
+    def bump_version(self, scope: str) -> int:
+        with self._lock:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+            return self._versions[scope]
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SharedSnapshotBackend:
+    """
+    Backend on a redis-compatible client (get / set(ex=) / incr).
+
+    Values are stored as JSON, so cached snapshots must be JSON-serializable
+    (callers cache model_dump(mode="json") output rather than Pydantic objects).
+    """
+
+    def __init__(self, client: Any, prefix: str = "snapshot"):
+        self.client = client
+        self.prefix = prefix
+        self.evictions = 0  # handled by the store
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(f"{self.prefix}:{key}")
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        self.client.set(f"{self.prefix}:{key}", json.dumps(value), ex=ttl_seconds)
+
+    def get_version(self, scope: str) -> int:
+        raw = self.client.get(f"{self.prefix}:version:{scope}")
+        return int(raw) if raw is not None else 0
+
+    def bump_version(self, scope: str) -> int:
+        return int(self.client.incr(f"{self.prefix}:version:{scope}"))
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class FakeSharedClient:
+    """In-memory stand-in for the redis client subset used by SharedSnapshotBackend."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Optional[float], str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ex if ex else None, value)
+        return True
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            expires_at, value = self._data.get(key, (None, "0"))
+            new_value = int(value) + 1
+            self._data[key] = (expires_at, str(new_value))
+            return new_value
+
+
+def _backend_from_env():
+    """Build the backend selected by SNAPSHOT_CACHE_BACKEND (None = disabled)."""
+    if SNAPSHOT_CACHE_BACKEND == "off":
+        return None
+    if SNAPSHOT_CACHE_BACKEND == "shared":
+        if not SNAPSHOT_CACHE_REDIS_URL:
+            logger.warning("[SnapshotCache] SNAPSHOT_CACHE_REDIS_URL not set, using local backend")
+            return LocalSnapshotBackend()
+        try:
+            import redis
+        except ImportError:
+            logger.warning("[SnapshotCache] redis package not installed, using local backend")
+            return LocalSnapshotBackend()
+        return SharedSnapshotBackend(redis.Redis.from_url(SNAPSHOT_CACHE_REDIS_URL))
+    return LocalSnapshotBackend()
+
+
+class SnapshotCache:
+    """Versioned read-through cache with per-snapshot hit/miss metrics."""
+
+    def __init__(self, backend=None, ttl_seconds: int = SNAPSHOT_CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._metrics: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "errors": 0}
+        )
+        self._metrics_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def configure(self, backend, ttl_seconds: Optional[int] = None) -> None:
+        """Swap the backend (None disables caching) and reset metrics."""
+        self.backend = backend
+        if ttl_seconds is not None:
+            self.ttl_seconds = ttl_seconds
+        with self._metrics_lock:
+            self._metrics.clear()
+
+    def get_or_compute(self, name: str, scope: str, compute: Callable[[], T], *key_parts: Any) -> T:
+        """
+        Return the cached snapshot for (name, scope, key_parts) or compute and store it.
+
+        Args:
+            name: Snapshot name (e.g. "user_summary")
+            scope: Id the underlying rows are keyed by (usually household_id)
+            compute: Zero-argument callable producing the snapshot
+            key_parts: Extra values the snapshot depends on (e.g. language)
+        """
+        key, cached = self._lookup(name, scope, key_parts)
+        if cached is not None:
+            return cached
+        value = compute()
+        self._store(name, key, value)
+        return value
+
+    async def get_or_compute_async(
+        self, name: str, scope: str, compute: Callable[[], Awaitable[T]], *key_parts: Any
+    ) -> T:
+        """Async variant of get_or_compute() for coroutine-producing callables."""
+        key, cached = self._lookup(name, scope, key_parts)
+        if cached is not None:
+            return cached
+        value = await compute()
+        self._store(name, key, value)
+        return value
+
+    def invalidate(self, scope: str) -> None:
+        """Make every cached snapshot for a scope stale."""
+        if not self.enabled:
+            return
+        try:
+            self.backend.bump_version(scope)
+        except Exception as e:
+            logger.warning(f"[SnapshotCache] Failed to bump version for {scope}: {e}")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters per snapshot name plus backend info."""
+        with self._metrics_lock:
+            by_name = {name: dict(counts) for name, counts in self._metrics.items()}
+        hits = sum(c["hits"] for c in by_name.values())
+        misses = sum(c["misses"] for c in by_name.values())
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "ttl_seconds": self.ttl_seconds,
+            "entries": self.backend.size() if self.backend else 0,
+            "evictions": self.backend.evictions if self.backend else 0,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "by_name": by_name,
+        }
+
+    def _count(self, name: str, field: str) -> None:
+        with self._metrics_lock:
+            self._metrics[name][field] += 1
+
+    def _lookup(self, name: str, scope: str, key_parts: Tuple) -> Tuple[Optional[str], Optional[Any]]:
+        """Return (key, cached value). key is None when caching is unavailable."""
+        if not self.enabled:
+            return None, None
+        try:
+            version = self.backend.get_version(scope)
+            key = ":".join([name, scope, f"v{version}", date.today().isoformat(), *map(str, key_parts)])
+            cached = self.backend.get(key)
+        except Exception as e:
+            # Cache trouble must never fail the request - fall back to computing
+            logger.warning(f"[SnapshotCache] Lookup failed for {name}/{scope}: {e}")
+            self._count(name, "errors")
+            return None, None
+
+        self._count(name, "hits" if cached is not None else "misses")
+        return key, cached
+
+    def _store(self, name: str, key: Optional[str], value: Any) -> None:
+        if key is None or value is None:
+            return
+        try:
+            self.backend.set(key, value, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"[SnapshotCache] Store failed for {key}: {e}")
+            self._count(name, "errors")
+
+
+snapshot_cache = SnapshotCache(_backend_from_env())
+
+
+# ----------------------------------------------------------------------
+# Session hooks: bump data versions for scopes written in a transaction
+# ----------------------------------------------------------------------
+
+def _collect_scopes(session: Session) -> None:
+    pending: Set[str] = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        attr = TRACKED_MODELS.get(type(obj))
+        if attr is None:
+            continue
+        scope = getattr(obj, attr, None)
+        if scope:
+            pending.add(scope)
+
+
+def mark_scope_written(session: Session, scope: str) -> None:
+    """Invalidate a scope when the session commits; for Core bulk writes the flush hook can't see."""
+    if snapshot_cache.enabled and scope:
+        session.info.setdefault(_PENDING_KEY, set()).add(scope)
+
+
+@event.listens_for(Session, "after_flush")
+def _snapshot_cache_after_flush(session, flush_context):
+    if snapshot_cache.enabled:
+        _collect_scopes(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _snapshot_cache_after_commit(session):
+    for scope in session.info.pop(_PENDING_KEY, ()):
+        snapshot_cache.invalidate(scope)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _snapshot_cache_after_rollback(session, previous_transaction):
+    # A savepoint rollback leaves the outer transaction's writes pending; keeping
+    # the scopes only over-invalidates.
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_KEY, None)
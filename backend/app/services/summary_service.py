@@ -0,0 +1,308 @@
+"""
+SummaryService - Single-pass dashboard summary (/users/{id}/summary).
+
+Each source table is read once per request and everything else is derived in memory:
+1. Income/expenses: one MonthlyAggregateService.get_range() read covering the rolling
+   13-month window (current month totals, category distributions, cash flow).
+2. Loans: non-archived loans loaded once; per-month payments, balance and progress
+   are computed from the rows instead of a SUM query per cash-flow month.
+3. Savings: one grouped query per category yields the all-time balance, the
+   current month's net flow and each goal's progress.
+4. Activities: the 20 most recent entries.
+
+The number of statements is therefore independent of history length; the endpoint
+enforces it with a QueryBudget (see app/query_budget.py).
+"""
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import Session
+
+from ..models import Activity, Loan, Saving
+from .monthly_aggregate_service import MonthlyAggregateService
+from .monthly_totals_service import MonthlyTotalsService
+
+# Rolling cash-flow window: 12 past months + current month
+CASH_FLOW_MONTHS = 13
+
+RECENT_ACTIVITY_LIMIT = 20
+
+# Statement budget for build_summary(), including first-read materialization of the
+# monthly aggregates. Override with QUERY_BUDGET_USER_SUMMARY.
+SUMMARY_MAX_QUERIES = 12
+
+ACTIVITY_NUMERIC_FIELDS = {
+    'amount',
+    'principal_amount',
+    'remaining_balance',
+    'monthly_payment',
+    'target_amount',
+}
+
+
+class SummaryService:
+    """Service building the dashboard financial summary."""
+
+    @staticmethod
+    def build_summary(household_id: str, db: Session, today: Optional[date] = None) -> Dict:
+        """
+        Build the dashboard summary for a household.
+
+        Args:
+            household_id: Household ID (primary user id)
+            db: Database session
+            today: Reference date (defaults to today)
+
+        Returns:
+            Summary dictionary as returned by GET /users/{id}/summary
+        """
+        today = today or date.today()
+        month_start, month_end = MonthlyTotalsService._month_bounds(today.year, today.month)
+
+        # Rolling window instead of "current calendar year" so the BudgetVsActual
+        # 3-month average always has real historical data even in January.
+        first = today.year * 12 + today.month - 1 - (CASH_FLOW_MONTHS - 1)
+        range_totals = MonthlyAggregateService.get_range(
+            household_id, (first // 12, first % 12 + 1), (today.year, today.month), db
+        )
+        income_totals = range_totals[(today.year, today.month)]["income"]
+        expense_totals = range_totals[(today.year, today.month)]["expenses"]
+        monthly_income = income_totals["total"]
+        monthly_expenses = expense_totals["total"]
+
+        active_loans = db.query(Loan).filter(
+            Loan.user_id == household_id,
+            (Loan.is_archived == False) | (Loan.is_archived == None)
+        ).order_by(Loan.id).all()
+
+        monthly_loan_payments = SummaryService._loan_payments_until(active_loans, month_end)
+        total_loan_balance = sum(loan.remaining_balance or 0 for loan in active_loans)
+
+        monthly_balance = monthly_income - monthly_expenses - monthly_loan_payments
+        savings_rate = 0
+        debt_to_income = 0
+        if monthly_income > 0:
+            savings_rate = monthly_balance / monthly_income
+            debt_to_income = monthly_loan_payments / monthly_income
+
+        cash_flow = []
+        for (m_year, m_month), m_totals in range_totals.items():  # ascending order
+            _, m_end = MonthlyTotalsService._month_bounds(m_year, m_month)
+            month_income = m_totals["income"]["total"]
+            month_expenses = m_totals["expenses"]["total"]
+            month_loan_payments = SummaryService._loan_payments_until(active_loans, m_end)
+            cash_flow.append({
+                "month": f"{m_year}-{m_month:02d}",
+                "income": float(month_income),
+                "expenses": float(month_expenses),
+                "loanPayments": float(month_loan_payments),
+                "netFlow": float(month_income - month_expenses - month_loan_payments),
+                "year": m_year
+            })
+
+        savings = SummaryService._savings_summary(
+            household_id, month_start, month_end, monthly_expenses, db
+        )
+
+        recent_activities = db.query(Activity).filter(
+            Activity.user_id == household_id
+        ).order_by(Activity.timestamp.desc()).limit(RECENT_ACTIVITY_LIMIT).all()
+
+        return {
+            "total_monthly_income": float(monthly_income),
+            "total_monthly_expenses": float(monthly_expenses),
+            "total_monthly_loan_payments": float(monthly_loan_payments),
+            "total_loan_balance": float(total_loan_balance),
+            "monthly_balance": float(monthly_balance),
+            "savings_rate": float(savings_rate),
+            "debt_to_income": float(debt_to_income),
+            "income_distribution": SummaryService._distribution(income_totals["by_category"]),
+            "expense_distribution": SummaryService._distribution(expense_totals["by_category"]),
+            "cash_flow": cash_flow,
+            "loans": [SummaryService._format_loan(loan) for loan in active_loans],
+            "activities": [SummaryService._format_activity(a) for a in recent_activities],
+            "total_savings_balance": float(savings["total_balance"]),
+            "monthly_savings": float(savings["monthly_net"]),
+            "savings_goals": savings["goals"],
+        }
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _loan_payments_until(loans: List[Loan], month_end: date) -> float:
+        """Sum monthly payments of loans that started on or before month_end."""
+        return sum(
+            loan.monthly_payment or 0
+            for loan in loans
+            if loan.start_date is not None and loan.start_date <= month_end
+        )
+
+    @staticmethod
+    def _distribution(by_category: Dict[Optional[str], float]) -> List[Dict]:
+        """Convert {category: amount} into the dashboard's distribution list."""
+        total = sum(by_category.values())
+        return [
+            {
+                "category": category,
+                "amount": float(amount),
+                "percentage": float((amount / total * 100) if total > 0 else 0)
+            }
+            for category, amount in by_category.items()
+        ]
+
+    @staticmethod
+    def _format_loan(loan: Loan) -> Dict:
+        total_amount = loan.principal_amount
+        paid_amount = total_amount - loan.remaining_balance
+        progress = (paid_amount / total_amount * 100) if total_amount > 0 else 0
+        return {
+            "id": str(loan.id),
+            "description": loan.description,
+            "balance": float(loan.remaining_balance),
+            "monthlyPayment": float(loan.monthly_payment),
+            "interestRate": float(loan.interest_rate),
+            "progress": float(progress),
+            "totalAmount": float(total_amount)
+        }
+
+    @staticmethod
+    def _savings_summary(
+        household_id: str, month_start: date, month_end: date, monthly_expenses: float, db: Session
+    ) -> Dict:
+        """
+        Aggregate savings per category in a single query.
+
+        Returns:
+            Dictionary with:
+                - total_balance: All-time deposits - withdrawals
+                - monthly_net: Current month deposits - withdrawals (one-off entries
+                  dated this month + recurring entries active this month)
+                - goals: Per-category goal progress
+        """
+        is_deposit = Saving.saving_type == 'deposit'
+        is_withdrawal = Saving.saving_type == 'withdrawal'
+        in_month = or_(
+            and_(
+                Saving.is_recurring == False,
+                Saving.date >= month_start,
+                Saving.date <= month_end
+            ),
+            and_(
+                Saving.is_recurring == True,
+                Saving.date <= month_end,  # Started before or during this month
+                or_(Saving.end_date == None, Saving.end_date >= month_start)
+            )
+        )
+
+        rows = db.query(
+            Saving.category,
+            func.sum(case((is_deposit, Saving.amount), else_=0)).label('deposits'),
+            func.sum(case((is_withdrawal, Saving.amount), else_=0)).label('withdrawals'),
+            func.sum(case((is_deposit, Saving.amount), else_=-Saving.amount)).label('current_amount'),
+            func.sum(case(
+                (and_(in_month, is_deposit), Saving.amount),
+                (and_(in_month, is_withdrawal), -Saving.amount),
+                else_=0
+            )).label('monthly_net'),
+            func.max(Saving.target_amount).label('target_amount')
+        ).filter(
+            Saving.user_id == household_id
+        ).group_by(Saving.category).all()
+
+        goals = []
+        for row in rows:
+            target = float(row.target_amount or 0)
+            current = float(row.current_amount or 0)
+            # Hardcoded Baby Steps targets: emergency_fund = 1 month, six_month_fund = 6 months
+            if target == 0:
+                if row.category == 'emergency_fund':
+                    target = float(monthly_expenses) * 1
+                elif row.category == 'six_month_fund':
+                    target = float(monthly_expenses) * 6
+            # Show actual balance (no capping) — progress bar capped separately
+            progress = (current / target * 100) if target > 0 else 0
+            goals.append({
+                "category": row.category,
+                "currentAmount": current,
+                "targetAmount": target,
+                "progress": min(float(progress), 100)
+            })
+
+        return {
+            "total_balance": sum((row.deposits or 0) - (row.withdrawals or 0) for row in rows),
+            "monthly_net": sum(row.monthly_net or 0 for row in rows),
+            "goals": goals,
+        }
+
+    @staticmethod
+    def _format_activity(activity: Activity) -> Dict:
+        base = activity.new_values or activity.previous_values or {}
+        return {
+            "id": activity.id,
+            "title": base.get('description') or activity.entity_type,
+            "amount": SummaryService._activity_amount(activity),
+            "type": activity.entity_type.lower(),
+            "date": activity.timestamp.isoformat() if activity.timestamp else datetime.utcnow().isoformat(),
+            "operation": activity.operation_type,
+            "changes": SummaryService._activity_changes(activity),
+        }
+
+    @staticmethod
+    def _activity_changes(activity: Activity) -> List[Dict]:
+        changes: List[Dict] = []
+        previous = activity.previous_values or {}
+        new = activity.new_values or {}
+
+        if activity.operation_type == 'create':
+            for key, value in new.items():
+                if key in {'created_at', 'updated_at'}:
+                    continue
+                if key in ACTIVITY_NUMERIC_FIELDS or isinstance(value, (int, float, str)):
+                    changes.append({
+                        'field': key,
+                        'oldValue': None,
+                        'newValue': value,
+                    })
+        elif activity.operation_type == 'delete':
+            for key, value in previous.items():
+                if key in {'created_at', 'updated_at'}:
+                    continue
+                if key in ACTIVITY_NUMERIC_FIELDS or isinstance(value, (int, float, str)):
+                    changes.append({
+                        'field': key,
+                        'oldValue': value,
+                        'newValue': None,
+                    })
+        else:
+            for key, old_value in previous.items():
+                if key in {'created_at', 'updated_at'}:
+                    continue
+                new_value = new.get(key)
+                if old_value != new_value:
+                    if key in ACTIVITY_NUMERIC_FIELDS or isinstance(old_value, (int, float, str)) or isinstance(new_value, (int, float, str)):
+                        changes.append({
+                            'field': key,
+                            'oldValue': old_value,
+                            'newValue': new_value,
+                        })
+        return changes
+
+    @staticmethod
+    def _activity_amount(activity: Activity) -> float:
+        source = activity.new_values or activity.previous_values or {}
+        try:
+            if activity.entity_type == 'Income':
+                return float(source.get('amount', 0) or 0)
+            if activity.entity_type == 'Expense':
+                return -float(source.get('amount', 0) or 0)
+            if activity.entity_type == 'Loan':
+                return -float(source.get('monthly_payment', 0) or 0)
+            if activity.entity_type == 'Saving':
+                amount = float(source.get('amount', 0) or 0)
+                return amount if source.get('saving_type') != 'withdrawal' else -amount
+        except (TypeError, ValueError):
+            pass
+        return 0.0
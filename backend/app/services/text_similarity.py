@@ -0,0 +1,183 @@
+"""
+Description similarity kernels shared by duplicate detection and reconciliation.
+
+Both callers compare descriptions inside nested loops and only care whether a
+score clears a threshold (a confidence tier), so every scorer here takes that
+threshold and gives up as soon as it can't be reached:
+
+1. Descriptions are prepared once - normalized, with a character histogram and
+   trigram counts - and cached (LRU), since the same merchant strings recur.
+2. Cheap lower bounds on the edit distance rule pairs out first: the length
+   difference, the character histogram difference (each edit fixes at most
+   one surplus character per side) and the shared trigram count (each edit
+   destroys at most three trigrams).
+3. levenshtein_distance() only fills the diagonal band of width max_distance
+   and stops once a whole row exceeds it.
+
+sequence_similarity() applies the same idea to difflib's ratio, using
+SequenceMatcher's quick upper bounds before the full match.
+"""
+import difflib
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Distinct descriptions kept prepared
+DESCRIPTION_CACHE_SIZE = 8192
+
+
+class PreparedDescription(NamedTuple):
+    """A normalized description with the counts the prefilters need."""
+    normalized: str
+    histogram: Counter
+    trigrams: Counter
+
+
+@lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def normalize_description(desc: Optional[str]) -> str:
+    """
+    Normalize a transaction description for comparison.
+
+    Rules:
+    - Convert to lowercase
+    - Remove all non-alphanumeric characters
+    - Collapse multiple spaces
+    - Trim whitespace
+
+    Examples:
+    - "TESCO" -> "tesco"
+    - "Tesco Stores" -> "tescostores"
+    - "TESCO STORES 3297" -> "tescostores3297"
+    """
+    if not desc:
+        return ""
+
+    # Lowercase
+    normalized = desc.lower()
+
+    # Remove non-alphanumeric (keep spaces for now)
+    normalized = re.sub(r'[^a-z0-9\s]', '', normalized)
+
+    # Remove all spaces
+    normalized = re.sub(r'\s+', '', normalized)
+
+    return normalized.strip()
+
+
+@lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def prepare_description(desc: Optional[str]) -> PreparedDescription:
+    """Normalize a description and count its characters and trigrams (cached)."""
+    normalized = normalize_description(desc)
+    return PreparedDescription(
+        normalized=normalized,
+        histogram=Counter(normalized),
+        trigrams=Counter(normalized[i:i + 3] for i in range(len(normalized) - 2)),
+    )
+
+
+def max_distance_for(length: int, min_similarity: float) -> int:
+    """Largest edit distance that keeps 1 - distance / length >= min_similarity."""
+    # The epsilon keeps e.g. 5 * (1 - 0.8) = 0.9999999999999998 at 1
+    return int(length * (1.0 - min_similarity) + 1e-9)
+
+
+def levenshtein_distance(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
+    """
+    Calculate the Levenshtein distance between two strings.
+
+    With max_distance, only cells within max_distance of the diagonal are
+    computed and the result is max_distance + 1 as soon as the distance is
+    known to exceed it.
+    """
+    if s1 == s2:
+        return 0
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+
+    len1, len2 = len(s1), len(s2)
+    limit = len1 if max_distance is None else max_distance
+    if len1 - len2 > limit:
+        return limit + 1
+    if len2 == 0:
+        return len1
+
+    # Cells outside the band are at least limit + 1 away
+    outside = limit + 1
+    previous_row = list(range(len2 + 1))
+    for i in range(1, len1 + 1):
+        c1 = s1[i - 1]
+        low = max(1, i - limit)
+        high = min(len2, i + limit)
+
+        current_row = [outside] * (len2 + 1)
+        current_row[0] = i
+        row_min = i if low == 1 else outside
+        for j in range(low, high + 1):
+            value = min(
+                previous_row[j - 1] + (c1 != s2[j - 1]),  # substitution
+                current_row[j - 1] + 1,                   # insertion
+                previous_row[j] + 1,                      # deletion
+            )
+            current_row[j] = value
+            if value < row_min:
+                row_min = value
+
+        if row_min > limit:
+            return limit + 1
+        previous_row = current_row
+
+    distance = previous_row[len2]
+    return distance if distance <= limit else limit + 1
+
+
+def bounded_similarity(
+    first: PreparedDescription,
+    second: PreparedDescription,
+    min_similarity: float = 0.0,
+) -> float:
+    """
+    Levenshtein similarity (1 - distance / max_length) of two prepared descriptions.
+
+    Exact when it is at least min_similarity; 0.0 when it is provably below,
+    in which case the distance is usually never computed.
+    """
+    a, b = first.normalized, second.normalized
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+
+    max_len = max(len(a), len(b))
+    max_distance = max_distance_for(max_len, min_similarity)
+    if abs(len(a) - len(b)) > max_distance:
+        return 0.0
+    if max_distance < max_len:
+        surplus = max(
+            sum((first.histogram - second.histogram).values()),
+            sum((second.histogram - first.histogram).values()),
+        )
+        if surplus > max_distance:
+            return 0.0
+        if sum((first.trigrams & second.trigrams).values()) < max_len - 2 - 3 * max_distance:
+            return 0.0
+
+    distance = levenshtein_distance(a, b, max_distance)
+    if distance > max_distance:
+        return 0.0
+    return 1.0 - (distance / max_len)
+
+
+def sequence_similarity(first: str, second: str, min_ratio: float = 0.0) -> float:
+    """
+    difflib.SequenceMatcher ratio of two strings.
+
+    Exact when it is at least min_ratio; 0.0 when SequenceMatcher's quick
+    upper bounds already show it is below.
+    """
+    matcher = difflib.SequenceMatcher(None, first, second)
+    if min_ratio > 0.0 and (
+        matcher.real_quick_ratio() < min_ratio or matcher.quick_ratio() < min_ratio
+    ):
+        return 0.0
+    return matcher.ratio()
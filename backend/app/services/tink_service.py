@@ -22,14 +22,17 @@ import hashlib
 import base64
 import json
 import asyncio
+import functools
 import random
 import time
 from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
 from urllib.parse import urlencode
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Awaitable, Callable
 from sqlalchemy.orm import Session
 
+from ..database import run_sync_db
+from ..http_clients import get_client
 from ..models import TinkConnection, BankTransaction, TinkPendingAuth
 from ..logging_utils import get_secure_logger
 from .audit_service import audit_token_refreshed
@@ -327,23 +330,23 @@ class TinkService:
         for attempt in range(max_retries):
             attempt_start = time.time()
             try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    if method.upper() == "GET":
-                        response = await client.get(
-                            url,
-                            headers=headers,
-                            params=params,
-                        )
-                    elif method.upper() == "POST":
-                        response = await client.post(
-                            url,
-                            headers=headers,
-                            data=data,
-                            json=json_data,
-                            params=params,
-                        )
-                    else:
-                        raise ValueError(f"Unsupported HTTP method: {method}")
+                client = get_client("tink")
+                if method.upper() == "GET":
+                    response = await client.get(
+                        url,
+                        headers=headers,
+                        params=params,
+                    )
+                elif method.upper() == "POST":
+                    response = await client.post(
+                        url,
+                        headers=headers,
+                        data=data,
+                        json=json_data,
+                        params=params,
+                    )
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
 
                 # Check if response indicates success
                 if response.status_code < 400:
@@ -1039,6 +1042,38 @@ class TinkService:
                 )
             raise
 
+    async def iter_transaction_pages(
+        self,
+        access_token: str,
+        account_id: Optional[str] = None,
+        from_date: Optional[datetime] = None,
+        page_token: Optional[str] = None,
+        max_pages: int = 100,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Fetch transactions page by page, following nextPageToken.
+
+        Yields each page response as it arrives, so callers can store a page
+        before the next one is requested and resume from its nextPageToken if
+        the stream is interrupted. Starts at page_token when given.
+        """
+        seen_tokens = set()
+        for _ in range(max_pages):
+            page = await self.fetch_transactions(
+                access_token, account_id=account_id, from_date=from_date, page_token=page_token
+            )
+            yield page
+
+            page_token = page.get("nextPageToken") or None
+            if not page_token:
+                return
+            if page_token in seen_tokens:
+                logger.warning("Tink returned a repeated nextPageToken; stopping pagination")
+                return
+            seen_tokens.add(page_token)
+
+        logger.warning(f"Stopped Tink pagination after {max_pages} pages")
+
     # =========================================================================
     # Connection Management
     # =========================================================================
@@ -1182,8 +1217,20 @@ class TinkService:
 
         return response.json()
 
-    async def get_valid_access_token(self, connection: TinkConnection, db: Session) -> str:
-        """Get a valid access token, refreshing if necessary."""
+    async def get_valid_access_token(
+        self,
+        connection: TinkConnection,
+        db: Session,
+        run_db: Optional[Callable[..., Awaitable[Any]]] = None,
+    ) -> str:
+        """Get a valid access token, refreshing if necessary.
+
+        db may be a Session or an AsyncSession (see run_sync_db). run_db(fn, *args)
+        runs fn(db, *args) for the refresh's writes; it defaults to run_sync_db, and
+        bank sync jobs pass one that runs on their offload pool.
+        """
+        if run_db is None:
+            run_db = functools.partial(run_sync_db, db)
         # Handle both timezone-aware and naive datetimes
         now = datetime.utcnow()
         token_expires = connection.token_expires_at
@@ -1206,7 +1253,7 @@ class TinkService:
             connection.refresh_token = token_data.get("refresh_token", connection.refresh_token)
             connection.token_expires_at = datetime.utcnow() + timedelta(seconds=token_data["expires_in"])
 
-            db.commit()
+            await run_db(lambda session: session.commit())
 
             # Record successful token refresh in metrics
             duration_ms = (time.time() - start_time) * 1000
@@ -1222,7 +1269,7 @@ class TinkService:
                 pass  # Never fail due to metrics
 
             # Audit: Token refresh succeeded
-            audit_token_refreshed(db, connection.user_id, connection.id, "success")
+            await run_db(audit_token_refreshed, connection.user_id, connection.id, "success")
 
             return connection.access_token
 
@@ -1241,7 +1288,7 @@ class TinkService:
                 pass  # Never fail due to metrics
 
             # Audit: Token refresh failed
-            audit_token_refreshed(db, connection.user_id, connection.id, "failure")
+            await run_db(audit_token_refreshed, connection.user_id, connection.id, "failure")
             raise
 
 
@@ -0,0 +1,263 @@
+"""
+ToolResultCache - Memoization for the AI advisor's tool calls.
+
+Within a conversation (WebSocket chat or MCP server) the model calls the same
+read tools over and over with the same or equivalent arguments. Results are
+stored in an in-process LRU under
+
+    {tool}:{household}:v{data_version}:{today}:{normalized arguments}
+
+How it stays correct:
+1. Data-reading tools use the household's snapshot_cache data version, which
+   the session hooks bump whenever a tracked model is written. When the
+   snapshot cache is off there is no version to key on, so only pure tools are
+   cached.
+2. Arguments are normalized before keying: empty values ("", "null", None) are
+   dropped, the tool's defaults are filled in and keys are sorted, so
+   {"months": 3} and {} share an entry for get_spending_trend.
+3. Each tool has its own TTL (TOOL_CACHE_TTLS), which also bounds staleness for
+   writes the hooks can't see (another process with the local snapshot backend).
+
+Pure tools (PURE_TOOLS) depend on their arguments only: they are keyed without
+a data version and computed without a database session. simulate_loan_overpayment
+reads the loan by name, so it is data-versioned like the read tools.
+
+Identical calls already in flight (one turn's tool calls run concurrently) share
+one computation. Results are deep-copied in and out.
+"""
+import asyncio
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .snapshot_cache import SnapshotCache, snapshot_cache
+
+logger = logging.getLogger(__name__)
+
+_IS_TEST_MODE = os.getenv("ENVIRONMENT", "production") == "test"
+TOOL_RESULT_CACHE = os.getenv("TOOL_RESULT_CACHE", "off" if _IS_TEST_MODE else "on").lower() == "on"
+TOOL_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_RESULT_CACHE_MAX_ENTRIES", "1024"))
+
+# Seconds a result stays valid; tools missing here are never cached
+TOOL_CACHE_TTLS = {
+    "get_expenses_by_category": 300,
+    "get_income_breakdown": 300,
+    "get_loans_status": 300,
+    "calculate_polish_tax": 300,
+    "get_savings_analysis": 300,
+    "get_baby_steps_progress": 300,
+    "get_spending_trend": 300,
+    "get_cash_flow_summary": 300,
+    "get_bank_transactions": 60,
+    "simulate_loan_overpayment": 300,
+    "simulate_savings_goal": 3600,
+}
+
+# Tools computed from their arguments alone
+PURE_TOOLS = {"simulate_savings_goal"}
+
+# Defaults the tools apply to omitted arguments (callables receive today's date)
+TOOL_ARG_DEFAULTS = {
+    "get_expenses_by_category": {"year": lambda today: today.year},
+    "get_income_breakdown": {"year": lambda today: today.year},
+    "calculate_polish_tax": {"employment_type": "employee"},
+    "get_spending_trend": {"months": 3},
+    "get_cash_flow_summary": {"months_back": 3},
+    "get_bank_transactions": {"months_back": 1, "limit": 50, "transaction_type": "all"},
+    "simulate_loan_overpayment": {"extra_payment": 0, "monthly_extra": 0},
+    "simulate_savings_goal": {"current_amount": 0, "annual_rate": 0},
+}
+
+_EMPTY_VALUES = (None, "", "null")
+
+
+def normalize_arguments(name: str, arguments: Optional[dict], today: Optional[date] = None) -> dict:
+    """Drop empty values and fill in the tool's defaults."""
+    today = today or date.today()
+    normalized = {
+        key: value for key, value in (arguments or {}).items()
+        if not (isinstance(value, (str, type(None))) and value in _EMPTY_VALUES)
+    }
+    for key, default in TOOL_ARG_DEFAULTS.get(name, {}).items():
+        if key not in normalized:
+            normalized[key] = default(today) if callable(default) else default
+    return normalized
+
+
+class ToolResultCache:
+    """Bounded LRU of tool results with per-tool TTLs, hit/miss and time-saved metrics."""
+
+    def __init__(
+        self,
+        versions: Optional[SnapshotCache] = snapshot_cache,
+        max_entries: int = TOOL_RESULT_CACHE_MAX_ENTRIES,
+        ttls: Optional[Dict[str, int]] = None,
+        enabled: bool = True,
+    ):
+        self.versions = versions
+        self.max_entries = max_entries
+        self.ttls = TOOL_CACHE_TTLS if ttls is None else ttls
+        self.enabled = enabled
+        self.evictions = 0
+        # key -> (expires_at, compute seconds, result)
+        self._entries: "OrderedDict[str, Tuple[float, float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "compute_ms": 0.0, "saved_ms": 0.0}
+        )
+
+    def is_cacheable(self, name: str) -> bool:
+        if not self.enabled or name not in self.ttls:
+            return False
+        return name in PURE_TOOLS or self._versions_enabled()
+
+    async def get_or_execute(
+        self,
+        name: str,
+        arguments: Optional[dict],
+        household_id: str,
+        execute: Callable[[], Awaitable[dict]],
+    ) -> dict:
+        """
+        Return the cached result of a tool call or execute it and store the result.
+
+        Args:
+            name: Tool name
+            arguments: Tool input as sent by the model
+            household_id: Household the tool reads (user_id of the data rows)
+            execute: Zero-argument coroutine function running the tool
+        """
+        if not self.is_cacheable(name):
+            return await execute()
+        key = self._key(name, arguments, household_id)
+        if key is None:
+            return await execute()
+
+        with self._lock:
+            cached = self._get(key)
+            if cached is not None:
+                compute_seconds, result = cached
+                self._record_hit(name, compute_seconds)
+                return copy.deepcopy(result)
+            pending = self._in_flight.get(key)
+
+        if pending is not None:
+            result = await asyncio.shield(pending)
+            with self._lock:
+                self._metrics[name]["hits"] += 1
+            return copy.deepcopy(result)
+
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._in_flight[key] = future
+            self._metrics[name]["misses"] += 1
+        started = time.perf_counter()
+        try:
+            result = await execute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark retrieved so an unshared failure isn't logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._metrics[name]["compute_ms"] += elapsed * 1000
+            if isinstance(result, dict) and "error" not in result:
+                self._set(key, name, elapsed, result)
+        return copy.deepcopy(result)
+
+    def clear(self) -> None:
+        """Drop all entries and reset metrics."""
+        with self._lock:
+            self._entries.clear()
+            self._metrics.clear()
+            self.evictions = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and time saved (compute time of the hits) per tool."""
+        with self._lock:
+            by_tool = {
+                name: {
+                    "hits": int(m["hits"]),
+                    "misses": int(m["misses"]),
+                    "hit_rate": m["hits"] / (m["hits"] + m["misses"]) if m["hits"] + m["misses"] else 0.0,
+                    "avg_compute_ms": round(m["compute_ms"] / m["misses"], 2) if m["misses"] else 0.0,
+                    "saved_ms": round(m["saved_ms"], 2),
+                }
+                for name, m in self._metrics.items()
+            }
+            entries = len(self._entries)
+        hits = sum(m["hits"] for m in by_tool.values())
+        misses = sum(m["misses"] for m in by_tool.values())
+        return {
+            "enabled": self.enabled,
+            "versioned": self._versions_enabled(),
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "saved_ms": round(sum(m["saved_ms"] for m in by_tool.values()), 2),
+            "by_tool": by_tool,
+        }
+
+    def _versions_enabled(self) -> bool:
+        return self.versions is not None and self.versions.enabled
+
+    def _key(self, name: str, arguments: Optional[dict], household_id: str) -> Optional[str]:
+        """Cache key, or None when the data version can't be read."""
+        today = date.today()
+        try:
+            args_key = json.dumps(normalize_arguments(name, arguments, today), sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            return None
+        if name in PURE_TOOLS:
+            return ":".join([name, today.isoformat(), args_key])
+        try:
+            version = self.versions.backend.get_version(household_id)
+        except Exception as e:
+            logger.warning(f"[ToolResultCache] Version lookup failed for {household_id}: {e}")
+            return None
+        return ":".join([name, household_id, f"v{version}", today.isoformat(), args_key])
+
+    def _get(self, key: str) -> Optional[Tuple[float, Any]]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, compute_seconds, result = item
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return compute_seconds, result
+
+    def _set(self, key: str, name: str, compute_seconds: float, result: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttls[name], compute_seconds, copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _record_hit(self, name: str, compute_seconds: float) -> None:
+        self._metrics[name]["hits"] += 1
+        self._metrics[name]["saved_ms"] += compute_seconds * 1000
+
+
+tool_result_cache = ToolResultCache(enabled=TOOL_RESULT_CACHE)
@@ -0,0 +1,506 @@
+"""
+Transaction Ingestion Pipeline
+
+Single storage path for bank transactions from every provider (Tink, GoCardless,
+Enable Banking):
+
+1. Provider adapters (parse_tink_transaction, parse_gocardless_transaction,
+   parse_enable_banking_transaction) normalize raw payloads into IngestRecord,
+   including category mapping and internal-transfer detection
+2. ingest_records() stores a batch with a constant number of queries:
+   - one prefetch of the tink/provider transaction ids already stored
+   - optionally one candidate-window query; pending->booked and fuzzy duplicate
+     matching then run in memory (DuplicateCandidateIndex)
+   - one bulk INSERT ... ON CONFLICT DO NOTHING for the new rows
+
+Batches are processed in chunks of INGEST_CHUNK_SIZE, each under its own
+QueryBudget, so the query count per chunk does not grow with the batch.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from ..database import dialect_insert
+from ..models import BankTransaction
+from ..query_budget import QueryBudget
+from .duplicate_detection_service import (
+    DuplicateCandidateIndex,
+    TransactionFingerprint,
+    create_fingerprint,
+    fetch_candidate_window,
+    fetch_existing_transaction_ids,
+)
+from .reconciliation_candidates import queue_bank_transactions
+from .snapshot_cache import mark_scope_written
+from ..logging_utils import get_secure_logger
+
+logger = get_secure_logger(__name__)
+
+# Records stored per chunk (one candidate window and one insert page each)
+INGEST_CHUNK_SIZE = 1000
+
+# Per chunk: the id prefetch, the candidate window, the bulk insert and one flush
+# of pending->booked updates.
+INGEST_MAX_QUERIES = 10
+
+
+# =============================================================================
+# Normalized Record
+# =============================================================================
+
+@dataclass(slots=True)
+class IngestRecord:
+    """A provider transaction normalized to BankTransaction column values."""
+    tink_transaction_id: str
+    tink_account_id: str
+    provider: str
+    amount: float
+    currency: str
+    date: date
+    description_display: str
+    suggested_type: str
+    raw_data: Dict[str, Any]
+    provider_transaction_id: Optional[str] = None
+    booked_datetime: Optional[datetime] = None
+    description_original: Optional[str] = None
+    description_detailed: Optional[str] = None
+    merchant_name: Optional[str] = None
+    merchant_category_code: Optional[str] = None
+    tink_category_id: Optional[str] = None
+    tink_category_name: Optional[str] = None
+    suggested_category: Optional[str] = None
+    is_internal_transfer: bool = False
+
+    def fingerprint(self) -> TransactionFingerprint:
+        return create_fingerprint(
+            amount=self.amount,
+            currency=self.currency,
+            tx_date=self.date,
+            description=self.description_display,
+            merchant_category_code=self.merchant_category_code,
+            tink_account_id=self.tink_account_id,
+        )
+
+    def to_row(self, user_id: str) -> Dict[str, Any]:
+        """Column values for the bulk insert (every row carries the same keys)."""
+        row = {name: getattr(self, name) for name in _RECORD_FIELDS}
+        row.update(
+            user_id=user_id,
+            status="pending",
+            is_duplicate=False,
+            duplicate_of=None,
+            duplicate_confidence=None,
+            duplicate_reason=None,
+        )
+        return row
+
+
+_RECORD_FIELDS = tuple(f.name for f in fields(IngestRecord))
+
+
+class IngestResult(NamedTuple):
+    synced_count: int
+    exact_duplicate_count: int
+    fuzzy_duplicate_count: int
+
+
+# =============================================================================
+# Provider Adapters
+# =============================================================================
+
+def _parse_iso_date(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def parse_tink_transaction(tx: dict) -> IngestRecord:
+    """Normalize a Tink transaction payload."""
+    amount_data = tx.get("amount", {})
+    amount_value = amount_data.get("value", {})
+    # Tink uses unscaledValue and scale (e.g., -15000 with scale 2 = -150.00)
+    scale = int(amount_value.get("scale", "2"))
+    unscaled = float(amount_value.get("unscaledValue", "0"))
+    amount = unscaled / (10 ** scale)
+
+    descriptions = tx.get("descriptions", {})
+    merchant_info = tx.get("merchantInformation", {})
+
+    # Prefer enriched categories (enrichment API), fall back to basic categories
+    enriched_categories = tx.get("enrichedData", {}).get("categories", {}) or tx.get("enriched_data", {}).get("categories", {})
+    basic_categories = tx.get("categories", {})
+    pfm_category = enriched_categories.get("pfm", {}) or basic_categories.get("pfm", {})
+    tink_category_id = pfm_category.get("id")
+
+    suggested_type = "income" if amount > 0 else "expense"
+
+    return IngestRecord(
+        tink_transaction_id=tx.get("id"),
+        tink_account_id=tx.get("accountId", ""),
+        provider="tink",
+        # The bank's transaction ID is stable across Tink reconnections,
+        # while Tink's internal ID may change (especially in sandbox)
+        provider_transaction_id=tx.get("identifiers", {}).get("providerTransactionId"),
+        amount=amount,
+        currency=amount_data.get("currencyCode", "PLN"),
+        date=_parse_iso_date(tx.get("dates", {}).get("booked")) or datetime.now().date(),
+        description_display=descriptions.get("display", "Unknown transaction"),
+        description_original=descriptions.get("original"),
+        description_detailed=descriptions.get("detailed"),
+        merchant_name=merchant_info.get("merchantName"),
+        merchant_category_code=merchant_info.get("merchantCategoryCode"),
+        tink_category_id=tink_category_id,
+        tink_category_name=pfm_category.get("name"),
+        suggested_type=suggested_type,
+        suggested_category=map_tink_category(tink_category_id, suggested_type),
+        raw_data=tx,
+    )
+
+
+def parse_gocardless_transaction(tx: dict, account_id: str) -> Optional[IngestRecord]:
+    """
+    Normalize a GoCardless transaction payload.
+
+    Returns None when the transaction has neither internalTransactionId nor transactionId.
+    """
+    # internalTransactionId is stable across reconnections; fall back to transactionId
+    internal_tx_id = tx.get("internalTransactionId")
+    gc_transaction_id = tx.get("transactionId", "")
+    if not (internal_tx_id or gc_transaction_id):
+        logger.warning("Transaction missing both internalTransactionId and transactionId, skipping")
+        return None
+
+    # internalTransactionId is a unique hash, but transactionId is per-account sequential
+    # (e.g., ING uses "D202602190000002" which repeats across accounts)
+    unique_tx_id = internal_tx_id or f"gc:{account_id}:{gc_transaction_id}"
+
+    # GoCardless sends amounts as strings like "-95.35"
+    amount_data = tx.get("transactionAmount", {})
+    try:
+        amount = float(amount_data.get("amount", "0"))
+    except (ValueError, TypeError):
+        amount = 0.0
+
+    remittance_info = tx.get("remittanceInformationUnstructured", "")
+
+    # For expenses (negative amount), creditor is the merchant
+    # For income (positive amount), debtor is the source
+    counterparty = tx.get("creditorName") if amount < 0 else tx.get("debtorName")
+
+    return IngestRecord(
+        tink_transaction_id=unique_tx_id,
+        tink_account_id=account_id,
+        provider="gocardless",
+        provider_transaction_id=internal_tx_id,
+        amount=amount,
+        currency=amount_data.get("currency", "PLN"),
+        date=_parse_iso_date(tx.get("bookingDate")) or datetime.now().date(),
+        description_display=counterparty or remittance_info or "Unknown transaction",
+        description_original=remittance_info,
+        description_detailed=remittance_info,
+        merchant_name=counterparty,
+        # proprietaryBankTransactionCode e.g. "PURCHASE", "TRANSFER"
+        merchant_category_code=tx.get("proprietaryBankTransactionCode", ""),
+        suggested_type="income" if amount > 0 else "expense",
+        is_internal_transfer=detect_internal_transfer(tx, "gocardless"),
+        raw_data=tx,
+    )
+
+
+def parse_enable_banking_transaction(tx: dict, account_uid: str) -> Optional[IngestRecord]:
+    """
+    Normalize an Enable Banking transaction payload.
+
+    Returns None when the transaction has neither entry_reference nor transaction_id.
+    """
+    # entry_reference is the stable bank ID
+    entry_ref = tx.get("entry_reference", "")
+    tx_id = tx.get("transaction_id", "")
+    if not (entry_ref or tx_id):
+        logger.warning("EB transaction missing entry_reference and transaction_id, skipping")
+        return None
+
+    amount_data = tx.get("transaction_amount", {})
+    try:
+        amount = float(amount_data.get("amount", "0"))
+    except (ValueError, TypeError):
+        amount = 0.0
+
+    booked_date = _parse_iso_date(tx.get("booking_date", ""))
+
+    remittance_info = tx.get("remittance_information", [])
+    remittance_text = " ".join(remittance_info) if isinstance(remittance_info, list) else str(remittance_info or "")
+
+    # credit_debit_indicator: CRDT (income) or DBIT (expense)
+    if tx.get("credit_debit_indicator", "") == "DBIT" or amount < 0:
+        counterparty = (tx.get("creditor", {}) or {}).get("name")
+        suggested_type = "expense"
+    else:
+        counterparty = (tx.get("debtor", {}) or {}).get("name")
+        suggested_type = "income"
+
+    return IngestRecord(
+        tink_transaction_id=entry_ref or f"eb:{account_uid}:{tx_id}",
+        tink_account_id=account_uid,
+        provider="enablebanking",
+        provider_transaction_id=entry_ref or None,
+        amount=amount,
+        currency=amount_data.get("currency", "PLN"),
+        date=booked_date or datetime.now().date(),
+        booked_datetime=datetime.combine(booked_date, datetime.min.time()) if booked_date else None,
+        description_display=counterparty or remittance_text or "Unknown transaction",
+        description_original=remittance_info[0] if isinstance(remittance_info, list) and remittance_info else remittance_text,
+        description_detailed=remittance_text,
+        merchant_name=counterparty,
+        merchant_category_code=tx.get("merchant_category_code") or None,
+        suggested_type=suggested_type,
+        is_internal_transfer=detect_internal_transfer(tx, "enablebanking"),
+        raw_data=tx,
+    )
+
+
+def detect_internal_transfer(raw_data: dict, provider: str) -> bool:
+    """Detect internal transfers from raw provider transaction data.
+
+    GoCardless marks them with types.type == "TRANSFER". For Enable Banking this
+    catches ING Smart Saver, own-account transfers, savings account transfers,
+    and same-bank same-person transfers.
+    """
+    if not raw_data:
+        return False
+
+    if provider == "gocardless":
+        types = raw_data.get("types") or {}
+        if isinstance(types, dict):
+            types = [types]
+        return any(isinstance(t, dict) and t.get("type") == "TRANSFER" for t in types)
+
+    remittance = raw_data.get("remittance_information", [])
+    remittance_text = " ".join(remittance) if isinstance(remittance, list) else str(remittance or "")
+    remittance_lower = remittance_text.lower()
+
+    # Pattern 1: ING Smart Saver auto-savings
+    if "smart saver" in remittance_lower:
+        return True
+
+    # Pattern 2: Own-account transfer ("Przelew własny")
+    if "przelew własny" in remittance_lower:
+        return True
+
+    # Pattern 3: Savings account transfer
+    if "konto oszczędnościowe" in remittance_lower:
+        return True
+
+    # Pattern 4: Same bank, same person (debtor_agent BIC == creditor_agent BIC)
+    debtor_agent = raw_data.get("debtor_agent") or {}
+    creditor_agent = raw_data.get("creditor_agent") or {}
+    if (debtor_agent.get("bic_fi") and
+            debtor_agent.get("bic_fi") == creditor_agent.get("bic_fi")):
+        debtor_addr = (raw_data.get("debtor") or {}).get("postal_address") or {}
+        creditor_addr = (raw_data.get("creditor") or {}).get("postal_address") or {}
+        debtor_lines = debtor_addr.get("address_line") or []
+        creditor_lines = creditor_addr.get("address_line") or []
+        if debtor_lines and creditor_lines and debtor_lines[0] == creditor_lines[0]:
+            return True
+
+    return False
+
+
+# Tink categories look like: "expenses:food.groceries", "income:salary"
+TINK_CATEGORY_MAP = {
+    # Expenses
+    "expenses:food.groceries": "Jedzenie",
+    "expenses:food.restaurants": "Restauracje",
+    "expenses:food.coffee": "Restauracje",
+    "expenses:transport.fuel": "Transport",
+    "expenses:transport.public": "Transport",
+    "expenses:transport.taxi": "Transport",
+    "expenses:transport.parking": "Transport",
+    "expenses:housing.rent": "Mieszkanie",
+    "expenses:housing.mortgage": "Mieszkanie",
+    "expenses:housing.utilities": "Rachunki",
+    "expenses:housing.insurance": "Ubezpieczenia",
+    "expenses:shopping.clothes": "Ubrania",
+    "expenses:shopping.electronics": "Elektronika",
+    "expenses:shopping.groceries": "Jedzenie",
+    "expenses:entertainment.movies": "Rozrywka",
+    "expenses:entertainment.games": "Rozrywka",
+    "expenses:entertainment.streaming": "Subskrypcje",
+    "expenses:health.pharmacy": "Zdrowie",
+    "expenses:health.doctor": "Zdrowie",
+    "expenses:health.gym": "Zdrowie",
+    "expenses:education": "Edukacja",
+    "expenses:misc": "Inne",
+
+    # Income
+    "income:salary": "Wynagrodzenie",
+    "income:benefits": "Świadczenia",
+    "income:pension": "Emerytura",
+    "income:refund": "Zwroty",
+    "income:investment": "Inwestycje",
+    "income:gift": "Prezenty",
+    "income:other": "Inne",
+
+    # Transfers (usually ignored)
+    "transfers:internal": None,
+    "transfers:savings": None,
+}
+
+
+def map_tink_category(tink_category_id: Optional[str], tx_type: str) -> Optional[str]:
+    """
+    Map Tink category ID to our app category.
+
+    Tink categories look like: "expenses:food.groceries", "income:salary"
+    """
+    if not tink_category_id:
+        return None
+
+    # Try exact match first
+    if tink_category_id in TINK_CATEGORY_MAP:
+        return TINK_CATEGORY_MAP[tink_category_id]
+
+    # Try prefix match
+    for prefix, category in TINK_CATEGORY_MAP.items():
+        if tink_category_id.startswith(prefix.split(".")[0]):
+            return category
+
+    # Default based on type
+    return "Inne" if tx_type == "expense" else "Inne"
+
+
+# =============================================================================
+# Batched Dedup / Insert Stage
+# =============================================================================
+
+def ingest_records(
+    db: Session,
+    user_id: str,
+    records: Iterable[Optional[IngestRecord]],
+    match_fuzzy: bool = False,
+) -> IngestResult:
+    """
+    Store normalized records, skipping exact duplicates.
+
+    A record is an exact duplicate when its tink_transaction_id is already stored
+    (or repeated in the batch), or its provider_transaction_id is already stored
+    for this household. With match_fuzzy, a booked record that replaces a stored
+    pending one updates that row instead, and fuzzy duplicates are stored flagged
+    for review. None entries (payloads an adapter skipped) are ignored.
+
+    The caller commits.
+    """
+    records = [record for record in records if record is not None]
+    seen_tink_ids: set = set()
+    seen_provider_ids: set = set()
+    totals = [0, 0, 0]
+
+    for start in range(0, len(records), INGEST_CHUNK_SIZE):
+        chunk = records[start:start + INGEST_CHUNK_SIZE]
+        with QueryBudget("transaction_ingest", max_queries=INGEST_MAX_QUERIES):
+            result = _ingest_chunk(db, user_id, chunk, match_fuzzy, seen_tink_ids, seen_provider_ids)
+        for i, count in enumerate(result):
+            totals[i] += count
+
+    return IngestResult(*totals)
+
+
+def _ingest_chunk(
+    db: Session,
+    user_id: str,
+    records: List[IngestRecord],
+    match_fuzzy: bool,
+    seen_tink_ids: set,
+    seen_provider_ids: set,
+) -> IngestResult:
+    stored_tink_ids, stored_provider_ids = fetch_existing_transaction_ids(
+        db,
+        user_id,
+        (record.tink_transaction_id for record in records),
+        (record.provider_transaction_id for record in records),
+    )
+    seen_tink_ids |= stored_tink_ids
+    seen_provider_ids |= stored_provider_ids
+
+    exact_duplicate_count = 0
+    candidates = []
+    for record in records:
+        # Also skips repeats within the batch, e.g. both sides of an ING
+        # internal transfer sharing one internalTransactionId
+        if record.tink_transaction_id in seen_tink_ids:
+            exact_duplicate_count += 1
+            continue
+        seen_tink_ids.add(record.tink_transaction_id)
+        candidates.append(record)
+
+    index = None
+    if match_fuzzy and candidates:
+        fingerprints = [record.fingerprint() for record in candidates]
+        index = DuplicateCandidateIndex(fetch_candidate_window(db, user_id, fingerprints))
+
+    new_rows = []
+    fuzzy_duplicate_count = 0
+    for position, record in enumerate(candidates):
+        fingerprint = fingerprints[position] if index is not None else None
+
+        # Pending -> booked: update the stored pending row instead of adding a new one.
+        # Checked before the provider id, which the pending row may already carry.
+        if index is not None:
+            pending_tx = index.find_pending_to_booked(fingerprint, record.raw_data)
+            if pending_tx is not None:
+                pending_tx.tink_transaction_id = record.tink_transaction_id
+                pending_tx.raw_data = record.raw_data
+                continue
+
+        provider_tx_id = record.provider_transaction_id
+        if provider_tx_id:
+            if provider_tx_id in seen_provider_ids:
+                exact_duplicate_count += 1
+                continue
+            seen_provider_ids.add(provider_tx_id)
+
+        row = record.to_row(user_id)
+        fuzzy_match = index.find_duplicate(fingerprint) if index is not None else None
+        if fuzzy_match:
+            row.update(
+                is_duplicate=True,
+                duplicate_of=fuzzy_match.original_transaction_id,
+                duplicate_confidence=fuzzy_match.confidence,
+                duplicate_reason=fuzzy_match.match_reason,
+            )
+            fuzzy_duplicate_count += 1
+        new_rows.append(row)
+
+    inserted_ids = insert_transaction_rows(db, new_rows)
+    synced_count = len(inserted_ids)
+    # Rows a concurrent sync stored in the meantime
+    exact_duplicate_count += len(new_rows) - synced_count
+    if synced_count:
+        mark_scope_written(db, user_id)
+        queue_bank_transactions(db, ids=inserted_ids)
+
+    db.flush()
+    return IngestResult(synced_count, exact_duplicate_count, fuzzy_duplicate_count)
+
+
+def insert_transaction_rows(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Bulk insert rows, skipping any whose tink_transaction_id already exists.
+
+    Returns the ids of the rows actually inserted.
+    """
+    if not rows:
+        return []
+
+    stmt = (
+        dialect_insert(db, BankTransaction.__table__)
+        .on_conflict_do_nothing(index_elements=["tink_transaction_id"])
+        .returning(BankTransaction.__table__.c.id)
+    )
+    return list(db.execute(stmt, rows).scalars())
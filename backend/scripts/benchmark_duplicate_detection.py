@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch duplicate detection against per-transaction lookups.
+
+Seeds an in-memory SQLite database with one user's synthetic bank history
+(50k rows by default), builds an incoming batch where part of the rows are
+near-duplicates of stored ones, then deduplicates the batch with:
+
+- legacy: the previous find_potential_duplicates() - one ±7-day query per
+  transaction truncated to limit * 3 rows, full Levenshtein per candidate
+- batch: find_duplicates_batch() - one window query and DuplicateCandidateIndex
+
+and reports database round trips, wall time and how many duplicates each found.
+
+Usage:
+    python scripts/benchmark_duplicate_detection.py [--rows 50000] [--batch 500]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("ENVIRONMENT", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert
+
+from app.database import Base, SessionLocal, engine
+from app.models import BankTransaction, User
+from app.services.duplicate_detection_service import (
+    MIN_AMOUNT_FOR_DUPLICATE_CHECK,
+    MIN_CONFIDENCE_THRESHOLD,
+    amounts_match,
+    calculate_duplicate_confidence,
+    create_fingerprint,
+    find_duplicates_batch,
+)
+
+USER_ID = "benchmark-user"
+MERCHANTS = [
+    "BIEDRONKA", "LIDL SP Z O O", "ZABKA Z1234", "ORLEN STACJA", "ALLEGRO", "UBER *TRIP",
+    "SPOTIFY", "NETFLIX.COM", "ROSSMANN", "IKEA RETAIL", "CARREFOUR EXPRESS", "MPK KRAKOW",
+]
+
+
+def seed(db, rows: int, today: date):
+    """Insert a user's two-year history across three accounts; return the rows."""
+    rng = random.Random(42)
+    db.add(User(id=USER_ID, email="benchmark@example.com", name="Benchmark"))
+    db.flush()
+
+    history = []
+    for i in range(rows):
+        merchant = rng.choice(MERCHANTS)
+        history.append({
+            "user_id": USER_ID,
+            "tink_transaction_id": f"bench_{i}",
+            "tink_account_id": rng.choice(["acc_main", "acc_card", "acc_savings"]),
+            "amount": -round(rng.uniform(1, 500), 2),
+            "currency": "PLN",
+            "date": today - timedelta(days=rng.randint(0, 730)),
+            "description_display": f"{merchant} {rng.randint(1, 9999)}",
+            "status": "pending",
+        })
+    db.execute(insert(BankTransaction), history)
+    db.commit()
+    return history
+
+
+def incoming_batch(history, size: int):
+    """A batch where every other row is a near-duplicate of a stored one."""
+    rng = random.Random(7)
+    batch = []
+    for i in range(size):
+        source = rng.choice(history)
+        if i % 2 == 0:
+            description = source["description_display"][:-1] + str(rng.randint(0, 9))
+            day = source["date"] + timedelta(days=rng.randint(0, 1))
+            amount = source["amount"]
+        else:
+            description = f"{rng.choice(MERCHANTS)} NEW {i}"
+            day = source["date"]
+            amount = -round(rng.uniform(1, 500), 2)
+        batch.append(create_fingerprint(amount, "PLN", day, description, None, source["tink_account_id"]))
+    return batch
+
+
+def legacy_find_potential_duplicates(db, fingerprint, limit=10):
+    """find_potential_duplicates() as it was before DuplicateCandidateIndex."""
+    if fingerprint.amount_abs < MIN_AMOUNT_FOR_DUPLICATE_CHECK:
+        return []
+    candidates = db.query(BankTransaction).filter(
+        BankTransaction.user_id == USER_ID,
+        BankTransaction.currency == fingerprint.currency,
+        BankTransaction.date >= fingerprint.date - timedelta(days=7),
+        BankTransaction.date <= fingerprint.date + timedelta(days=7),
+    ).limit(limit * 3).all()
+
+    matches = []
+    for candidate in candidates:
+        if not amounts_match(fingerprint.amount_abs, abs(candidate.amount), tolerance=0.50):
+            continue
+        confidence, _ = calculate_duplicate_confidence(fingerprint, candidate)
+        if confidence >= MIN_CONFIDENCE_THRESHOLD:
+            matches.append((confidence, candidate.id))
+    matches.sort(reverse=True)
+    return matches[:limit]
+
+
+def legacy(db, batch):
+    return [bool(legacy_find_potential_duplicates(db, fp)) for fp in batch]
+
+
+def batched(db, batch):
+    return [match is not None for match in find_duplicates_batch(db, USER_ID, batch)]
+
+
+def measure(label, func, db, batch):
+    queries = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        started = time.perf_counter()
+        found = func(db, batch)
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    print(f"{label:<8} {len(queries):>8} {elapsed * 1000:>10.1f} {sum(found):>8}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        history = seed(db, args.rows, date.today())
+        batch = incoming_batch(history, args.batch)
+
+        print(f"{args.rows} stored rows, batch of {args.batch} ({args.batch // 2 + args.batch % 2} near-duplicates)")
+        print(f"{'strategy':<8} {'queries':>8} {'ms total':>10} {'matched':>8}")
+        baseline = measure("legacy", legacy, db, batch)
+        db.expire_all()
+        candidate = measure("batch", batched, db, batch)
+        missed = sum(1 for old, new in zip(baseline, candidate) if old and not new)
+        print(f"matched by legacy but not batch: {missed}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark event-loop lag while serving concurrent dashboard summaries.
+
+Seeds a temporary SQLite database file with a synthetic household, then builds
+--concurrency summaries at once inside one event loop, the way uvicorn serves
+concurrent requests:
+- "sync Session": the summary runs on a plain Session from an async handler,
+  like the endpoints that call db.query() directly - every query blocks the loop.
+- "AsyncSession": the same service code runs through run_sync_db on an aiosqlite
+  AsyncSession (get_async_db), so query I/O is awaited instead.
+
+A probe task sleeps in short ticks and records how late it wakes up; the report
+shows wall time and the p50/p95/max probe lag for each strategy.
+
+Usage:
+    python scripts/benchmark_event_loop_lag.py [--rows 5000] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("ENVIRONMENT", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, run_sync_db
+from app.models import Expense, Income, Loan, Saving, User
+from app.services.summary_service import SummaryService
+
+USER_ID = "benchmark-user"
+PROBE_INTERVAL = 0.005
+
+
+def seed(db, rows: int, today: date) -> None:
+    """Insert two years of one-off and recurring entries, savings and a few loans."""
+    rng = random.Random(42)
+    db.add(User(id=USER_ID, email="benchmark@example.com", name="Benchmark"))
+    db.flush()
+
+    for i in range(rows):
+        day = today - timedelta(days=rng.randint(0, 2 * 365))
+        common = dict(
+            user_id=USER_ID,
+            category=rng.choice(["groceries", "transport", "housing", "salary"]),
+            description=f"entry-{i % 200}",
+            amount=round(rng.uniform(5, 2000), 2),
+            date=day,
+            is_recurring=rng.random() < 0.05,
+        )
+        kind = i % 5
+        if kind == 0:
+            db.add(Income(**common))
+        elif kind == 1:
+            db.add(Saving(**common, saving_type=rng.choice(["deposit", "withdrawal"])))
+        else:
+            db.add(Expense(**common))
+
+    for i in range(10):
+        db.add(Loan(
+            user_id=USER_ID,
+            loan_type="personal",
+            description=f"loan-{i}",
+            principal_amount=10000.0,
+            remaining_balance=5000.0,
+            interest_rate=7.5,
+            monthly_payment=300.0,
+            start_date=today - timedelta(days=rng.randint(30, 700)),
+            term_months=60,
+        ))
+    db.commit()
+
+
+async def probe_lag(stop: asyncio.Event, lags: list) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - started - PROBE_INTERVAL)
+
+
+async def run_strategy(handler, concurrency: int):
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_lag(stop, lags))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    return elapsed, lags
+
+
+def report(label: str, elapsed: float, lags: list) -> None:
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p95 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.95))]
+    print(
+        f"{label:<14} {elapsed * 1000:>9.1f} {statistics.median(lags_ms):>9.1f} "
+        f"{p95:>9.1f} {lags_ms[-1]:>9.1f}"
+    )
+
+
+async def main_async(args, path: str) -> None:
+    sync_engine = create_engine(f"sqlite:///{path}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    AsyncSession = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    Base.metadata.create_all(bind=sync_engine)
+    with SyncSession() as db:
+        seed(db, args.rows, date.today())
+        # Materialize the monthly aggregates up front so both strategies only read
+        SummaryService.build_summary(USER_ID, db)
+        db.commit()
+
+    async def sync_handler():
+        with SyncSession() as db:
+            SummaryService.build_summary(USER_ID, db)
+
+    async def async_handler():
+        async with AsyncSession() as db:
+            await run_sync_db(db, lambda session: SummaryService.build_summary(USER_ID, session))
+
+    print(f"{args.rows} rows, {args.concurrency} concurrent summaries")
+    print(f"{'strategy':<14} {'wall ms':>9} {'p50 lag':>9} {'p95 lag':>9} {'max lag':>9}")
+    for label, handler in (("sync Session", sync_handler), ("AsyncSession", async_handler)):
+        elapsed, lags = await run_strategy(handler, args.concurrency)
+        report(label, elapsed, lags)
+
+    await async_engine.dispose()
+    sync_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(main_async(args, os.path.join(tmp, "benchmark.db")))
+
+
+if __name__ == "__main__":
+    main()
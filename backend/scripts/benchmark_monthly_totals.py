@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark MonthlyTotalsService.calculate_range against per-month calculation.
+
+Seeds an in-memory SQLite database with a synthetic household history, then
+computes a rolling 13-month cash flow (the dashboard chart) both ways and
+reports database round trips, wall time and whether the results match.
+
+Usage:
+    python scripts/benchmark_monthly_totals.py [--months 13] [--rows 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("ENVIRONMENT", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app.database import Base, SessionLocal, engine
+from app.models import Expense, Income, User
+from app.services.monthly_totals_service import MonthlyTotalsService
+
+USER_ID = "benchmark-user"
+
+
+def seed(db, rows: int, today: date) -> None:
+    """Insert a mix of one-off and recurring expenses/income spread over three years."""
+    rng = random.Random(42)
+    db.add(User(id=USER_ID, email="benchmark@example.com", name="Benchmark"))
+    db.flush()
+
+    categories = ["groceries", "transport", "housing", "utilities", "obligations"]
+    for i in range(rows):
+        start = today - timedelta(days=rng.randint(0, 3 * 365))
+        recurring = rng.random() < 0.05
+        end_date = None
+        if recurring and rng.random() < 0.5:
+            end_date = start + timedelta(days=rng.randint(30, 720))
+        model = Income if i % 10 == 0 else Expense
+        db.add(model(
+            user_id=USER_ID,
+            category=rng.choice(categories),
+            description=f"entry-{i % 200}",
+            amount=round(rng.uniform(5, 2000), 2),
+            date=start,
+            end_date=end_date,
+            is_recurring=recurring,
+            reconciliation_status=rng.choice(["unreviewed", "manual_confirmed", "duplicate_of_bank"]),
+        ))
+    db.commit()
+
+
+def month_window(today: date, months: int):
+    """Return (start_ym, end_ym) for a rolling window ending in the current month."""
+    first = today.year * 12 + today.month - 1 - (months - 1)
+    return (first // 12, first % 12 + 1), (today.year, today.month)
+
+
+def per_month(db, start_ym, end_ym):
+    results = {}
+    for ym in MonthlyTotalsService._month_range(start_ym, end_ym):
+        results[ym] = {
+            "income": MonthlyTotalsService.calculate_monthly_income(USER_ID, ym[0], ym[1], db),
+            "expenses": MonthlyTotalsService.calculate_monthly_expenses(USER_ID, ym[0], ym[1], db),
+            "obligations": MonthlyTotalsService.calculate_monthly_obligations(USER_ID, ym[0], ym[1], db),
+        }
+    return results
+
+
+def ranged(db, start_ym, end_ym):
+    return MonthlyTotalsService.calculate_range(USER_ID, start_ym, end_ym, db)
+
+
+def measure(label, func, db, start_ym, end_ym, repeat: int):
+    queries = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = func(db, start_ym, end_ym)
+        elapsed = (time.perf_counter() - started) / repeat
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    print(f"{label:<12} {len(queries) // repeat:>8} {elapsed * 1000:>10.2f}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--months", type=int, default=13)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    today = date.today()
+    db = SessionLocal()
+    try:
+        seed(db, args.rows, today)
+        start_ym, end_ym = month_window(today, args.months)
+
+        print(f"{args.rows} rows, {args.months} months ({start_ym} -> {end_ym})")
+        print(f"{'strategy':<12} {'queries':>8} {'ms/call':>10}")
+        baseline = measure("per-month", per_month, db, start_ym, end_ym, args.repeat)
+        candidate = measure("range", ranged, db, start_ym, end_ym, args.repeat)
+        print(f"identical results: {baseline == candidate}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
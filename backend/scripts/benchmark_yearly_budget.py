@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Benchmark BudgetReportService.build_yearly_report against the per-month loop.
+
+Seeds an in-memory SQLite database with a synthetic household (one-off and recurring
+incomes, expenses and savings plus loans spread over the range), then builds the
+yearly budget report with the previous row-rescanning loop (kept here as the
+baseline) and with the columnar builder, reporting wall time and whether the JSON
+output is identical.
+
+Usage:
+    python scripts/benchmark_yearly_budget.py [--years 10] [--rows 5000]
+"""
+
+import argparse
+import calendar
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("ENVIRONMENT", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base, SessionLocal, engine
+from app.models import Expense, Income, Loan, Saving, User
+from app.services.budget_report_service import BudgetReportService
+
+USER_ID = "benchmark-user"
+
+
+def seed(db, rows: int, start: date, end: date) -> None:
+    """Insert rows spread over [start, end]: ~10% recurring, a few dozen loans."""
+    rng = random.Random(42)
+    db.add(User(id=USER_ID, email="benchmark@example.com", name="Benchmark"))
+    db.flush()
+
+    span = (end - start).days
+    categories = ["groceries", "transport", "housing", "utilities", "salary", "emergency_fund"]
+    for i in range(rows):
+        day = start + timedelta(days=rng.randint(0, span))
+        recurring = rng.random() < 0.1
+        end_date = day + timedelta(days=rng.randint(30, 1500)) if recurring and rng.random() < 0.5 else None
+        common = dict(
+            user_id=USER_ID,
+            category=rng.choice(categories),
+            description=f"entry-{i % 300}",
+            amount=round(rng.uniform(5, 3000), 2),
+            date=day,
+            end_date=end_date,
+            is_recurring=recurring,
+        )
+        kind = i % 5
+        if kind == 0:
+            db.add(Income(**common))
+        elif kind == 1:
+            db.add(Saving(**common, saving_type=rng.choice(["deposit", "withdrawal"])))
+        else:
+            db.add(Expense(**common))
+
+    for i in range(rows // 100):
+        principal = round(rng.uniform(5000, 300000), 2)
+        db.add(Loan(
+            user_id=USER_ID,
+            loan_type=rng.choice(["mortgage", "car", "personal"]),
+            description=f"loan-{i}",
+            principal_amount=principal,
+            remaining_balance=round(principal * rng.random(), 2),
+            interest_rate=round(rng.uniform(2, 12), 2),
+            monthly_payment=round(principal / 60, 2),
+            start_date=start + timedelta(days=rng.randint(0, span)),
+            term_months=rng.randint(12, 360),
+        ))
+    db.commit()
+
+
+def legacy_report(db, start_date: str, end_date: str):
+    """The previous get_yearly_budget loop: every month rescans every row."""
+    start_datetime = datetime.strptime(start_date, "%Y-%m")
+    end_datetime = datetime.strptime(end_date, "%Y-%m")
+    end_datetime = end_datetime.replace(day=calendar.monthrange(end_datetime.year, end_datetime.month)[1])
+    period_start, period_end = start_datetime.date(), end_datetime.date()
+
+    def load(model):
+        regular = db.query(model).filter(
+            model.user_id == USER_ID, model.date >= period_start, model.date <= period_end,
+            model.is_recurring == False
+        ).all()
+        recurring = db.query(model).filter(
+            model.user_id == USER_ID, model.is_recurring == True, model.date <= period_end
+        ).all()
+        return regular, recurring
+
+    regular_incomes, recurring_incomes = load(Income)
+    regular_expenses, recurring_expenses = load(Expense)
+    regular_savings, recurring_savings = load(Saving)
+    loans = db.query(Loan).filter(Loan.user_id == USER_ID, Loan.start_date <= period_end).all()
+
+    def item(row):
+        return {"id": row.id, "title": row.description, "amount": float(row.amount),
+                "category": row.category, "date": row.date.isoformat()}
+
+    def saving_item(row):
+        return {"id": row.id, "title": row.description, "amount": float(row.amount),
+                "category": row.category, "saving_type": row.saving_type, "date": row.date.isoformat()}
+
+    monthly_data = {}
+    current_date = start_datetime
+    while current_date <= end_datetime:
+        month_name = current_date.strftime("%B")
+        month_idx = current_date.month
+        year = current_date.year
+        current_date_only = current_date.date()
+
+        def in_month(rows, build):
+            return [build(r) for r in rows if r.date.year == year and r.date.month == month_idx]
+
+        def active(rows, build):
+            return [build(r) for r in rows
+                    if r.date <= current_date_only and (r.end_date is None or r.end_date >= current_date_only)]
+
+        monthly_regular_incomes = in_month(regular_incomes, item)
+        monthly_recurring_incomes = active(recurring_incomes, item)
+        monthly_regular_expenses = in_month(regular_expenses, item)
+        monthly_recurring_expenses = active(recurring_expenses, item)
+
+        monthly_loans = []
+        monthly_loan_payments_total = 0.0
+        for loan in loans:
+            loan_start = datetime.combine(loan.start_date, datetime.min.time())
+            loan_end_date = loan_start + timedelta(days=30 * loan.term_months)
+            if loan_start.date() <= current_date_only and loan_end_date.date() >= current_date_only:
+                loan_payment = float(loan.monthly_payment) if loan.monthly_payment is not None else 0.0
+                monthly_loan_payments_total += loan_payment
+                monthly_loans.append({
+                    "id": loan.id,
+                    "loan_type": loan.loan_type,
+                    "description": loan.description,
+                    "principal_amount": float(loan.principal_amount) if loan.principal_amount is not None else 0.0,
+                    "remaining_balance": float(loan.remaining_balance) if loan.remaining_balance is not None else 0.0,
+                    "interest_rate": float(loan.interest_rate) if loan.interest_rate is not None else 0.0,
+                    "monthly_payment": loan_payment,
+                    "start_date": loan.start_date.isoformat(),
+                    "term_months": loan.term_months
+                })
+
+        all_monthly_savings = in_month(regular_savings, saving_item) + active(recurring_savings, saving_item)
+        total_deposits = sum(s["amount"] for s in all_monthly_savings if s["saving_type"] == "deposit")
+        total_withdrawals = sum(s["amount"] for s in all_monthly_savings if s["saving_type"] == "withdrawal")
+
+        total_income = float(sum(i["amount"] for i in monthly_regular_incomes)
+                             + sum(i["amount"] for i in monthly_recurring_incomes))
+        total_expenses = float(sum(e["amount"] for e in monthly_regular_expenses)
+                               + sum(e["amount"] for e in monthly_recurring_expenses))
+
+        monthly_data[f"{month_name} {year}"] = {
+            "incomes": monthly_regular_incomes + monthly_recurring_incomes,
+            "expenses": monthly_regular_expenses + monthly_recurring_expenses,
+            "loanPayments": monthly_loans,
+            "savings": all_monthly_savings,
+            "totals": {
+                "income": total_income,
+                "expenses": total_expenses,
+                "loanPayments": monthly_loan_payments_total,
+                "savings": float(total_deposits - total_withdrawals),
+                "deposits": float(total_deposits),
+                "withdrawals": float(total_withdrawals),
+                "balance": total_income - total_expenses - monthly_loan_payments_total
+            }
+        }
+
+        if month_idx == 12:
+            current_date = current_date.replace(year=year + 1, month=1)
+        else:
+            current_date = current_date.replace(month=month_idx + 1)
+
+    return monthly_data
+
+
+def columnar_report(db, start_date: str, end_date: str):
+    start = datetime.strptime(start_date, "%Y-%m")
+    end = datetime.strptime(end_date, "%Y-%m")
+    return BudgetReportService.build_yearly_report(
+        USER_ID, (start.year, start.month), (end.year, end.month), db
+    )
+
+
+def measure(label, func, db, start_date, end_date, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        db.expire_all()
+        result = func(db, start_date, end_date)
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<12} {elapsed * 1000:>10.1f}")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    end_year = date.today().year
+    start_year = end_year - args.years + 1
+    db = SessionLocal()
+    try:
+        seed(db, args.rows, date(start_year, 1, 1), date(end_year, 12, 31))
+        start_date, end_date = f"{start_year}-01", f"{end_year}-12"
+
+        print(f"{args.rows} rows, {args.years} years ({start_date} -> {end_date})")
+        print(f"{'strategy':<12} {'ms/call':>10}")
+        baseline, baseline_time = measure("per-month", legacy_report, db, start_date, end_date, args.repeat)
+        candidate, candidate_time = measure("columnar", columnar_report, db, start_date, end_date, args.repeat)
+        print(f"speedup: {baseline_time / candidate_time:.1f}x")
+        print(f"identical JSON: {json.dumps(baseline) == json.dumps(candidate)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
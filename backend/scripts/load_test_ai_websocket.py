@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Load test: many simultaneous /ai/ws chats against a local fake Anthropic API.
+
+Starts a minimal streaming server that speaks the Messages API SSE format and
+emits --tokens text deltas --token-delay seconds apart, points the app at it
+(ANTHROPIC_BASE_URL), serves the app with uvicorn on an in-memory SQLite
+database and opens --sessions WebSocket chats at once, each from its own
+premium user.
+
+Every stream takes about tokens * token-delay. Without head-of-line blocking
+the whole run takes about as long as one stream and the first token of every
+session arrives after about one token delay. If streaming blocked the event
+loop, sessions would finish one after another and wall time would grow with
+--sessions.
+
+Usage:
+    python scripts/load_test_ai_websocket.py [--sessions 50] [--tokens 40] [--token-delay 0.02]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROBE_INTERVAL = 0.005
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def fake_anthropic(tokens: int, token_delay: float):
+    """Connection handler streaming a fixed text answer for every request."""
+
+    async def handle(reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.decode("latin-1").split("\r\n"):
+                if line.lower().startswith("content-length:"):
+                    length = int(line.split(":", 1)[1])
+            await reader.readexactly(length)
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+            )
+            writer.write(_sse("message_start", {
+                "type": "message_start",
+                "message": {
+                    "id": "msg_load_test", "type": "message", "role": "assistant", "model": "fake",
+                    "content": [], "stop_reason": None, "stop_sequence": None,
+                    "usage": {"input_tokens": 10, "output_tokens": 0},
+                },
+            }))
+            writer.write(_sse("content_block_start", {
+                "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+            }))
+            await writer.drain()
+            for i in range(tokens):
+                await asyncio.sleep(token_delay)
+                writer.write(_sse("content_block_delta", {
+                    "type": "content_block_delta", "index": 0,
+                    "delta": {"type": "text_delta", "text": f"t{i} "},
+                }))
+                await writer.drain()
+            writer.write(_sse("content_block_stop", {"type": "content_block_stop", "index": 0}))
+            writer.write(_sse("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": tokens},
+            }))
+            writer.write(_sse("message_stop", {"type": "message_stop"}))
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def probe_lag(stop: asyncio.Event, lags: list) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - started - PROBE_INTERVAL)
+
+
+def seed_users(count: int) -> list:
+    """Create premium users and return their WebSocket tokens."""
+    import jwt
+
+    from app.database import Base, SessionLocal, engine
+    from app.dependencies import JWT_ALGORITHM, JWT_SECRET
+    from app.models import Subscription, User
+
+    Base.metadata.create_all(bind=engine)
+    tokens = []
+    with SessionLocal() as db:
+        for i in range(count):
+            email = f"load-{i}@example.com"
+            db.add(User(id=f"load-user-{i}", email=email, name=f"Load {i}"))
+            db.add(Subscription(user_id=f"load-user-{i}", status="active", plan_type="lifetime", is_lifetime=True))
+            tokens.append(jwt.encode(
+                {"sub": email, "exp": datetime.utcnow() + timedelta(hours=1)}, JWT_SECRET, algorithm=JWT_ALGORITHM
+            ))
+        db.commit()
+    return tokens
+
+
+async def chat(url: str, token: str) -> dict:
+    """One session: send a message, time the first token and the done frame."""
+    import websockets
+
+    async with websockets.connect(f"{url}/ai/ws?token={token}") as ws:
+        started = time.perf_counter()
+        await ws.send(json.dumps({"type": "message", "content": "Jak wyglada moj budzet?"}))
+        first_token = None
+        tokens = 0
+        while True:
+            frame = json.loads(await ws.recv())
+            if frame["type"] == "token":
+                tokens += 1
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+            elif frame["type"] in ("done", "error", "quota_exceeded"):
+                return {
+                    "status": frame["type"],
+                    "first_token": first_token,
+                    "total": time.perf_counter() - started,
+                    "tokens": tokens,
+                }
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def main_async(args) -> None:
+    fake = await asyncio.start_server(fake_anthropic(args.tokens, args.token_delay), "127.0.0.1", 0)
+    fake_host, fake_port = fake.sockets[0].getsockname()[:2]
+
+    os.environ.update({
+        "ENVIRONMENT": "test",
+        "TESTING": "true",
+        "ANTHROPIC_API_KEY": "load-test",
+        "ANTHROPIC_BASE_URL": f"http://{fake_host}:{fake_port}",
+        "AI_QUERIES_PER_MONTH": "1000000",
+    })
+
+    import uvicorn
+    from app.main import app
+
+    tokens = seed_users(args.sessions)
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, lifespan="off", log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    url = f"ws://127.0.0.1:{port}"
+
+    # Warm-up: imports, the shared client and the first connection
+    await chat(url, tokens[0])
+
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_lag(stop, lags))
+    started = time.perf_counter()
+    results = await asyncio.gather(*(chat(url, token) for token in tokens))
+    wall = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    server.should_exit = True
+    await serving
+    fake.close()
+
+    ok = [r for r in results if r["status"] == "done"]
+    stream_time = args.tokens * args.token_delay
+    print(f"{args.sessions} sessions, {args.tokens} tokens every {args.token_delay * 1000:.0f} ms "
+          f"(one stream ~{stream_time * 1000:.0f} ms)")
+    print(f"completed:        {len(ok)}/{len(results)}")
+    if not ok:
+        print(f"statuses:         {sorted({r['status'] for r in results})}")
+        return
+    first_tokens = [r["first_token"] * 1000 for r in ok if r["first_token"] is not None]
+    totals = [r["total"] * 1000 for r in ok]
+    lags_ms = [lag * 1000 for lag in lags] or [0.0]
+    print(f"wall:             {wall * 1000:.0f} ms ({wall / stream_time:.1f}x one stream)")
+    print(f"first token ms:   p50 {statistics.median(first_tokens):.0f}  "
+          f"p95 {percentile(first_tokens, 0.95):.0f}  max {max(first_tokens):.0f}")
+    print(f"session ms:       p50 {statistics.median(totals):.0f}  "
+          f"p95 {percentile(totals, 0.95):.0f}  max {max(totals):.0f}")
+    print(f"loop lag ms:      p50 {statistics.median(lags_ms):.1f}  "
+          f"p95 {percentile(lags_ms, 0.95):.1f}  max {max(lags_ms):.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Rebuild or verify the materialized monthly_aggregates table.
+
+Recomputes every household's monthly income/expense buckets from the raw
+Expense/Income rows (MonthlyTotalsService rules), or with --check diffs the
+stored buckets against the live computation without writing anything.
+
+Run after migration: python scripts/rebuild_monthly_aggregates.py
+
+Options:
+  --household ID   Only process one household (primary user id)
+  --check          Report mismatches instead of rebuilding (exit code 1 if any)
+
+Can be run inside Docker:
+  docker exec home-budget-backend python scripts/rebuild_monthly_aggregates.py --check
+"""
+
+import argparse
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models import Expense, Income, MonthlyAggregateCoverage
+from app.services.monthly_aggregate_service import MonthlyAggregateService
+
+
+def household_ids(db):
+    """All households with Expense/Income rows or existing aggregates."""
+    ids = set()
+    for column in (Expense.user_id, Income.user_id, MonthlyAggregateCoverage.household_id):
+        ids.update(row[0] for row in db.query(column).distinct() if row[0])
+    return sorted(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify monthly_aggregates")
+    parser.add_argument("--household", help="Only process this household id")
+    parser.add_argument("--check", action="store_true", help="Diff against live totals, don't rebuild")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        targets = [args.household] if args.household else household_ids(db)
+        print(f"Processing {len(targets)} household(s)")
+
+        total_mismatches = 0
+        for household_id in targets:
+            if args.check:
+                mismatches = MonthlyAggregateService.check_consistency(household_id, db)
+                total_mismatches += len(mismatches)
+                for m in mismatches:
+                    print(
+                        f"  MISMATCH {household_id} {m['year']}-{m['month']:02d} "
+                        f"{m['kind']}/{m['category']} {m['field']}: "
+                        f"stored={m['stored']} live={m['live']}"
+                    )
+            else:
+                start_ym, end_ym = MonthlyAggregateService.rebuild(household_id, db)
+                print(f"  Rebuilt {household_id}: {start_ym[0]}-{start_ym[1]:02d} .. {end_ym[0]}-{end_ym[1]:02d}")
+
+        if args.check:
+            print(f"Done. {total_mismatches} mismatch(es)")
+            sys.exit(1 if total_mismatches else 0)
+        print("Done.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Rebuild the reconciliation_candidates table.
+
+Recomputes every household's manual/bank duplicate candidates from the
+unreviewed Expense/Income rows and pending bank transactions
+(reconciliation_engine rules). New writes keep the table current; run this
+once after the migration, or to repair a household.
+
+Run after migration: python scripts/rebuild_reconciliation_candidates.py
+
+Options:
+  --household ID   Only process one household (primary user id)
+
+Can be run inside Docker:
+  docker exec home-budget-backend python scripts/rebuild_reconciliation_candidates.py
+"""
+
+import argparse
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models import BankTransaction, Expense, Income
+from app.services.reconciliation_candidates import ReconciliationCandidates
+
+
+def household_ids(db):
+    """All households with Expense/Income rows or bank transactions."""
+    ids = set()
+    for column in (Expense.user_id, Income.user_id, BankTransaction.user_id):
+        ids.update(row[0] for row in db.query(column).distinct() if row[0])
+    return sorted(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild reconciliation_candidates")
+    parser.add_argument("--household", help="Only process this household id")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        targets = [args.household] if args.household else household_ids(db)
+        print(f"Processing {len(targets)} household(s)")
+
+        for household_id in targets:
+            count = ReconciliationCandidates.rebuild(household_id, db)
+            db.commit()
+            print(f"  Rebuilt {household_id}: {count} candidate(s)")
+
+        print("Done.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -182,6 +182,20 @@ class Saving(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 
+class ReconciliationCandidate(Base):
+    __tablename__ = "reconciliation_candidates"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    entry_type = Column(String, nullable=False)
+    expense_id = Column(Integer, ForeignKey("expenses.id"), nullable=True)
+    income_id = Column(Integer, ForeignKey("income.id"), nullable=True)
+    bank_transaction_id = Column(Integer, ForeignKey("bank_transactions.id"), nullable=False)
+    manual_date = Column(Date, nullable=False)
+    match_score = Column(Float, nullable=False)
+    match_reasons = Column(JSON, nullable=False, default=list)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class OnboardingBackup(Base):
     __tablename__ = "onboarding_backups"
     id = Column(Integer, primary_key=True, index=True)
@@ -191,6 +205,42 @@ class OnboardingBackup(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--index-advisor",
+        action="store_true",
+        default=False,
+        help="Report WHERE column patterns on app tables that no index supports",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("--index-advisor"):
+        from app.database import Base as AppBase
+        from app import models  # noqa: F401 - register app tables
+        from tests.index_advisor import IndexAdvisor
+
+        advisor = IndexAdvisor(AppBase.metadata.tables.values())
+        advisor.install()
+        config._index_advisor = advisor
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    advisor = getattr(item.config, "_index_advisor", None)
+    if advisor is not None:
+        advisor.current_test = item.nodeid
+    yield
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    advisor = getattr(config, "_index_advisor", None)
+    if advisor is not None:
+        terminalreporter.section("index advisor")
+        for line in advisor.report_lines():
+            terminalreporter.write_line(line)
+
+
 @pytest.fixture(scope="session")
 def engine():
     """Create a test database engine that persists across the test session."""
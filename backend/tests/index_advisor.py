@@ -0,0 +1,129 @@
+"""
+Test-time index advisor.
+
+Run the suite with ``pytest --index-advisor`` to record the WHERE columns of every
+ORM query issued against the application's tables and report the column sets
+that no index can serve. An index supports a query when the filtered columns
+are a prefix of the index's columns (in any order): an index on (user_id, date)
+serves user_id = ? and user_id = ? AND date >= ?, but not user_id = ? AND
+description = ?. A primary key or unique index also supports any query that
+filters on all of its columns (the primary key and unique constraints count as
+indexes).
+
+The report lists each unsupported (table, columns) pattern with how often it was
+seen and an example test, most frequent first. Only tables from the app's
+metadata are inspected; the simplified unit-test models in tests/conftest.py
+don't carry the production indexes.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Table, UniqueConstraint, event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import ColumnClause
+from sqlalchemy.sql.selectable import Alias
+
+Pattern = Tuple[str, FrozenSet[str]]
+
+
+@dataclass
+class PatternStats:
+    count: int = 0
+    tests: Set[str] = field(default_factory=set)
+
+
+def index_column_lists(table: Table) -> List[Tuple[List[str], bool]]:
+    """Column lists of every index, primary key and unique constraint, with whether it is unique."""
+    lists = []
+    if table.primary_key.columns:
+        lists.append(([column.name for column in table.primary_key.columns], True))
+    for index in table.indexes:
+        columns = [column.name for column in index.columns]
+        if columns:
+            lists.append((columns, bool(index.unique)))
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint) and len(constraint.columns):
+            lists.append(([column.name for column in constraint.columns], True))
+    return lists
+
+
+def where_columns(statement) -> Dict[Table, Set[str]]:
+    """Map each table referenced in a statement's WHERE clause to its filtered columns."""
+    criteria = getattr(statement, "whereclause", None)
+    if criteria is None:
+        return {}
+
+    by_table: Dict[Table, Set[str]] = defaultdict(set)
+    for element in visitors.iterate(criteria):
+        if not isinstance(element, ColumnClause):
+            continue
+        table = element.table
+        if isinstance(table, Alias):
+            table = table.element
+        if isinstance(table, Table):
+            by_table[table].add(element.name)
+    return by_table
+
+
+class IndexAdvisor:
+    """Collects WHERE column patterns and reports those without a supporting index."""
+
+    def __init__(self, tables: Iterable[Table]):
+        self.tables = set(tables)
+        self.current_test: Optional[str] = None
+        self.patterns: Dict[Pattern, PatternStats] = defaultdict(PatternStats)
+        self._indexes = {table: index_column_lists(table) for table in self.tables}
+
+    def record(self, statement) -> None:
+        for table, columns in where_columns(statement).items():
+            if table not in self.tables:
+                continue
+            stats = self.patterns[(table.name, frozenset(columns))]
+            stats.count += 1
+            if self.current_test:
+                stats.tests.add(self.current_test)
+
+    def is_supported(self, table_name: str, columns: FrozenSet[str]) -> bool:
+        table = next(t for t in self.tables if t.name == table_name)
+        for index_columns, unique in self._indexes[table]:
+            if unique and columns.issuperset(index_columns):
+                return True
+            prefix = set()
+            for column in index_columns:
+                if column not in columns:
+                    break
+                prefix.add(column)
+            if prefix and columns <= prefix:
+                return True
+        return False
+
+    def unsupported(self) -> List[Tuple[Pattern, PatternStats]]:
+        """Unsupported patterns, most frequently executed first."""
+        rows = [
+            (pattern, stats) for pattern, stats in self.patterns.items()
+            if not self.is_supported(*pattern)
+        ]
+        return sorted(rows, key=lambda item: (-item[1].count, item[0][0], sorted(item[0][1])))
+
+    def report_lines(self) -> List[str]:
+        unsupported = self.unsupported()
+        lines = [
+            f"{len(self.patterns)} WHERE column patterns on {len({p[0] for p in self.patterns})} tables, "
+            f"{len(unsupported)} without a supporting index"
+        ]
+        for (table, columns), stats in unsupported:
+            example = sorted(stats.tests)[0] if stats.tests else "-"
+            lines.append(f"  {table}({', '.join(sorted(columns))})  x{stats.count}  e.g. {example}")
+        return lines
+
+    def install(self) -> None:
+        event.listen(Session, "do_orm_execute", self._on_orm_execute)
+
+    def uninstall(self) -> None:
+        event.remove(Session, "do_orm_execute", self._on_orm_execute)
+
+    def _on_orm_execute(self, orm_execute_state) -> None:
+        if orm_execute_state.is_select or orm_execute_state.is_update or orm_execute_state.is_delete:
+            self.record(orm_execute_state.statement)
@@ -29,10 +29,11 @@ sys.modules['stripe'] = stripe_mock
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 # Now we can safely import the app
-from app.database import engine, Base, get_db
+from app.database import engine, Base, get_db, get_async_db, get_async_session_factory
 from app.main import app
 from app import models
 
@@ -97,7 +98,17 @@ def client(db_session):
         finally:
             pass  # Don't close the session - let the fixture handle it
 
+    async def override_get_async_db():
+        # AsyncSession over the same transactional session, so async endpoints see
+        # fixture rows; they reach it through run_sync_db.
+        yield AsyncSession(sync_session_class=lambda **kwargs: db_session)
+
+    def override_get_async_session_factory():
+        return lambda: AsyncSession(sync_session_class=lambda **kwargs: db_session)
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_session_factory] = override_get_async_session_factory
 
     with TestClient(app) as test_client:
         yield test_client
@@ -0,0 +1,95 @@
+"""
+Integration tests for the per-connection AI chat state.
+
+Tests that ChatConnection:
+- Caches premium status until premium_ttl passes
+- Counts queries locally and writes them behind, adding to the stored count
+- Serves the next turn's history before the previous turn is stored
+- Persists queued turns with their usage records in one flush and on close
+"""
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.services import ai_chat_service
+from app.services.ai_chat_connection import ChatConnection
+from app.services.ai_chat_service import TurnUsage, current_quota_month
+
+
+@pytest.fixture
+def session_factory(db_session):
+    return lambda: AsyncSession(sync_session_class=lambda **kwargs: db_session)
+
+
+def _stored_quota(db_session, user_id):
+    quota = db_session.query(models.AIUsageQuota).filter_by(user_id=user_id, month=current_quota_month()).first()
+    return quota.queries_used if quota else 0
+
+
+@pytest.mark.asyncio
+async def test_premium_status_cached(db_session, premium_subscription, session_factory):
+    connection = ChatConnection(premium_subscription.user_id, session_factory, premium_ttl=3600)
+    assert await connection.is_premium() is True
+
+    db_session.query(models.Subscription).delete()
+    db_session.commit()
+    assert await connection.is_premium() is True
+
+    connection.premium_ttl = 0
+    assert await connection.is_premium() is False
+
+
+@pytest.mark.asyncio
+async def test_quota_written_behind(db_session, test_user, session_factory, monkeypatch):
+    monkeypatch.setattr(ai_chat_service, "AI_QUERIES_PER_MONTH", 3)
+    db_session.add(models.AIUsageQuota(user_id=test_user.id, month=current_quota_month(), queries_used=1))
+    db_session.commit()
+    connection = ChatConnection(test_user.id, session_factory)
+
+    assert await connection.consume_query() == (True, 2, 3)
+    assert _stored_quota(db_session, test_user.id) == 1
+
+    # Another connection's use lands in the stored count meanwhile
+    ai_chat_service.add_quota_usage(test_user.id, current_quota_month(), 1, db_session)
+    db_session.commit()
+    await connection.flush()
+
+    assert _stored_quota(db_session, test_user.id) == 3
+    assert await connection.consume_query() == (False, 3, 3)
+
+
+@pytest.mark.asyncio
+async def test_turns_queued_and_persisted_in_one_flush(db_session, test_user, session_factory):
+    connection = ChatConnection(test_user.id, session_factory, flush_interval=3600)
+    conversation = await connection.open_conversation(None)
+
+    connection.record_turn(conversation, "Ile wydalem?", "2000 zl.", TurnUsage())
+    assert db_session.query(models.AIMessage).count() == 0
+    assert [m["content"] for m in conversation.recent()] == ["Ile wydalem?", "2000 zl."]
+    assert await connection.open_conversation(conversation.id) is conversation
+
+    connection.record_turn(conversation, "A na jedzenie?", "800 zl.", TurnUsage())
+    await connection.flush()
+
+    messages = db_session.query(models.AIMessage).filter_by(conversation_id=conversation.id).order_by(
+        models.AIMessage.id
+    ).all()
+    assert [m.content for m in messages] == ["Ile wydalem?", "2000 zl.", "A na jedzenie?", "800 zl."]
+    assert db_session.query(models.AIUsageRecord).filter_by(conversation_id=conversation.id).count() == 2
+    assert db_session.get(models.AIConversation, conversation.id).title == "Ile wydalem?"
+    assert conversation.unsaved == 0
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_work(db_session, test_user, session_factory, monkeypatch):
+    monkeypatch.setattr(ai_chat_service, "AI_QUERIES_PER_MONTH", 10)
+    connection = ChatConnection(test_user.id, session_factory, flush_interval=3600)
+    connection.start()
+
+    await connection.consume_query()
+    conversation = await connection.open_conversation(None)
+    connection.record_turn(conversation, "Hej", "Czesc!")
+    await connection.close()
+
+    assert _stored_quota(db_session, test_user.id) == 1
+    assert db_session.query(models.AIMessage).filter_by(conversation_id=conversation.id).count() == 2
@@ -0,0 +1,106 @@
+"""
+Integration tests for the AI advisor's financial context.
+
+Tests that AIContextService.build_context:
+- Derives income average, category breakdown and savings rate from the monthly aggregates
+- Splits savings into balances by account type, illiquid assets and this year's contributions
+- Reads the profile (settings, Baby Steps, subscription) and loans
+- Issues the same number of queries however long the history is
+"""
+from datetime import date
+
+from app import models
+from app.query_budget import QueryBudget
+from app.services.ai_context_service import AI_CONTEXT_MAX_QUERIES, AIContextService
+
+TODAY = date(2026, 6, 15)
+
+
+def _saving(user_id, amount, day, saving_type="deposit", account_type="standard", category="emergency",
+            entry_type="contribution"):
+    return models.Saving(
+        user_id=user_id, category=category, description=category, amount=amount, date=day,
+        saving_type=saving_type, account_type=account_type, entry_type=entry_type,
+    )
+
+
+def _expense(user_id, category, amount, day):
+    return models.Expense(user_id=user_id, category=category, description=category, amount=amount, date=day)
+
+
+def _income(user_id, amount, day):
+    return models.Income(user_id=user_id, category="salary", description="salary", amount=amount, date=day)
+
+
+def test_context_sections(db_session, test_user):
+    uid = test_user.id
+    db_session.add_all([
+        _income(uid, 10000, date(2026, 6, 10)),
+        _income(uid, 9000, date(2026, 5, 10)),
+        _income(uid, 8000, date(2026, 3, 10)),
+        _income(uid, 7000, date(2026, 2, 10)),
+        _income(uid, 1000, date(2026, 1, 10)),
+        _expense(uid, "food", 1500, date(2026, 6, 2)),
+        _expense(uid, "housing", 3000, date(2026, 6, 3)),
+        _expense(uid, "food", 500, date(2026, 6, 4)),
+        _saving(uid, 5000, date(2025, 3, 1)),
+        _saving(uid, 1000, date(2026, 2, 1), saving_type="withdrawal"),
+        _saving(uid, 200000, date(2024, 1, 1), category="real_estate"),
+        _saving(uid, 10000, date(2025, 1, 1), account_type="ike", entry_type="opening_balance"),
+        _saving(uid, 3000, date(2026, 4, 1), account_type="ike"),
+        _saving(uid, 2000, date(2025, 12, 31), account_type="ikze"),
+        models.Loan(
+            user_id=uid, loan_type="mortgage", description="Hipoteka", principal_amount=300000,
+            remaining_balance=250000, interest_rate=7.0, monthly_payment=2500, start_date=date(2024, 1, 1),
+            term_months=300,
+        ),
+        models.Settings(user_id=uid, currency="PLN", language="pl", birth_year=1990),
+        models.FinancialFreedom(userId=uid, steps=[
+            {"step": 1, "status": "completed"}, {"step": 2, "status": "in_progress"},
+        ]),
+    ])
+    db_session.commit()
+
+    context = AIContextService.build_context(uid, db_session, today=TODAY)
+
+    assert context["income"] == {"current_month": 10000.0, "avg_monthly": 8000.0}
+    assert context["expenses"]["current_month_total"] == 5000.0
+    assert context["expenses"]["top_categories"] == [("housing", 3000.0), ("food", 2000.0)]
+    assert context["savings_rate"] == 50.0
+
+    assert context["savings_by_type"] == {"standard": 204000.0, "ike": 13000.0, "ikze": 2000.0}
+    assert context["illiquid_assets_value"] == 200000.0
+    assert context["liquid_standard_savings"] == 4000.0
+    assert context["savings_contrib_2026"] == {"ike": 3000.0}
+
+    assert context["net_worth"] == 219000.0 - 250000.0
+    assert context["loans"][0]["name"] == "Hipoteka"
+    assert context["baby_step"] == 2
+    assert context["settings"]["age"] == 36
+    assert context["is_premium"] is False
+
+
+def test_context_without_data(db_session, test_user):
+    context = AIContextService.build_context(test_user.id, db_session, today=TODAY)
+
+    assert context["income"] == {"current_month": 0.0, "avg_monthly": 0.0}
+    assert context["savings_by_type"] == {}
+    assert context["baby_step"] == 1
+    assert context["settings"]["currency"] == "PLN"
+
+
+def test_query_count_independent_of_history(db_session, test_user):
+    # Materialize the aggregates first so both runs only read
+    AIContextService.build_context(test_user.id, db_session, today=TODAY)
+
+    counts = []
+    for years in (1, 5):
+        for offset in range(years * 12):
+            day = date(2026 - offset // 12, offset % 12 + 1, 5)
+            db_session.add(_saving(test_user.id, 100, day, account_type="ike"))
+        db_session.commit()
+        with QueryBudget(f"ai_context_{years}", max_queries=AI_CONTEXT_MAX_QUERIES) as budget:
+            AIContextService.build_context(test_user.id, db_session, today=TODAY)
+        counts.append(budget.count)
+
+    assert counts[0] == counts[1]
@@ -0,0 +1,110 @@
+"""
+Integration tests for AI conversation history compaction and usage accounting.
+
+Tests that:
+- compact_conversation leaves conversations under the token budget alone
+- Older turns are folded into AIConversation.summary and no longer resent
+- The kept history starts with a user message
+- save_messages and compaction write AIUsageRecord rows that get_usage_report aggregates
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app import models
+from app.services import ai_chat_service
+from app.services.ai_chat_service import (
+    TurnUsage,
+    compact_conversation,
+    get_conversation_history,
+    get_usage_report,
+    save_messages,
+)
+
+
+class FakeAnthropic:
+    """Answers every summarization request with a fixed summary."""
+
+    def __init__(self, text="Uzytkownik pytal o wydatki na jedzenie (2000 zl)."):
+        self.text = text
+        self.requests = []
+        self.messages = SimpleNamespace(create=self.create)
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=self.text)],
+            usage=SimpleNamespace(input_tokens=900, output_tokens=60),
+        )
+
+
+@pytest.fixture
+def fake_anthropic(monkeypatch):
+    client = FakeAnthropic()
+    monkeypatch.setattr(ai_chat_service, "get_anthropic_client", lambda: client)
+    monkeypatch.setattr(ai_chat_service, "AI_HISTORY_TOKEN_BUDGET", 100)
+    monkeypatch.setattr(ai_chat_service, "AI_HISTORY_KEEP_MESSAGES", 2)
+    return client
+
+
+def _conversation(db_session, user_id, turns, length=40):
+    conv = models.AIConversation(user_id=user_id)
+    db_session.add(conv)
+    db_session.commit()
+    for i in range(turns):
+        save_messages(conv, f"Pytanie {i} " + "x" * length, f"Odpowiedz {i} " + "y" * length, db_session)
+    return conv
+
+
+@pytest.mark.asyncio
+async def test_short_history_is_not_compacted(db_session, test_user, fake_anthropic):
+    conv = _conversation(db_session, test_user.id, turns=1)
+
+    assert await compact_conversation(conv.id, db_session) is False
+    assert fake_anthropic.requests == []
+    assert conv.summary is None
+
+
+@pytest.mark.asyncio
+async def test_older_turns_rolled_into_summary(db_session, test_user, fake_anthropic):
+    conv = _conversation(db_session, test_user.id, turns=4)
+
+    assert await compact_conversation(conv.id, db_session) is True
+
+    db_session.refresh(conv)
+    assert conv.summary == fake_anthropic.text
+    transcript = fake_anthropic.requests[0]["messages"][0]["content"]
+    assert "Pytanie 0" in transcript and "Odpowiedz 2" in transcript and "Pytanie 3" not in transcript
+
+    history = get_conversation_history(conv, db_session)
+    assert [m["content"].split(" ")[:2] for m in history] == [["Pytanie", "3"], ["Odpowiedz", "3"]]
+
+    # The next compaction merges the previous summary with the newer turns
+    save_messages(conv, "Pytanie 4 " + "x" * 400, "Odpowiedz 4", db_session)
+    assert await compact_conversation(conv.id, db_session) is True
+    assert fake_anthropic.text in fake_anthropic.requests[1]["messages"][0]["content"]
+    db_session.refresh(conv)
+    assert [m["content"][:9] for m in get_conversation_history(conv, db_session)] == ["Pytanie 4", "Odpowiedz"]
+
+
+@pytest.mark.asyncio
+async def test_usage_records(db_session, test_user, fake_anthropic):
+    conv = _conversation(db_session, test_user.id, turns=4)
+    usage = TurnUsage()
+    usage.add_message(SimpleNamespace(usage=SimpleNamespace(
+        input_tokens=100, output_tokens=20, cache_creation_input_tokens=0, cache_read_input_tokens=3000,
+    )))
+    save_messages(conv, "Pytanie", "Odpowiedz", db_session, usage=usage)
+    await compact_conversation(conv.id, db_session)
+
+    records = db_session.query(models.AIUsageRecord).filter_by(conversation_id=conv.id).all()
+    assert sorted((r.kind, r.input_tokens, r.cache_read_input_tokens) for r in records) == [
+        ("chat", 100, 3000), ("summary", 900, 0),
+    ]
+    assert all(r.latency_ms is not None for r in records)
+
+    report = get_usage_report(db_session, days=1)
+    chat = next(row for row in report["by_day"] if row["kind"] == "chat")
+    assert chat["turns"] == 1
+    assert chat["billed_input_tokens"] == 400
+    assert chat["cache_read_ratio"] == round(3000 / 3100, 3)
@@ -0,0 +1,147 @@
+"""
+Integration tests for the durable bank sync queue.
+
+Tests that:
+- Repeated requests return the queued/running job (double-click, Idempotency-Key)
+- A claimed job runs its provider handler and stores the result
+- Failed attempts are re-queued with backoff until max_attempts
+- Non-retryable errors fail the job at once and free the user's slot
+- A job whose worker lease expired is claimed again
+- Job status is only visible to its household
+"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.jobs import bank_sync_queue as queue_module
+from app.jobs.bank_sync_queue import BankSyncQueue, SyncJobError, enqueue_sync
+from app.jobs.sync_scheduler import TokenBucket
+
+
+@pytest.fixture
+def queue(db_session):
+    factory = sessionmaker(bind=db_session.connection())
+    queue = BankSyncQueue(workers=0, session_factory=factory)
+    unlimited = TokenBucket(capacity=1000, rate=1000)
+    with patch.object(queue_module.sync_scheduler, "provider_bucket", return_value=unlimited):
+        yield queue
+
+
+def _handlers(**handlers):
+    return patch.dict(queue_module._HANDLERS, handlers)
+
+
+def test_repeated_request_returns_active_job(db_session, test_user):
+    first = enqueue_sync(db_session, test_user.id, "tink", {"days": 90})
+    second = enqueue_sync(db_session, test_user.id, "tink", {"days": 30})
+    other_provider = enqueue_sync(db_session, test_user.id, "enable_banking")
+
+    assert second.id == first.id
+    assert other_provider.id != first.id
+
+
+def test_idempotency_key_returns_same_job_after_it_finished(db_session, test_user):
+    first = enqueue_sync(db_session, test_user.id, "tink", idempotency_key="click-1")
+    first.status = "succeeded"
+    first.active_key = None
+    db_session.commit()
+
+    assert enqueue_sync(db_session, test_user.id, "tink", idempotency_key="click-1").id == first.id
+    assert enqueue_sync(db_session, test_user.id, "tink", idempotency_key="click-2").id != first.id
+
+
+@pytest.mark.asyncio
+async def test_claimed_job_runs_handler(db_session, test_user, queue):
+    seen = {}
+
+    async def handler(db, job, progress):
+        seen["params"] = job.params
+        progress.update(stage="fetching", fetched=3)
+        return {"success": True, "synced_count": 3}
+
+    job = enqueue_sync(db_session, test_user.id, "tink", {"days": 7})
+    with _handlers(tink=handler):
+        claimed = queue.claim_next("worker-1")
+        assert queue.claim_next("worker-2") is None
+        await queue.run_job(claimed, "worker-1")
+
+    db_session.refresh(job)
+    assert seen["params"] == {"days": 7}
+    assert job.status == "succeeded"
+    assert job.result == {"success": True, "synced_count": 3}
+    assert job.progress["fetched"] == 3
+    assert job.active_key is None
+    assert job.attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_is_retried_with_backoff(db_session, test_user, queue):
+    async def handler(db, job, progress):
+        raise SyncJobError("Bank unavailable", error_code="BANK_UNAVAILABLE")
+
+    job = enqueue_sync(db_session, test_user.id, "tink")
+    with _handlers(tink=handler), patch.object(queue_module, "BANK_SYNC_RETRY_BASE_SECONDS", 60):
+        await queue.run_job(queue.claim_next("worker-1"), "worker-1")
+
+        db_session.refresh(job)
+        assert job.status == "queued"
+        assert job.error_code == "BANK_UNAVAILABLE"
+        assert job.run_after.replace(tzinfo=None) > datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=50)
+        assert queue.claim_next("worker-1") is None
+
+        # Due again: attempts run out after max_attempts
+        for _ in range(job.max_attempts - 1):
+            job.run_after = datetime.now(timezone.utc) - timedelta(seconds=1)
+            db_session.commit()
+            await queue.run_job(queue.claim_next("worker-1"), "worker-1")
+            db_session.refresh(job)
+
+    assert job.status == "failed"
+    assert job.attempts == job.max_attempts
+    assert job.active_key is None
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_error_fails_at_once(db_session, test_user, queue):
+    async def handler(db, job, progress):
+        raise SyncJobError("Consent expired", error_code="TOKEN_EXPIRED", retryable=False)
+
+    job = enqueue_sync(db_session, test_user.id, "tink")
+    with _handlers(tink=handler):
+        await queue.run_job(queue.claim_next("worker-1"), "worker-1")
+
+    db_session.refresh(job)
+    assert job.status == "failed"
+    assert job.error_code == "TOKEN_EXPIRED"
+    assert enqueue_sync(db_session, test_user.id, "tink").id != job.id
+
+
+def test_expired_lease_is_claimed_again(db_session, test_user, queue):
+    job = enqueue_sync(db_session, test_user.id, "tink")
+    queue.claim_next("worker-1")
+
+    db_session.refresh(job)
+    job.locked_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+
+    reclaimed = queue.claim_next("worker-2")
+    assert reclaimed.id == job.id
+    assert reclaimed.locked_by == "worker-2"
+    assert reclaimed.attempts == 2
+
+
+def test_job_status_scoped_to_household(client, db_session, test_user, auth_headers):
+    other = models.User(id="other-user", email="other@example.com", name="Other")
+    db_session.add(other)
+    db_session.commit()
+    own = enqueue_sync(db_session, test_user.id, "tink")
+    foreign = enqueue_sync(db_session, other.id, "tink")
+
+    response = client.get(f"/banking/sync-jobs/{own.id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "queued"
+    assert response.json()["events_url"] == f"/banking/sync-jobs/{own.id}/events"
+
+    assert client.get(f"/banking/sync-jobs/{foreign.id}", headers=auth_headers).status_code == 404
@@ -0,0 +1,128 @@
+"""
+Integration tests for cached, concurrent AI categorization.
+
+Tests that categorize_with_cache / categorize_in_batches:
+- Send one representative per merchant and apply its result to the rest
+- Serve repeated merchants from merchant_categories without calling the LLM
+- Keep income and expense directions of a merchant apart
+- Pack batches by token budget and keep at most max_concurrency calls in flight
+"""
+import asyncio
+
+import pytest
+
+from app import models
+from app.services import categorization_service
+from app.services.categorization_service import (
+    categorize_in_batches,
+    categorize_with_cache,
+    category_cache_metrics,
+    plan_batches,
+)
+
+
+class FakeLLM:
+    """Stands in for categorize_transactions, recording every batch it is sent."""
+
+    def __init__(self, confidence=0.9, delay=0.0):
+        self.confidence = confidence
+        self.delay = delay
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, transactions, api_key=None):
+        self.batches.append([tx["id"] for tx in transactions])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return [
+            {
+                "id": tx["id"],
+                "type": "expense" if tx["amount"] < 0 else "income",
+                "category": "food" if tx["amount"] < 0 else "other",
+                "confidence": self.confidence,
+            }
+            for tx in transactions
+        ]
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(categorization_service, "categorize_transactions", llm)
+    category_cache_metrics.reset()
+    return llm
+
+
+def _tx(tx_id, merchant, amount=-25.0):
+    return {"id": tx_id, "description": f"{merchant} card payment", "merchant_name": merchant, "amount": amount}
+
+
+@pytest.mark.asyncio
+async def test_repeated_merchants_are_sent_once_and_cached(db_session, test_user, fake_llm):
+    transactions = [_tx(1, "BIEDRONKA"), _tx(2, "Biedronka"), _tx(3, "Lidl"), _tx(4, "Biedronka", amount=12.0)]
+
+    results = await categorize_with_cache(db_session, test_user.id, transactions, api_key="key")
+    db_session.commit()
+
+    assert sorted(id for batch in fake_llm.batches for id in batch) == [1, 3, 4]
+    assert {r["id"]: r["category"] for r in results} == {1: "food", 2: "food", 3: "food", 4: "other"}
+    stored = db_session.query(models.MerchantCategory).filter_by(user_id=test_user.id).all()
+    assert sorted((row.merchant_key, row.direction) for row in stored) == [
+        ("biedronka", "expense"), ("biedronka", "income"), ("lidl", "expense"),
+    ]
+
+    fake_llm.batches.clear()
+    results = await categorize_with_cache(
+        db_session, test_user.id, [_tx(5, "BIEDRONKA"), _tx(6, "Zabka")], api_key="key"
+    )
+
+    assert fake_llm.batches == [[6]]
+    assert next(r for r in results if r["id"] == 5) == {
+        "id": 5, "type": "expense", "category": "food", "confidence": 0.9, "cached": True,
+    }
+    stats = category_cache_metrics.stats()
+    assert (stats["hits"], stats["misses"], stats["llm_transactions"]) == (1, 5, 4)
+
+
+@pytest.mark.asyncio
+async def test_low_confidence_and_refresh(db_session, test_user, fake_llm):
+    fake_llm.confidence = 0.5
+    await categorize_with_cache(db_session, test_user.id, [_tx(1, "Orlen")], api_key="key")
+    assert db_session.query(models.MerchantCategory).count() == 0
+
+    fake_llm.confidence = 0.95
+    await categorize_with_cache(db_session, test_user.id, [_tx(2, "Orlen")], api_key="key")
+    fake_llm.confidence = 0.8
+    await categorize_with_cache(db_session, test_user.id, [_tx(3, "Orlen")], api_key="key", refresh=True)
+    db_session.commit()
+
+    assert len(fake_llm.batches) == 3
+    row = db_session.query(models.MerchantCategory).one()
+    assert row.confidence == 0.8
+
+
+def test_plan_batches_respects_token_budget():
+    short = [_tx(i, "Lidl") for i in range(10)]
+    long = [_tx(i, "Lidl " + "x" * 400) for i in range(10, 14)]
+
+    assert [len(batch) for batch in plan_batches(short, max_batch_size=4)] == [4, 4, 2]
+    batches = plan_batches(long, max_batch_size=30, token_budget=250)
+    assert [len(batch) for batch in batches] == [1, 1, 1, 1]
+    assert [tx["id"] for batch in plan_batches(short + long) for tx in batch] == list(range(14))
+
+
+@pytest.mark.asyncio
+async def test_batches_run_concurrently_up_to_limit(monkeypatch):
+    llm = FakeLLM(delay=0.05)
+    monkeypatch.setattr(categorization_service, "categorize_transactions", llm)
+
+    results = await categorize_in_batches(
+        [_tx(i, f"Shop {i}") for i in range(40)], batch_size=5, max_concurrency=3
+    )
+
+    assert len(llm.batches) == 8
+    assert llm.max_in_flight == 3
+    assert [r["id"] for r in results] == list(range(40))
@@ -0,0 +1,153 @@
+"""
+Integration tests for POST /banking/enablebanking/sync and its queued sync job.
+
+Tests that the sync:
+- Is queued and returns a job instead of syncing inside the request
+- Fetches accounts concurrently, capped at EB_SYNC_ACCOUNT_CONCURRENCY
+- Follows every continuation page of an account
+- Reports pages, latency and stored/duplicate counts per account
+- Keeps syncing the other accounts when one account's fetch fails
+"""
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.jobs.bank_sync_queue import BankSyncQueue
+from app.jobs.sync_scheduler import TokenBucket
+from app.main import app
+from app.services.enable_banking_service import EnableBankingAPIError
+
+
+class AllowAllLimiter:
+    async def check(self, *args, **kwargs):
+        pass
+
+
+def _eb_tx(entry_ref, amount=-10.0):
+    return {
+        "entry_reference": entry_ref,
+        "transaction_amount": {"amount": str(amount), "currency": "PLN"},
+        "booking_date": "2026-02-03",
+        "credit_debit_indicator": "DBIT",
+        "creditor": {"name": "Lidl"},
+        "remittance_information": ["Zakupy"],
+    }
+
+
+class FakeEnableBankingPages:
+    """Stands in for iter_transaction_pages, tracking how many accounts are fetched at once."""
+
+    def __init__(self, pages_by_account, failing=()):
+        self.pages_by_account = pages_by_account
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, account_uid, date_from=None, date_to=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if account_uid in self.failing:
+                raise EnableBankingAPIError("Consent expired", status_code=401)
+            for page in self.pages_by_account[account_uid]:
+                yield page
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def eb_connection(db_session, test_user):
+    connection = models.EnableBankingConnection(
+        user_id=test_user.id,
+        session_id="eb_session_1",
+        aspsp_name="ING",
+        aspsp_country="PL",
+        valid_until=datetime.now() + timedelta(days=90),
+        accounts=[{"uid": f"uid_{i}"} for i in range(4)],
+        is_active=True,
+    )
+    db_session.add(connection)
+    db_session.commit()
+    return connection
+
+
+@pytest.fixture
+def allow_all_limiter(monkeypatch):
+    monkeypatch.setattr(app.state, "limiter", AllowAllLimiter(), raising=False)
+
+
+@pytest.fixture
+def queue(db_session):
+    factory = sessionmaker(bind=db_session.connection())
+    queue = BankSyncQueue(workers=0, session_factory=factory)
+    unlimited = TokenBucket(capacity=1000, rate=1000)
+    with patch("app.jobs.bank_sync_queue.sync_scheduler.provider_bucket", return_value=unlimited):
+        yield queue
+
+
+async def _sync(client, auth_headers, queue, pages):
+    """Queue a sync through the endpoint, run the job and return its final state."""
+    response = client.post("/banking/enablebanking/sync", headers=auth_headers)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    with patch("app.routers.enable_banking.enable_banking_service.iter_transaction_pages", pages), \
+            patch("app.routers.enable_banking.EB_SYNC_ACCOUNT_CONCURRENCY", 2):
+        job = queue.claim_next("worker-1")
+        assert job.id == job_id
+        await queue.run_job(job, "worker-1")
+
+    status = client.get(f"/banking/sync-jobs/{job_id}", headers=auth_headers)
+    assert status.status_code == 200
+    return status.json()
+
+
+@pytest.mark.asyncio
+async def test_accounts_fetched_concurrently_with_per_account_report(
+    client, auth_headers, eb_connection, allow_all_limiter, queue
+):
+    pages = FakeEnableBankingPages({
+        "uid_0": [[_eb_tx("a1"), _eb_tx("a2")], [_eb_tx("a3")]],
+        "uid_1": [[_eb_tx("b1")]],
+        "uid_2": [[_eb_tx("a1")]],
+        "uid_3": [[]],
+    })
+
+    job = await _sync(client, auth_headers, queue, pages)
+
+    assert job["status"] == "succeeded"
+    assert job["progress"]["accounts_fetched"] == 4
+    body = job["result"]
+    assert pages.max_in_flight == 2
+    assert body["total_fetched"] == 5
+    assert body["synced_count"] == 4
+    assert body["exact_duplicate_count"] == 1
+
+    reports = {report["account_uid"]: report for report in body["accounts"]}
+    assert reports["uid_0"]["pages"] == 2
+    assert reports["uid_0"]["synced_count"] == 3
+    assert reports["uid_2"]["exact_duplicate_count"] == 1
+    assert all(report["fetch_ms"] > 0 for report in reports.values())
+
+
+@pytest.mark.asyncio
+async def test_failed_account_is_reported_and_others_synced(
+    client, auth_headers, eb_connection, allow_all_limiter, queue
+):
+    pages = FakeEnableBankingPages(
+        {"uid_0": [[_eb_tx("a1")]], "uid_2": [[]], "uid_3": [[]]},
+        failing={"uid_1"},
+    )
+
+    job = await _sync(client, auth_headers, queue, pages)
+
+    assert job["status"] == "succeeded"
+    body = job["result"]
+    assert body["synced_count"] == 1
+    reports = {report["account_uid"]: report for report in body["accounts"]}
+    assert reports["uid_1"]["error"] == "Consent expired"
+    assert reports["uid_1"]["fetched"] == 0
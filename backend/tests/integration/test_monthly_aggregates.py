@@ -0,0 +1,222 @@
+"""
+Integration tests for the materialized monthly aggregates.
+
+Tests that monthly_aggregates:
+- Is materialized on first read and matches MonthlyTotalsService
+- Is maintained incrementally by expense/income create, update and delete endpoints
+- Follows reconciliation status changes
+- Can be rebuilt and checked for consistency
+"""
+import pytest
+from datetime import date
+from app import models
+from app.services.monthly_aggregate_service import MonthlyAggregateService
+from app.services.monthly_totals_service import MonthlyTotalsService
+
+
+def _expense_payload(**overrides):
+    payload = {
+        "category": "food",
+        "description": "Groceries",
+        "amount": 120.0,
+        "date": "2026-02-10",
+        "is_recurring": False,
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.fixture
+def materialized(client, db_session, test_user, auth_headers):
+    """User with a recurring expense, with Jan-Apr 2026 already materialized."""
+    db_session.add(models.Expense(
+        user_id=test_user.id,
+        category="housing",
+        description="Rent",
+        amount=2000.0,
+        date=date(2025, 6, 1),
+        is_recurring=True,
+        reconciliation_status="manual_confirmed",
+    ))
+    db_session.commit()
+
+    MonthlyAggregateService.get_range(test_user.id, (2026, 1), (2026, 4), db_session)
+    return test_user
+
+
+class TestMaterialization:
+    """Test reads materialize the table and match the live computation."""
+
+    def test_first_read_materializes_coverage(self, db_session, materialized):
+        """Reading a range stores coverage and one row per (month, kind, category)."""
+        coverage = db_session.query(models.MonthlyAggregateCoverage).filter_by(
+            household_id=materialized.id
+        ).one()
+        assert (coverage.first_year, coverage.first_month) == (2026, 1)
+        assert (coverage.last_year, coverage.last_month) == (2026, 4)
+
+        rows = db_session.query(models.MonthlyAggregate).filter_by(household_id=materialized.id).all()
+        assert len(rows) == 4
+        assert {row.total for row in rows} == {2000.0}
+
+    def test_monthly_endpoint_reads_aggregates(self, client, materialized, auth_headers):
+        """GET /expenses/monthly returns the materialized totals."""
+        response = client.get(
+            f"/users/{materialized.id}/expenses/monthly?month=2026-03",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 2000.0
+
+    def test_read_outside_coverage_extends_it(self, db_session, materialized):
+        """Requesting later months extends coverage contiguously."""
+        totals = MonthlyAggregateService.get_range(materialized.id, (2026, 7), (2026, 7), db_session)
+
+        assert totals[(2026, 7)]["expenses"]["total"] == 2000.0
+        coverage = db_session.query(models.MonthlyAggregateCoverage).filter_by(
+            household_id=materialized.id
+        ).one()
+        assert (coverage.last_year, coverage.last_month) == (2026, 7)
+        assert MonthlyAggregateService.check_consistency(materialized.id, db_session) == []
+
+
+class TestIncrementalMaintenance:
+    """Test writes through the API keep the aggregates in sync."""
+
+    def test_create_expense_updates_month(self, client, db_session, materialized, auth_headers):
+        """Creating an expense adds it to its month only."""
+        response = client.post(
+            f"/users/{materialized.id}/expenses",
+            json=_expense_payload(),
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        totals = MonthlyAggregateService.get_range(materialized.id, (2026, 1), (2026, 3), db_session)
+        assert totals[(2026, 1)]["expenses"]["total"] == 2000.0
+        assert totals[(2026, 2)]["expenses"]["total"] == 2120.0
+        assert totals[(2026, 2)]["expenses"]["by_category"] == {"food": 120.0, "housing": 2000.0}
+        assert MonthlyAggregateService.check_consistency(materialized.id, db_session) == []
+
+    def test_update_expense_moves_between_months(self, client, db_session, materialized, auth_headers):
+        """Changing the date refreshes both the old and the new month."""
+        created = client.post(
+            f"/users/{materialized.id}/expenses",
+            json=_expense_payload(),
+            headers=auth_headers
+        ).json()
+
+        response = client.put(
+            f"/users/{materialized.id}/expenses/{created['id']}",
+            json=_expense_payload(date="2026-03-15", amount=80.0),
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        totals = MonthlyAggregateService.get_range(materialized.id, (2026, 2), (2026, 3), db_session)
+        assert totals[(2026, 2)]["expenses"]["total"] == 2000.0
+        assert totals[(2026, 3)]["expenses"]["total"] == 2080.0
+        assert MonthlyAggregateService.check_consistency(materialized.id, db_session) == []
+
+    def test_recurring_income_refreshes_all_covered_months(self, client, db_session, materialized, auth_headers):
+        """An open-ended recurring income touches every covered month from its start."""
+        response = client.post(
+            f"/users/{materialized.id}/income",
+            json={
+                "category": "salary",
+                "description": "Salary",
+                "amount": 7000.0,
+                "date": "2026-02-01",
+                "is_recurring": True,
+            },
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        totals = MonthlyAggregateService.get_range(materialized.id, (2026, 1), (2026, 4), db_session)
+        assert [totals[(2026, m)]["income"]["total"] for m in range(1, 5)] == [0, 7000.0, 7000.0, 7000.0]
+        assert MonthlyAggregateService.check_consistency(materialized.id, db_session) == []
+
+    def test_delete_expense_removes_it(self, client, db_session, materialized, auth_headers):
+        """Deleting an expense removes it from the aggregates."""
+        created = client.post(
+            f"/users/{materialized.id}/expenses",
+            json=_expense_payload(),
+            headers=auth_headers
+        ).json()
+
+        response = client.delete(
+            f"/users/{materialized.id}/expenses/{created['id']}",
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        totals = MonthlyAggregateService.get_month(materialized.id, 2026, 2, db_session)
+        assert totals["expenses"]["total"] == 2000.0
+        assert "food" not in totals["expenses"]["by_category"]
+
+    def test_mark_duplicate_excludes_entry(self, client, db_session, materialized, auth_headers):
+        """Marking a manual expense as duplicate_of_bank drops it from the totals."""
+        bank_tx = models.BankTransaction(
+            user_id=materialized.id,
+            tink_transaction_id="tx_agg_1",
+            tink_account_id="acc1",
+            amount=-120.0,
+            currency="PLN",
+            date=date(2026, 2, 10),
+            description_display="Groceries",
+            status="pending"
+        )
+        db_session.add(bank_tx)
+        db_session.commit()
+        created = client.post(
+            f"/users/{materialized.id}/expenses",
+            json=_expense_payload(),
+            headers=auth_headers
+        ).json()
+
+        response = client.post(
+            f"/users/{materialized.email}/reconciliation/expenses/{created['id']}/mark-duplicate",
+            json={"bank_transaction_id": bank_tx.id},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        totals = MonthlyAggregateService.get_month(materialized.id, 2026, 2, db_session)
+        assert totals["expenses"]["total"] == 2000.0
+        assert totals["expenses"]["duplicate_count"] == 1
+        assert MonthlyAggregateService.check_consistency(materialized.id, db_session) == []
+
+
+class TestRebuildAndConsistency:
+    """Test rebuild() and check_consistency()."""
+
+    def test_checker_reports_drift(self, db_session, materialized):
+        """A tampered bucket is reported against the live value."""
+        row = db_session.query(models.MonthlyAggregate).filter_by(
+            household_id=materialized.id, year=2026, month=2
+        ).one()
+        row.total = 1.0
+        db_session.commit()
+
+        mismatches = MonthlyAggregateService.check_consistency(materialized.id, db_session)
+
+        assert mismatches == [{
+            "year": 2026, "month": 2, "kind": "expense", "category": "housing",
+            "field": "total", "stored": 1.0, "live": 2000.0,
+        }]
+
+    def test_rebuild_restores_consistency(self, db_session, materialized):
+        """rebuild() recomputes from the earliest row and fixes drift."""
+        db_session.query(models.MonthlyAggregate).filter_by(household_id=materialized.id).delete()
+        db_session.commit()
+
+        start_ym, end_ym = MonthlyAggregateService.rebuild(materialized.id, db_session)
+
+        assert start_ym == (2025, 6)
+        assert MonthlyAggregateService.check_consistency(materialized.id, db_session) == []
+        live = MonthlyTotalsService.calculate_monthly_expenses(materialized.id, 2025, 9, db_session)
+        stored = MonthlyAggregateService.get_month(materialized.id, 2025, 9, db_session)["expenses"]
+        assert stored["total"] == live["total"]
+        assert stored["manual_count"] == live["manual_count"]
@@ -0,0 +1,154 @@
+"""
+Integration tests for the persisted reconciliation candidates.
+
+Tests that reconciliation_candidates:
+- Gains a candidate when a manual expense is created through the API
+- Gains candidates for bank transactions stored by the ingestion pipeline
+- Is pruned when either side is reviewed (confirm-separate, bulk reject)
+- Matches the from-scratch engine and can be rebuilt
+"""
+import pytest
+from datetime import date, timedelta
+from app import models
+from app.services.reconciliation_candidates import ReconciliationCandidates
+from app.services.reconciliation_engine import rank_suggestions
+from app.services.transaction_ingestion import ingest_records, parse_enable_banking_transaction
+
+DAY = date.today() - timedelta(days=10)
+
+
+def _bank_tx(user_id, tink_id, amount=-100.0, day=DAY, description="Biedronka"):
+    return models.BankTransaction(
+        user_id=user_id,
+        tink_transaction_id=tink_id,
+        tink_account_id="acc1",
+        amount=amount,
+        currency="PLN",
+        date=day,
+        description_display=description,
+        status="pending",
+    )
+
+
+def _candidates(db_session, user_id):
+    return db_session.query(models.ReconciliationCandidate).filter_by(user_id=user_id).all()
+
+
+def _pairs(suggestions):
+    return [
+        (s["entry_type"], s["manual_entry"].id, s["bank_transaction"].id, s["match_score"])
+        for s in suggestions
+    ]
+
+
+def test_created_expense_is_matched(client, db_session, test_user, auth_headers):
+    bank_tx = _bank_tx(test_user.id, "tx1")
+    far_tx = _bank_tx(test_user.id, "tx_far", day=DAY - timedelta(days=5))
+    db_session.add_all([bank_tx, far_tx])
+    db_session.commit()
+
+    response = client.post(
+        f"/users/{test_user.id}/expenses",
+        json={
+            "category": "Groceries",
+            "description": "Biedronka",
+            "amount": 100.0,
+            "date": DAY.isoformat(),
+            "is_recurring": False,
+        },
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    candidates = _candidates(db_session, test_user.id)
+    assert [(c.entry_type, c.bank_transaction_id) for c in candidates] == [("expense", bank_tx.id)]
+    assert candidates[0].match_score == 1.0
+    assert candidates[0].manual_date == DAY
+
+    suggestions = client.get(
+        "/users/test@example.com/reconciliation/suggestions",
+        headers=auth_headers,
+    ).json()
+    assert [s["bank_transaction_id"] for s in suggestions] == [bank_tx.id]
+
+
+def test_ingested_bank_transactions_are_matched(db_session, test_user):
+    income = models.Income(
+        user_id=test_user.id,
+        category="Salary",
+        description="Lidl",
+        amount=250.0,
+        date=DAY,
+        reconciliation_status="unreviewed",
+    )
+    db_session.add(income)
+    db_session.commit()
+
+    record = parse_enable_banking_transaction({
+        "entry_reference": "eb_1",
+        "transaction_amount": {"amount": "250.00", "currency": "PLN"},
+        "booking_date": DAY.isoformat(),
+        "credit_debit_indicator": "CRDT",
+        "debtor": {"name": "Lidl"},
+        "remittance_information": ["Lidl"],
+    }, "uid_1")
+    ingest_records(db_session, test_user.id, [record])
+    db_session.commit()
+
+    candidates = _candidates(db_session, test_user.id)
+    assert len(candidates) == 1
+    assert candidates[0].entry_type == "income"
+    assert candidates[0].income_id == income.id
+
+
+def test_reviewed_sides_are_pruned(client, db_session, test_user, auth_headers):
+    expense = models.Expense(
+        user_id=test_user.id, category="Groceries", description="Biedronka",
+        amount=100.0, date=DAY, reconciliation_status="unreviewed",
+    )
+    other = models.Expense(
+        user_id=test_user.id, category="Groceries", description="Orlen",
+        amount=300.0, date=DAY, reconciliation_status="unreviewed",
+    )
+    bank_tx = _bank_tx(test_user.id, "tx1")
+    orlen_tx = _bank_tx(test_user.id, "tx2", amount=-300.0, description="Orlen")
+    db_session.add_all([expense, other, bank_tx, orlen_tx])
+    db_session.commit()
+    assert len(_candidates(db_session, test_user.id)) == 2
+
+    response = client.post(
+        f"/users/test@example.com/reconciliation/expenses/{expense.id}/confirm-separate",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert [c.expense_id for c in _candidates(db_session, test_user.id)] == [other.id]
+
+    response = client.post(
+        "/banking/transactions/bulk/reject",
+        json={"transaction_ids": [orlen_tx.id]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert _candidates(db_session, test_user.id) == []
+
+
+def test_incremental_matches_engine_and_rebuild(db_session, test_user):
+    for i in range(6):
+        db_session.add(_bank_tx(test_user.id, f"tx{i}", amount=-(50.0 + i), day=DAY + timedelta(days=i)))
+        db_session.commit()
+        db_session.add(models.Expense(
+            user_id=test_user.id, category="Other", description="Biedronka",
+            amount=50.0 + i, date=DAY + timedelta(days=(i * 2) % 5), reconciliation_status="unreviewed",
+        ))
+        db_session.commit()
+
+    expected = _pairs(rank_suggestions(test_user.id, db_session, limit=100))
+    stored = _pairs(ReconciliationCandidates.read_suggestions(test_user.id, db_session, limit=100))
+    assert sorted(stored) == sorted(expected)
+    assert expected
+
+    db_session.query(models.ReconciliationCandidate).delete()
+    assert ReconciliationCandidates.rebuild(test_user.id, db_session) == len(expected)
+    db_session.commit()
+    rebuilt = _pairs(ReconciliationCandidates.read_suggestions(test_user.id, db_session, limit=100))
+    assert sorted(rebuilt) == sorted(expected)
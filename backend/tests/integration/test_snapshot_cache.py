@@ -0,0 +1,123 @@
+"""
+Integration tests for the household snapshot cache.
+
+Tests that cached endpoints:
+- Skip recomputation on repeated reads
+- Are invalidated by committed writes to the household's data
+- Are not invalidated by rolled-back writes or other households' writes
+"""
+import pytest
+from datetime import date
+from app import models
+from app.services.snapshot_cache import (
+    FakeSharedClient,
+    LocalSnapshotBackend,
+    SharedSnapshotBackend,
+    snapshot_cache,
+)
+
+
+@pytest.fixture(params=["local", "shared"])
+def enabled_cache(request):
+    """Enable the app-wide snapshot cache (off in test mode) for one test."""
+    if request.param == "local":
+        backend = LocalSnapshotBackend()
+    else:
+        backend = SharedSnapshotBackend(FakeSharedClient())
+    snapshot_cache.configure(backend)
+    yield snapshot_cache
+    snapshot_cache.configure(None)
+
+
+def _summary(client, user, auth_headers):
+    response = client.get(f"/users/{user.id}/summary", headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestSnapshotCaching:
+    """Test cached reads and write invalidation through the API."""
+
+    def test_repeated_summary_is_served_from_cache(self, client, test_user, auth_headers, enabled_cache):
+        first = _summary(client, test_user, auth_headers)
+        second = _summary(client, test_user, auth_headers)
+
+        assert first == second
+        assert enabled_cache.stats()["by_name"]["user_summary"] == {"hits": 1, "misses": 1, "errors": 0}
+
+    def test_expense_write_invalidates_summary(self, client, test_user, auth_headers, enabled_cache):
+        before = _summary(client, test_user, auth_headers)
+
+        response = client.post(
+            f"/users/{test_user.id}/expenses",
+            json={
+                "category": "food",
+                "description": "Groceries",
+                "amount": 120.0,
+                "date": date.today().isoformat(),
+                "is_recurring": False,
+            },
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        after = _summary(client, test_user, auth_headers)
+
+        assert after["total_monthly_expenses"] == before["total_monthly_expenses"] + 120.0
+        assert enabled_cache.stats()["by_name"]["user_summary"]["misses"] == 2
+
+    def test_saving_write_invalidates_savings_summary(self, client, db_session, test_user, auth_headers, enabled_cache):
+        assert client.get("/savings/summary", headers=auth_headers).json()["total_savings"] == 0
+
+        db_session.add(models.Saving(
+            user_id=test_user.id, category="general", description="Deposit", amount=300.0,
+            date=date.today(), saving_type="deposit",
+        ))
+        db_session.commit()
+
+        assert client.get("/savings/summary", headers=auth_headers).json()["total_savings"] == 300.0
+
+    def test_rolled_back_write_keeps_version(self, db_session, test_user, enabled_cache):
+        user_id = test_user.id
+        version = enabled_cache.backend.get_version(user_id)
+
+        db_session.add(models.Loan(
+            user_id=user_id, loan_type="car", description="Car", principal_amount=1000.0,
+            remaining_balance=1000.0, interest_rate=5.0, monthly_payment=100.0,
+            start_date=date.today(), term_months=10,
+        ))
+        db_session.flush()
+        db_session.rollback()
+
+        assert enabled_cache.backend.get_version(user_id) == version
+
+    def test_other_household_write_keeps_cache(self, client, db_session, test_user, auth_headers, enabled_cache):
+        other = models.User(id="other-household", email="other@example.com", name="Other")
+        db_session.add(other)
+        db_session.commit()
+        _summary(client, test_user, auth_headers)
+
+        db_session.add(models.Income(
+            user_id=other.id, category="salary", description="Salary", amount=5000.0,
+            date=date.today(),
+        ))
+        db_session.commit()
+        _summary(client, test_user, auth_headers)
+
+        assert enabled_cache.stats()["by_name"]["user_summary"]["hits"] == 1
+
+    @pytest.mark.parametrize("path,name", [
+        ("/financial-freedom/calculated", "financial_freedom_calculated"),
+        ("/gamification/overview", "gamification_overview"),
+    ])
+    def test_cached_snapshot_matches_computed_response(self, client, test_user, auth_headers, enabled_cache, path, name):
+        # The first gamification read creates the stats row, which itself bumps the version
+        client.get(path, headers=auth_headers)
+        first = client.get(path, headers=auth_headers)
+        second = client.get(path, headers=auth_headers)
+
+        assert first.status_code == second.status_code == 200
+        first_body, second_body = first.json(), second.json()
+        first_body.pop("lastUpdated", None)
+        second_body.pop("lastUpdated", None)
+        assert first_body == second_body
+        assert enabled_cache.stats()["by_name"][name]["hits"] >= 1
@@ -0,0 +1,155 @@
+"""
+Integration tests for the dashboard summary (GET /users/{id}/summary).
+
+Tests that the summary:
+- Derives totals, cash flow, loans and savings correctly from a single pass
+- Issues the same number of queries regardless of history length
+- Stays within its query budget on cold (materializing) and warm reads
+"""
+import pytest
+from datetime import date, timedelta
+from app import models
+from app.query_budget import QueryBudget, QueryBudgetExceeded
+from app.services.summary_service import SummaryService, SUMMARY_MAX_QUERIES
+
+TODAY = date(2026, 3, 15)
+
+
+def _seed_household(db_session, user_id, history_months):
+    """Salary, rent, two loans, savings and one grocery expense per day of history."""
+    db_session.add_all([
+        models.Income(
+            user_id=user_id, category="salary", description="Salary", amount=8000.0,
+            date=date(2024, 1, 1), is_recurring=True, reconciliation_status="manual_confirmed",
+        ),
+        models.Expense(
+            user_id=user_id, category="housing", description="Rent", amount=2500.0,
+            date=date(2024, 1, 1), is_recurring=True, reconciliation_status="manual_confirmed",
+        ),
+        models.Loan(
+            user_id=user_id, loan_type="car", description="Car loan", principal_amount=40000.0,
+            remaining_balance=30000.0, interest_rate=7.5, monthly_payment=900.0,
+            start_date=date(2024, 6, 1), term_months=48,
+        ),
+        models.Loan(
+            user_id=user_id, loan_type="personal", description="New laptop", principal_amount=6000.0,
+            remaining_balance=6000.0, interest_rate=10.0, monthly_payment=300.0,
+            start_date=date(2026, 2, 1), term_months=20,
+        ),
+        models.Loan(
+            user_id=user_id, loan_type="personal", description="Paid off", principal_amount=1000.0,
+            remaining_balance=0.0, interest_rate=5.0, monthly_payment=100.0,
+            start_date=date(2023, 1, 1), term_months=10, is_archived=True,
+        ),
+        models.Saving(
+            user_id=user_id, category="emergency_fund", description="Opening balance", amount=5000.0,
+            date=date(2025, 1, 10), saving_type="deposit",
+        ),
+        models.Saving(
+            user_id=user_id, category="emergency_fund", description="Monthly deposit", amount=500.0,
+            date=date(2025, 6, 1), is_recurring=True, saving_type="deposit",
+        ),
+        models.Saving(
+            user_id=user_id, category="vacation", description="Trip", amount=1200.0,
+            date=date(2026, 3, 2), saving_type="deposit", target_amount=4000.0,
+        ),
+        models.Saving(
+            user_id=user_id, category="vacation", description="Booking", amount=200.0,
+            date=date(2026, 3, 5), saving_type="withdrawal",
+        ),
+    ])
+
+    start = TODAY - timedelta(days=30 * history_months)
+    day = start
+    while day <= TODAY:
+        db_session.add(models.Expense(
+            user_id=user_id, category="food", description="Groceries", amount=10.0,
+            date=day, reconciliation_status="manual_confirmed",
+        ))
+        day += timedelta(days=1)
+    db_session.commit()
+
+
+def _count_queries(db_session, user_id):
+    with QueryBudget("test_summary", max_queries=SUMMARY_MAX_QUERIES) as budget:
+        SummaryService.build_summary(user_id, db_session, today=TODAY)
+    return budget.count
+
+
+class TestSummaryValues:
+    """Test the summary figures derived in memory."""
+
+    @pytest.fixture
+    def summary(self, db_session, test_user):
+        _seed_household(db_session, test_user.id, history_months=3)
+        return SummaryService.build_summary(test_user.id, db_session, today=TODAY)
+
+    def test_current_month_totals(self, summary):
+        """Income, expenses, loan payments and ratios for the current month."""
+        assert summary["total_monthly_income"] == 8000.0
+        assert summary["total_monthly_expenses"] == 2500.0 + 15 * 10.0
+        assert summary["total_monthly_loan_payments"] == 1200.0
+        assert summary["total_loan_balance"] == 36000.0
+        assert summary["monthly_balance"] == 8000.0 - 2650.0 - 1200.0
+        assert summary["debt_to_income"] == pytest.approx(1200.0 / 8000.0)
+
+    def test_cash_flow_loan_payments_follow_start_dates(self, summary):
+        """Each cash-flow month only counts loans that had started by then."""
+        cash_flow = {entry["month"]: entry for entry in summary["cash_flow"]}
+
+        assert len(summary["cash_flow"]) == 13
+        assert summary["cash_flow"][0]["month"] == "2025-03"
+        assert cash_flow["2026-01"]["loanPayments"] == 900.0
+        assert cash_flow["2026-02"]["loanPayments"] == 1200.0
+
+    def test_loans_exclude_archived(self, summary):
+        """Archived loans are not listed."""
+        assert [loan["description"] for loan in summary["loans"]] == ["Car loan", "New laptop"]
+        assert summary["loans"][0]["progress"] == pytest.approx(25.0)
+
+    def test_savings_from_grouped_query(self, summary):
+        """Balance, monthly net and goals come from one grouped savings query."""
+        goals = {goal["category"]: goal for goal in summary["savings_goals"]}
+
+        assert summary["total_savings_balance"] == 5000.0 + 500.0 + 1200.0 - 200.0
+        assert summary["monthly_savings"] == 500.0 + 1200.0 - 200.0
+        assert goals["vacation"]["targetAmount"] == 4000.0
+        assert goals["vacation"]["progress"] == pytest.approx(25.0)
+        assert goals["emergency_fund"]["targetAmount"] == summary["total_monthly_expenses"]
+
+
+class TestSummaryQueryBudget:
+    """Test the summary issues a constant, bounded number of queries."""
+
+    def test_query_count_independent_of_history(self, db_session, test_user):
+        """Three months and three years of history cost the same number of queries."""
+        other = models.User(id="long-history-user", email="long@example.com", name="Long History")
+        db_session.add(other)
+        db_session.commit()
+        _seed_household(db_session, test_user.id, history_months=3)
+        _seed_household(db_session, other.id, history_months=36)
+
+        cold_short = _count_queries(db_session, test_user.id)
+        cold_long = _count_queries(db_session, other.id)
+        warm_short = _count_queries(db_session, test_user.id)
+        warm_long = _count_queries(db_session, other.id)
+
+        assert cold_short == cold_long <= SUMMARY_MAX_QUERIES
+        assert warm_short == warm_long < cold_short
+
+    def test_budget_raises_when_exceeded(self, db_session, test_user):
+        """A budget smaller than the pipeline's query count fails loudly."""
+        with pytest.raises(QueryBudgetExceeded):
+            with QueryBudget("test_summary", max_queries=1, mode="raise"):
+                SummaryService.build_summary(test_user.id, db_session, today=TODAY)
+
+    def test_endpoint_within_budget(self, client, db_session, test_user, auth_headers):
+        """The endpoint returns 200 with a long history under the enforced budget."""
+        _seed_household(db_session, test_user.id, history_months=36)
+
+        response = client.get(f"/users/{test_user.id}/summary", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["cash_flow"]) == 13
+        assert data["total_monthly_income"] == 8000.0
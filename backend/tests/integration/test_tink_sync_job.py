@@ -0,0 +1,207 @@
+"""
+Integration tests for the background Tink sync job's batched ingestion.
+
+Tests that sync_single_connection:
+- Stores new transactions with a query count independent of batch size
+- Skips stored and repeated tink_transaction_ids as exact duplicates
+- Flags fuzzy duplicates and updates pending rows when their booked version arrives
+- Follows every page and syncs incrementally from the stored cursor
+"""
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from app import models
+from app.jobs.tink_sync_job import _ingest_transactions, sync_single_connection
+from app.query_budget import QueryBudget
+
+
+def _tink_tx(tx_id, amount, day, description="Coffee shop", account="acc_001", status="BOOKED"):
+    return {
+        "id": tx_id,
+        "accountId": account,
+        "status": status,
+        "amount": {"value": {"unscaledValue": str(int(amount * 100)), "scale": "2"}, "currencyCode": "PLN"},
+        "dates": {"booked": day.isoformat()},
+        "descriptions": {"display": description},
+    }
+
+
+def _stored_tx(user_id, tx_id, amount, day, description, status="BOOKED"):
+    return models.BankTransaction(
+        user_id=user_id,
+        tink_transaction_id=tx_id,
+        tink_account_id="acc_001",
+        amount=amount,
+        currency="PLN",
+        date=day,
+        description_display=description,
+        status="pending",
+        raw_data={"id": tx_id, "status": status},
+    )
+
+
+@pytest.fixture
+def connection(db_session, test_user):
+    connection = models.TinkConnection(
+        user_id=test_user.id,
+        tink_user_id="tink_123",
+        access_token="token",
+        refresh_token="refresh",
+        token_expires_at=datetime.now() + timedelta(hours=1),
+        is_active=True,
+    )
+    db_session.add(connection)
+    db_session.commit()
+    return connection
+
+
+class FakeTinkPages:
+    """Stands in for tink_service.iter_transaction_pages, recording each call's arguments."""
+
+    def __init__(self, *pages):
+        self.pages = pages
+        self.calls = []
+
+    async def __call__(self, access_token, account_id=None, from_date=None, page_token=None):
+        self.calls.append({"account_id": account_id, "from_date": from_date, "page_token": page_token})
+        start = int(page_token) if page_token else 0
+        for index in range(start, len(self.pages)):
+            next_token = str(index + 1) if index + 1 < len(self.pages) else None
+            yield {"transactions": self.pages[index], "nextPageToken": next_token}
+
+
+async def _run_sync(connection, db_session, transactions=None, pages=None):
+    pages = pages or FakeTinkPages(transactions)
+    with patch("app.jobs.tink_sync_job.tink_service") as service:
+        service.get_valid_access_token = AsyncMock(return_value="token")
+        service.iter_transaction_pages = pages
+        return await sync_single_connection(connection, db_session)
+
+
+def _distinct_batch(prefix, count):
+    start = date(2026, 1, 1)
+    return [
+        _tink_tx(f"{prefix}_{i}", -10.0 - i, start + timedelta(days=i % 60), f"Shop {prefix} {i}")
+        for i in range(count)
+    ]
+
+
+def test_query_count_does_not_grow_with_batch_size(db_session, test_user):
+    counts = []
+    for prefix, size in (("small", 5), ("large", 300)):
+        with QueryBudget(f"ingest_{prefix}", max_queries=1000) as budget:
+            synced, exact, fuzzy = _ingest_transactions(db_session, test_user.id, _distinct_batch(prefix, size))
+        assert synced == size
+        counts.append(budget.count)
+
+    assert counts[0] == counts[1]
+    assert counts[1] <= 3
+
+
+@pytest.mark.asyncio
+async def test_exact_duplicates_skipped(db_session, test_user, connection):
+    db_session.add(_stored_tx(test_user.id, "tx_stored", -20.0, date(2026, 2, 1), "Bakery"))
+    db_session.commit()
+
+    result = await _run_sync(connection, db_session, [
+        _tink_tx("tx_stored", -20.0, date(2026, 2, 1), "Bakery"),
+        _tink_tx("tx_new", -35.0, date(2026, 2, 3), "Cinema"),
+        _tink_tx("tx_new", -35.0, date(2026, 2, 3), "Cinema"),
+    ])
+
+    assert result["success"] is True
+    assert result["synced_count"] == 1
+    assert result["exact_duplicate_count"] == 2
+    assert connection.last_sync_at is not None
+    stored = db_session.query(models.BankTransaction).filter_by(tink_transaction_id="tx_new").one()
+    assert stored.amount == -35.0
+    assert stored.suggested_type == "expense"
+    assert stored.is_duplicate is False
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_duplicate_flagged(db_session, test_user, connection):
+    original = _stored_tx(test_user.id, "tx_original", -150.0, date(2026, 2, 1), "TESCO STORES 3297")
+    db_session.add(original)
+    db_session.commit()
+
+    result = await _run_sync(connection, db_session, [
+        _tink_tx("tx_reimported", -150.0, date(2026, 2, 1), "TESCO STORES 3297"),
+    ])
+
+    assert result["fuzzy_duplicate_count"] == 1
+    flagged = db_session.query(models.BankTransaction).filter_by(tink_transaction_id="tx_reimported").one()
+    assert flagged.is_duplicate is True
+    assert flagged.duplicate_of == original.id
+    assert flagged.duplicate_reason == "same_account_exact_match"
+
+
+@pytest.mark.asyncio
+async def test_pending_row_updated_by_booked_version(db_session, test_user, connection):
+    pending = _stored_tx(test_user.id, "tx_pending", -42.5, date(2026, 2, 10), "Fuel station", status="PENDING")
+    db_session.add(pending)
+    db_session.commit()
+
+    result = await _run_sync(connection, db_session, [
+        _tink_tx("tx_booked", -42.5, date(2026, 2, 11), "Fuel station"),
+    ])
+
+    assert result["synced_count"] == 0
+    db_session.refresh(pending)
+    assert pending.tink_transaction_id == "tx_booked"
+    assert pending.raw_data["status"] == "BOOKED"
+    assert db_session.query(models.BankTransaction).filter_by(user_id=test_user.id).count() == 1
+
+
+@pytest.mark.asyncio
+async def test_every_page_is_stored(db_session, test_user, connection):
+    pages = FakeTinkPages(
+        [_tink_tx("tx_p1", -10.0, date(2026, 2, 1), "Kiosk")],
+        [_tink_tx("tx_p2", -11.0, date(2026, 2, 5), "Bakery")],
+        [_tink_tx("tx_p3", -12.0, date(2026, 2, 9), "Cinema")],
+    )
+
+    result = await _run_sync(connection, db_session, pages=pages)
+
+    assert result["synced_count"] == 3
+    assert result["total_fetched"] == 3
+    state = db_session.query(models.TinkSyncState).filter_by(connection_id=connection.id).one()
+    assert state.last_booked_date == date(2026, 2, 9)
+    assert state.page_token is None
+
+
+@pytest.mark.asyncio
+async def test_next_sync_starts_from_watermark_with_overlap(db_session, test_user, connection):
+    db_session.add(models.TinkSyncState(
+        connection_id=connection.id, account_id="", last_booked_date=date(2026, 3, 20)
+    ))
+    db_session.commit()
+
+    pages = FakeTinkPages([_tink_tx("tx_new", -5.0, date(2026, 3, 22), "Kiosk")])
+    await _run_sync(connection, db_session, pages=pages)
+
+    assert pages.calls[0]["from_date"].date() == date(2026, 3, 13)
+    state = db_session.query(models.TinkSyncState).filter_by(connection_id=connection.id).one()
+    assert state.last_booked_date == date(2026, 3, 22)
+
+
+@pytest.mark.asyncio
+async def test_interrupted_sync_resumes_from_page_cursor(db_session, test_user, connection):
+    db_session.add(models.TinkSyncState(
+        connection_id=connection.id, account_id="", page_token="1", cursor_from_date=date(2026, 1, 1)
+    ))
+    db_session.commit()
+
+    pages = FakeTinkPages(
+        [_tink_tx("tx_done", -10.0, date(2026, 2, 1), "Kiosk")],
+        [_tink_tx("tx_rest", -11.0, date(2026, 2, 5), "Bakery")],
+    )
+    result = await _run_sync(connection, db_session, pages=pages)
+
+    assert pages.calls[0]["page_token"] == "1"
+    assert pages.calls[0]["from_date"].date() == date(2026, 1, 1)
+    assert result["total_fetched"] == 1
+    state = db_session.query(models.TinkSyncState).filter_by(connection_id=connection.id).one()
+    assert state.page_token is None
+    assert state.last_booked_date == date(2026, 2, 5)
@@ -0,0 +1,142 @@
+"""
+Integration tests for the provider-agnostic transaction ingestion pipeline.
+
+Tests that:
+- Each provider adapter normalizes its payload into the same record type
+- Exact duplicates are caught by tink_transaction_id, household provider id and in-batch repeats
+- The query count per batch does not grow with the batch size
+"""
+import pytest
+from datetime import date
+
+from app import models
+from app.query_budget import QueryBudget
+from app.services.transaction_ingestion import (
+    detect_internal_transfer,
+    ingest_records,
+    map_tink_category,
+    parse_enable_banking_transaction,
+    parse_gocardless_transaction,
+    parse_tink_transaction,
+)
+
+
+def _gc_tx(internal_id, amount, day="2026-02-01", creditor="Biedronka", **extra):
+    tx = {
+        "internalTransactionId": internal_id,
+        "transactionId": "D202602190000002",
+        "transactionAmount": {"amount": str(amount), "currency": "PLN"},
+        "bookingDate": day,
+        "creditorName": creditor,
+        "remittanceInformationUnstructured": "Card payment",
+    }
+    tx.update(extra)
+    return tx
+
+
+def _eb_tx(entry_ref, amount, remittance=("Zakupy",), cdi="DBIT"):
+    return {
+        "entry_reference": entry_ref,
+        "transaction_id": "t1",
+        "transaction_amount": {"amount": str(amount), "currency": "PLN"},
+        "booking_date": "2026-02-03",
+        "credit_debit_indicator": cdi,
+        "creditor": {"name": "Lidl"},
+        "debtor": {"name": "Jan Kowalski"},
+        "remittance_information": list(remittance),
+    }
+
+
+def test_tink_adapter_maps_amount_and_category():
+    record = parse_tink_transaction({
+        "id": "tink_1",
+        "accountId": "acc_001",
+        "amount": {"value": {"unscaledValue": "-15000", "scale": "2"}, "currencyCode": "PLN"},
+        "dates": {"booked": "2026-02-01"},
+        "descriptions": {"display": "Tesco", "original": "TESCO STORES 3297"},
+        "identifiers": {"providerTransactionId": "bank_1"},
+        "categories": {"pfm": {"id": "expenses:food.groceries", "name": "Groceries"}},
+    })
+
+    assert record.provider == "tink"
+    assert record.amount == -150.0
+    assert record.date == date(2026, 2, 1)
+    assert record.provider_transaction_id == "bank_1"
+    assert record.suggested_type == "expense"
+    assert record.suggested_category == "Jedzenie"
+
+
+def test_gocardless_adapter_builds_account_scoped_id_without_internal_id():
+    record = parse_gocardless_transaction(_gc_tx(None, "-95.35"), "acc_gc")
+
+    assert record.tink_transaction_id == "gc:acc_gc:D202602190000002"
+    assert record.provider_transaction_id is None
+    assert record.amount == -95.35
+    assert record.merchant_name == "Biedronka"
+    assert parse_gocardless_transaction({"transactionAmount": {"amount": "1"}}, "acc_gc") is None
+
+
+def test_enable_banking_adapter_detects_internal_transfer():
+    record = parse_enable_banking_transaction(_eb_tx("ref_1", 200, ("Smart Saver",), cdi="CRDT"), "uid_1")
+
+    assert record.provider == "enablebanking"
+    assert record.suggested_type == "income"
+    assert record.merchant_name == "Jan Kowalski"
+    assert record.is_internal_transfer is True
+    assert record.booked_datetime.date() == date(2026, 2, 3)
+
+
+def test_detect_internal_transfer_gocardless_types():
+    assert detect_internal_transfer({"types": {"type": "TRANSFER"}}, "gocardless") is True
+    assert detect_internal_transfer({"types": [{"type": "CARD"}]}, "gocardless") is False
+    assert map_tink_category("transfers:internal", "expense") is None
+
+
+def test_stored_and_repeated_ids_are_exact_duplicates(db_session, test_user):
+    db_session.add(models.BankTransaction(
+        user_id=test_user.id,
+        tink_transaction_id="gc_stored",
+        tink_account_id="acc_a",
+        provider_transaction_id="gc_stored",
+        provider="gocardless",
+        amount=-10.0,
+        currency="PLN",
+        date=date(2026, 2, 1),
+        description_display="Kiosk",
+        status="pending",
+    ))
+    db_session.commit()
+
+    records = [
+        parse_gocardless_transaction(_gc_tx("gc_stored", "-10.00"), "acc_a"),
+        # Both sides of an internal transfer carry the same internalTransactionId
+        parse_gocardless_transaction(_gc_tx("gc_transfer", "-500.00"), "acc_a"),
+        parse_gocardless_transaction(_gc_tx("gc_transfer", "500.00"), "acc_b"),
+        parse_enable_banking_transaction(_eb_tx("eb_new", -42.0), "uid_1"),
+        None,
+    ]
+    result = ingest_records(db_session, test_user.id, records)
+    db_session.commit()
+
+    assert result.synced_count == 2
+    assert result.exact_duplicate_count == 2
+    assert result.fuzzy_duplicate_count == 0
+    stored = db_session.query(models.BankTransaction).filter_by(tink_transaction_id="eb_new").one()
+    assert stored.provider == "enablebanking"
+    assert stored.user_id == test_user.id
+
+
+def test_query_count_does_not_grow_with_batch_size(db_session, test_user):
+    counts = []
+    for prefix, size in (("small", 5), ("large", 300)):
+        records = [
+            parse_enable_banking_transaction(_eb_tx(f"{prefix}_{i}", -1.0 - i), "uid_1")
+            for i in range(size)
+        ]
+        with QueryBudget(f"ingest_{prefix}", max_queries=1000) as budget:
+            result = ingest_records(db_session, test_user.id, records)
+        assert result.synced_count == size
+        counts.append(budget.count)
+
+    assert counts[0] == counts[1]
+    assert counts[1] <= 2
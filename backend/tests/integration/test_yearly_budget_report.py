@@ -0,0 +1,102 @@
+"""
+Integration tests for the yearly budget report (GET /api/reports/yearly-budget).
+
+Tests that the columnar report builder:
+- Returns one entry per month, in order, keyed by "<Month> <year>"
+- Buckets one-off entries into their month
+- Applies recurring entries from the first month starting on/after their start date until their end date
+- Includes loans from their start date for 30 days * term_months
+- Totals incomes, expenses, loan payments and net savings per month
+"""
+import pytest
+from datetime import date
+from app import models
+
+
+@pytest.fixture
+def report_data(db_session, test_user):
+    uid = test_user.id
+    db_session.add_all([
+        # One-off entries, including one on the first day of the range
+        models.Income(user_id=uid, category="bonus", description="Bonus", amount=1000.0,
+                      date=date(2025, 1, 1), is_recurring=False),
+        models.Expense(user_id=uid, category="food", description="Groceries", amount=150.0,
+                       date=date(2025, 2, 14), is_recurring=False),
+        models.Expense(user_id=uid, category="food", description="Outside range", amount=999.0,
+                       date=date(2025, 5, 1), is_recurring=False),
+        # Recurring: salary from before the range, rent starting mid-February, gym ending in February
+        models.Income(user_id=uid, category="salary", description="Salary", amount=6000.0,
+                      date=date(2024, 6, 1), is_recurring=True),
+        models.Expense(user_id=uid, category="housing", description="Rent", amount=2000.0,
+                       date=date(2025, 2, 10), is_recurring=True),
+        models.Expense(user_id=uid, category="health", description="Gym", amount=100.0,
+                       date=date(2024, 1, 1), end_date=date(2025, 2, 15), is_recurring=True),
+        # Savings
+        models.Saving(user_id=uid, category="general", description="Deposit", amount=500.0,
+                      date=date(2025, 3, 5), saving_type="deposit", is_recurring=False),
+        models.Saving(user_id=uid, category="general", description="Withdrawal", amount=200.0,
+                      date=date(2025, 3, 20), saving_type="withdrawal", is_recurring=False),
+        # Loan active Feb 1 + 30 days -> covers Feb and Mar 1st, not Apr
+        models.Loan(user_id=uid, loan_type="personal", description="Short loan", principal_amount=600.0,
+                    remaining_balance=300.0, interest_rate=5.0, monthly_payment=300.0,
+                    start_date=date(2025, 2, 1), term_months=1),
+    ])
+    db_session.commit()
+    return test_user
+
+
+def _report(client, auth_headers, start="2025-01", end="2025-04"):
+    response = client.get(
+        f"/api/reports/yearly-budget?start_date={start}&end_date={end}",
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestYearlyBudgetReport:
+    """Test the month-by-month report contents."""
+
+    def test_months_in_order(self, client, report_data, auth_headers):
+        data = _report(client, auth_headers)
+
+        assert list(data) == ["January 2025", "February 2025", "March 2025", "April 2025"]
+
+    def test_one_off_entries_bucketed_by_month(self, client, report_data, auth_headers):
+        data = _report(client, auth_headers)
+
+        assert [i["title"] for i in data["January 2025"]["incomes"]] == ["Bonus", "Salary"]
+        assert data["January 2025"]["totals"]["income"] == 7000.0
+        assert "Outside range" not in [e["title"] for month in data.values() for e in month["expenses"]]
+
+    def test_recurring_window(self, client, report_data, auth_headers):
+        data = _report(client, auth_headers)
+
+        titles = {month: [e["title"] for e in values["expenses"]] for month, values in data.items()}
+        assert titles["January 2025"] == ["Gym"]
+        # Rent starts Feb 10, so it first applies in March; Gym ends Feb 15
+        assert titles["February 2025"] == ["Groceries", "Gym"]
+        assert titles["March 2025"] == ["Rent"]
+        assert data["February 2025"]["totals"]["expenses"] == 250.0
+
+    def test_loan_window_and_balance(self, client, report_data, auth_headers):
+        data = _report(client, auth_headers)
+
+        assert [m["totals"]["loanPayments"] for m in data.values()] == [0.0, 300.0, 300.0, 0.0]
+        assert data["February 2025"]["loanPayments"][0]["start_date"] == "2025-02-01"
+        assert data["March 2025"]["totals"]["balance"] == 6000.0 - 2000.0 - 300.0
+
+    def test_savings_totals(self, client, report_data, auth_headers):
+        data = _report(client, auth_headers)
+
+        march = data["March 2025"]
+        assert [s["saving_type"] for s in march["savings"]] == ["deposit", "withdrawal"]
+        assert march["totals"]["deposits"] == 500.0
+        assert march["totals"]["withdrawals"] == 200.0
+        assert march["totals"]["savings"] == 300.0
+
+    def test_empty_household(self, client, test_user, auth_headers):
+        data = _report(client, auth_headers, start="2025-11", end="2026-02")
+
+        assert list(data) == ["November 2025", "December 2025", "January 2026", "February 2026"]
+        assert all(m["totals"]["balance"] == 0.0 for m in data.values())
@@ -0,0 +1,178 @@
+"""
+Unit tests for AI chat streaming.
+
+Tests that stream_claude_response:
+- Streams tokens from the shared async Anthropic client
+- Runs one turn's tool calls concurrently and reports them in call order
+- Sends the tool results back in the next request of the tool loop
+- Marks the static prompt, the context and the transcript tail for prompt caching
+- Sums token usage and timings of the turn's requests into TurnUsage
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.database import get_async_db
+from app.services import ai_chat_service
+
+
+def _tool_use(tool_id, name, partial_json):
+    return [
+        SimpleNamespace(type="content_block_start", content_block=SimpleNamespace(type="tool_use", id=tool_id, name=name)),
+        SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="input_json_delta", partial_json=partial_json)),
+    ]
+
+
+def _text(text):
+    return SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text=text))
+
+
+class FakeStream:
+    def __init__(self, events, final_message):
+        self.events = events
+        self.final_message = final_message
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for event in self.events:
+            await asyncio.sleep(0)
+            yield event
+
+    async def get_final_message(self):
+        return self.final_message
+
+
+class FakeAnthropic:
+    """Answers with two tool calls first, then with text."""
+
+    def __init__(self):
+        self.requests = []
+        self.messages = SimpleNamespace(stream=self.stream)
+
+    def stream(self, **kwargs):
+        self.requests.append(kwargs)
+        if len(self.requests) == 1:
+            events = _tool_use("t1", "get_spending_trend", '{"months": 3}') + _tool_use("t2", "get_loans_status", "")
+            blocks = [
+                SimpleNamespace(type="tool_use", id="t1", name="get_spending_trend", input={"months": 3}),
+                SimpleNamespace(type="tool_use", id="t2", name="get_loans_status", input={}),
+            ]
+            usage = SimpleNamespace(
+                input_tokens=120, output_tokens=30, cache_creation_input_tokens=3000, cache_read_input_tokens=0
+            )
+            return FakeStream(events, SimpleNamespace(stop_reason="tool_use", content=blocks, usage=usage))
+        usage = SimpleNamespace(
+            input_tokens=80, output_tokens=15, cache_creation_input_tokens=200, cache_read_input_tokens=3000
+        )
+        return FakeStream(
+            [_text("Masz "), _text("dobry budzet.")],
+            SimpleNamespace(stop_reason="end_turn", content=[], usage=usage),
+        )
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_run_concurrently(monkeypatch):
+    client = FakeAnthropic()
+    calls = []
+    in_flight = {"now": 0, "max": 0}
+
+    async def fake_tool(name, arguments, user_id, db):
+        calls.append((name, arguments))
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.05)
+        in_flight["now"] -= 1
+        return {"tool": name}
+
+    async def fake_context(user_id, db):
+        return {}
+
+    monkeypatch.setattr(ai_chat_service, "get_anthropic_client", lambda: client)
+    monkeypatch.setattr(ai_chat_service, "build_user_context", fake_context)
+    monkeypatch.setattr(ai_chat_service, "build_system_blocks", lambda context, summary: [])
+    monkeypatch.setattr(ai_chat_service, "execute_tool_call", fake_tool)
+
+    user = SimpleNamespace(id="test-user-id")
+    usage = ai_chat_service.TurnUsage()
+    async for db in get_async_db():
+        frames = [
+            frame async for frame in ai_chat_service.stream_claude_response(user, "Hej", [], db, usage=usage)
+        ]
+
+    assert in_flight["max"] == 2
+    assert calls == [("get_spending_trend", {"months": 3}), ("get_loans_status", {})]
+    assert [(f["type"], f.get("tool")) for f in frames if f["type"] != "token"] == [
+        ("tool_start", "get_spending_trend"),
+        ("tool_start", "get_loans_status"),
+        ("tool_result", "get_spending_trend"),
+        ("tool_result", "get_loans_status"),
+    ]
+    assert "".join(f["content"] for f in frames if f["type"] == "token") == "Masz dobry budzet."
+
+    follow_up = client.requests[1]["messages"]
+    assert [block["tool_use_id"] for block in follow_up[-1]["content"]] == ["t1", "t2"]
+    assert follow_up[-2]["content"][0] == {
+        "type": "tool_use", "id": "t1", "name": "get_spending_trend", "input": {"months": 3},
+    }
+
+    assert (usage.requests, usage.tool_calls) == (2, 2)
+    assert (usage.input_tokens, usage.output_tokens) == (200, 45)
+    assert (usage.cache_creation_input_tokens, usage.cache_read_input_tokens) == (3200, 3000)
+    assert usage.first_token_ms is not None and usage.latency_ms >= usage.first_token_ms
+
+
+@pytest.mark.asyncio
+async def test_prompt_cache_breakpoints(monkeypatch):
+    client = FakeAnthropic()
+
+    async def fake_tool(name, arguments, user_id, db):
+        return {"tool": name}
+
+    async def fake_context(user_id, db):
+        return {}
+
+    monkeypatch.setattr(ai_chat_service, "AI_PROMPT_CACHING", True)
+    monkeypatch.setattr(ai_chat_service, "get_anthropic_client", lambda: client)
+    monkeypatch.setattr(ai_chat_service, "build_user_context", fake_context)
+    monkeypatch.setattr(ai_chat_service, "build_context_prompt", lambda context: "KONTEKST")
+    monkeypatch.setattr(ai_chat_service, "execute_tool_call", fake_tool)
+
+    history = [{"role": "user", "content": "Ile wydalem?"}, {"role": "assistant", "content": "2000 zl."}]
+    frames = [
+        frame async for frame in ai_chat_service.stream_claude_response(
+            SimpleNamespace(id="u"), "Hej", list(history), None, summary="Pytal o wydatki."
+        )
+    ]
+
+    assert frames[-1]["type"] == "token"
+    system = client.requests[0]["system"]
+    assert system[0]["text"] == ai_chat_service.SYSTEM_PROMPT_STATIC
+    assert [block.get("cache_control") for block in system] == [{"type": "ephemeral"}, {"type": "ephemeral"}, None]
+    assert "Pytal o wydatki." in system[2]["text"]
+
+    for request in client.requests:
+        marked = [
+            block for message in request["messages"] if isinstance(message["content"], list)
+            for block in message["content"] if "cache_control" in block
+        ]
+        assert len(marked) == 1
+        assert request["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    # The stored transcript itself stays unmarked
+    assert history[-1] == {"role": "assistant", "content": "2000 zl."}
+    assert client.requests[1]["messages"][0] == history[0]
+
+
+@pytest.mark.asyncio
+async def test_missing_api_key_yields_error(monkeypatch):
+    monkeypatch.setattr(ai_chat_service, "ANTHROPIC_API_KEY", None)
+
+    frames = [frame async for frame in ai_chat_service.stream_claude_response(SimpleNamespace(id="u"), "Hej", [], None)]
+
+    assert frames == [{"type": "error", "message": "ANTHROPIC_API_KEY not configured"}]
@@ -0,0 +1,42 @@
+"""
+Unit tests for the async database layer.
+
+Tests get_async_db and run_sync_db in test mode:
+- get_async_db yields an aiosqlite AsyncSession
+- run_sync_db runs sync code through AsyncSession.run_sync
+- run_sync_db passes a plain Session straight through
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, get_async_db, run_sync_db
+
+
+@pytest.mark.asyncio
+async def test_get_async_db_yields_aiosqlite_session():
+    async for db in get_async_db():
+        assert isinstance(db, AsyncSession)
+        assert db.bind.dialect.driver == "aiosqlite"
+        assert (await db.execute(text("SELECT 1"))).scalar() == 1
+
+
+def _select(session, value):
+    return isinstance(session, Session), session.execute(text(f"SELECT {value}")).scalar()
+
+
+@pytest.mark.asyncio
+async def test_run_sync_db_with_async_session():
+    async for db in get_async_db():
+        assert await run_sync_db(db, _select, 7) == (True, 7)
+
+
+@pytest.mark.asyncio
+async def test_run_sync_db_with_sync_session():
+    db = SessionLocal()
+    try:
+        assert await run_sync_db(db, lambda session, value: (session is db, value), value=3) == (True, 3)
+    finally:
+        db.close()
@@ -36,11 +36,13 @@ from app.services.duplicate_detection_service import (
     create_fingerprint_from_transaction,
     calculate_duplicate_confidence,
     find_potential_duplicates,
+    find_duplicates_batch,
     detect_duplicate_for_new_transaction,
     amounts_match,
     dates_within_window,
     TransactionFingerprint,
     DuplicateMatch,
+    DuplicateCandidateIndex,
     MIN_CONFIDENCE_THRESHOLD,
 )
 
@@ -672,3 +674,99 @@ class TestEdgeCases:
 
         # Zero amounts should be skipped
         assert match is None
+
+
+# =============================================================================
+# Candidate Index Tests
+# =============================================================================
+
+class TestDuplicateCandidateIndex:
+    """Tests for DuplicateCandidateIndex and the batch API."""
+
+    def _stored(self, tx_id, amount, day, description, account="acc_001"):
+        return BankTransaction(
+            id=tx_id,
+            user_id="test-user-id",
+            tink_transaction_id=f"tx_{tx_id}",
+            tink_account_id=account,
+            amount=amount,
+            currency="PLN",
+            date=day,
+            description_display=description,
+            status="pending",
+        )
+
+    def test_scores_match_calculate_duplicate_confidence(self):
+        """Test that blocking and the trigram bound don't change any score."""
+        base = date(2026, 2, 1)
+        descriptions = ["TESCO STORES 3297", "TESCO STORES 3298", "Tesco", "ASDA", "Rent Payment", ""]
+        stored = [
+            self._stored(i + 1, amount, base + timedelta(days=offset), desc, account)
+            for i, (amount, offset, desc, account) in enumerate(
+                (amount, offset, desc, account)
+                for amount in (-150.00, 150.00, -150.40, -151.00)
+                for offset in (-3, -1, 0, 2)
+                for desc in descriptions
+                for account in ("acc_001", "acc_002")
+            )
+        ]
+        index = DuplicateCandidateIndex(stored)
+
+        for desc in descriptions:
+            fp = create_fingerprint(-150.00, "PLN", base, desc, None, "acc_001")
+            expected = []
+            for tx in stored:
+                if not amounts_match(fp.amount_abs, abs(tx.amount), tolerance=0.50):
+                    continue
+                confidence, reason = calculate_duplicate_confidence(fp, tx)
+                if confidence >= MIN_CONFIDENCE_THRESHOLD:
+                    expected.append((tx.id, confidence, reason))
+
+            found = [(m.original_transaction_id, m.confidence, m.match_reason) for m in index.find_matches(fp)]
+            assert sorted(found) == sorted(expected)
+
+    def test_match_not_cut_off_by_busy_window(self, db_session, test_user):
+        """Test that a duplicate is found behind many unrelated rows in the window."""
+        for i in range(40):
+            db_session.add(BankTransaction(
+                user_id=test_user.id,
+                tink_transaction_id=f"tx_noise_{i}",
+                tink_account_id="acc_001",
+                amount=-10.00 - i,
+                currency="PLN",
+                date=date(2026, 2, 1),
+                description_display=f"Shop {i}",
+                status="pending",
+            ))
+        target = BankTransaction(
+            user_id=test_user.id,
+            tink_transaction_id="tx_target",
+            tink_account_id="acc_001",
+            amount=-999.00,
+            currency="PLN",
+            date=date(2026, 2, 1),
+            description_display="IKEA",
+            status="pending",
+        )
+        db_session.add(target)
+        db_session.commit()
+
+        fp = create_fingerprint(-999.00, "PLN", date(2026, 2, 1), "IKEA", None, "acc_001")
+        matches = find_potential_duplicates(db_session, test_user.id, fp, limit=5)
+
+        assert [m.original_transaction_id for m in matches] == [target.id]
+
+    def test_batch_returns_best_match_per_fingerprint(self, db_session, test_user, sample_transaction):
+        """Test that the batch API answers each fingerprint in order."""
+        fingerprints = [
+            create_fingerprint(-150.00, "PLN", date(2026, 2, 1), "TESCO STORES 3297", "5411", "acc_001"),
+            create_fingerprint(-500.00, "PLN", date(2026, 2, 1), "ASDA", None, "acc_001"),
+            create_fingerprint(-150.00, "PLN", date(2026, 2, 2), "TESCO STORES 3298", "5411", "acc_001"),
+        ]
+
+        matches = find_duplicates_batch(db_session, test_user.id, fingerprints)
+
+        assert matches[0].match_reason == "same_account_exact_match"
+        assert matches[1] is None
+        assert matches[2].match_reason == "same_account_date_variance"
+        assert matches[2].original_transaction_id == sample_transaction.id
@@ -0,0 +1,67 @@
+"""
+Unit tests for the shared upstream HTTP clients.
+
+Tests:
+- get_client returns one shared client per upstream and event loop
+- Keep-alive connections are reused and counted in stats()
+- aclose() closes and forgets every client
+"""
+
+import asyncio
+
+import pytest
+
+from app import http_clients
+
+
+async def _serve_keep_alive(reader, writer):
+    """Minimal HTTP/1.1 server answering every request on the connection."""
+    while True:
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            break
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\nok")
+        await writer.drain()
+
+
+@pytest.fixture
+async def local_server():
+    server = await asyncio.start_server(_serve_keep_alive, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    yield f"http://{host}:{port}"
+    server.close()
+    await http_clients.aclose()
+
+
+@pytest.mark.asyncio
+async def test_one_client_per_upstream():
+    try:
+        assert http_clients.get_client("tink") is http_clients.get_client("tink")
+        assert http_clients.get_client("tink") is not http_clients.get_client("gocardless")
+        assert http_clients.get_client("tink").timeout.read == 30.0
+    finally:
+        await http_clients.aclose()
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused(local_server):
+    client = http_clients.get_client("unit-test")
+    for _ in range(3):
+        response = await client.get(f"{local_server}/ping")
+        assert response.text == "ok"
+
+    stats = http_clients.stats()["unit-test"]
+    assert stats["requests"] == 3
+    assert stats["new_connections"] == 1
+    assert stats["reuse_ratio"] == pytest.approx(2 / 3, abs=1e-3)
+    assert stats["open_connections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_aclose_forgets_clients():
+    client = http_clients.get_client("unit-test")
+    await http_clients.aclose()
+
+    assert client.is_closed
+    assert "unit-test" not in http_clients.stats()
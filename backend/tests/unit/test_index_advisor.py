@@ -0,0 +1,71 @@
+"""
+Unit tests for the test-time index advisor.
+
+Tests the advisor logic against the application's table definitions:
+- Extracting WHERE columns per table
+- Reporting only patterns without a supporting index (prefix coverage)
+"""
+
+from datetime import date
+
+from sqlalchemy import select
+
+from app.database import Base
+from app.models import Expense, Income, Loan
+from tests.index_advisor import IndexAdvisor, where_columns
+
+
+def _advisor():
+    return IndexAdvisor(Base.metadata.tables.values())
+
+
+class TestWhereColumns:
+    """Test WHERE column extraction."""
+
+    def test_collects_filtered_columns(self):
+        stmt = select(Expense).where(
+            Expense.user_id == "u1",
+            Expense.is_recurring == True,
+            Expense.date <= date(2025, 1, 31),
+        )
+
+        assert where_columns(stmt) == {Expense.__table__: {"user_id", "is_recurring", "date"}}
+
+    def test_no_where_clause(self):
+        assert where_columns(select(Expense)) == {}
+
+
+class TestIndexAdvisor:
+    """Test pattern recording and the unsupported report."""
+
+    def test_supported_pattern_not_reported(self):
+        advisor = _advisor()
+        advisor.record(select(Income).where(Income.user_id == "u1", Income.created_at >= date(2025, 1, 1)))
+
+        assert advisor.unsupported() == []
+
+    def test_columns_outside_index_prefix_reported(self):
+        advisor = _advisor()
+        advisor.record(select(Expense).where(Expense.user_id == "u1", Expense.description == "Rent"))
+        advisor.record(select(Expense).where(Expense.user_id == "u1", Expense.is_recurring == True))
+
+        assert [pattern for pattern, _ in advisor.unsupported()] == [
+            ("expenses", frozenset({"user_id", "description"})),
+        ]
+
+    def test_unique_lookup_supported(self):
+        advisor = _advisor()
+        advisor.record(select(Loan).where(Loan.id == 1, Loan.user_id == "u1"))
+
+        assert advisor.unsupported() == []
+
+    def test_unsupported_pattern_reported(self):
+        advisor = _advisor()
+        advisor.current_test = "tests/example.py::test_loans"
+        for _ in range(2):
+            advisor.record(select(Loan).where(Loan.description == "Car"))
+
+        [(pattern, stats)] = advisor.unsupported()
+        assert pattern == ("loans", frozenset({"description"}))
+        assert stats.count == 2
+        assert advisor.report_lines()[1].endswith("x2  e.g. tests/example.py::test_loans")
@@ -0,0 +1,67 @@
+"""
+Unit tests for the event-loop lag monitor.
+
+Tests:
+- Lag samples and stalls over the threshold are recorded
+- Stalls are attributed to the culprit sampled during the same heartbeat
+- In debug mode, a blocking call is attributed to the tracked request and function
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.loop_monitor import LoopLagMiddleware, LoopLagMonitor
+
+
+def test_record_counts_stalls_over_threshold():
+    monitor = LoopLagMonitor(threshold_ms=100)
+    monitor.record(5)
+    monitor.record(150)
+
+    stats = monitor.stats()
+    assert stats["samples"] == 2
+    assert stats["stalls"] == 1
+    assert stats["max_lag_ms"] == 150
+    assert stats["top_offenders"] == [
+        {"endpoint": "unknown", "function": "unknown", "count": 1, "total_ms": 150.0, "max_ms": 150.0}
+    ]
+
+
+def test_stall_uses_culprit_from_same_beat():
+    monitor = LoopLagMonitor(threshold_ms=100)
+    monitor._pending = (1.0, ("GET /old", "stale"))
+    monitor.record(120, beat=2.0)
+    monitor._pending = (3.0, ("GET /slow", "app/main.py:1 slow"))
+    monitor.record(130, beat=3.0)
+
+    endpoints = {o["endpoint"] for o in monitor.stats()["top_offenders"]}
+    assert endpoints == {"unknown", "GET /slow"}
+
+
+def blocking_handler():
+    time.sleep(0.15)
+
+
+@pytest.mark.asyncio
+async def test_debug_mode_attributes_blocking_call():
+    monitor = LoopLagMonitor(threshold_ms=50, interval_ms=10, debug=True)
+
+    async def app(scope, receive, send):
+        blocking_handler()
+
+    middleware = LoopLagMiddleware(app, monitor)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        await middleware({"type": "http", "method": "GET", "path": "/slow"}, None, None)
+        await asyncio.sleep(0.03)
+    finally:
+        await monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["stalls"] >= 1
+    worst = stats["top_offenders"][0]
+    assert worst["endpoint"] == "GET /slow"
+    assert "blocking_handler" in worst["function"]
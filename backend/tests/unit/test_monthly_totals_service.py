@@ -6,10 +6,13 @@ Tests cover:
 2. Handling of reconciliation statuses
 3. Recurring vs one-off entries
 4. Fuzzy matching for duplicate detection
+5. Multi-month range calculation
 """
 import pytest
 from datetime import date, datetime, timedelta
+from sqlalchemy import event
 from app.services.monthly_totals_service import MonthlyTotalsService
+from app.services.reconciliation_candidates import ReconciliationCandidates
 from tests.conftest import User, Expense, Income, BankTransaction
 
 
@@ -386,6 +389,123 @@ class TestMonthlyIncomeCalculation:
         assert result["manual_count"] == 1
 
 
+class TestCalculateRange:
+    """Test calculate_range() matches the per-month calculations."""
+
+    @pytest.fixture
+    def mixed_history(self, db_session):
+        """User with one-off, recurring, edited-recurring, duplicate and bank-backed rows."""
+        user = User(id="user1", email="test@example.com", name="Test User")
+        db_session.add(user)
+        db_session.commit()
+
+        bank_tx = BankTransaction(
+            user_id=user.id,
+            tink_transaction_id="tx1",
+            tink_account_id="acc1",
+            amount=-80.0,
+            currency="PLN",
+            date=date(2025, 11, 3),
+            description_display="Orlen",
+            status="converted"
+        )
+        db_session.add(bank_tx)
+        db_session.commit()
+
+        db_session.add_all([
+            # One-off expenses inside and outside the window
+            Expense(user_id=user.id, category="Groceries", description="Tesco",
+                    amount=150.0, date=date(2025, 10, 5), reconciliation_status="unreviewed"),
+            Expense(user_id=user.id, category="Groceries", description="Lidl",
+                    amount=99.0, date=date(2024, 1, 5), reconciliation_status="manual_confirmed"),
+            Expense(user_id=user.id, category="Transport", description="Orlen",
+                    amount=80.0, date=date(2025, 11, 3), bank_transaction_id=bank_tx.id,
+                    source="bank_import", reconciliation_status="bank_backed"),
+            Expense(user_id=user.id, category="Transport", description="Fuel (manual)",
+                    amount=80.0, date=date(2025, 11, 3), reconciliation_status="duplicate_of_bank"),
+            # Recurring expense edited twice (two open rows) - newest wins
+            Expense(user_id=user.id, category="Housing", description="Rent",
+                    amount=2000.0, date=date(2025, 1, 1), is_recurring=True,
+                    reconciliation_status="manual_confirmed"),
+            Expense(user_id=user.id, category="Housing", description="Rent",
+                    amount=2200.0, date=date(2025, 9, 1), is_recurring=True,
+                    reconciliation_status="manual_confirmed"),
+            # Recurring obligation that ends mid-window
+            Expense(user_id=user.id, category="obligations", description="Car loan",
+                    amount=500.0, date=date(2025, 6, 15), end_date=date(2025, 12, 10),
+                    is_recurring=True, reconciliation_status="manual_confirmed"),
+            # Income: recurring salary plus a one-off bonus
+            Income(user_id=user.id, category="Salary", description="Salary",
+                   amount=8000.0, date=date(2025, 3, 1), is_recurring=True,
+                   reconciliation_status="manual_confirmed"),
+            Income(user_id=user.id, category="Bonus", description="Year-end bonus",
+                   amount=3000.0, date=date(2025, 12, 20), reconciliation_status="unreviewed"),
+        ])
+        db_session.commit()
+        return user
+
+    def test_matches_per_month_calculations(self, db_session, mixed_history):
+        """Every month in the range equals the single-month results."""
+        result = MonthlyTotalsService.calculate_range(
+            user_id=mixed_history.id, start_ym=(2025, 4), end_ym=(2026, 3), db=db_session
+        )
+
+        assert len(result) == 12
+        for (year, month), totals in result.items():
+            assert totals["expenses"] == MonthlyTotalsService.calculate_monthly_expenses(
+                mixed_history.id, year, month, db_session
+            )
+            assert totals["income"] == MonthlyTotalsService.calculate_monthly_income(
+                mixed_history.id, year, month, db_session
+            )
+            assert totals["obligations"] == MonthlyTotalsService.calculate_monthly_obligations(
+                mixed_history.id, year, month, db_session
+            )
+
+    def test_keys_are_ascending_and_cross_year(self, db_session, mixed_history):
+        """Range keys run from start to end inclusive across a year boundary."""
+        result = MonthlyTotalsService.calculate_range(
+            user_id=mixed_history.id, start_ym=(2025, 11), end_ym=(2026, 2), db=db_session
+        )
+
+        assert list(result.keys()) == [(2025, 11), (2025, 12), (2026, 1), (2026, 2)]
+        # Edited recurring rent is counted once at the newest amount
+        assert result[(2026, 1)]["expenses"]["total"] == 2200.0
+        assert result[(2025, 11)]["expenses"]["duplicate_count"] == 2
+
+    def test_uses_one_query_per_table(self, engine, db_session, mixed_history):
+        """A 13-month range issues two SELECTs regardless of its length."""
+        user_id = mixed_history.id
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            MonthlyTotalsService.calculate_range(
+                user_id=user_id, start_ym=(2025, 1), end_ym=(2026, 1), db=db_session
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert len(statements) == 2
+
+    def test_rejects_inverted_range(self, db_session):
+        """end_ym before start_ym raises ValueError."""
+        with pytest.raises(ValueError):
+            MonthlyTotalsService.calculate_range(
+                user_id="user1", start_ym=(2026, 3), end_ym=(2026, 1), db=db_session
+            )
+
+
+def _suggest(user_id, db, **kwargs):
+    """suggest_duplicates() after filling reconciliation_candidates (test models bypass the write hooks)."""
+    ReconciliationCandidates.rebuild(user_id, db)
+    return MonthlyTotalsService.suggest_duplicates(user_id=user_id, db=db, **kwargs)
+
+
 class TestDuplicateSuggestions:
     """Test suggest_duplicates() fuzzy matching algorithm."""
 
@@ -394,6 +514,7 @@ class TestDuplicateSuggestions:
         user = User(id="user1", email="test@example.com", name="Test User")
         db_session.add(user)
         db_session.commit()
+        day = date.today() - timedelta(days=10)
 
         # Bank transaction
         bank_tx = BankTransaction(
@@ -402,7 +523,7 @@ class TestDuplicateSuggestions:
             tink_account_id="acc1",
             amount=-100.0,
             currency="PLN",
-            date=date(2026, 2, 5),
+            date=day,
             description_display="Biedronka",
             status="pending"
         )
@@ -415,13 +536,13 @@ class TestDuplicateSuggestions:
             category="Groceries",
             description="Biedronka",
             amount=100.0,
-            date=date(2026, 2, 5),
+            date=day,
             reconciliation_status="unreviewed"
         )
         db_session.add(expense)
         db_session.commit()
 
-        suggestions = MonthlyTotalsService.suggest_duplicates(
+        suggestions = _suggest(
             user_id=user.id, db=db_session
         )
 
@@ -435,6 +556,7 @@ class TestDuplicateSuggestions:
         user = User(id="user1", email="test@example.com", name="Test User")
         db_session.add(user)
         db_session.commit()
+        day = date.today() - timedelta(days=10)
 
         # Bank transaction on Feb 5
         bank_tx = BankTransaction(
@@ -443,7 +565,7 @@ class TestDuplicateSuggestions:
             tink_account_id="acc1",
             amount=-100.0,
             currency="PLN",
-            date=date(2026, 2, 5),
+            date=day,
             description_display="Tesco",
             status="pending"
         )
@@ -456,13 +578,13 @@ class TestDuplicateSuggestions:
             category="Groceries",
             description="Tesco",
             amount=100.0,
-            date=date(2026, 2, 7),
+            date=day + timedelta(days=2),
             reconciliation_status="unreviewed"
         )
         db_session.add(expense)
         db_session.commit()
 
-        suggestions = MonthlyTotalsService.suggest_duplicates(
+        suggestions = _suggest(
             user_id=user.id, db=db_session
         )
 
@@ -477,6 +599,7 @@ class TestDuplicateSuggestions:
         user = User(id="user1", email="test@example.com", name="Test User")
         db_session.add(user)
         db_session.commit()
+        day = date.today() - timedelta(days=10)
 
         # Bank transaction: 100.00
         bank_tx = BankTransaction(
@@ -485,7 +608,7 @@ class TestDuplicateSuggestions:
             tink_account_id="acc1",
             amount=-100.0,
             currency="PLN",
-            date=date(2026, 2, 5),
+            date=day,
             description_display="Restaurant",
             status="pending"
         )
@@ -498,13 +621,13 @@ class TestDuplicateSuggestions:
             category="Food",
             description="Restaurant",
             amount=101.50,
-            date=date(2026, 2, 5),
+            date=day,
             reconciliation_status="unreviewed"
         )
         db_session.add(expense)
         db_session.commit()
 
-        suggestions = MonthlyTotalsService.suggest_duplicates(
+        suggestions = _suggest(
             user_id=user.id, db=db_session
         )
 
@@ -519,6 +642,7 @@ class TestDuplicateSuggestions:
         user = User(id="user1", email="test@example.com", name="Test User")
         db_session.add(user)
         db_session.commit()
+        day = date.today() - timedelta(days=10)
 
         # Bank transaction
         bank_tx = BankTransaction(
@@ -527,7 +651,7 @@ class TestDuplicateSuggestions:
             tink_account_id="acc1",
             amount=-100.0,
             currency="PLN",
-            date=date(2026, 2, 5),
+            date=day,
             description_display="Lidl",
             status="pending"
         )
@@ -540,13 +664,13 @@ class TestDuplicateSuggestions:
             category="Groceries",
             description="Lidl",
             amount=100.0,
-            date=date(2026, 2, 5),
+            date=day,
             reconciliation_status="manual_confirmed"  # Already reviewed
         )
         db_session.add(expense)
         db_session.commit()
 
-        suggestions = MonthlyTotalsService.suggest_duplicates(
+        suggestions = _suggest(
             user_id=user.id, db=db_session
         )
 
@@ -558,6 +682,7 @@ class TestDuplicateSuggestions:
         user = User(id="user1", email="test@example.com", name="Test User")
         db_session.add(user)
         db_session.commit()
+        day = date.today() - timedelta(days=10)
 
         # Bank transaction
         bank_tx = BankTransaction(
@@ -566,7 +691,7 @@ class TestDuplicateSuggestions:
             tink_account_id="acc1",
             amount=-100.0,
             currency="PLN",
-            date=date(2026, 2, 5),
+            date=day,
             description_display="Unknown Merchant",
             status="pending"
         )
@@ -579,22 +704,89 @@ class TestDuplicateSuggestions:
             category="Other",
             description="Some random purchase",
             amount=100.0,
-            date=date(2026, 2, 5),
+            date=day,
             reconciliation_status="unreviewed"
         )
         db_session.add(expense)
         db_session.commit()
 
         # With default min_score=0.7, this should not match (description too different)
-        suggestions = MonthlyTotalsService.suggest_duplicates(
+        suggestions = _suggest(
             user_id=user.id, db=db_session, min_score=0.7
         )
 
         # Even with matching date and amount, very different descriptions should fail
         # (Unless the score happens to be exactly 0.7 due to date+amount alone)
         # Let's test with a higher threshold to be sure
-        suggestions_high = MonthlyTotalsService.suggest_duplicates(
+        suggestions_high = _suggest(
             user_id=user.id, db=db_session, min_score=0.9
         )
 
         assert len(suggestions_high) == 0  # Should filter out low matches
+
+    def test_min_score_below_stored_threshold_rejected(self, db_session):
+        """Test that min_score below what the candidates table keeps raises."""
+        with pytest.raises(ValueError):
+            MonthlyTotalsService.suggest_duplicates(user_id="user1", db=db_session, min_score=0.5)
+
+    def test_limit_keeps_best_scores_in_order(self, db_session):
+        """Test that only the best `limit` suggestions are kept, highest first."""
+        user = User(id="user1", email="test@example.com", name="Test User")
+        db_session.add(user)
+        db_session.commit()
+        day = date.today() - timedelta(days=10)
+        for i, offset in enumerate((0, 2, 0, 3)):
+            db_session.add(BankTransaction(
+                user_id=user.id,
+                tink_transaction_id=f"tx{i}",
+                tink_account_id="acc1",
+                amount=-(100.0 + i * 50),
+                currency="PLN",
+                date=day,
+                description_display=f"Shop {i}",
+                status="pending"
+            ))
+            db_session.add(Expense(
+                user_id=user.id,
+                category="Other",
+                description=f"Shop {i}",
+                amount=100.0 + i * 50,
+                date=day + timedelta(days=offset),
+                reconciliation_status="unreviewed"
+            ))
+        db_session.commit()
+
+        suggestions = _suggest(
+            user_id=user.id, db=db_session, limit=2
+        )
+
+        assert [s["match_score"] for s in suggestions] == [1.0, 1.0]
+        assert [s["manual_entry"].description for s in suggestions] == ["Shop 0", "Shop 2"]
+
+    def test_pairs_outside_window_not_suggested(self, db_session):
+        """Test that matching amounts/descriptions more than 3 days apart aren't paired."""
+        user = User(id="user1", email="test@example.com", name="Test User")
+        db_session.add(user)
+        db_session.commit()
+        day = date.today() - timedelta(days=20)
+        db_session.add(BankTransaction(
+            user_id=user.id,
+            tink_transaction_id="tx1",
+            tink_account_id="acc1",
+            amount=-49.99,
+            currency="PLN",
+            date=day,
+            description_display="Netflix",
+            status="pending"
+        ))
+        db_session.add(Expense(
+            user_id=user.id,
+            category="Subscriptions",
+            description="Netflix",
+            amount=49.99,
+            date=day + timedelta(days=4),
+            reconciliation_status="unreviewed"
+        ))
+        db_session.commit()
+
+        assert _suggest(user_id=user.id, db=db_session) == []
@@ -0,0 +1,75 @@
+"""
+Unit tests for the blocking-call offload pools.
+
+Tests:
+- Calls run on the pool's worker threads, not the event loop thread
+- The @blocking decorator keeps sync calls working and adds .offload
+- Saturation is counted when every worker is busy
+- Context variables follow the call into the worker
+"""
+
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+
+import pytest
+
+from app.offload import OffloadPool, blocking, get_pool, run_blocking
+
+
+@pytest.mark.asyncio
+async def test_runs_on_worker_thread():
+    pool = OffloadPool("test", max_workers=2)
+    try:
+        name = await pool.run(lambda: threading.current_thread().name)
+    finally:
+        pool.shutdown()
+
+    assert name.startswith("offload-test")
+    assert pool.stats()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_blocking_decorator():
+    @blocking("unit-test")
+    def add(a, b=0):
+        return a + b
+
+    assert add(1, b=2) == 3
+    assert await add.offload(1, b=2) == 3
+    assert add.offload_pool == "unit-test"
+    assert get_pool("unit-test").stats()["submitted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_saturation_counted_when_workers_busy():
+    pool = OffloadPool("busy", max_workers=1)
+    try:
+        await asyncio.gather(*(pool.run(time.sleep, 0.02) for _ in range(3)))
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats()
+    assert stats["saturated"] == 2
+    assert stats["peak_in_flight"] == 3
+    assert stats["max_wait_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_failures_counted_and_raised():
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await run_blocking("unit-test-failures", fail)
+
+    assert get_pool("unit-test-failures").stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_context_variables_follow_the_call():
+    request_id: ContextVar[str] = ContextVar("request_id", default="none")
+    request_id.set("abc")
+
+    assert await run_blocking("unit-test", request_id.get) == "abc"
@@ -0,0 +1,150 @@
+"""
+Unit tests for the household snapshot cache.
+
+Tests the cache logic without requiring database access:
+- Read-through behavior and per-name hit/miss metrics
+- Data-version invalidation
+- LRU eviction and TTL expiry of the local backend
+- The shared backend over FakeSharedClient
+- Degrading to computing when the backend fails
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from app.services.snapshot_cache import (
+    FakeSharedClient,
+    LocalSnapshotBackend,
+    SharedSnapshotBackend,
+    SnapshotCache,
+)
+
+
+@pytest.fixture(params=["local", "shared"])
+def cache(request):
+    if request.param == "local":
+        backend = LocalSnapshotBackend(max_entries=16)
+    else:
+        backend = SharedSnapshotBackend(FakeSharedClient())
+    return SnapshotCache(backend, ttl_seconds=60)
+
+
+class Counter:
+    """Compute function that records how often it ran."""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestReadThrough:
+    """Test get_or_compute caching and metrics."""
+
+    def test_second_read_is_a_hit(self, cache):
+        compute = Counter({"total": 100.0})
+
+        first = cache.get_or_compute("summary", "household-1", compute)
+        second = cache.get_or_compute("summary", "household-1", compute)
+
+        assert first == second == {"total": 100.0}
+        assert compute.calls == 1
+        stats = cache.stats()
+        assert stats["by_name"]["summary"] == {"hits": 1, "misses": 1, "errors": 0}
+        assert stats["hit_rate"] == 0.5
+
+    def test_scopes_and_key_parts_are_isolated(self, cache):
+        compute = Counter({"total": 1.0})
+
+        cache.get_or_compute("summary", "household-1", compute)
+        cache.get_or_compute("summary", "household-2", compute)
+        cache.get_or_compute("summary", "household-1", compute, "pl")
+
+        assert compute.calls == 3
+
+    def test_invalidate_bumps_version(self, cache):
+        compute = Counter({"total": 1.0})
+        cache.get_or_compute("summary", "household-1", compute)
+
+        cache.invalidate("household-1")
+        cache.get_or_compute("summary", "household-1", compute)
+
+        assert compute.calls == 2
+
+    def test_cached_value_is_not_shared_with_caller(self, cache):
+        cache.get_or_compute("summary", "household-1", Counter({"items": [1]}))
+
+        cached = cache.get_or_compute("summary", "household-1", Counter(None))
+        cached["items"].append(2)
+
+        assert cache.get_or_compute("summary", "household-1", Counter(None)) == {"items": [1]}
+
+    def test_async_variant(self, cache):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return {"context": "ok"}
+
+        async def run():
+            first = await cache.get_or_compute_async("ai_context", "user-1", compute)
+            second = await cache.get_or_compute_async("ai_context", "user-1", compute)
+            return first, second
+
+        assert asyncio.run(run()) == ({"context": "ok"}, {"context": "ok"})
+        assert len(calls) == 1
+
+
+class TestLocalBackend:
+    """Test LRU eviction and TTL expiry."""
+
+    def test_lru_evicts_least_recently_used(self):
+        backend = LocalSnapshotBackend(max_entries=2)
+        backend.set("a", 1, 60)
+        backend.set("b", 2, 60)
+        backend.get("a")  # a is now most recently used
+        backend.set("c", 3, 60)
+
+        assert backend.get("a") == 1
+        assert backend.get("b") is None
+        assert backend.get("c") == 3
+        assert backend.evictions == 1
+
+    def test_entries_expire_after_ttl(self):
+        backend = LocalSnapshotBackend()
+        with patch("app.services.snapshot_cache.time.monotonic", return_value=1000.0):
+            backend.set("a", 1, 30)
+        with patch("app.services.snapshot_cache.time.monotonic", return_value=1029.0):
+            assert backend.get("a") == 1
+        with patch("app.services.snapshot_cache.time.monotonic", return_value=1031.0):
+            assert backend.get("a") is None
+        assert backend.size() == 0
+
+
+class TestDegradedOperation:
+    """Test disabled and failing caches fall back to computing."""
+
+    def test_disabled_cache_always_computes(self):
+        cache = SnapshotCache(None)
+        compute = Counter(1)
+
+        cache.get_or_compute("summary", "household-1", compute)
+        cache.get_or_compute("summary", "household-1", compute)
+
+        assert compute.calls == 2
+        assert cache.stats()["backend"] is None
+
+    def test_backend_errors_are_counted_not_raised(self):
+        class BrokenClient(FakeSharedClient):
+            def get(self, key):
+                raise ConnectionError("store unavailable")
+
+        cache = SnapshotCache(SharedSnapshotBackend(BrokenClient()))
+        compute = Counter(1)
+
+        assert cache.get_or_compute("summary", "household-1", compute) == 1
+        assert cache.stats()["by_name"]["summary"]["errors"] == 1
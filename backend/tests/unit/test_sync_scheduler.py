@@ -0,0 +1,142 @@
+"""
+Unit tests for the background sync scheduler.
+
+Tests:
+- Token buckets refill over time and report the wait for the next token
+- Jobs run concurrently, bounded by the concurrency limit
+- Users over their daily sync budget are skipped
+- Each job gets its own session, and failures are isolated and counted
+- Provider budgets throttle the pass
+"""
+
+import asyncio
+
+import pytest
+
+from app.jobs.sync_scheduler import SyncJob, SyncScheduler, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+        self.rolled_back = False
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_token_bucket_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=2, rate=0.5, clock=clock)
+
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.wait_time() == pytest.approx(2.0)
+
+    clock.now = 2.0
+    assert bucket.try_acquire()
+
+    clock.now = 100.0
+    assert bucket.tokens == 2
+
+
+def _scheduler(**kwargs):
+    sessions = []
+
+    def session_factory():
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    kwargs.setdefault("provider_buckets", {"tink": TokenBucket(capacity=1000, rate=1000)})
+    return SyncScheduler(session_factory=session_factory, **kwargs), sessions
+
+
+@pytest.mark.asyncio
+async def test_runs_jobs_concurrently_within_limit():
+    scheduler, sessions = _scheduler(concurrency=3)
+    in_flight = 0
+    peak = 0
+    seen_sessions = []
+
+    async def run(db):
+        nonlocal in_flight, peak
+        seen_sessions.append(db)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"success": True}
+
+    jobs = [SyncJob("tink", f"user-{i}", i, run) for i in range(9)]
+    summary = await scheduler.run(jobs)
+
+    assert summary["succeeded"] == 9
+    assert peak == 3
+    assert len({id(db) for db in seen_sessions}) == 9
+    assert all(db.closed for db in sessions)
+    assert summary["max_queue_lag_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_users_over_daily_limit_are_skipped():
+    scheduler, _ = _scheduler(user_daily_limit=2)
+
+    async def run(db):
+        return {"success": True}
+
+    summary = await scheduler.run([SyncJob("tink", "busy-user", i, run) for i in range(3)])
+
+    assert summary["succeeded"] == 2
+    assert summary["rate_limited"] == 1
+    assert scheduler.stats()["rate_limited_users"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_are_isolated():
+    scheduler, sessions = _scheduler()
+
+    async def ok(db):
+        return {"success": True}
+
+    async def reported_failure(db):
+        return {"success": False, "error": "token expired"}
+
+    async def crash(db):
+        raise RuntimeError("boom")
+
+    summary = await scheduler.run([
+        SyncJob("tink", "a", 1, ok),
+        SyncJob("tink", "b", 2, reported_failure),
+        SyncJob("tink", "c", 3, crash),
+    ])
+
+    assert summary["succeeded"] == 1
+    assert summary["failed"] == 2
+    assert sum(db.rolled_back for db in sessions) == 1
+    assert scheduler.stats()["totals"] == {"passes": 1, "succeeded": 1, "failed": 2, "rate_limited": 0}
+
+
+@pytest.mark.asyncio
+async def test_provider_budget_throttles_pass():
+    scheduler, _ = _scheduler(provider_buckets={"gocardless": TokenBucket(capacity=1, rate=50)})
+
+    async def run(db):
+        return {"success": True}
+
+    summary = await scheduler.run([SyncJob("gocardless", f"user-{i}", i, run) for i in range(3)])
+
+    # One token up front, then one every 20 ms
+    assert summary["succeeded"] == 3
+    assert summary["duration_s"] >= 0.035
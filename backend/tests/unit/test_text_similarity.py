@@ -0,0 +1,85 @@
+"""
+Unit tests for the description similarity kernels.
+
+Tests:
+- The banded Levenshtein distance is exact up to max_distance and stops above it
+- Bounded similarity is exact above its threshold and 0.0 below it
+- The SequenceMatcher wrapper keeps difflib's ratio above its cutoff
+"""
+
+import difflib
+import random
+
+from app.services.text_similarity import (
+    bounded_similarity,
+    levenshtein_distance,
+    max_distance_for,
+    prepare_description,
+    sequence_similarity,
+)
+
+
+def _full_distance(s1, s2):
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, start=1):
+        current_row = [i]
+        for j, c2 in enumerate(s2, start=1):
+            current_row.append(min(previous_row[j] + 1, current_row[j - 1] + 1, previous_row[j - 1] + (c1 != c2)))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def _random_pairs(count, seed=7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        first = "".join(rng.choice("abcd1") for _ in range(rng.randint(0, 12)))
+        second = list(first)
+        for _ in range(rng.randint(0, 6)):
+            position = rng.randint(0, len(second))
+            if rng.random() < 0.5 and second:
+                second.pop(min(position, len(second) - 1))
+            else:
+                second.insert(position, rng.choice("abcd1"))
+        yield first, "".join(second)
+
+
+def test_banded_distance_is_exact_within_limit():
+    for first, second in _random_pairs(2000):
+        expected = _full_distance(first, second)
+        assert levenshtein_distance(first, second) == expected
+        for max_distance in range(5):
+            got = levenshtein_distance(first, second, max_distance)
+            assert got == (expected if expected <= max_distance else max_distance + 1)
+
+
+def test_max_distance_for_tiers():
+    assert max_distance_for(5, 0.8) == 1
+    assert max_distance_for(10, 0.5) == 5
+    assert max_distance_for(7, 0.0) == 7
+
+
+def test_bounded_similarity_exact_above_threshold():
+    first = prepare_description("TESCO STORES 3297")
+    second = prepare_description("Tesco Stores 3298")
+
+    assert bounded_similarity(first, second, 0.8) == 1.0 - 1 / 15
+    assert bounded_similarity(first, prepare_description("ASDA"), 0.5) == 0.0
+    assert bounded_similarity(first, prepare_description(""), 0.0) == 0.0
+    assert bounded_similarity(first, prepare_description("tesco-stores 3297"), 0.8) == 1.0
+
+
+def test_bounded_similarity_never_hides_a_passing_pair():
+    for first, second in _random_pairs(2000, seed=11):
+        if not first or not second or first == second:
+            continue
+        exact = 1.0 - _full_distance(first, second) / max(len(first), len(second))
+        for threshold in (0.5, 0.8):
+            got = bounded_similarity(prepare_description(first), prepare_description(second), threshold)
+            assert got == (exact if exact >= threshold else 0.0)
+
+
+def test_sequence_similarity_matches_difflib_above_cutoff():
+    for first, second in _random_pairs(1000, seed=3):
+        ratio = difflib.SequenceMatcher(None, first, second).ratio()
+        got = sequence_similarity(first, second, min_ratio=0.6)
+        assert got == ratio or (ratio < 0.6 and got == 0.0)
@@ -1446,3 +1446,43 @@ class TestRefreshAccessToken:
                 await tink_service.refresh_access_token("invalid-refresh-token")
 
             assert exc_info.value.status_code == 400
+
+
+# =============================================================================
+# Transaction Pagination Tests
+# =============================================================================
+
+class TestIterTransactionPages:
+    """Tests for iter_transaction_pages method."""
+
+    @staticmethod
+    def _page(transactions, next_token):
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"transactions": transactions, "nextPageToken": next_token}
+        return response
+
+    @pytest.mark.asyncio
+    async def test_follows_next_page_token(self, tink_service):
+        """Test that every page is fetched, passing each nextPageToken on."""
+        with patch.object(tink_service, '_request_with_retry', new_callable=AsyncMock) as mock_request:
+            mock_request.side_effect = [
+                self._page([{"id": "tx1"}], "page-2"),
+                self._page([{"id": "tx2"}], ""),
+            ]
+
+            pages = [page async for page in tink_service.iter_transaction_pages("token")]
+
+            assert [page["transactions"][0]["id"] for page in pages] == ["tx1", "tx2"]
+            assert "pageToken" not in mock_request.call_args_list[0][1]["params"]
+            assert mock_request.call_args_list[1][1]["params"]["pageToken"] == "page-2"
+
+    @pytest.mark.asyncio
+    async def test_stops_on_repeated_token(self, tink_service):
+        """Test that a repeated nextPageToken doesn't loop forever."""
+        with patch.object(tink_service, '_request_with_retry', new_callable=AsyncMock) as mock_request:
+            mock_request.return_value = self._page([], "same-token")
+
+            pages = [page async for page in tink_service.iter_transaction_pages("token")]
+
+            assert len(pages) == 2
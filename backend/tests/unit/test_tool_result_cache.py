@@ -0,0 +1,189 @@
+"""
+Unit tests for the AI tool result cache.
+
+Tests the cache logic without requiring database access:
+- Argument normalization (empty values, tool defaults)
+- Read-through per household and data version, with per-tool metrics
+- Pure tools cached without a data version or database session
+- LRU eviction and per-tool TTLs
+- Sharing one computation between identical concurrent calls
+"""
+
+import asyncio
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from app.services import ai_chat_service
+from app.services.snapshot_cache import LocalSnapshotBackend, SnapshotCache
+from app.services.tool_result_cache import ToolResultCache, normalize_arguments
+
+TODAY = date(2026, 6, 15)
+
+
+@pytest.fixture
+def versions():
+    return SnapshotCache(LocalSnapshotBackend(max_entries=16))
+
+
+@pytest.fixture
+def cache(versions):
+    return ToolResultCache(versions=versions, max_entries=16)
+
+
+class Tool:
+    """Async tool function that records how often it ran."""
+
+    def __init__(self, value, delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+class TestNormalizeArguments:
+    """Test normalize_arguments()."""
+
+    def test_empty_values_dropped_and_defaults_filled(self):
+        assert normalize_arguments("get_expenses_by_category", {"month": "null", "months_back": None}, TODAY) == {
+            "year": 2026,
+        }
+        assert normalize_arguments("get_spending_trend", {}, TODAY) == normalize_arguments(
+            "get_spending_trend", {"months": 3}, TODAY
+        )
+
+    def test_explicit_values_kept(self):
+        assert normalize_arguments("get_bank_transactions", {"limit": 10, "merchant_search": ""}, TODAY) == {
+            "months_back": 1, "limit": 10, "transaction_type": "all",
+        }
+
+
+@pytest.mark.asyncio
+class TestReadThrough:
+    """Test get_or_execute caching and metrics."""
+
+    async def test_equivalent_arguments_hit(self, cache):
+        tool = Tool({"trend": [1, 2, 3]})
+
+        first = await cache.get_or_execute("get_spending_trend", {"months": 3}, "household-1", tool)
+        second = await cache.get_or_execute("get_spending_trend", {}, "household-1", tool)
+        other = await cache.get_or_execute("get_spending_trend", {}, "household-2", tool)
+
+        assert first == second == other == {"trend": [1, 2, 3]}
+        assert tool.calls == 2
+        stats = cache.stats()
+        assert stats["by_tool"]["get_spending_trend"]["hits"] == 1
+        assert stats["by_tool"]["get_spending_trend"]["misses"] == 2
+        assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+    async def test_data_version_bump_invalidates(self, cache, versions):
+        tool = Tool({"total": 100.0})
+
+        await cache.get_or_execute("get_cash_flow_summary", {}, "household-1", tool)
+        versions.invalidate("household-1")
+        await cache.get_or_execute("get_cash_flow_summary", {}, "household-1", tool)
+
+        assert tool.calls == 2
+
+    async def test_time_saved_counts_compute_time_of_hits(self, cache):
+        tool = Tool({"total": 1.0}, delay=0.02)
+
+        for _ in range(3):
+            await cache.get_or_execute("get_loans_status", {}, "household-1", tool)
+
+        by_tool = cache.stats()["by_tool"]["get_loans_status"]
+        assert tool.calls == 1
+        assert by_tool["saved_ms"] >= 2 * 20 * 0.9
+
+    async def test_results_are_copies(self, cache):
+        tool = Tool({"loans": []})
+
+        first = await cache.get_or_execute("get_loans_status", {}, "household-1", tool)
+        first["loans"].append("mutated")
+
+        assert await cache.get_or_execute("get_loans_status", {}, "household-1", tool) == {"loans": []}
+
+    async def test_errors_and_uncached_tools_always_execute(self, cache):
+        error = Tool({"error": "Nie znaleziono kredytu"})
+        chart = Tool({"chart_type": "bar"})
+
+        for _ in range(2):
+            await cache.get_or_execute("simulate_loan_overpayment", {"loan_name": "x"}, "household-1", error)
+            await cache.get_or_execute("generate_chart_config", {"chart_type": "bar"}, "household-1", chart)
+
+        assert (error.calls, chart.calls) == (2, 2)
+
+    async def test_concurrent_identical_calls_share_one_execution(self, cache):
+        tool = Tool({"total": 1.0}, delay=0.05)
+
+        results = await asyncio.gather(*(
+            cache.get_or_execute("get_income_breakdown", {"year": 2026}, "household-1", tool) for _ in range(3)
+        ))
+
+        assert tool.calls == 1
+        assert results == [{"total": 1.0}] * 3
+
+
+@pytest.mark.asyncio
+class TestPureTools:
+    """Test caching of tools computed from their arguments alone."""
+
+    async def test_pure_tool_cached_without_versions(self):
+        cache = ToolResultCache(versions=SnapshotCache(None))
+        goal = Tool({"months_needed": 10})
+        trend = Tool({"trend": []})
+
+        for household in ("household-1", "household-2"):
+            await cache.get_or_execute("simulate_savings_goal", {"target_amount": 1000}, household, goal)
+            await cache.get_or_execute("get_spending_trend", {}, household, trend)
+
+        assert goal.calls == 1
+        assert trend.calls == 2
+
+    async def test_execute_tool_call_skips_database_for_pure_tools(self):
+        cache = ToolResultCache(versions=SnapshotCache(None))
+        arguments = {"target_amount": 12000, "monthly_savings": 1000}
+
+        with patch.object(ai_chat_service, "tool_result_cache", cache), \
+                patch.object(ai_chat_service, "run_sync_db") as run_sync_db:
+            first = await ai_chat_service.execute_tool_call("simulate_savings_goal", arguments, "u", db=None)
+            second = await ai_chat_service.execute_tool_call("simulate_savings_goal", arguments, "u", db=None)
+
+        run_sync_db.assert_not_called()
+        assert first == second
+        assert cache.stats()["by_tool"]["simulate_savings_goal"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+class TestBounds:
+    """Test LRU eviction and TTL expiry."""
+
+    async def test_lru_eviction(self, versions):
+        cache = ToolResultCache(versions=versions, max_entries=2)
+        tools = {year: Tool({"year": year}) for year in (2024, 2025, 2026)}
+
+        for year, tool in tools.items():
+            await cache.get_or_execute("get_income_breakdown", {"year": year}, "household-1", tool)
+        await cache.get_or_execute("get_income_breakdown", {"year": 2024}, "household-1", tools[2024])
+
+        assert tools[2024].calls == 2
+        assert cache.stats()["evictions"] == 2
+
+    async def test_per_tool_ttl(self, versions):
+        cache = ToolResultCache(versions=versions, ttls={"get_bank_transactions": 60, "get_loans_status": 300})
+        transactions = Tool({"transactions": []})
+        loans = Tool({"loans": []})
+
+        with patch("app.services.tool_result_cache.time.monotonic", return_value=1000.0):
+            await cache.get_or_execute("get_bank_transactions", {}, "household-1", transactions)
+            await cache.get_or_execute("get_loans_status", {}, "household-1", loans)
+        with patch("app.services.tool_result_cache.time.monotonic", return_value=1100.0):
+            await cache.get_or_execute("get_bank_transactions", {}, "household-1", transactions)
+            await cache.get_or_execute("get_loans_status", {}, "household-1", loans)
+
+        assert (transactions.calls, loans.calls) == (2, 1)
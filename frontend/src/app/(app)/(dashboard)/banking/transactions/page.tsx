@@ -59,6 +59,7 @@ import { TablePageSkeleton } from "@/components/LoadingSkeleton";
 import { useSettings } from "@/contexts/SettingsContext";
 import Link from "next/link";
 import { mapTinkCategoryToApp } from "@/lib/tink-category-mapping";
+import { SyncJobFailedError, waitForSyncJob } from "@/lib/sync-jobs";
 
 // API calls go through dedicated Next.js API routes at /api/banking/* which add auth headers
 
@@ -303,11 +304,17 @@ export default function BankTransactionsPage() {
         } catch { /* ignore parse errors */ }
       }
 
-      // Process Enable Banking result
+      // Process Enable Banking result (the sync is queued; wait for its job)
       if (ebRes.status === "fulfilled" && ebRes.value.ok) {
-        const result = await ebRes.value.json();
-        totalSynced += result.synced_count || 0;
-        anySuccess = true;
+        try {
+          const job = await waitForSyncJob(await ebRes.value.json());
+          totalSynced += job.result?.synced_count || 0;
+          anySuccess = true;
+        } catch (err) {
+          if (err instanceof SyncJobFailedError && err.job.error_code) {
+            lastError = err.job.error_code;
+          }
+        }
       } else if (ebRes.status === "fulfilled" && ebRes.value.status !== 404) {
         try {
           const errorData = await ebRes.value.json();
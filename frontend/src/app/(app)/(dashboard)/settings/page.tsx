@@ -33,6 +33,7 @@ import {
 import { Separator } from "@/components/ui/separator";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import { logger } from "@/lib/logger";
+import { waitForSyncJob } from "@/lib/sync-jobs";
 import { FontAwesomeIcon } from "@fortawesome/react-fontawesome";
 import {
   faCrown,
@@ -352,6 +353,7 @@ export default function SettingsPage() {
         throw new Error(errData.detail || "Sync failed");
       }
 
+      // GoCardless syncs run in the request (no queued job)
       const data = await response.json();
       toast({
         title: data.message || `Synced ${data.synced_count} transactions`,
@@ -415,7 +417,8 @@ export default function SettingsPage() {
         throw new Error(errData.detail || "Sync failed");
       }
 
-      const data = await response.json();
+      const job = await waitForSyncJob(await response.json());
+      const data = job.result || {};
       toast({
         title: data.message || `Synced ${data.synced_count} transactions`,
       });
@@ -18,9 +18,16 @@ export async function POST(request: NextRequest) {
     const days = request.nextUrl.searchParams.get('days') || '30';
     const backendUrl = `${BACKEND_BASE_URL}/banking/enablebanking/sync?days=${days}`;
 
+    const headers = createBackendHeaders(session.user.email || '');
+    // Lets the backend return the already-queued job for a repeated click
+    const idempotencyKey = request.headers.get('Idempotency-Key');
+    if (idempotencyKey) {
+      headers['Idempotency-Key'] = idempotencyKey;
+    }
+
     const response = await fetch(backendUrl, {
       method: 'POST',
-      headers: createBackendHeaders(session.user.email || ''),
+      headers,
     });
 
     if (!response.ok) {
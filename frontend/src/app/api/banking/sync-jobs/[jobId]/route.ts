@@ -0,0 +1,46 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getServerSession } from 'next-auth/next';
+import { authOptions } from '@/lib/auth';
+import { createBackendHeaders } from '@/lib/backend-headers';
+
+const BACKEND_BASE_URL =
+  process.env.BACKEND_API_URL ||
+  process.env.NEXT_PUBLIC_API_URL ||
+  'http://localhost:8000';
+
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ jobId: string }> }
+) {
+  try {
+    const session = await getServerSession(authOptions);
+    if (!session?.user) {
+      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const { jobId } = await params;
+    const backendUrl = `${BACKEND_BASE_URL}/banking/sync-jobs/${encodeURIComponent(jobId)}`;
+
+    const response = await fetch(backendUrl, {
+      method: 'GET',
+      headers: createBackendHeaders(session.user.email || ''),
+      cache: 'no-store',
+    });
+
+    if (!response.ok) {
+      const errorText = await response.text();
+      return NextResponse.json(
+        { error: 'Failed to fetch sync job', detail: errorText },
+        { status: response.status }
+      );
+    }
+
+    const data = await response.json();
+    return NextResponse.json(data);
+  } catch (error: any) {
+    return NextResponse.json(
+      { error: 'Internal server error', detail: error.message },
+      { status: 500 }
+    );
+  }
+}
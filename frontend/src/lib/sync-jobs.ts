@@ -0,0 +1,68 @@
+/**
+ * Helpers for queued bank syncs.
+ *
+ * POST /api/banking/enablebanking/sync queues a sync job on the backend and
+ * returns it immediately; the sync summary arrives in `result` once a worker
+ * has finished the job.
+ *
+ * Usage:
+ *   const job = await (await fetch('/api/banking/enablebanking/sync', { method: 'POST' })).json();
+ *   const finished = await waitForSyncJob(job);
+ *   console.log(finished.result?.synced_count);
+ */
+
+export interface SyncJob {
+  job_id: number;
+  provider: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  attempts: number;
+  max_attempts: number;
+  progress: Record<string, any>;
+  result: Record<string, any> | null;
+  error: string | null;
+  error_code: string | null;
+}
+
+export class SyncJobFailedError extends Error {
+  constructor(public job: SyncJob) {
+    super(job.error || 'Sync failed');
+    this.name = 'SyncJobFailedError';
+  }
+}
+
+const TERMINAL_STATUSES = ['succeeded', 'failed'];
+
+/**
+ * Poll a sync job until it finishes. Resolves with the succeeded job and
+ * rejects with SyncJobFailedError when it failed.
+ */
+export async function waitForSyncJob(
+  job: SyncJob,
+  { intervalMs = 1500, timeoutMs = 10 * 60 * 1000, onProgress }: {
+    intervalMs?: number;
+    timeoutMs?: number;
+    onProgress?: (job: SyncJob) => void;
+  } = {}
+): Promise<SyncJob> {
+  const deadline = Date.now() + timeoutMs;
+  let current = job;
+
+  while (!TERMINAL_STATUSES.includes(current.status)) {
+    if (Date.now() > deadline) {
+      throw new Error('Sync is still running, check back later');
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+
+    const response = await fetch(`/api/banking/sync-jobs/${current.job_id}`, { cache: 'no-store' });
+    if (!response.ok) {
+      throw new Error('Failed to fetch sync status');
+    }
+    current = await response.json();
+    onProgress?.(current);
+  }
+
+  if (current.status === 'failed') {
+    throw new SyncJobFailedError(current);
+  }
+  return current;
+}